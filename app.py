@@ -9,6 +9,7 @@ import os
 import socket
 import logging
 import json
+import base64
 import tempfile
 import zipfile
 import time
@@ -17,7 +18,7 @@ import atexit
 import threading
 import requests # type: ignore
 import re
-from flask import Flask, render_template, request, jsonify, send_file, session, redirect, url_for, flash, send_from_directory, make_response
+from flask import Flask, render_template, request, jsonify, send_file, session, redirect, url_for, flash, send_from_directory, make_response, Response, stream_with_context
 
 # 2FA Import
 try:
@@ -41,6 +42,8 @@ from datetime import datetime, timedelta
 import shutil
 from functools import wraps
 
+from tischplan_live import TischplanEventBroker
+
 # Pandas als Lazy Import - nur laden wenn wirklich benötigt
 pd = None
 
@@ -65,6 +68,31 @@ except ImportError:
     EMAIL_AVAILABLE = False
     print("E-Mail Manager nicht verfügbar")
 
+# Medien-Manager importieren (Hintergrund-Verarbeitung der Gäste-Uploads)
+try:
+    from media_manager import (MediaManager, bild_platzhalter_pfad, get_upload_root, gleiche_upload_pfade_ab,
+                               loese_upload_pfad, video_platzhalter_pfad, waehle_derivat)
+    MEDIA_MANAGER_AVAILABLE = True
+except ImportError:
+    MEDIA_MANAGER_AVAILABLE = False
+    print("Medien-Manager nicht verfügbar")
+
+# E-Mail-Outbox (Versand im Hintergrund über eine gehaltene SMTP-Verbindung)
+from email_outbox import EmailOutbox
+from mail_merge import VORSCHAU_STANDARD, MailMerge
+
+# Streaming-ZIP für Sammel-Downloads
+from zip_stream import stream_zip
+
+# Karten-Jobs (parallele Kartengenerierung mit Fortschritt)
+from card_jobs import (CardJobManager, CardPreviewService, erstelle_kartengenerator, kartenrenderer,
+                       pruefe_karten_cache, warm_up_card_renderer)
+from card_pdf import PAPIERFORMATE
+from media_delivery import sende_mediendatei
+
+# Upload-Manager (fortsetzbare Uploads in Abschnitten)
+from upload_manager import UploadSessionManager, lege_blob_ab, parse_content_range, speichere_stream
+
 # DynDNS Manager importieren
 try:
     from dyndns_manager import init_dyndns, start_dyndns, stop_dyndns, get_dyndns_status
@@ -552,6 +580,10 @@ def init_config_files():
 # Globaler DataManager - initialisiere sofort
 data_manager = None
 email_manager = None
+email_outbox = None
+media_manager = None
+card_job_manager = None
+card_preview_service = None
 
 # Thread-Management für sauberes Shutdown
 ssl_thread = None
@@ -573,6 +605,20 @@ def signal_handler(signum, frame):
         except:
             pass
     
+    # E-Mail-Outbox stoppen (nicht versendete E-Mails bleiben in der Datenbank)
+    if email_outbox:
+        try:
+            email_outbox.stop()
+        except Exception:
+            pass
+    
+    # Medien-Worker beenden (os._exit überspringt atexit)
+    if media_manager:
+        try:
+            media_manager.stop()
+        except Exception:
+            pass
+    
     # SSL-Thread beenden (falls vorhanden)
     if ssl_thread and ssl_thread.is_alive():
         print("🔒 SSL-Server wird beendet...")
@@ -591,6 +637,16 @@ def cleanup():
                 email_manager.stop_email_checking()
             except:
                 pass
+        if email_outbox:
+            try:
+                email_outbox.stop()
+            except Exception:
+                pass
+        if media_manager:
+            try:
+                media_manager.stop()
+            except Exception:
+                pass
 
 # Signal-Handler registrieren
 signal.signal(signal.SIGINT, signal_handler)
@@ -635,6 +691,70 @@ if EMAIL_AVAILABLE:
         logger.error(f"Fehler beim Initialisieren des E-Mail Managers: {e}")
         email_manager = None
 
+# E-Mail-Outbox initialisieren (NACH E-Mail Manager)
+if email_manager and email_manager.is_enabled() and data_manager:
+    try:
+        email_outbox = EmailOutbox(data_manager, email_manager, DATA_DIR)
+        # Den Versand-Thread startet start_background_services() im bedienenden Prozess
+        if not email_outbox.is_enabled():
+            print("E-Mail-Outbox deaktiviert - E-Mails werden direkt gesendet")
+            email_outbox = None
+    except Exception as e:
+        logger.error(f"Fehler beim Initialisieren der E-Mail-Outbox: {e}")
+        email_outbox = None
+
+# Medien-Pipeline initialisieren (NACH DataManager)
+if MEDIA_MANAGER_AVAILABLE and data_manager:
+    try:
+        media_manager = MediaManager(data_manager, DATA_DIR)
+        # Worker-Prozesse startet start_background_services() im bedienenden Prozess
+        if not media_manager.is_enabled():
+            print("Medien-Pipeline deaktiviert - Thumbnails werden bei Bedarf erstellt")
+    except Exception as e:
+        logger.error(f"Fehler beim Initialisieren der Medien-Pipeline: {e}")
+        media_manager = None
+
+# Karten-Jobs initialisieren (NACH DataManager)
+if data_manager:
+    card_job_manager = CardJobManager(data_manager, DATA_DIR)
+    card_preview_service = CardPreviewService(data_manager)
+
+
+def warm_up_worker():
+    """
+    Kartenrenderer im Worker vorab laden (Gunicorn post_fork, Entwicklungsserver)
+    
+    Mit CARD_WARMUP=0 abschaltbar; dann lädt die erste Kartenanfrage den Renderer.
+    """
+    if not data_manager or os.environ.get('CARD_WARMUP', '1') == '0':
+        return None
+    try:
+        return warm_up_card_renderer(data_manager)
+    except Exception as e:
+        logger.warning(f"⚠️ Warm-up des Kartenrenderers fehlgeschlagen: {e}")
+        return None
+
+def start_background_services():
+    """
+    Hintergrunddienste im bedienenden Prozess starten (Gunicorn post_worker_init, Entwicklungsserver)
+    
+    Nicht beim Import: mit preload_app liefen sie sonst im Gunicorn-Master.
+    Unter gevent erst nach dem Monkey-Patching aufrufen (daher nicht in post_fork).
+    Jeder Worker versucht den Start, die Lock-Dateien lassen nur einen zum Zug
+    kommen; wird dieser Worker ersetzt, übernimmt sein Nachfolger. Neue E-Mails
+    aus anderen Workern holt der Versand-Thread beim nächsten Abfrageintervall ab.
+    """
+    if media_manager:
+        try:
+            media_manager.start()
+        except Exception as e:
+            logger.error(f"Fehler beim Starten der Medien-Pipeline: {e}")
+    if email_outbox:
+        try:
+            email_outbox.start()
+        except Exception as e:
+            logger.error(f"Fehler beim Starten der E-Mail-Outbox: {e}")
+
 # DynDNS Manager initialisieren
 def init_dyndns_manager():
     """Initialisiert den DynDNS Manager"""
@@ -2165,13 +2285,9 @@ def api_generate_test_card():
         app.logger.info(f"Finale Einstellungen für Test-Karte: {final_settings}")
         app.logger.info(f"Verwendetes Template für Test-Karte: {template}")
         
-        # Dynamisch QR-Generator importieren (mit Reload für Entwicklung)
+        # Kartenrenderer (einmal pro Prozess geladen, siehe warm_up_worker)
         try:
-            import importlib
-            import qr_card_generator
-            # Erzwinge Reload des Moduls für Entwicklungsänderungen
-            importlib.reload(qr_card_generator)
-            from qr_card_generator import WebQRCardGenerator
+            WebQRCardGenerator = kartenrenderer().WebQRCardGenerator
         except ImportError as e:
             app.logger.error(f"QR Card Generator nicht verfügbar: {e}")
             return jsonify({'error': 'QR Card Generator nicht verfügbar'}), 500
@@ -2205,153 +2321,329 @@ def api_generate_test_card():
         app.logger.error(f"Fehler beim Generieren der Test-Karte: {e}")
         return jsonify({'error': str(e)}), 500
 
+def merge_card_settings(data):
+    """
+    Führt die Karten-Einstellungen aus Request und Datenbank zusammen
+    
+    Frontend-Einstellungen haben Priorität, DB-Einstellungen dienen als Fallback.
+    
+    Returns:
+        tuple: (finale Einstellungen, Template)
+    """
+    settings = data.get('settings', {}) if data else {}
+    template = data.get('template', 'elegant') if data else 'elegant'
+    
+    # Lade gespeicherte Einstellungen aus der Datenbank als Fallback
+    try:
+        db_settings = data_manager.load_invitation_generator_settings()
+        app.logger.info(f"Datenbank-Einstellungen geladen: {bool(db_settings)}")
+    except Exception as e:
+        app.logger.warning(f"Fehler beim Laden der DB-Einstellungen: {e}")
+        db_settings = {}
+    
+    final_settings = {}
+    if db_settings:
+        final_settings.update(db_settings)
+    if settings:
+        final_settings.update(settings)
+    
+    # Falls immer noch keine Einstellungen vorhanden, verwende Standardwerte
+    if not final_settings:
+        final_settings = {
+            'primaryColor': '#8b7355',
+            'accentColor': '#d4af37',
+            'backgroundColor': '#ffffff',
+            'qrSize': 120,
+            'includePhoto': True,
+            'showLoginData': True,
+            'elegantFont': True
+        }
+    
+    # Template aus finalen Einstellungen verwenden falls nicht anders angegeben
+    if 'template' in final_settings and not data:
+        template = final_settings['template']
+    
+    return final_settings, template
+
 @app.route('/api/generate-all-cards', methods=['POST'])
 @require_auth
 @require_role(['admin'])
 def api_generate_all_cards():
-    """Generiert QR-Karten für alle Gäste und erstellt ZIP-Datei"""
+    """
+    Generiert QR-Karten für alle Gäste und streamt sie als ZIP-Download
+    
+    Die Einstellungen kommen als JSON-Body oder als Formularfeld 'payload'
+    (Formular-POST, damit der Browser den Download direkt übernimmt). Jede
+    Karte wird erst beim Streamen gerendert und sofort gesendet. Für viele
+    Gäste ist /api/card-jobs schneller (parallel, mit Fortschritt).
+    
+    Mit format='pdf' (und paper='A4'/'A3') entsteht stattdessen ein
+    druckfertiges PDF mit mehreren Karten pro Bogen und Schnittmarken.
+    """
     try:
-        data = request.get_json()
-        settings = data.get('settings', {}) if data else {}
-        template = data.get('template', 'elegant') if data else 'elegant'
-        
-        # Lade gespeicherte Einstellungen aus der Datenbank als Fallback
-        try:
-            db_settings = data_manager.load_invitation_generator_settings()
-            app.logger.info(f"Datenbank-Einstellungen geladen: {bool(db_settings)}")
-        except Exception as e:
-            app.logger.warning(f"Fehler beim Laden der DB-Einstellungen: {e}")
-            db_settings = {}
-        
-        # Merge settings: Frontend-Einstellungen haben Priorität, DB-Einstellungen als Fallback
-        final_settings = {}
-        if db_settings:
-            final_settings.update(db_settings)
-        if settings:
-            final_settings.update(settings)
-        
-        # Falls immer noch keine Einstellungen vorhanden, verwende Standardwerte
-        if not final_settings:
-            final_settings = {
-                'primaryColor': '#8b7355',
-                'accentColor': '#d4af37',
-                'backgroundColor': '#ffffff',
-                'qrSize': 120,
-                'includePhoto': True,
-                'showLoginData': True,
-                'elegantFont': True
-            }
-        
-        # Template aus finalen Einstellungen verwenden falls nicht anders angegeben
-        if 'template' in final_settings and not data:
-            template = final_settings['template']
+        if request.form.get('payload'):
+            data = json.loads(request.form['payload'])
+        else:
+            data = request.get_json(silent=True)
+        final_settings, template = merge_card_settings(data)
         
         app.logger.info(f"Finale Einstellungen für Kartengenerierung: {final_settings}")
         app.logger.info(f"Verwendetes Template: {template}")
         
-        # Dynamisch QR-Generator importieren (mit Reload für Entwicklung)
+        # Kartenrenderer (einmal pro Prozess geladen, siehe warm_up_worker)
         try:
-            import importlib
-            import qr_card_generator
-            # Erzwinge Reload des Moduls für Entwicklungsänderungen
-            importlib.reload(qr_card_generator)
-            from qr_card_generator import WebQRCardGenerator
+            kartenrenderer()
         except ImportError as e:
             app.logger.error(f"QR Card Generator nicht verfügbar: {e}")
             return jsonify({'error': 'QR Card Generator nicht verfügbar'}), 500
         
-        # QR-Generator initialisieren
-        generator = WebQRCardGenerator(data_manager)
-        
-        # Finale Settings anwenden
-        if final_settings:
-            primary_color = final_settings.get('primaryColor')
-            accent_color = final_settings.get('accentColor')
-            background_color = final_settings.get('backgroundColor')
-            
-            generator.set_colors(
-                primary=primary_color,
-                accent=accent_color,
-                background=background_color
-            )
-            
-            if 'qrSize' in final_settings:
-                generator.qr_size = int(final_settings['qrSize'])
+        # QR-Generator mit finalen Settings initialisieren
+        generator = erstelle_kartengenerator(data_manager, final_settings)
         
-        # Alle Karten als ZIP generieren
-        zip_data = generator.generate_all_cards(template, 'zip')
+        guests = data_manager.get_all_guests()
+        if not guests:
+            return jsonify({'error': 'Keine Gäste in der Datenbank gefunden'}), 400
         
-        if not zip_data:
-            return jsonify({'error': 'Keine Karten erstellt'}), 500
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # ZIP-Datei in temporärer Datei speichern
-        import tempfile
-        import os
+        if data and data.get('format') == 'pdf':
+            paper = data.get('paper', 'A4')
+            if paper not in PAPIERFORMATE:
+                return jsonify({'error': f'Unbekanntes Papierformat: {paper}'}), 400
+            
+            pdf_filename = f"einladungskarten_druck_{paper}_{timestamp}.pdf"
+            app.logger.info(f"Streame {pdf_filename} mit {len(guests)} Karten")
+            response = Response(generator.iter_print_pdf(template, guests, paper), mimetype='application/pdf')
+            response.headers['Content-Disposition'] = f'attachment; filename="{pdf_filename}"'
+            response.headers['X-Accel-Buffering'] = 'no'
+            response.headers['Cache-Control'] = 'no-store'
+            return response
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         zip_filename = f"qr_einladungskarten_{timestamp}.zip"
-        zip_path = os.path.join(tempfile.gettempdir(), zip_filename)
+        app.logger.info(f"Streame {zip_filename} mit {len(guests)} Karten")
         
-        with open(zip_path, 'wb') as f:
-            f.write(zip_data)
+        return zip_download_response(generator.iter_all_cards(template, guests), zip_filename)
+        
+    except Exception as e:
+        app.logger.error(f"Fehler beim Generieren aller Karten: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/card-jobs', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def api_start_card_job():
+    """
+    Startet die Kartengenerierung für alle (oder ausgewählte) Gäste als Hintergrund-Job
+    
+    Body: {settings, template, guest_ids (optional), force (optional)}
+    Antwortet sofort mit der Job-ID; Fortschritt unter /api/card-jobs/<id>,
+    Download unter /api/card-jobs/<id>/download. Unveränderte Karten werden
+    aus dem Karten-Cache übernommen, außer force ist gesetzt.
+    """
+    try:
+        if not data_manager or not card_job_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        # Anzahl der Gäste für Info
-        guest_count = len(data_manager.get_all_guests())
+        data = request.get_json(silent=True) or {}
+        final_settings, template = merge_card_settings(data)
         
-        app.logger.info(f"ZIP-Datei erstellt: {zip_path} mit {guest_count} Karten")
+        guests = data_manager.get_all_guests()
+        if data.get('guest_ids'):
+            guest_ids = {int(guest_id) for guest_id in data['guest_ids']}
+            guests = [guest for guest in guests if guest.get('id') in guest_ids]
+        if not guests:
+            return jsonify({'error': 'Keine Gäste in der Datenbank gefunden'}), 400
         
+        job_id = card_job_manager.start_job(guests, final_settings, template, force=bool(data.get('force')))
         return jsonify({
             'success': True,
-            'generated_count': guest_count,
-            'zip_filepath': zip_path,
-            'zip_filename': zip_filename,
-            'template': template
-        })
+            'job_id': job_id,
+            'gesamt': len(guests),
+            'status_url': f'/api/card-jobs/{job_id}',
+            'download_url': f'/api/card-jobs/{job_id}/download'
+        }), 202
         
     except Exception as e:
-        app.logger.error(f"Fehler beim Generieren aller Karten: {e}")
+        app.logger.error(f"Fehler beim Starten des Karten-Jobs: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/download-card')
+@app.route('/api/card-cache/stale', methods=['GET'])
 @require_auth
 @require_role(['admin'])
-def api_download_card():
-    """Download einer einzelnen QR-Karte"""
+def api_card_cache_stale():
+    """
+    Listet Gäste, deren Karte mit den aktuellen Einstellungen neu erstellt werden muss
+    
+    Query: template (optional, sonst aus den gespeicherten Einstellungen),
+    all=1 liefert auch die aktuellen Karten mit.
+    """
     try:
-        filepath = request.args.get('filepath')
-        if not filepath or not os.path.exists(filepath):
-            return jsonify({'error': 'Datei nicht gefunden'}), 404
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        return send_file(
-            filepath,
-            as_attachment=True,
-            download_name=os.path.basename(filepath),
-            mimetype='image/png'
-        )
+        anfrage = {'template': request.args['template']} if request.args.get('template') else None
+        final_settings, template = merge_card_settings(anfrage)
+        generator = erstelle_kartengenerator(data_manager, final_settings)
+        eintraege = pruefe_karten_cache(DATA_DIR, generator, data_manager.get_all_guests(), template)
+        
+        anzahl = {'aktuell': 0, 'veraltet': 0, 'fehlt': 0}
+        gaeste = []
+        for eintrag in eintraege:
+            anzahl[eintrag['status']] += 1
+            if eintrag['status'] != 'aktuell' or request.args.get('all') == '1':
+                guest = eintrag['guest']
+                gaeste.append({
+                    'id': guest.get('id'),
+                    'name': f"{guest.get('vorname', '')} {guest.get('nachname', '') or ''}".strip(),
+                    'status': eintrag['status']
+                })
+        
+        return jsonify({'success': True, 'template': template, 'anzahl': anzahl, 'gaeste': gaeste})
         
     except Exception as e:
-        app.logger.error(f"Fehler beim Download der Karte: {e}")
+        app.logger.error(f"Fehler beim Prüfen des Karten-Caches: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/card-jobs/<job_id>', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def api_card_job_status(job_id):
+    """Fortschritt eines Karten-Jobs"""
+    if not card_job_manager:
+        return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+    
+    status = card_job_manager.status(job_id)
+    if not status:
+        return jsonify({'error': 'Job nicht gefunden'}), 404
+    
+    karten = status.pop('karten')
+    status['verfuegbar'] = len(karten)
+    status['prozent'] = round(100 * (status['fertig'] + status['fehler']) / status['gesamt']) if status['gesamt'] else 100
+    return jsonify({'success': True, **status})
+
+@app.route('/api/card-jobs/<job_id>/cancel', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def api_cancel_card_job(job_id):
+    """Bricht einen laufenden Karten-Job ab (bereits fertige Karten bleiben herunterladbar)"""
+    if not card_job_manager:
+        return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+    
+    if not card_job_manager.cancel(job_id):
+        return jsonify({'error': 'Job nicht gefunden'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/card-jobs/<job_id>/download', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def api_download_card_job(job_id):
+    """
+    Streamt die Karten eines Jobs als ZIP in Fertigstellungsreihenfolge
+    
+    Läuft der Job noch, folgt der Download den Workern bis zur letzten Karte.
+    """
+    if not card_job_manager:
+        return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+    
+    status = card_job_manager.status(job_id)
+    if not status:
+        return jsonify({'error': 'Job nicht gefunden'}), 404
+    
+    timestamp = datetime.fromisoformat(status['gestartet']).strftime("%Y%m%d_%H%M%S")
+    zip_filename = f"qr_einladungskarten_{timestamp}.zip"
+    return zip_download_response(card_job_manager.iter_karten(job_id), zip_filename)
+
+@app.route('/api/card-qr/<int:guest_id>.svg', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def api_card_qr_svg(guest_id):
+    """QR-Code der Einladungskarte eines Gastes als SVG (z.B. für eigene Druckvorlagen)"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        guest = data_manager.get_guest_by_id(guest_id)
+        if not guest:
+            return jsonify({'error': 'Gast nicht gefunden'}), 404
+        
+        final_settings, _ = merge_card_settings(None)
+        generator = erstelle_kartengenerator(data_manager, final_settings)
+        svg = generator.guest_qr_svg(guest, request.args.get('size', type=int))
+        return Response(svg, mimetype='image/svg+xml', headers={'Cache-Control': 'no-store'})
+        
+    except Exception as e:
+        app.logger.error(f"Fehler beim Erstellen des QR-SVGs: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/card-preview', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def api_card_preview():
+    """
+    Schnelle Kartenvorschau für den Einladungs-Editor
+    
+    Verkleinert und als JPEG/WebP statt PNG in voller Größe. Pro Editor
+    (Benutzer + client_id) wird nur die neueste Anfrage gerendert; überholte
+    Anfragen erhalten 204.
+    """
+    try:
+        if not data_manager or not card_preview_service:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        data = request.get_json() or {}
+        renderer = kartenrenderer()
+        
+        image_format = data.get('format', 'jpeg')
+        if image_format not in renderer.PREVIEW_FORMATS:
+            return jsonify({'error': f'Unbekanntes Vorschauformat: {image_format}'}), 400
+        try:
+            scale = float(data.get('scale', renderer.PREVIEW_SCALE))
+        except (TypeError, ValueError):
+            scale = 0
+        if not 0.1 <= scale <= 1:
+            return jsonify({'error': 'scale muss zwischen 0.1 und 1 liegen'}), 400
+        
+        guest = renderer.DEMO_GUEST
+        if data.get('guest_id'):
+            guest = data_manager.get_guest_by_id(data['guest_id'])
+            if not guest:
+                return jsonify({'error': 'Gast nicht gefunden'}), 404
+        
+        final_settings, template = merge_card_settings(data)
+        editor = f"{session.get('username', '')}:{data.get('client_id', '')}"
+        result = card_preview_service.render(editor, guest, final_settings, template, image_format, scale)
+        if result is None:
+            return '', 204
+        
+        return Response(result['data'], mimetype=renderer.PREVIEW_FORMATS[image_format][1], headers={
+            'Cache-Control': 'no-store',
+            'X-Render-Time': str(result['ms']),
+            'X-Preview-Reused': '1' if result['wiederverwendet'] else '0'
+        })
+        
+    except Exception as e:
+        app.logger.error(f"Fehler beim Erstellen der Kartenvorschau: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/download-zip')
+@app.route('/api/download-card')
 @require_auth
 @require_role(['admin'])
-def api_download_zip():
-    """Download der ZIP-Datei mit allen QR-Karten"""
+def api_download_card():
+    """Download einer einzelnen QR-Karte"""
     try:
         filepath = request.args.get('filepath')
         if not filepath or not os.path.exists(filepath):
-            return jsonify({'error': 'ZIP-Datei nicht gefunden'}), 404
+            return jsonify({'error': 'Datei nicht gefunden'}), 404
         
         return send_file(
             filepath,
             as_attachment=True,
             download_name=os.path.basename(filepath),
-            mimetype='application/zip'
+            mimetype='image/png'
         )
         
     except Exception as e:
-        app.logger.error(f"Fehler beim Download der ZIP-Datei: {e}")
+        app.logger.error(f"Fehler beim Download der Karte: {e}")
         return jsonify({'error': str(e)}), 500
 
 # =============================================================================
@@ -6095,7 +6387,13 @@ def send_invitation():
                 'message': f'Fehlende Felder: {", ".join(missing_fields)}'
             }), 400
         
-        # Einladung senden
+        # Einladung über die Outbox senden (ohne Outbox direkt)
+        if email_outbox:
+            subject, body, html_body = email_manager.invitation_content(
+                data['guest_name'], data['event_date'], data['event_location'], data.get('rsvp_link')
+            )
+            return outbox_einreihen('einladung', data['guest_email'], subject, body, html_body, data.get('guest_id'))
+        
         result = email_manager.send_guest_invitation(
             guest_email=data['guest_email'],
             guest_name=data['guest_name'],
@@ -6143,7 +6441,11 @@ def send_reminder():
                 'message': f'Fehlende Felder: {", ".join(missing_fields)}'
             }), 400
         
-        # Erinnerung senden
+        # Erinnerung über die Outbox senden (ohne Outbox direkt)
+        if email_outbox:
+            subject, body, html_body = email_manager.reminder_content(data['guest_name'], data['reminder_text'])
+            return outbox_einreihen('erinnerung', data['guest_email'], subject, body, html_body, data.get('guest_id'))
+        
         result = email_manager.send_reminder_email(
             guest_email=data['guest_email'],
             guest_name=data['guest_name'],
@@ -6160,57 +6462,238 @@ def send_reminder():
             'message': f'Fehler beim Erinnerungsversand: {str(e)}'
         }), 500
 
-# =============================================================================
-# AUFGABEN-E-MAIL INTEGRATION API ROUTEN
-# =============================================================================
-
-@app.route('/api/aufgaben/<int:aufgabe_id>/email/send', methods=['POST'])
-@require_auth
-@require_role(['admin', 'user'])
-def api_aufgaben_email_send(aufgabe_id):
-    """Sendet eine E-Mail zu einer bestimmten Aufgabe"""
-    if not EMAIL_AVAILABLE or not email_manager:
-        return jsonify({
-            'success': False,
-            'message': 'E-Mail Manager nicht verfügbar'
-        }), 400
-    
-    if not email_manager.is_enabled():
+def outbox_einreihen(kategorie, guest_email, subject, body, html_body, guest_id=None):
+    """Reiht eine Gäste-E-Mail in die Outbox ein und antwortet mit 202 und der Outbox-ID"""
+    ids = email_outbox.enqueue([{
+        'kategorie': kategorie,
+        'referenz': guest_id,
+        'to_emails': [guest_email],
+        'subject': subject,
+        'body': body,
+        'html_body': html_body
+    }])
+    if not ids:
         return jsonify({
             'success': False,
-            'message': 'E-Mail-Funktionalität ist deaktiviert'
-        }), 400
+            'message': 'E-Mail konnte nicht eingereiht werden'
+        }), 500
     
+    return jsonify({
+        'success': True,
+        'queued': True,
+        'outbox_id': ids[0],
+        'status_url': f'/api/email/outbox/{ids[0]}',
+        'message': f'E-Mail an {guest_email} wurde zum Versand eingereiht'
+    }), 202
+
+@app.route('/api/email/outbox', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def email_outbox_status():
+    """Backlog der E-Mail-Outbox; mit ids/batch_id/status auch der Versandstatus einzelner E-Mails"""
     try:
-        # Aufgabe laden
-        aufgaben = data_manager.load_aufgaben()
-        aufgabe = next((a for a in aufgaben if a.get('id') == aufgabe_id), None)
-        
-        if not aufgabe:
-            return jsonify({
-                'success': False,
-                'message': 'Aufgabe nicht gefunden'
-            }), 404
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        data = request.get_json()
+        batch_id = request.args.get('batch_id')
+        ids = [int(email_id) for email_id in request.args.get('ids', '').split(',') if email_id.strip().isdigit()]
         
-        # Debug: Log der empfangenen Daten
-        logger.info(f"E-Mail-Daten empfangen für Aufgabe {aufgabe_id}: {data}")
+        stats = data_manager.get_email_outbox_statistics(batch_id=batch_id)
+        stats['sender'] = email_outbox.status() if email_outbox else None
+        if ids or batch_id or request.args.get('status'):
+            stats['messages'] = data_manager.get_outbox_emails(
+                email_ids=ids, batch_id=batch_id, status=request.args.get('status'),
+                limit=min(request.args.get('limit', 200, type=int), 1000)
+            )
+        return jsonify(stats)
         
-        # Pflichtfelder prüfen
-        required_fields = ['to_emails', 'subject', 'body']
-        missing_fields = [field for field in required_fields if not data.get(field)]
+    except Exception as e:
+        logger.error(f"Fehler beim Laden der Outbox-Statistik: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/email/outbox/<int:email_id>', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def email_outbox_message(email_id):
+    """Versandstatus einer E-Mail der Outbox"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        if missing_fields:
-            logger.warning(f"Fehlende Felder beim E-Mail-Versand: {missing_fields}")
-            return jsonify({
-                'success': False,
-                'message': f'Fehlende Felder: {", ".join(missing_fields)}'
-            }), 400
+        emails = data_manager.get_outbox_emails(email_ids=[email_id])
+        if not emails:
+            return jsonify({'error': 'E-Mail nicht gefunden'}), 404
+        return jsonify(emails[0])
         
-        # Aufgaben-E-Mail senden
-        result = email_manager.send_task_email(
-            task_id=aufgabe_id,
+    except Exception as e:
+        logger.error(f"Fehler beim Laden der Outbox-E-Mail {email_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/email/outbox/retry', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def email_outbox_retry():
+    """Plant fehlgeschlagene E-Mails erneut ein (optional nur eines Laufs)"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        data = request.get_json(silent=True) or {}
+        anzahl = data_manager.retry_failed_emails(batch_id=data.get('batch_id'))
+        if anzahl and email_outbox:
+            email_outbox.wake()
+        return jsonify({'success': True, 'retried': anzahl, 'message': f'{anzahl} E-Mails erneut eingeplant'})
+        
+    except Exception as e:
+        logger.error(f"Fehler beim erneuten Einplanen der E-Mails: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/email/outbox/cancel', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def email_outbox_cancel():
+    """Bricht noch nicht versendete E-Mails ab (batch_id oder ids)"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        data = request.get_json(silent=True) or {}
+        ids = [int(email_id) for email_id in data.get('ids', []) if str(email_id).isdigit()]
+        if not ids and not data.get('batch_id'):
+            return jsonify({'success': False, 'error': 'batch_id oder ids erforderlich'}), 400
+        
+        anzahl = data_manager.cancel_emails(batch_id=data.get('batch_id'), email_ids=ids)
+        return jsonify({'success': True, 'cancelled': anzahl, 'message': f'{anzahl} E-Mails abgebrochen'})
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Abbrechen der E-Mails: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/email/mail-merge', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def email_mail_merge():
+    """
+    Serienbrief an alle (gefilterten) Gäste über die Outbox
+    
+    Body: {template: invitation|reminder|custom, subject, body, html_body,
+    filter: {guest_ids, kategorie, seite, status}, variables, skip_already_sent,
+    priority, dry_run, preview}
+    Mit dry_run werden nur die ersten preview E-Mails gerendert und zurückgegeben.
+    Sonst werden alle in einer Transaktion eingereiht (202); Versandstand unter
+    /api/email/mail-merge/<batch_id>.
+    """
+    if not EMAIL_AVAILABLE or not email_manager:
+        return jsonify({
+            'success': False,
+            'message': 'E-Mail Manager nicht verfügbar'
+        }), 400
+    
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        data = request.get_json(silent=True) or {}
+        mail_merge = MailMerge(data_manager, email_manager, email_outbox)
+        login_basis = f"{request.url_root.rstrip('/')}/login"
+        
+        if data.get('dry_run'):
+            vorschau, bericht = mail_merge.vorschau(data, login_basis, data.get('preview', VORSCHAU_STANDARD))
+            return jsonify({'success': True, 'bericht': bericht, 'vorschau': vorschau})
+        
+        if not email_manager.is_enabled() or not email_outbox:
+            return jsonify({
+                'success': False,
+                'message': 'E-Mail-Versand bzw. Outbox ist deaktiviert - nur dry_run möglich'
+            }), 400
+        
+        bericht = mail_merge.starten(data, login_basis)
+        if not bericht['eingereiht']:
+            return jsonify({'success': False, 'message': 'Keine passenden Gäste mit E-Mail-Adresse',
+                            'bericht': bericht}), 400
+        
+        return jsonify({
+            'success': True,
+            'batch_id': bericht['batch_id'],
+            'bericht': bericht,
+            'status_url': f"/api/email/mail-merge/{bericht['batch_id']}"
+        }), 202
+        
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Fehler beim Serienbrief: {e}")
+        return jsonify({'success': False, 'message': f'Fehler beim Serienbrief: {str(e)}'}), 500
+
+@app.route('/api/email/mail-merge/<batch_id>', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def email_mail_merge_status(batch_id):
+    """Versandstand und Durchsatz eines Serienbriefs"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        status = MailMerge(data_manager, email_manager, email_outbox).status(batch_id)
+        if not status['gesamt']:
+            return jsonify({'error': 'Serienbrief nicht gefunden'}), 404
+        return jsonify(status)
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Laden des Serienbriefs {batch_id}: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# =============================================================================
+# AUFGABEN-E-MAIL INTEGRATION API ROUTEN
+# =============================================================================
+
+@app.route('/api/aufgaben/<int:aufgabe_id>/email/send', methods=['POST'])
+@require_auth
+@require_role(['admin', 'user'])
+def api_aufgaben_email_send(aufgabe_id):
+    """Sendet eine E-Mail zu einer bestimmten Aufgabe"""
+    if not EMAIL_AVAILABLE or not email_manager:
+        return jsonify({
+            'success': False,
+            'message': 'E-Mail Manager nicht verfügbar'
+        }), 400
+    
+    if not email_manager.is_enabled():
+        return jsonify({
+            'success': False,
+            'message': 'E-Mail-Funktionalität ist deaktiviert'
+        }), 400
+    
+    try:
+        # Aufgabe laden
+        aufgaben = data_manager.load_aufgaben()
+        aufgabe = next((a for a in aufgaben if a.get('id') == aufgabe_id), None)
+        
+        if not aufgabe:
+            return jsonify({
+                'success': False,
+                'message': 'Aufgabe nicht gefunden'
+            }), 404
+        
+        data = request.get_json()
+        
+        # Debug: Log der empfangenen Daten
+        logger.info(f"E-Mail-Daten empfangen für Aufgabe {aufgabe_id}: {data}")
+        
+        # Pflichtfelder prüfen
+        required_fields = ['to_emails', 'subject', 'body']
+        missing_fields = [field for field in required_fields if not data.get(field)]
+        
+        if missing_fields:
+            logger.warning(f"Fehlende Felder beim E-Mail-Versand: {missing_fields}")
+            return jsonify({
+                'success': False,
+                'message': f'Fehlende Felder: {", ".join(missing_fields)}'
+            }), 400
+        
+        # Aufgaben-E-Mail senden
+        result = email_manager.send_task_email(
+            task_id=aufgabe_id,
             task_title=aufgabe['titel'],
             to_emails=data['to_emails'],
             subject=data['subject'],
@@ -7049,7 +7532,8 @@ def guest_upload():
         if upload_result['success']:
             return jsonify({
                 'message': 'Upload erfolgreich',
-                'upload_id': upload_result['upload_id']
+                'upload_id': upload_result['upload_id'],
+                'duplicate': upload_result.get('duplicate', False)
             })
         else:
             return jsonify({'error': upload_result['error']}), 500
@@ -7058,6 +7542,177 @@ def guest_upload():
         logger.error(f"Fehler beim Gast-Upload: {e}")
         return jsonify({'error': str(e)}), 500
 
+# Fortsetzbare Uploads (Content-Range-Protokoll)
+upload_session_manager = None
+upload_session_manager_lock = threading.Lock()
+
+def get_upload_session_manager():
+    """Erzeugt den Manager für fortsetzbare Uploads beim ersten Zugriff"""
+    global upload_session_manager
+    with upload_session_manager_lock:
+        if upload_session_manager is None:
+            upload_session_manager = UploadSessionManager(data_manager, get_upload_path)
+        return upload_session_manager
+
+def upload_session_response(result):
+    """JSON-Antwort mit Upload-Offset-Header für einen Abschnitt"""
+    response = jsonify(result)
+    response.headers['Upload-Offset'] = str(result.get('offset', 0))
+    return response
+
+@app.route('/api/guest-upload/sessions', methods=['POST'])
+def guest_upload_session_create():
+    """
+    Startet einen fortsetzbaren Upload
+    
+    Body (JSON): filename, size, mime_type, description. Danach werden die
+    Abschnitte per PUT an /api/guest-upload/sessions/<token> gesendet.
+    """
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        # Prüfe Gast-Session
+        if 'guest_id' not in session:
+            return jsonify({'error': 'Nicht autorisiert'}), 401
+        
+        settings = data_manager.get_upload_settings()
+        if not settings.get('upload_enabled', True):
+            return jsonify({'error': 'Uploads sind derzeit deaktiviert'}), 403
+        
+        data = request.get_json() or {}
+        filename = (data.get('filename') or '').strip()
+        try:
+            total_size = int(data.get('size', 0))
+        except (TypeError, ValueError):
+            total_size = 0
+        
+        if not filename or total_size <= 0:
+            return jsonify({'error': 'Dateiname und Dateigröße erforderlich'}), 400
+        
+        # Größe und Endung vor dem ersten Byte prüfen
+        validation = validate_upload_meta(filename, total_size, settings)
+        if not validation['valid']:
+            return jsonify({'error': validation['error']}), 400
+        
+        result = get_upload_session_manager().create(
+            session['guest_id'], filename, total_size,
+            data.get('mime_type') or 'application/octet-stream',
+            data.get('description', '')
+        )
+        if not result:
+            return jsonify({'error': 'Upload konnte nicht gestartet werden'}), 500
+        
+        return jsonify(result), 201
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Starten des Uploads: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/guest-upload/sessions/<token>', methods=['GET', 'HEAD'])
+def guest_upload_session_status(token):
+    """Liefert den bestätigten Fortschritt eines Uploads (zum Fortsetzen)"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        if 'guest_id' not in session:
+            return jsonify({'error': 'Nicht autorisiert'}), 401
+        
+        upload_session = get_upload_session_manager().get(token, session['guest_id'])
+        if not upload_session:
+            return jsonify({'error': 'Upload-Session nicht gefunden'}), 404
+        
+        return upload_session_response({
+            'offset': upload_session['received'],
+            'size': upload_session['total_size']
+        })
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Laden des Upload-Status: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/guest-upload/sessions/<token>', methods=['PUT'])
+def guest_upload_session_chunk(token):
+    """
+    Nimmt einen Abschnitt entgegen (Header "Content-Range: bytes start-ende/gesamt")
+    
+    Der Body wird direkt aus dem Request-Stream auf die Platte geschrieben.
+    Nach dem letzten Abschnitt wird der Upload wie ein normaler Gast-Upload eingetragen.
+    """
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        if 'guest_id' not in session:
+            return jsonify({'error': 'Nicht autorisiert'}), 401
+
+        # Auch bereits begonnene Uploads stoppen, sobald Uploads deaktiviert werden
+        if not data_manager.get_upload_settings().get('upload_enabled', True):
+            return jsonify({'error': 'Uploads sind derzeit deaktiviert'}), 403
+
+        manager = get_upload_session_manager()
+        upload_session = manager.get(token, session['guest_id'])
+        if not upload_session:
+            return jsonify({'error': 'Upload-Session nicht gefunden'}), 404
+
+        content_range = parse_content_range(request.headers.get('Content-Range'))
+        if not content_range:
+            return jsonify({'error': 'Ungültiger Content-Range-Header'}), 400
+        
+        result = manager.write_chunk(upload_session, request.stream, *content_range)
+        if not result['success']:
+            return upload_session_response(result), result.get('status', 400)
+        
+        if not result.get('complete'):
+            return upload_session_response(result)
+        
+        upload_result = register_guest_upload(
+            upload_session['gast_id'],
+            result['temp_path'],
+            result['file_size'],
+            result['content_hash'],
+            upload_session['original_filename'],
+            upload_session['mime_type'] or 'application/octet-stream',
+            upload_session['beschreibung'] or ''
+        )
+        if not upload_result['success']:
+            return jsonify({'error': upload_result['error']}), 500
+        
+        return upload_session_response({
+            'message': 'Upload erfolgreich',
+            'upload_id': upload_result['upload_id'],
+            'duplicate': upload_result.get('duplicate', False),
+            'offset': result['offset'],
+            'complete': True
+        })
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Upload-Abschnitt: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/guest-upload/sessions/<token>', methods=['DELETE'])
+def guest_upload_session_abort(token):
+    """Bricht einen fortsetzbaren Upload ab"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        if 'guest_id' not in session:
+            return jsonify({'error': 'Nicht autorisiert'}), 401
+        
+        manager = get_upload_session_manager()
+        upload_session = manager.get(token, session['guest_id'])
+        if not upload_session:
+            return jsonify({'error': 'Upload-Session nicht gefunden'}), 404
+        
+        manager.abort(upload_session)
+        return jsonify({'message': 'Upload abgebrochen'})
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Abbrechen des Uploads: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/my-uploads')
 def get_my_uploads():
     """Liefert alle Uploads des aktuellen Gastes"""
@@ -7099,14 +7754,8 @@ def download_upload(upload_id):
             return jsonify({'error': 'Nicht autorisiert'}), 401
         
         # Datei senden
-        upload_path = get_upload_path()
-        file_path = os.path.join(upload_path, upload['filename'])
-        
-        if not os.path.exists(file_path):
-            return jsonify({'error': 'Datei nicht gefunden'}), 404
-        
-        return send_file(
-            file_path,
+        return send_upload_file(
+            upload,
             as_attachment=True,
             download_name=upload['original_filename']
         )
@@ -7144,18 +7793,10 @@ def delete_upload(upload_id):
             logger.error(f"❌ Berechtigung verweigert: user_role={user_role}")
             return jsonify({'error': 'Nicht autorisiert'}), 401
         
-        # Upload löschen
-        success = data_manager.delete_upload(upload_id)
+        # Upload löschen (Datei wird entfernt, sobald kein anderer Upload sie mehr nutzt)
+        success = delete_upload_with_file(upload)
         
         if success:
-            # Datei auch vom Dateisystem löschen
-            upload_path = get_upload_path()
-            file_path = os.path.join(upload_path, upload['filename'])
-            
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                logger.info(f"🗑️ Datei gelöscht: {file_path}")
-            
             logger.info(f"✅ Upload {upload_id} erfolgreich gelöscht")
             return jsonify({'message': 'Upload erfolgreich gelöscht'})
         else:
@@ -7390,14 +8031,8 @@ def admin_download_upload(upload_id):
             return jsonify({'error': 'Upload nicht gefunden'}), 404
         
         # Datei senden
-        upload_path = get_upload_path()
-        file_path = os.path.join(upload_path, upload['filename'])
-        
-        if not os.path.exists(file_path):
-            return jsonify({'error': 'Datei nicht gefunden'}), 404
-        
-        return send_file(
-            file_path,
+        return send_upload_file(
+            upload,
             as_attachment=True,
             download_name=upload['original_filename']
         )
@@ -7419,17 +8054,10 @@ def admin_delete_upload(upload_id):
         if not upload:
             return jsonify({'error': 'Upload nicht gefunden'}), 404
         
-        # Upload löschen
-        success = data_manager.delete_upload(upload_id)
+        # Upload löschen (Datei wird entfernt, sobald kein anderer Upload sie mehr nutzt)
+        success = delete_upload_with_file(upload)
         
         if success:
-            # Datei auch vom Dateisystem löschen
-            upload_path = get_upload_path()
-            file_path = os.path.join(upload_path, upload['filename'])
-            
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            
             return jsonify({'message': 'Upload erfolgreich gelöscht'})
         else:
             return jsonify({'error': 'Fehler beim Löschen'}), 500
@@ -7452,17 +8080,11 @@ def admin_bulk_delete_uploads():
             return jsonify({'error': 'Keine Upload-IDs angegeben'}), 400
         
         deleted_count = 0
-        upload_path = get_upload_path()
         
         for upload_id in upload_ids:
             upload = data_manager.get_upload_by_id(upload_id)
             if upload:
-                success = data_manager.delete_upload(upload_id)
-                if success:
-                    # Datei auch vom Dateisystem löschen
-                    file_path = os.path.join(upload_path, upload['filename'])
-                    if os.path.exists(file_path):
-                        os.remove(file_path)
+                if delete_upload_with_file(upload):
                     deleted_count += 1
         
         return jsonify({
@@ -7474,6 +8096,14 @@ def admin_bulk_delete_uploads():
         logger.error(f"Fehler bei Bulk-Löschung: {e}")
         return jsonify({'error': str(e)}), 500
 
+def zip_download_response(eintraege, download_name):
+    """Streamt ein ZIP-Archiv ohne temporäre Datei (erste Bytes sofort, konstanter Speicher)"""
+    response = Response(stream_zip(eintraege), mimetype='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @app.route('/api/admin/bulk-download-uploads')
 @require_auth
 @require_role(['admin'])
@@ -7487,30 +8117,21 @@ def admin_bulk_download_uploads():
         if not upload_ids or not upload_ids[0]:
             return jsonify({'error': 'Keine Upload-IDs angegeben'}), 400
         
-        # Temporäre ZIP-Datei erstellen
-        temp_dir = tempfile.mkdtemp()
-        zip_path = os.path.join(temp_dir, 'uploads.zip')
-        upload_path = get_upload_path()
-        
-        with zipfile.ZipFile(zip_path, 'w') as zip_file:
-            for upload_id in upload_ids:
-                try:
-                    upload = data_manager.get_upload_by_id(int(upload_id))
-                    if upload:
-                        file_path = os.path.join(upload_path, upload['filename'])
-                        if os.path.exists(file_path):
-                            # Füge Datei mit originalem Namen hinzu
-                            zip_file.write(file_path, upload['original_filename'])
-                except (ValueError, Exception) as e:
-                    logger.warning(f"Fehler bei Upload {upload_id}: {e}")
-                    continue
+        # Dateien vorab auflösen, das Archiv selbst wird direkt in die Response gestreamt
+        eintraege = []
+        for upload_id in upload_ids:
+            try:
+                upload = data_manager.get_upload_by_id(int(upload_id))
+                if upload:
+                    file_path = get_upload_file_path(upload)
+                    if file_path and os.path.exists(file_path):
+                        # Datei mit originalem Namen hinzufügen
+                        eintraege.append((upload['original_filename'], file_path))
+            except (ValueError, Exception) as e:
+                logger.warning(f"Fehler bei Upload {upload_id}: {e}")
+                continue
         
-        # ZIP-Datei senden
-        return send_file(
-            zip_path,
-            as_attachment=True,
-            download_name=f'uploads_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip'
-        )
+        return zip_download_response(eintraege, f'uploads_{datetime.now().strftime("%Y%m%d_%H%M%S")}.zip')
         
     except Exception as e:
         logger.error(f"Fehler beim Bulk-Download: {e}")
@@ -7699,313 +8320,367 @@ def get_pending_uploads():
         logger.error(f"❌ Fehler beim Laden der ausstehenden Uploads: {e}")
         return jsonify({'error': str(e)}), 500
 
+GALERIE_SEITE_STANDARD = 50
+GALERIE_SEITE_MAX = 200
+
+def encode_gallery_cursor(position):
+    """Undurchsichtiger Cursor für die nächste Galerie-Seite"""
+    if not position:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(position)).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_gallery_cursor(cursor):
+    """(upload_date, id) aus einem Galerie-Cursor oder None bei ungültigem Cursor"""
+    try:
+        upload_date, upload_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return str(upload_date), int(upload_id)
+    except (ValueError, TypeError):
+        return None
+
 @app.route('/api/approved-gallery')
 @require_auth
 @require_role(['admin', 'user', 'guest'])
 def get_approved_gallery():
-    """Liefert alle genehmigten Uploads für die Foto-Galerie (für eingeloggte Benutzer)"""
+    """
+    Liefert die genehmigten Uploads für die Foto-Galerie (für eingeloggte Benutzer)
+    
+    Mit ?limit= (und ?cursor= für Folgeseiten) wird seitenweise geliefert:
+    {'items': [...], 'next_cursor': ...} mit kompakten Einträgen für das Raster
+    (Thumbnail-URL, Maße, BlurHash). Ohne Parameter wie bisher die komplette Liste.
+    
+    Weitere Filter: ?type=image|video, ?zeitplan=<Eintrag-ID> (Aufnahmezeit im
+    Zeitfenster des Programmpunkts), ?serien=1 (nahezu gleiche Bilder nur einmal,
+    mit 'serie' = Anzahl der Bilder).
+    """
     try:
-        logger.info("🎯 Photo Gallery API: get_approved_gallery called")
-        logger.info(f"🔐 Photo Gallery API: User: {session.get('username', 'unknown')}")
-        logger.info(f"🔐 Photo Gallery API: Role: {session.get('user_role', 'unknown')}")
-        
         if not data_manager:
             logger.error("❌ Photo Gallery API: Datenbank nicht verfügbar")
             return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        logger.info("📡 Photo Gallery API: Fetching approved uploads from database...")
-        uploads = data_manager.get_approved_uploads()
-        
-        logger.info(f"📦 Photo Gallery API: Found {len(uploads)} approved uploads")
+        if 'limit' not in request.args and 'cursor' not in request.args:
+            return jsonify(data_manager.get_approved_uploads())
         
-        if uploads:
-            logger.info(f"📦 Photo Gallery API: Sample upload: {uploads[0]}")
-        else:
-            logger.warning("📭 Photo Gallery API: No approved uploads found")
+        try:
+            limit = int(request.args.get('limit', GALERIE_SEITE_STANDARD))
+        except ValueError:
+            return jsonify({'error': 'Ungültiges Limit'}), 400
+        limit = max(1, min(limit, GALERIE_SEITE_MAX))
+        
+        nach = None
+        if request.args.get('cursor'):
+            nach = decode_gallery_cursor(request.args['cursor'])
+            if not nach:
+                return jsonify({'error': 'Ungültiger Cursor'}), 400
+        
+        file_type = request.args.get('type')
+        if file_type not in (None, '', 'image', 'video'):
+            return jsonify({'error': 'Ungültiger Dateityp'}), 400
+        
+        zeitraum = None
+        if request.args.get('zeitplan'):
+            fenster = next((f for f in data_manager.get_zeitplan_zeitfenster()
+                            if str(f['id']) == request.args['zeitplan']), None)
+            if not fenster:
+                return jsonify({'error': 'Programmpunkt nicht gefunden'}), 404
+            zeitraum = (fenster['von'], fenster['bis'])
+        
+        serien_groesse = {}
+        ausblenden = None
+        if request.args.get('serien') == '1':
+            ausblenden = []
+            for serie in data_manager.get_upload_serien():
+                serien_groesse[serie['repraesentant']] = len(serie['ids'])
+                ausblenden.extend(i for i in serie['ids'] if i != serie['repraesentant'])
+        
+        uploads, naechste = data_manager.get_approved_uploads_seite(limit, nach, file_type or None,
+                                                                    zeitraum, ausblenden)
+        for upload in uploads:
+            upload['thumb_url'] = f"/api/gallery-thumbnail/{upload['id']}"
+            if upload['id'] in serien_groesse:
+                upload['serie'] = serien_groesse[upload['id']]
         
-        logger.info("✅ Photo Gallery API: Returning uploads successfully")
-        return jsonify(uploads)
+        return jsonify({'items': uploads, 'next_cursor': encode_gallery_cursor(naechste)})
         
     except Exception as e:
         logger.error(f"❌ Photo Gallery API: Fehler beim Laden der Foto-Galerie: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/gallery/serien')
+@require_auth
+@require_role(['admin', 'user', 'guest'])
+def get_gallery_serien():
+    """Gruppen nahezu gleicher Bilder (Serienaufnahmen) anhand des Wahrnehmungs-Hashes"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        max_abstand = request.args.get('max_abstand', type=int)
+        serien = data_manager.get_upload_serien(max_abstand) if max_abstand is not None \
+            else data_manager.get_upload_serien()
+        return jsonify({'success': True, 'serien': serien})
+        
+    except Exception as e:
+        logger.error(f"❌ Fehler beim Laden der Serienbilder: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/gallery/aehnliche/<int:upload_id>')
+@require_auth
+@require_role(['admin', 'user', 'guest'])
+def get_gallery_aehnliche(upload_id):
+    """Nahezu gleiche Bilder zu einem Upload (aufsteigend nach Hamming-Abstand)"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        return jsonify({'success': True, 'aehnliche': data_manager.get_aehnliche_uploads(upload_id)})
+        
+    except Exception as e:
+        logger.error(f"❌ Fehler bei der Ähnlichkeitssuche: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/gallery/zeitplan')
+@require_auth
+@require_role(['admin', 'user', 'guest'])
+def get_gallery_zeitplan():
+    """Programmpunkte des Zeitplans mit Zeitfenster und Anzahl der Aufnahmen (EXIF-Zeit)"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        zeitplan = data_manager.get_zeitplan_galerie()
+        # Gäste sehen nur öffentliche Programmpunkte
+        if session.get('user_role') == 'guest':
+            oeffentlich = {e['id'] for e in data_manager.get_zeitplan() if not e.get('nur_brautpaar')}
+            zeitplan = [e for e in zeitplan if e['id'] in oeffentlich]
+        return jsonify({'success': True, 'zeitplan': zeitplan})
+        
+    except Exception as e:
+        logger.error(f"❌ Fehler beim Laden der Zeitleiste: {e}")
+        return jsonify({'error': str(e)}), 500
+
+def get_width_hint():
+    """Gewünschte Bildbreite in Gerätepixeln (?w= oder Client-Hint-Header)"""
+    hint = request.args.get('w') or request.headers.get('Sec-CH-Width') or request.headers.get('Width')
+    try:
+        return max(1, int(float(hint))) if hint else None
+    except ValueError:
+        return None
+
+def load_upload_derivate(upload_id, variante):
+    """
+    Lädt die Derivate eines Uploads; fehlt die benötigte Variante, wird die
+    Verarbeitung angestoßen (Job vorziehen bzw. ohne Worker direkt rechnen)
+    """
+    derivate = data_manager.get_upload_derivate(upload_id)
+    if any(d['variante'] == variante for d in derivate) or not media_manager:
+        return derivate
+    
+    if media_manager.is_enabled():
+        data_manager.enqueue_media_job(upload_id, prioritaet=10)
+    elif PIL_AVAILABLE:
+        # Keine Worker konfiguriert (MEDIA_WORKERS=0)
+        media_manager.process_now(upload_id)
+        derivate = data_manager.get_upload_derivate(upload_id)
+    return derivate
+
+def send_upload_derivat(derivat):
+    """Liefert ein vorberechnetes Derivat aus (abhängig vom Accept-Header)"""
+    response = sende_mediendatei(derivat['pfad'], mimetype=derivat['mime_type'], upload_root=get_upload_path())
+    response.headers['Vary'] = 'Accept'
+    return response
+
 @app.route('/api/gallery-image/<int:upload_id>')
 @require_auth
 @require_role(['admin', 'user', 'guest'])
 def serve_gallery_image(upload_id):
-    """Stellt genehmigte Bilder für die Galerie bereit (für eingeloggte Benutzer)"""
+    """
+    Stellt genehmigte Bilder für die Galerie bereit (für eingeloggte Benutzer)
+    
+    Bilder werden als passend skaliertes Derivat ausgeliefert (Breite über ?w=,
+    Format über den Accept-Header); ?original=1 liefert die Originaldatei.
+    """
     try:
-        logger.info(f"🖼️ Photo Gallery API: serve_gallery_image called for upload_id: {upload_id}")
+        logger.debug(f"🖼️ Photo Gallery API: serve_gallery_image called for upload_id: {upload_id}")
         
         if not data_manager:
             logger.error("❌ Photo Gallery API: Datenbank nicht verfügbar")
             return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
         # Prüfe ob Upload genehmigt ist
-        logger.info(f"🔍 Photo Gallery API: Checking upload {upload_id} approval status...")
+        logger.debug(f"🔍 Photo Gallery API: Checking upload {upload_id} approval status...")
         upload = data_manager.get_upload_by_id(upload_id)
         
         if not upload:
             logger.warning(f"📭 Photo Gallery API: Upload {upload_id} not found")
             return jsonify({'error': 'Upload nicht gefunden'}), 404
         
-        logger.info(f"📋 Photo Gallery API: Upload {upload_id} details: {upload}")
+        logger.debug(f"📋 Photo Gallery API: Upload {upload_id} details: {upload}")
         
         if upload.get('admin_approved') != 1:
             logger.warning(f"🚫 Photo Gallery API: Upload {upload_id} not approved (status: {upload.get('admin_approved')})")
             return jsonify({'error': 'Upload nicht genehmigt'}), 403
         
-        # Datei bereitstellen - intelligente Pfadsuche
-        upload_path = get_upload_path()
-        filename = upload['filename']
-        
-        # Mögliche Dateipfade in Prioritätsreihenfolge
-        possible_paths = [
-            # 1. Standard Upload-Pfad mit Dateiname
-            os.path.join(upload_path, filename),
-            # 2. Ursprünglicher Pfad aus der Datenbank (falls noch gültig)
-            upload.get('file_path', ''),
-            # 3. Alternatives Upload-Verzeichnis
-            os.path.join(DATA_DIR, 'uploads', filename),
-            # 4. Uploads-Verzeichnis im Hauptverzeichnis
-            os.path.join(os.path.dirname(__file__), 'Uploads', filename),
-            # 5. Data-Verzeichnis direkt
-            os.path.join(DATA_DIR, filename)
-        ]
-        
-        file_path = None
-        for path in possible_paths:
-            if path and os.path.exists(path):
-                file_path = path
-                logger.info(f"✅ Photo Gallery API: Found file at: {file_path}")
-                break
-                
-        if not file_path:
-            logger.error(f"❌ Photo Gallery API: File not found in any of these locations:")
-            for i, path in enumerate(possible_paths, 1):
-                logger.error(f"  {i}. {path}")
-            return jsonify({'error': 'Datei nicht gefunden'}), 404
+        if upload['mime_type'].startswith('image/') and request.args.get('original') != '1':
+            derivate = [d for d in load_upload_derivate(upload_id, 'large') if d['variante'] != 'thumb']
+            derivat = waehle_derivat(derivate, breite=get_width_hint(), accept=request.headers.get('Accept', ''))
+            if derivat and os.path.exists(derivat['pfad']):
+                return send_upload_derivat(derivat)
         
-        logger.info(f"✅ Photo Gallery API: Serving file: {file_path} with mime_type: {upload['mime_type']}")
-        return send_file(file_path, mimetype=upload['mime_type'])
+        # Originaldatei über den beim Upload gespeicherten Pfad
+        return send_upload_file(upload, mimetype=upload['mime_type'])
         
     except Exception as e:
         logger.error(f"❌ Photo Gallery API: Fehler beim Bereitstellen des Galerie-Bildes: {e}")
         return jsonify({'error': str(e)}), 500
 
 def create_video_thumbnail(upload_id, filename):
-    """Erstellt ein generisches Thumbnail für Videos"""
+    """Liefert den gemeinsamen Video-Platzhalter (bis der Poster-Frame fertig ist)"""
     try:
         if not PIL_AVAILABLE:
             # Fallback: Einfache JSON-Antwort
             return jsonify({'error': 'Video-Thumbnail nicht verfügbar'}), 404
         
-        from PIL import Image, ImageDraw, ImageFont
-        import io
+        video_thumb_path, _ = video_platzhalter_pfad(get_upload_path())
+        response = send_file(video_thumb_path, mimetype='image/jpeg')
+        # Kurz cachen - danach soll der echte Poster-Frame geladen werden
+        response.headers['Cache-Control'] = 'private, max-age=60'
+        return response
         
-        # Cache-Verzeichnis für Video-Thumbnails
-        upload_path = get_upload_path()
-        thumbnails_dir = os.path.join(upload_path, 'video_thumbnails')
-        if not os.path.exists(thumbnails_dir):
-            os.makedirs(thumbnails_dir)
-        
-        # Video-Thumbnail-Dateiname
-        video_thumb_filename = f"video_thumb_{upload_id}.jpg"
-        video_thumb_path = os.path.join(thumbnails_dir, video_thumb_filename)
-        
-        # Prüfe ob Video-Thumbnail bereits existiert
-        if os.path.exists(video_thumb_path):
-            logger.info(f"✅ Video Thumbnail: Using cached video thumbnail: {video_thumb_path}")
-            return send_file(video_thumb_path, mimetype='image/jpeg')
-        
-        logger.info(f"🎬 Video Thumbnail: Creating generic video thumbnail for: {filename}")
-        
-        # Erstelle ein 300x300 Video-Thumbnail mit Play-Symbol
-        img = Image.new('RGB', (300, 300), color='#2c3e50')
-        draw = ImageDraw.Draw(img)
-        
-        # Gradient-Hintergrund simulieren
-        for y in range(300):
-            color_val = int(44 + (y / 300) * 40)  # Von #2c3e50 zu hellerer Farbe
-            draw.line([(0, y), (300, y)], fill=(color_val, color_val + 20, color_val + 30))
-        
-        # Play-Symbol zeichnen (großer Kreis mit Dreieck)
-        center_x, center_y = 150, 150
-        circle_radius = 60
-        
-        # Kreis für Play-Button
-        draw.ellipse([center_x - circle_radius, center_y - circle_radius, 
-                     center_x + circle_radius, center_y + circle_radius], 
-                    fill='#ffffff', outline='#ecf0f1', width=3)
-        
-        # Play-Dreieck
-        triangle_size = 25
-        triangle_points = [
-            (center_x - triangle_size//2, center_y - triangle_size),
-            (center_x - triangle_size//2, center_y + triangle_size),
-            (center_x + triangle_size, center_y)
-        ]
-        draw.polygon(triangle_points, fill='#3498db')
+    except Exception as e:
+        logger.error(f"❌ Video Thumbnail: Error creating video thumbnail: {e}")
+        # Fallback: JSON-Fehler
+        return jsonify({'error': 'Video-Thumbnail Erstellung fehlgeschlagen'}), 500
+
+@app.route('/api/gallery-thumbnail/<int:upload_id>')
+@require_auth
+@require_role(['admin', 'user', 'guest'])
+def serve_gallery_thumbnail(upload_id):
+    """
+    Stellt Thumbnails für die Galerie bereit
+    
+    Thumbnails werden von der Medien-Pipeline im Hintergrund vorberechnet;
+    im Request wird nur noch die fertige Datei ausgeliefert.
+    """
+    try:
+        if not data_manager:
+            logger.error("❌ Thumbnail API: Datenbank nicht verfügbar")
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        # Video-Icon in der Ecke
-        icon_size = 24
-        draw.rectangle([10, 10, 10 + icon_size, 10 + icon_size], fill='#e74c3c')
-        draw.polygon([(15, 18), (15, 26), (25, 22)], fill='#ffffff')
+        # Prüfe ob Upload genehmigt ist
+        upload = data_manager.get_upload_by_id(upload_id)
         
-        # "VIDEO" Text
-        try:
-            # Versuche eine bessere Schrift zu verwenden
-            font = ImageFont.truetype("arial.ttf", 16)
-        except:
-            # Fallback auf Standard-Schrift
-            font = ImageFont.load_default()
+        if not upload:
+            logger.warning(f"📭 Thumbnail API: Upload {upload_id} not found")
+            return jsonify({'error': 'Upload nicht gefunden'}), 404
+        
+        if upload.get('admin_approved') != 1:
+            logger.warning(f"🚫 Thumbnail API: Upload {upload_id} not approved")
+            return jsonify({'error': 'Upload nicht genehmigt'}), 403
         
-        text = "VIDEO"
-        text_bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_height = text_bbox[3] - text_bbox[1]
-        text_x = (300 - text_width) // 2
-        text_y = 240
+        derivat = waehle_derivat(load_upload_derivate(upload_id, 'thumb'), variante='thumb',
+                                 accept=request.headers.get('Accept', ''))
+        if derivat and os.path.exists(derivat['pfad']):
+            return send_upload_derivat(derivat)
         
-        # Text-Schatten
-        draw.text((text_x + 1, text_y + 1), text, fill='#000000', font=font)
-        # Haupttext
-        draw.text((text_x, text_y), text, fill='#ffffff', font=font)
+        # Fallback bis das Derivat fertig ist
+        if not upload['mime_type'].startswith('image/'):
+            return create_video_thumbnail(upload_id, upload['filename'])
         
-        # Speichere Video-Thumbnail
-        img.save(video_thumb_path, 'JPEG', quality=85, optimize=True)
+        # Job ist vorgezogen (load_upload_derivate) - bis dahin Platzhalter statt
+        # des vollen Originals; nur ohne Pipeline oder nach Fehlschlag das Original
+        if media_manager and media_manager.is_enabled() and upload.get('media_status') != 'failed':
+            platzhalter_pfad, _ = bild_platzhalter_pfad(get_upload_path())
+            response = send_file(platzhalter_pfad, mimetype='image/jpeg')
+            response.headers['Cache-Control'] = 'no-store'
+            response.headers['Retry-After'] = '2'
+            return response
         
-        logger.info(f"✅ Video Thumbnail: Created and cached: {video_thumb_path}")
-        return send_file(video_thumb_path, mimetype='image/jpeg')
+        return send_upload_file(upload, mimetype=upload['mime_type'])
         
     except Exception as e:
-        logger.error(f"❌ Video Thumbnail: Error creating video thumbnail: {e}")
-        # Fallback: JSON-Fehler
-        return jsonify({'error': 'Video-Thumbnail Erstellung fehlgeschlagen'}), 500
+        logger.error(f"❌ Thumbnail API: Fehler beim Bereitstellen des Thumbnails: {e}")
+        return jsonify({'error': str(e)}), 500
 
-@app.route('/api/gallery-thumbnail/<int:upload_id>')
+@app.route('/api/gallery-preview/<int:upload_id>')
 @require_auth
 @require_role(['admin', 'user', 'guest'])
-def serve_gallery_thumbnail(upload_id):
-    """Stellt Thumbnails für die Galerie bereit (optimiert für Performance)"""
+def serve_gallery_preview(upload_id):
+    """
+    Kurzer, stummer Vorschau-Clip eines Videos für die Galerie-Übersicht
+    
+    Ist (noch) kein Clip vorhanden (z.B. ohne ffmpeg), wird das Original geliefert.
+    """
     try:
-        logger.info(f"🖼️ Thumbnail API: serve_gallery_thumbnail called for upload_id: {upload_id}")
-        
         if not data_manager:
-            logger.error("❌ Thumbnail API: Datenbank nicht verfügbar")
             return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        # Prüfe ob Upload genehmigt ist
         upload = data_manager.get_upload_by_id(upload_id)
-        
         if not upload:
-            logger.warning(f"📭 Thumbnail API: Upload {upload_id} not found")
             return jsonify({'error': 'Upload nicht gefunden'}), 404
         
         if upload.get('admin_approved') != 1:
-            logger.warning(f"🚫 Thumbnail API: Upload {upload_id} not approved")
             return jsonify({'error': 'Upload nicht genehmigt'}), 403
         
-        # Thumbnail erstellen und bereitstellen - intelligente Pfadsuche
-        upload_path = get_upload_path()
-        filename = upload['filename']
-        
-        # Mögliche Dateipfade in Prioritätsreihenfolge
-        possible_paths = [
-            # 1. Standard Upload-Pfad mit Dateiname
-            os.path.join(upload_path, filename),
-            # 2. Ursprünglicher Pfad aus der Datenbank (falls noch gültig)
-            upload.get('file_path', ''),
-            # 3. Alternatives Upload-Verzeichnis
-            os.path.join(DATA_DIR, 'uploads', filename),
-            # 4. Uploads-Verzeichnis im Hauptverzeichnis
-            os.path.join(os.path.dirname(__file__), 'Uploads', filename),
-            # 5. Data-Verzeichnis direkt
-            os.path.join(DATA_DIR, filename)
-        ]
-        
-        file_path = None
-        for path in possible_paths:
-            if path and os.path.exists(path):
-                file_path = path
-                logger.info(f"✅ Thumbnail API: Found file at: {file_path}")
-                break
-                
-        if not file_path:
-            logger.error(f"❌ Thumbnail API: File not found in any of these locations:")
-            for i, path in enumerate(possible_paths, 1):
-                logger.error(f"  {i}. {path}")
-            return jsonify({'error': 'Datei nicht gefunden'}), 404
+        # Kein Nachrechnen anstoßen - das übernimmt bereits der Thumbnail-Abruf
+        derivat = waehle_derivat(data_manager.get_upload_derivate(upload_id), variante='preview')
+        if derivat and os.path.exists(derivat['pfad']):
+            return sende_mediendatei(derivat['pfad'], mimetype=derivat['mime_type'], upload_root=get_upload_path())
         
-        # Prüfe ob es ein Bild ist (nur für Bilder Thumbnails erstellen)
-        if not upload['mime_type'].startswith('image/'):
-            # Für Videos: Erstelle ein generisches Video-Thumbnail
-            return create_video_thumbnail(upload_id, upload['filename'])
+        return send_upload_file(upload, mimetype=upload['mime_type'])
         
-        # Thumbnail erstellen
-        if not PIL_AVAILABLE:
-            logger.warning("⚠️ Thumbnail API: PIL not available, serving original image")
-            return send_file(file_path, mimetype=upload['mime_type'])
+    except Exception as e:
+        logger.error(f"❌ Preview API: Fehler beim Bereitstellen der Video-Vorschau: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/media-jobs', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def admin_media_jobs():
+    """Backlog der Medien-Pipeline (offene, laufende und fehlgeschlagene Jobs)"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        try:
-            import io
-            
-            # Cache-Verzeichnis für Thumbnails
-            thumbnails_dir = os.path.join(upload_path, 'thumbnails')
-            if not os.path.exists(thumbnails_dir):
-                os.makedirs(thumbnails_dir)
-            
-            # Thumbnail-Dateiname
-            thumb_filename = f"thumb_{upload_id}_{upload['filename']}"
-            thumb_path = os.path.join(thumbnails_dir, thumb_filename)
-            
-            # Prüfe ob Thumbnail bereits existiert
-            if os.path.exists(thumb_path):
-                logger.info(f"✅ Thumbnail API: Using cached thumbnail: {thumb_path}")
-                return send_file(thumb_path, mimetype='image/jpeg')
-            
-            # Thumbnail erstellen
-            logger.info(f"🔄 Thumbnail API: Creating thumbnail for: {file_path}")
-            
-            with Image.open(file_path) as img:
-                # EXIF-Orientierung korrigieren
-                try:
-                    # Einfachere EXIF-Handhabung
-                    if hasattr(img, '_getexif') and img._getexif() is not None:
-                        exif = img._getexif()
-                        orientation = exif.get(0x0112, 1)  # 0x0112 ist EXIF Orientation Tag
-                        if orientation == 3:
-                            img = img.rotate(180, expand=True)
-                        elif orientation == 6:
-                            img = img.rotate(270, expand=True)
-                        elif orientation == 8:
-                            img = img.rotate(90, expand=True)
-                except (AttributeError, KeyError, TypeError):
-                    pass  # Ignoriere EXIF-Fehler
-                
-                # Konvertiere zu RGB falls nötig
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Thumbnail erstellen (300x300 max, behält Seitenverhältnis bei)
-                img.thumbnail((300, 300), Image.Resampling.LANCZOS)
-                
-                # Speichere Thumbnail
-                img.save(thumb_path, 'JPEG', quality=85, optimize=True)
-                
-                logger.info(f"✅ Thumbnail API: Thumbnail created and cached: {thumb_path}")
-                return send_file(thumb_path, mimetype='image/jpeg')
-                
-        except Exception as thumb_error:
-            logger.error(f"❌ Thumbnail API: Error creating thumbnail: {thumb_error}")
-            # Fallback: Original-Datei bereitstellen
-            return send_file(file_path, mimetype=upload['mime_type'])
+        stats = data_manager.get_media_job_statistics()
+        stats['workers'] = media_manager.worker_count if media_manager and media_manager.is_enabled() else 0
+        return jsonify(stats)
         
     except Exception as e:
-        logger.error(f"❌ Thumbnail API: Fehler beim Bereitstellen des Thumbnails: {e}")
+        logger.error(f"Fehler beim Laden der Medien-Pipeline-Statistik: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/admin/media-jobs/retry', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def admin_media_jobs_retry():
+    """Plant fehlgeschlagene Medien-Jobs erneut ein"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        anzahl = data_manager.retry_failed_media_jobs()
+        return jsonify({'success': True, 'retried': anzahl, 'message': f'{anzahl} Jobs erneut eingeplant'})
+        
+    except Exception as e:
+        logger.error(f"Fehler beim erneuten Einplanen der Medien-Jobs: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/admin/uploads/reconcile-paths', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def admin_reconcile_upload_paths():
+    """Sucht die Dateien von Uploads ohne (gültigen) gespeicherten Pfad erneut"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        stats = gleiche_upload_pfade_ab(data_manager, DATA_DIR, auch_fehlende=True)
+        return jsonify({'success': True, **stats})
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Abgleich der Upload-Pfade: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/admin/preview-upload/<int:upload_id>')
 @require_auth
 @require_role(['admin'])
@@ -8021,13 +8696,7 @@ def admin_preview_upload(upload_id):
             return jsonify({'error': 'Upload nicht gefunden'}), 404
         
         # Datei bereitstellen
-        upload_path = get_upload_path()
-        file_path = os.path.join(upload_path, upload['filename'])
-        
-        if not os.path.exists(file_path):
-            return jsonify({'error': 'Datei nicht gefunden'}), 404
-        
-        return send_file(file_path, mimetype=upload['mime_type'])
+        return send_upload_file(upload, mimetype=upload['mime_type'])
         
     except Exception as e:
         logger.error(f"Fehler beim Admin-Preview: {e}")
@@ -8072,16 +8741,15 @@ def create_directory():
 # Upload Helper Functions
 # ============================
 
-def validate_upload_file(file, settings):
-    """Validiert eine Upload-Datei"""
+def get_upload_max_bytes(settings):
+    """Maximale Upload-Größe in Bytes"""
+    return settings.get('upload_max_size_mb', 50) * 1024 * 1024
+
+def validate_upload_meta(filename, file_size, settings):
+    """Validiert Dateiname und (angekündigte) Größe eines Uploads"""
     try:
         # Prüfe Dateigröße
-        max_size = settings.get('upload_max_size_mb', 50) * 1024 * 1024
-        
-        # Dateigröße ermitteln
-        file.seek(0, 2)  # Zum Ende der Datei
-        file_size = file.tell()
-        file.seek(0)  # Zurück zum Anfang
+        max_size = get_upload_max_bytes(settings)
         
         if file_size > max_size:
             return {
@@ -8093,7 +8761,7 @@ def validate_upload_file(file, settings):
         allowed_extensions = settings.get('upload_allowed_extensions', 'jpg,jpeg,png,gif,mp4,mov,avi')
         allowed_exts = [ext.strip().lower() for ext in allowed_extensions.split(',')]
         
-        filename = file.filename.lower()
+        filename = filename.lower()
         file_ext = filename.split('.')[-1] if '.' in filename else ''
         
         if file_ext not in allowed_exts:
@@ -8107,6 +8775,17 @@ def validate_upload_file(file, settings):
     except Exception as e:
         return {'valid': False, 'error': f'Validierungsfehler: {str(e)}'}
 
+def validate_upload_file(file, settings):
+    """Validiert eine Upload-Datei (Größe wird ohne Einlesen über seek ermittelt)"""
+    try:
+        file.seek(0, 2)  # Zum Ende der Datei
+        file_size = file.tell()
+        file.seek(0)  # Zurück zum Anfang
+        return validate_upload_meta(file.filename, file_size, settings)
+        
+    except Exception as e:
+        return {'valid': False, 'error': f'Validierungsfehler: {str(e)}'}
+
 def process_upload(file, gast_id, description):
     """Verarbeitet den Upload einer Datei"""
     try:
@@ -8114,31 +8793,60 @@ def process_upload(file, gast_id, description):
         upload_path = get_upload_path()
         os.makedirs(upload_path, exist_ok=True)
         
-        # Eindeutigen Dateinamen generieren
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        file_ext = file.filename.split('.')[-1] if '.' in file.filename else 'bin'
-        filename = f'upload_{gast_id}_{timestamp}_{int(time.time())}.{file_ext}'
+        # Datei blockweise zwischenspeichern (Hash wird dabei berechnet)
+        temp_path, file_size, content_hash = speichere_stream(file.stream, upload_path)
         
-        file_path = os.path.join(upload_path, filename)
+        return register_guest_upload(gast_id, temp_path, file_size, content_hash, file.filename,
+                                     file.content_type or 'application/octet-stream', description)
         
-        # Datei speichern
-        file.save(file_path)
+    except Exception as e:
+        logger.error(f"Fehler beim Upload-Processing: {e}")
+        return {'success': False, 'error': str(e)}
+
+def store_upload_blob(temp_path, content_hash, original_filename):
+    """
+    Legt eine fertig geschriebene Datei inhaltsadressiert ab (identischer Inhalt wird nur einmal gespeichert)
+    
+    Returns:
+        (absoluter Pfad, Dateiname relativ zum Upload-Verzeichnis)
+    """
+    upload_path = get_upload_path()
+    file_path = lege_blob_ab(data_manager, temp_path, content_hash, upload_path, original_filename)
+    return file_path, os.path.relpath(file_path, upload_path)
+
+def discard_unregistered_blob(file_path, content_hash):
+    """Entfernt eine abgelegte Datei nach fehlgeschlagenem DB-Eintrag, sofern kein Upload sie nutzt"""
+    if not data_manager.get_upload_blob(content_hash) and os.path.exists(file_path):
+        os.remove(file_path)
+
+def register_guest_upload(gast_id, temp_path, file_size, content_hash, original_filename, mime_type, description):
+    """Legt eine hochgeladene Gast-Datei ab, trägt sie ein und stößt die Verarbeitung an"""
+    try:
+        # Gleiche Datei vom selben Gast erneut hochgeladen (z.B. weitergeleitete Fotos)
+        vorhanden = data_manager.find_guest_upload_by_hash(gast_id, content_hash)
+        if vorhanden:
+            os.remove(temp_path)
+            logger.info(f"♻️ Upload von Gast {gast_id} ist ein Duplikat von Upload {vorhanden}")
+            return {'success': True, 'upload_id': vorhanden, 'duplicate': True}
         
-        # Dateigröße ermitteln
-        file_size = os.path.getsize(file_path)
+        file_path, filename = store_upload_blob(temp_path, content_hash, original_filename)
         
         # In Datenbank speichern
         upload_id = data_manager.add_upload(
             gast_id=gast_id,
-            original_filename=file.filename,
+            original_filename=original_filename,
             filename=filename,
             file_path=file_path,
             file_size=file_size,
-            mime_type=file.content_type or 'application/octet-stream',
-            beschreibung=description
+            mime_type=mime_type,
+            beschreibung=description,
+            content_hash=content_hash
         )
         
         if upload_id:
+            # Thumbnails usw. im Hintergrund vorberechnen
+            data_manager.enqueue_media_job(upload_id)
+            
             # Push-Notification für neuen Upload senden
             try:
                 guest_info = data_manager.get_guest_by_id(gast_id)
@@ -8162,12 +8870,13 @@ def process_upload(file, gast_id, description):
             return {'success': True, 'upload_id': upload_id}
         else:
             # Datei löschen wenn DB-Eintrag fehlschlägt
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            discard_unregistered_blob(file_path, content_hash)
             return {'success': False, 'error': 'Fehler beim Speichern in der Datenbank'}
         
     except Exception as e:
-        logger.error(f"Fehler beim Upload-Processing: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        logger.error(f"Fehler beim Registrieren des Uploads: {e}")
         return {'success': False, 'error': str(e)}
 
 def process_admin_upload(file, admin_user, description):
@@ -8177,18 +8886,9 @@ def process_admin_upload(file, admin_user, description):
         upload_path = get_upload_path()
         os.makedirs(upload_path, exist_ok=True)
         
-        # Eindeutigen Dateinamen generieren (mit admin prefix)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        file_ext = file.filename.split('.')[-1] if '.' in file.filename else 'bin'
-        filename = f'admin_upload_{timestamp}_{int(time.time())}.{file_ext}'
-        
-        file_path = os.path.join(upload_path, filename)
-        
-        # Datei speichern
-        file.save(file_path)
-        
-        # Dateigröße ermitteln
-        file_size = os.path.getsize(file_path)
+        # Datei blockweise speichern (Hash wird dabei berechnet) und inhaltsadressiert ablegen
+        temp_path, file_size, content_hash = speichere_stream(file.stream, upload_path)
+        file_path, filename = store_upload_blob(temp_path, content_hash, file.filename)
         
         # In Datenbank speichern - Admin-Upload ohne Gast-ID aber automatisch genehmigt
         upload_id = data_manager.add_admin_upload(
@@ -8198,15 +8898,17 @@ def process_admin_upload(file, admin_user, description):
             file_path=file_path,
             file_size=file_size,
             mime_type=file.content_type or 'application/octet-stream',
-            beschreibung=description
+            beschreibung=description,
+            content_hash=content_hash
         )
         
         if upload_id:
+            # Admin-Uploads sind sofort in der Galerie - bevorzugt verarbeiten
+            data_manager.enqueue_media_job(upload_id, prioritaet=5)
             return {'success': True, 'upload_id': upload_id}
         else:
             # Datei löschen wenn DB-Eintrag fehlschlägt
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            discard_unregistered_blob(file_path, content_hash)
             return {'success': False, 'error': 'Fehler beim Speichern in der Datenbank'}
         
     except Exception as e:
@@ -8214,15 +8916,42 @@ def process_admin_upload(file, admin_user, description):
         return {'success': False, 'error': str(e)}
 
 def get_upload_path():
-    """Ermittelt das Upload-Verzeichnis"""
-    settings = data_manager.get_upload_settings() if data_manager else {}
-    upload_path = settings.get('upload_path', '')
+    """Ermittelt das Upload-Verzeichnis (absolut, Einstellungen werden im DataManager gecacht)"""
+    return get_upload_root(data_manager, DATA_DIR)
+
+def get_upload_file_path(upload):
+    """Absoluter Dateipfad eines Uploads (gespeichert beim Upload, Altbestand wird einmalig gesucht)"""
+    return loese_upload_pfad(data_manager, upload, get_upload_path(), DATA_DIR)
+
+def delete_upload_with_file(upload):
+    """
+    Löscht einen Upload samt Datei
+    
+    Bei Altbestand ohne gespeicherten Pfad wird die Datei vorher gesucht und
+    der Pfad gespeichert - delete_upload entfernt nur Dateien, die es kennt.
+    """
+    get_upload_file_path(upload)
+    return data_manager.delete_upload(upload['id'])
+
+def send_upload_file(upload, **kwargs):
+    """
+    Liefert die Originaldatei eines Uploads aus
     
-    if not upload_path:
-        # Standard: uploads-Verzeichnis im Data-Verzeichnis
-        upload_path = os.path.join(DATA_DIR, 'uploads')
+    Range-Anfragen (Video-Spulen) und bedingte Anfragen werden über den
+    Inhalts-Hash als ETag beantwortet. Ist die gespeicherte Datei
+    verschwunden, wird der Pfad verworfen, damit der nächste Abruf (bzw. der
+    Pfad-Abgleich) neu sucht.
+    """
+    file_path = get_upload_file_path(upload)
+    if file_path:
+        try:
+            return sende_mediendatei(file_path, etag=upload.get('content_hash'),
+                                     upload_root=get_upload_path(), **kwargs)
+        except FileNotFoundError:
+            data_manager.set_upload_resolved_path(upload['id'], None)
     
-    return upload_path
+    logger.error(f"❌ Datei nicht gefunden für Upload {upload['id']}: {upload['filename']}")
+    return jsonify({'error': 'Datei nicht gefunden'}), 404
 
 # ============================
 # Upload Template Route
@@ -8607,50 +9336,15 @@ def api_tischplanung_overview():
         if not data_manager:
             return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        # Lade alle Daten
-        zuordnungen = data_manager.get_tisch_zuordnungen()
-        tische = data_manager.get_tische()
-        gaeste = data_manager.get_gaeste_liste()
-        
-        if not zuordnungen:
-            return jsonify({'table_overview': []})
-        
-        # Erstelle Übersicht nach Tischen
-        table_overview = {}
+        # Tische, Gäste und Belegung in einem Durchlauf laden (eine JOIN-Abfrage)
+        table_overview = {
+            table['table_name']: table
+            for table in data_manager.get_tischplan_overview()
+            if table['guests']
+        }
         
-        for zuordnung in zuordnungen:
-            tisch_id = zuordnung.get('tisch_id')
-            gast_id = zuordnung.get('gast_id')
-            
-            # Finde Tisch und Gast
-            tisch = next((t for t in tische if t.get('id') == tisch_id), None)
-            gast = next((g for g in gaeste if g.get('id') == gast_id), None)
-            
-            if not tisch or not gast:
-                continue
-                
-            table_name = tisch.get('name', f'Tisch {tisch_id}')
-            
-            if table_name not in table_overview:
-                table_overview[table_name] = {
-                    'table_id': tisch_id,
-                    'table_name': table_name,
-                    'guests': [],
-                    'total_persons': 0
-                }
-            
-            persons_count = gast.get('anzahl_essen', 1) or 1
-            
-            table_overview[table_name]['guests'].append({
-                'guest_id': gast_id,
-                'name': f"{gast.get('vorname', '')} {gast.get('nachname', '')}".strip(),
-                'category': gast.get('kategorie', 'Unbekannt'),
-                'side': gast.get('seite', ''),
-                'persons': persons_count,
-                'children': gast.get('kind', 0) or 0
-            })
-            
-            table_overview[table_name]['total_persons'] += persons_count
+        if not table_overview:
+            return jsonify({'table_overview': [], 'plan_version': data_manager.get_tischplan_version()})
         
         # Füge Brautpaar hinzu falls Brauttisch existiert
         config = data_manager.load_config()
@@ -8690,7 +9384,7 @@ def api_tischplanung_overview():
         
         table_list.sort(key=sort_key)
         
-        return jsonify({'table_overview': table_list})
+        return jsonify({'table_overview': table_list, 'plan_version': data_manager.get_tischplan_version()})
         
     except Exception as e:
         logger.error(f"Fehler beim Laden der Tischübersicht: {e}")
@@ -8839,6 +9533,10 @@ def api_tischplanung_auto_assign():
         # Parameter aus Request lesen
         request_data = request.get_json() or {}
         only_confirmed = request_data.get('only_confirmed', False)
+        # Planversion, auf der der Client arbeitet (Optimistic Locking gegen parallele Drag&Drop-Änderungen)
+        expected_version = request_data.get('plan_version')
+        if expected_version is None:
+            expected_version = data_manager.get_tischplan_version()
         
         # Einfache automatische Zuweisung
         # Lade alle Gäste und Tische
@@ -8857,8 +9555,31 @@ def api_tischplanung_auto_assign():
             gast_name = f"{gast.get('vorname', '')} {gast.get('nachname', '')}" if gast else f"ID {gast_id}"
             logger.info(f"   💒 {gast_name} ↔ Brautpaar: {rel.get('beziehungstyp', 'Unbekannt')} (Stärke: {rel.get('staerke', 0)})")
         
-        # Erst alle Zuordnungen löschen
-        data_manager.clear_all_tisch_zuordnungen()
+        # Alle Änderungen werden nur vorgemerkt und am Ende in EINER Transaktion geschrieben,
+        # damit ein Abbruch nie einen halb belegten Saal hinterlässt
+        seating_plan = {
+            'version': expected_version,
+            'replace_all': True,
+            'new_tables': [],
+            'table_updates': [],
+            'assignments': []
+        }
+        
+        def plan_new_table(table_data):
+            """Merkt einen neuen Tisch vor und gibt seine temporäre Referenz zurück"""
+            ref = f"neu_{len(seating_plan['new_tables']) + 1}"
+            seating_plan['new_tables'].append({**table_data, 'ref': ref})
+            return ref
+        
+        def plan_assignment(gast_id, tisch_id, zugeordnet_von):
+            """Merkt eine Zuordnung Gast -> Tisch vor"""
+            seating_plan['assignments'].append({
+                'gast_id': gast_id,
+                'tisch_id': tisch_id,
+                'position': None,
+                'zugeordnet_von': zugeordnet_von
+            })
+            return True
         
         assigned_count = 0
         assignments = []
@@ -8930,7 +9651,7 @@ def api_tischplanung_auto_assign():
                 for tisch in tische:
                     new_size = min(MAX_TISCHGROESSE, tisch['max_personen'] + 2)
                     if new_size != tisch['max_personen']:
-                        data_manager.update_tisch(tisch['id'], {'max_personen': new_size})
+                        seating_plan['table_updates'].append({'id': tisch['id'], 'max_personen': new_size})
                         tisch['max_personen'] = new_size
                         logger.info(f"📈 {tisch['name']} Größe erhöht auf {new_size} Personen")
                 
@@ -8972,7 +9693,7 @@ def api_tischplanung_auto_assign():
                     'form': 'round'
                 }
                 
-                new_table_id = data_manager.add_tisch(new_table_data)
+                new_table_id = plan_new_table(new_table_data)
                 if new_table_id:
                     new_table = {
                         'id': new_table_id,
@@ -9358,7 +10079,7 @@ def api_tischplanung_auto_assign():
                 'form': 'round'
             }
             
-            brauttisch_id = data_manager.add_tisch(brauttisch_data)
+            brauttisch_id = plan_new_table(brauttisch_data)
             if brauttisch_id:
                 existing_brauttisch = {**brauttisch_data, 'id': brauttisch_id}
                 tische.insert(0, existing_brauttisch)  # Brauttisch an erste Stelle
@@ -9404,10 +10125,9 @@ def api_tischplanung_auto_assign():
             
             # Prüfe ob noch Platz am Brauttisch (nach Brautpaar-Reservierung)
             if current_table_capacity + persons_needed <= current_table['max_personen']:
-                success, _ = data_manager.assign_gast_to_tisch(
+                success = plan_assignment(
                     gast['id'],
                     current_table['id'],
-                    position=None,
                     zugeordnet_von='Auto-Zuweisung (Brauttisch-Trauzeuge)'
                 )
                 
@@ -9560,10 +10280,9 @@ def api_tischplanung_auto_assign():
                 for group_guest in group_guests:
                     persons_needed = group_guest.get('anzahl_essen', 0) or 1
                     
-                    success, _ = data_manager.assign_gast_to_tisch(
+                    success = plan_assignment(
                         group_guest['id'],
                         best_table['id'],
-                        position=None,
                         zugeordnet_von=f'Auto-Zuweisung (Optimale Gruppe, Kompatibilität: {best_compatibility:.0f}%)'
                     )
                     
@@ -9598,7 +10317,7 @@ def api_tischplanung_auto_assign():
                     'form': 'round'
                 }
                 
-                new_table_id = data_manager.add_tisch(new_table_data)
+                new_table_id = plan_new_table(new_table_data)
                 if new_table_id:
                     new_table = {**new_table_data, 'id': new_table_id}
                     tische.append(new_table)
@@ -9610,10 +10329,9 @@ def api_tischplanung_auto_assign():
                     for group_guest in group_guests:
                         persons_needed = group_guest.get('anzahl_essen', 0) or 1
                         
-                        success, _ = data_manager.assign_gast_to_tisch(
+                        success = plan_assignment(
                             group_guest['id'],
                             new_table_id,
-                            position=None,
                             zugeordnet_von='Auto-Zuweisung (Neuer Tisch für optimale Gruppe)'
                         )
                         
@@ -9633,6 +10351,32 @@ def api_tischplanung_auto_assign():
         
         logger.info(f"✅ PHASE 2 abgeschlossen: Alle optimalen Gruppen zu Tischen zugewiesen")
         
+        # ═══════════════════════════════════════════════════════════════
+        # 💾 PHASE 3: SITZPLAN ATOMAR SPEICHERN
+        # ═══════════════════════════════════════════════════════════════
+        plan_result = data_manager.apply_seating_plan(seating_plan)
+        
+        if not plan_result.get('success'):
+            if plan_result.get('conflict'):
+                logger.warning(f"⚠️ Auto-Zuweisung verworfen: Sitzplan wurde parallel geändert")
+                return jsonify({
+                    'success': False,
+                    'conflict': True,
+                    'message': plan_result.get('message'),
+                    'plan_version': plan_result.get('current_version')
+                }), 409
+            return jsonify({
+                'success': False,
+                'message': f"Fehler beim Speichern des Sitzplans: {plan_result.get('message')}"
+            }), 500
+        
+        # Temporäre Tisch-Referenzen durch echte IDs ersetzen
+        table_ids = plan_result.get('table_ids', {})
+        for tisch in tische:
+            tisch['id'] = table_ids.get(tisch['id'], tisch['id'])
+        for assignment in assignments:
+            assignment['table_id'] = table_ids.get(assignment['table_id'], assignment['table_id'])
+        
         # Erstelle detaillierte Übersicht nach Tischen sortiert
         table_overview = {}
         for assignment in assignments:
@@ -9708,7 +10452,8 @@ def api_tischplanung_auto_assign():
             'total_tables': total_tables_used,
             'new_tables': created_tables,
             'table_overview': table_overview,
-            'assignments': assignments
+            'assignments': assignments,
+            'plan_version': plan_result.get('version')
         }
         
     except Exception as e:
@@ -9740,27 +10485,22 @@ def api_tischplanung_optimize_table_sizes():
         if not data_manager:
             return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
         
-        # Lade alle Daten
+        # Lade Tische und die (gecachte) Belegung je Tisch
         tische = data_manager.get_tische()
-        zuordnungen = data_manager.get_tisch_zuordnungen()
+        belegung = data_manager.get_tisch_belegung()
         
         if not tische:
             return jsonify({'error': 'Keine Tische vorhanden'}), 400
         
         optimized_count = 0
         optimizations = []
+        table_updates = []
         
         for tisch in tische:
             tisch_id = tisch['id']
             
-            # Berechne aktuelle Belegung dieses Tisches
-            current_occupancy = 0
-            for zuordnung in zuordnungen:
-                if zuordnung.get('tisch_id') == tisch_id:
-                    gast_id = zuordnung.get('gast_id')
-                    gast = data_manager.get_gast_by_id(gast_id)
-                    if gast:
-                        current_occupancy += gast.get('anzahl_essen', 1)
+            # Aktuelle Belegung dieses Tisches
+            current_occupancy = belegung.get(tisch_id, 0)
             
             # Berücksichtige Brautpaar am Brauttisch
             if tisch.get('name') == 'Brauttisch':
@@ -9774,7 +10514,7 @@ def api_tischplanung_optimize_table_sizes():
                 
                 # Wenn der Unterschied signifikant ist (mehr als 2 Plätze), optimiere
                 if abs(current_max - optimal_size) > 2:
-                    data_manager.update_tisch(tisch_id, {'max_personen': optimal_size})
+                    table_updates.append({'id': tisch_id, 'max_personen': optimal_size})
                     
                     optimizations.append({
                         'table_name': tisch.get('name', f'Tisch {tisch_id}'),
@@ -9786,6 +10526,15 @@ def api_tischplanung_optimize_table_sizes():
                     
                     logger.info(f"📏 {tisch.get('name')}: Größe optimiert {current_max} → {optimal_size} (Belegung: {current_occupancy})")
         
+        # Alle Größenänderungen gemeinsam schreiben (Zuordnungen bleiben unverändert)
+        if table_updates:
+            plan_result = data_manager.apply_seating_plan({
+                'table_updates': table_updates,
+                'replace_all': False
+            })
+            if not plan_result.get('success'):
+                return jsonify({'error': plan_result.get('message', 'Fehler beim Speichern der Tischgrößen')}), 500
+        
         message = f"Tischgrößen optimiert: {optimized_count} Tische angepasst" if optimized_count > 0 else "Alle Tischgrößen bereits optimal"
         
         return jsonify({
@@ -9868,9 +10617,241 @@ def api_tischplanung_config_save():
         logger.error(f"Fehler beim Speichern der Konfiguration: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/tischplanung/scenarios', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def api_tischplanung_scenarios():
+    """Lädt alle gespeicherten Sitzplan-Szenarien"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        return jsonify({'success': True, 'scenarios': data_manager.get_tischplan_szenarien()})
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Laden der Szenarien: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/tischplanung/scenarios', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def api_tischplanung_scenario_create():
+    """Speichert den aktuellen Sitzplan als Szenario oder klont ein bestehendes Szenario"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        data = request.get_json() or {}
+        name = (data.get('name') or '').strip()
+        if not name:
+            return jsonify({'error': 'Szenario-Name ist erforderlich'}), 400
+        
+        source_id = data.get('source_id')
+        if source_id:
+            szenario_id = data_manager.clone_tischplan_szenario(source_id, name, data.get('beschreibung'))
+        else:
+            szenario_id = data_manager.create_tischplan_szenario(name, data.get('beschreibung', ''))
+        
+        if szenario_id:
+            return jsonify({'success': True, 'id': szenario_id})
+        else:
+            return jsonify({'error': 'Szenario konnte nicht gespeichert werden (Name bereits vergeben?)'}), 400
+            
+    except Exception as e:
+        logger.error(f"Fehler beim Speichern des Szenarios: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/tischplanung/scenarios/<int:scenario_id>', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def api_tischplanung_scenario_get(scenario_id):
+    """Lädt ein Szenario mit allen Zuordnungen"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        eintrag = data_manager.get_tischplan_szenario(scenario_id)
+        if not eintrag:
+            return jsonify({'error': 'Szenario nicht gefunden'}), 404
+        
+        szenario = eintrag.pop('szenario')
+        eintrag['assignments'] = [
+            {'guest_id': gast_id, 'table_id': tisch_id} for gast_id, tisch_id in szenario.items()
+        ]
+        return jsonify({'success': True, 'scenario': eintrag})
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Laden des Szenarios: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/tischplanung/scenarios/<int:scenario_id>', methods=['PUT'])
+@require_auth
+@require_role(['admin'])
+def api_tischplanung_scenario_update(scenario_id):
+    """Ändert Zuordnungen, Name oder Beschreibung eines Szenarios"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'Keine Daten empfangen'}), 400
+        
+        # Erwartet: [{'guest_id': 1, 'table_id': 3}, {'guest_id': 2, 'table_id': null}, ...]
+        aenderungen = [
+            (int(change['guest_id']), int(change['table_id']) if change.get('table_id') is not None else None)
+            for change in data.get('changes', [])
+        ]
+        
+        success = data_manager.update_tischplan_szenario(
+            scenario_id,
+            aenderungen,
+            name=data.get('name'),
+            beschreibung=data.get('beschreibung')
+        )
+        
+        if success:
+            return jsonify({'success': True, 'message': 'Szenario aktualisiert'})
+        else:
+            return jsonify({'error': 'Szenario nicht gefunden'}), 404
+            
+    except Exception as e:
+        logger.error(f"Fehler beim Aktualisieren des Szenarios: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/tischplanung/scenarios/<int:scenario_id>', methods=['DELETE'])
+@require_auth
+@require_role(['admin'])
+def api_tischplanung_scenario_delete(scenario_id):
+    """Löscht ein Szenario"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        if data_manager.delete_tischplan_szenario(scenario_id):
+            return jsonify({'success': True, 'message': 'Szenario gelöscht'})
+        else:
+            return jsonify({'error': 'Szenario nicht gefunden'}), 404
+            
+    except Exception as e:
+        logger.error(f"Fehler beim Löschen des Szenarios: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/tischplanung/scenarios/compare', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def api_tischplanung_scenarios_compare():
+    """Vergleicht Szenarien (?ids=1,2,3) mit dem aktuellen Sitzplan anhand derselben Bewertung"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        ids_param = request.args.get('ids', '')
+        if ids_param:
+            scenario_ids = [int(i) for i in ids_param.split(',') if i.strip().isdigit()]
+        else:
+            scenario_ids = [s['id'] for s in data_manager.get_tischplan_szenarien()]
+        include_live = request.args.get('live', 'true').lower() != 'false'
+        
+        return jsonify({
+            'success': True,
+            'comparison': data_manager.compare_tischplan_szenarien(scenario_ids, include_live)
+        })
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Vergleichen der Szenarien: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/tischplanung/scenarios/<int:scenario_id>/promote', methods=['POST'])
+@require_auth
+@require_role(['admin'])
+def api_tischplanung_scenario_promote(scenario_id):
+    """Übernimmt ein Szenario als aktuellen Sitzplan"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        data = request.get_json(silent=True) or {}
+        result = data_manager.promote_tischplan_szenario(
+            scenario_id,
+            version=data.get('plan_version'),
+            zugeordnet_von=f"Szenario ({session.get('username', 'Admin')})"
+        )
+        
+        if result.get('success'):
+            return jsonify({
+                'success': True,
+                'message': f"Szenario übernommen ({result.get('assigned_count', 0)} Zuordnungen)",
+                'assigned_count': result.get('assigned_count', 0),
+                'skipped_count': result.get('uebersprungen', 0),
+                'plan_version': result.get('version')
+            })
+        if result.get('conflict'):
+            return jsonify({
+                'success': False,
+                'conflict': True,
+                'message': result.get('message'),
+                'plan_version': result.get('current_version')
+            }), 409
+        return jsonify({'success': False, 'error': result.get('message', 'Fehler bei der Übernahme')}), 400
+        
+    except Exception as e:
+        logger.error(f"Fehler bei der Übernahme des Szenarios: {e}")
+        return jsonify({'error': str(e)}), 500
+
+# Live-Tischplanung (Server-Sent Events)
+tischplan_broker = None
+tischplan_broker_lock = threading.Lock()
+
+def get_tischplan_broker():
+    """Erzeugt den Event-Broker erst im Worker (nach dem gevent Monkey-Patching)"""
+    global tischplan_broker
+    with tischplan_broker_lock:
+        if tischplan_broker is None:
+            tischplan_broker = TischplanEventBroker(data_manager)
+        return tischplan_broker
+
+@app.after_request
+def notify_tischplan_live(response):
+    """Weckt nach schreibenden Tischplanungs-Requests die Live-Clients dieses Workers sofort"""
+    if (tischplan_broker is not None
+            and request.method != 'GET'
+            and request.path.startswith('/api/tischplanung/')
+            and response.status_code < 400):
+        tischplan_broker.notify()
+    return response
+
+@app.route('/api/tischplanung/events', methods=['GET'])
+@require_auth
+@require_role(['admin'])
+def api_tischplanung_events():
+    """Event-Stream mit allen Sitzplan-Änderungen (assign, unassign, table_update, ...)"""
+    try:
+        if not data_manager:
+            return jsonify({'error': 'Datenbank nicht verfügbar'}), 500
+        
+        since = request.headers.get('Last-Event-ID') or request.args.get('since')
+        try:
+            since_version = int(since) if since not in (None, '') else None
+        except ValueError:
+            since_version = None
+        
+        response = Response(
+            stream_with_context(get_tischplan_broker().stream(since_version)),
+            mimetype='text/event-stream'
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Fehler beim Öffnen des Tischplanungs-Streams: {e}")
+        return jsonify({'error': str(e)}), 500
+
 def start_server_with_ssl():
     """Startet den Server mit SSL-Unterstützung"""
     global ssl_thread, server_running
+    start_background_services()
     import threading
     import time
     import socket
@@ -11572,6 +12553,7 @@ if __name__ == '__main__':
         print("❌ KRITISCHER FEHLER: DataManager konnte nicht initialisiert werden!")
         exit(1)
     
+    warm_up_worker()
     start_server_with_ssl()
 
 
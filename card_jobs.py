@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Karten-Jobs für Hochzeitsplaner
+Erzeugt die QR-Einladungskarten aller Gäste im Hintergrund auf mehreren
+Worker-Prozessen. Jeder Worker lädt Schriften und Kartenhintergrund einmal
+und rendert dann Gast für Gast; die fertigen Karten landen als PNG im
+Job-Verzeichnis und werden in Fertigstellungsreihenfolge als ZIP gestreamt.
+
+Der Zustand eines Jobs liegt als status.json im Job-Verzeichnis - damit
+funktionieren Fortschritt, Abbruch und Download auch, wenn die Anfragen bei
+einem anderen Gunicorn-Worker landen als dem, der den Job gestartet hat.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import hashlib
+import logging
+import socket
+import secrets
+import argparse
+import threading
+import subprocess
+from collections import OrderedDict, deque
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Anzahl Render-Prozesse pro Job (0 = im Job-Thread des Webservers rendern)
+CARD_WORKERS = int(os.environ.get('CARD_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Abgeschlossene Jobs werden nach dieser Zeit samt Karten gelöscht
+JOB_AUFBEWAHRUNG_STUNDEN = 6
+
+# Abfrageintervall beim Streamen eines noch laufenden Jobs
+STREAM_INTERVALL = 0.25
+
+# Ohne Lebenszeichen des Job-Threads gilt ein laufender Job danach als verwaist
+JOB_LEBENSZEICHEN_SEKUNDEN = 120
+
+# Längste Wartezeit des Downloads auf die nächste Karte, danach wird das ZIP abgeschlossen
+STREAM_MAX_WARTEN = 180
+
+# Editor-Sitzungen, deren letzte Vorschau gemerkt wird
+VORSCHAU_SITZUNGEN = 32
+
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+def jobs_dir(data_dir):
+    """Basisverzeichnis aller Karten-Jobs"""
+    pfad = os.path.join(data_dir, 'card_jobs')
+    os.makedirs(pfad, exist_ok=True)
+    return pfad
+
+
+def card_cache_dir(data_dir):
+    """Verzeichnis der gespeicherten Karten (<gast_id>_<vorlage>_<fingerabdruck>.png)"""
+    pfad = os.path.join(data_dir, 'card_cache')
+    os.makedirs(pfad, exist_ok=True)
+    return pfad
+
+
+def _cache_praefix(guest, template=None):
+    """
+    Schlüssel einer Karte im Cache: Gast und Vorlage
+    
+    Ohne Vorlage der Präfix älterer Cache-Dateien (<gast_id>_<fingerabdruck>.png).
+    """
+    praefix = re.sub(r'\W', '_', str(guest.get('id', 'unknown'))) + '_'
+    if template is None:
+        return praefix
+    return praefix + re.sub(r'\W', '_', str(template)) + '_'
+
+
+def _datei_praefix(name):
+    """Präfix einer Cache-Datei (alles vor dem Fingerabdruck)"""
+    return name.rsplit('_', 1)[0] + '_'
+
+
+def pruefe_karten_cache(data_dir, generator, guests, template):
+    """
+    Vergleicht die gespeicherten Karten mit den aktuellen Fingerabdrücken
+
+    Returns:
+        Liste von Dicts mit 'guest', 'datei' (Dateiname der aktuellen Karte)
+        und 'status': 'aktuell', 'veraltet' (Karte eines älteren Stands
+        vorhanden) oder 'fehlt'
+    """
+    vorhanden = {}
+    for name in os.listdir(card_cache_dir(data_dir)):
+        if name.endswith('.png'):
+            vorhanden.setdefault(_datei_praefix(name), set()).add(name)
+
+    ergebnis = []
+    for guest in guests:
+        praefix = _cache_praefix(guest, template)
+        datei = f"{praefix}{generator.card_fingerprint(guest, template)[:32]}.png"
+        dateien = vorhanden.get(praefix, set()) | vorhanden.get(_cache_praefix(guest), set())
+        if datei in dateien:
+            status = 'aktuell'
+        elif dateien:
+            status = 'veraltet'
+        else:
+            status = 'fehlt'
+        ergebnis.append({'guest': guest, 'datei': datei, 'status': status})
+    return ergebnis
+
+
+def erstelle_kartengenerator(data_manager, settings, editor_einstellungen=False):
+    """
+    WebQRCardGenerator mit den Farben und der QR-Größe aus den Einstellungen
+    
+    Mit editor_einstellungen=True gelten zusätzlich Texte, Foto, Schrift und
+    Login-Anzeige aus den Einstellungen (wie in der Editor-Vorschau).
+    """
+    generator = kartenrenderer().WebQRCardGenerator(data_manager)
+    if editor_einstellungen:
+        generator.set_frontend_settings(settings)
+    if settings:
+        generator.set_colors(
+            primary=settings.get('primaryColor'),
+            accent=settings.get('accentColor'),
+            background=settings.get('backgroundColor')
+        )
+        if 'qrSize' in settings:
+            generator.qr_size = int(settings['qrSize'])
+    return generator
+
+
+def _schreibe_json(pfad, daten):
+    """Schreibt JSON atomar (andere Prozesse lesen nie eine halbe Datei)"""
+    temp_pfad = f"{pfad}.{os.getpid()}.tmp"
+    with open(temp_pfad, 'w', encoding='utf-8') as f:
+        json.dump(daten, f, ensure_ascii=False, default=str)
+    os.replace(temp_pfad, pfad)
+
+
+def _prozess_lebt(pid):
+    """Prüft, ob ein Prozess dieses Rechners noch läuft"""
+    if not pid or os.name == 'nt':
+        # Unter Windows beendet os.kill den Prozess - dort zählt nur das Lebenszeichen
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # z.B. PermissionError: Prozess existiert, gehört aber einem anderen Benutzer
+        return True
+    return True
+
+
+def _job_verwaist(status):
+    """Ein als laufend eingetragener Job, dessen Job-Thread nicht mehr arbeitet"""
+    if time.time() - (status.get('lebenszeichen') or 0) > JOB_LEBENSZEICHEN_SEKUNDEN:
+        return True
+    return status.get('host') == socket.gethostname() and not _prozess_lebt(status.get('pid'))
+
+
+def _rendere_karte(generator, cache_dir, template, index, guest, datei):
+    """
+    Rendert eine Karte in den Karten-Cache und liefert den Protokolleintrag
+
+    Ältere Stände derselben Karte (gleicher Gast, gleiche Vorlage) werden dabei
+    entfernt; Karten anderer Vorlagen bleiben für deren Jobs erhalten.
+    """
+    try:
+        card_data = generator.create_guest_card(guest, template)
+        temp_pfad = os.path.join(cache_dir, f"{datei}.{os.getpid()}.tmp")
+        with open(temp_pfad, 'wb') as f:
+            f.write(card_data)
+        os.replace(temp_pfad, os.path.join(cache_dir, datei))
+
+        veraltet = {_cache_praefix(guest, template), _cache_praefix(guest)}
+        for name in os.listdir(cache_dir):
+            if name.endswith('.png') and name != datei and _datei_praefix(name) in veraltet:
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except OSError:
+                    pass
+        return {'index': index, 'datei': datei, 'name': generator.card_filename(guest)}
+    except Exception as e:
+        return {'index': index, 'fehler': str(e), 'gast_id': guest.get('id')}
+
+
+# =============================================================================
+# Kartenrenderer (einmal pro Prozess)
+# =============================================================================
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def kartenrenderer():
+    """
+    Modul qr_card_generator, beim ersten Aufruf importiert und vorbereitet
+
+    Import und Schriftsuche passieren einmal pro Prozess; Schrift-, QR- und
+    Hintergrund-Caches bleiben danach über alle Anfragen erhalten.
+    """
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                start = time.perf_counter()
+                import qr_card_generator
+                qr_card_generator.warm_font_cache()
+                _renderer = qr_card_generator
+                logger.info(f"🃏 Kartenrenderer geladen in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return _renderer
+
+
+def warm_up_card_renderer(data_manager):
+    """
+    Warm-up beim Worker-Start: Renderer laden und eine Demo-Karte rendern
+
+    Danach liegen Hintergrund (gespeicherte Einstellungen), Schriften und
+    PNG-Encoder bereit - die erste echte Anfrage zahlt keine Startkosten.
+
+    Returns:
+        Dict mit den gemessenen Zeiten in ms
+    """
+    start = time.perf_counter()
+    kartenrenderer()
+    zeiten = {'import_ms': round((time.perf_counter() - start) * 1000, 1)}
+
+    start = time.perf_counter()
+    settings = data_manager.load_invitation_generator_settings() or {}
+    # Wie eine echte Anfrage: Texte und Foto aus den gespeicherten Einstellungen
+    generator = erstelle_kartengenerator(data_manager, settings, editor_einstellungen=True)
+    generator.generate_test_card(settings.get('template', 'elegant'))
+    zeiten['karte_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+    logger.info(f"🔥 Kartenrenderer aufgewärmt (pid {os.getpid()}): Import {zeiten['import_ms']} ms, "
+                f"Demo-Karte {zeiten['karte_ms']} ms")
+    return zeiten
+
+
+# =============================================================================
+# Worker-Prozess
+# =============================================================================
+
+def card_worker_main(data_dir, job_dir):
+    """
+    Hauptschleife eines Render-Prozesses
+
+    Liest pro Zeile einen Gast (JSON) von stdin und antwortet pro Zeile mit
+    dem Ergebnis auf stdout. Ausgaben des Generators gehen nach stderr.
+    """
+    protokoll = sys.stdout
+    sys.stdout = sys.stderr
+
+    from sqlite_datenmanager import SQLiteHochzeitsDatenManager
+
+    with open(os.path.join(job_dir, 'job.json'), encoding='utf-8') as f:
+        job = json.load(f)
+
+    # Die Schema-Prüfung beim Öffnen der Datenbank ist nicht für parallele
+    # Prozesse ausgelegt - die Worker eines Jobs starten deshalb nacheinander
+    with open(os.path.join(data_dir, 'card_worker.lock'), 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        data_manager = SQLiteHochzeitsDatenManager(data_dir)
+    generator = erstelle_kartengenerator(data_manager, job['settings'])
+    cache_dir = card_cache_dir(data_dir)
+
+    for zeile in sys.stdin:
+        auftrag = json.loads(zeile)
+        ergebnis = _rendere_karte(generator, cache_dir, job['template'], auftrag['index'], auftrag['guest'],
+                                  auftrag['datei'])
+        protokoll.write(json.dumps(ergebnis, ensure_ascii=False) + '\n')
+        protokoll.flush()
+
+
+# =============================================================================
+# Job-Verwaltung im Webserver
+# =============================================================================
+
+class CardJobManager:
+    """
+    Startet Karten-Jobs und liefert Fortschritt, Abbruch und Download
+
+    Ein Job-Thread verteilt die Gäste an CARD_WORKERS eigenständige
+    Interpreter (python card_jobs.py ...), die weder Flask noch den
+    gevent-Zustand des Servers erben. Ein Worker erhält immer erst dann
+    den nächsten Gast, wenn er die vorige Karte abgeliefert hat.
+    """
+
+    def __init__(self, data_manager, data_dir, worker_count=None):
+        self.data_manager = data_manager
+        self.data_dir = data_dir
+        if worker_count is None:
+            worker_count = CARD_WORKERS
+        # Als .exe (PyInstaller) gibt es kein separates Skript für die Worker
+        if getattr(sys, 'frozen', False):
+            worker_count = 0
+        self.worker_count = worker_count
+
+    def _job_dir(self, job_id):
+        if not job_id or not _JOB_ID.match(job_id):
+            return None
+        return os.path.join(jobs_dir(self.data_dir), job_id)
+
+    def _lese_status(self, job_id):
+        job_dir = self._job_dir(job_id)
+        if not job_dir:
+            return None
+        try:
+            with open(os.path.join(job_dir, 'status.json'), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def status(self, job_id):
+        """
+        Aktueller Zustand eines Jobs (oder None)
+        
+        Ein laufender Job, dessen Prozess nicht mehr lebt (z.B. Gunicorn-Worker
+        nach max_requests ersetzt) oder der sich seit JOB_LEBENSZEICHEN_SEKUNDEN
+        nicht gemeldet hat, wird als beendet eingetragen: 'abgebrochen', wenn
+        ein Abbruch angefordert war, sonst 'fehler'.
+        """
+        status = self._lese_status(job_id)
+        if not status or status['status'] != 'laeuft' or not _job_verwaist(status):
+            return status
+        
+        job_dir = self._job_dir(job_id)
+        if os.path.exists(os.path.join(job_dir, 'abbrechen')):
+            status['status'] = 'abgebrochen'
+        else:
+            status['status'] = 'fehler'
+            status['meldung'] = 'Der Job wurde unterbrochen, bevor alle Karten fertig waren'
+        status['beendet'] = datetime.now().isoformat()
+        _schreibe_json(os.path.join(job_dir, 'status.json'), status)
+        logger.warning(f"⚠️ Karten-Job {job_id[:8]} ohne Lebenszeichen (pid {status.get('pid')}): "
+                       f"{status['fertig']}/{status['gesamt']} Karten, als '{status['status']}' eingetragen")
+        return status
+    
+    def start_job(self, guests, settings, template, force=False):
+        """
+        Legt einen Job an und startet ihn im Hintergrund
+
+        Karten, deren Fingerabdruck sich nicht geändert hat, werden aus dem
+        Karten-Cache übernommen; force rendert trotzdem alle neu.
+
+        Returns:
+            Job-ID
+        """
+        self.cleanup_alte_jobs()
+
+        job_id = secrets.token_hex(16)
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir)
+
+        _schreibe_json(os.path.join(job_dir, 'job.json'), {'settings': settings, 'template': template})
+        status = {
+            'job_id': job_id,
+            'status': 'laeuft',
+            'template': template,
+            'gesamt': len(guests),
+            'fertig': 0,
+            'fehler': 0,
+            'wiederverwendet': 0,
+            'gestartet': datetime.now().isoformat(),
+            'beendet': None,
+            'pid': os.getpid(),
+            'host': socket.gethostname(),
+            'lebenszeichen': time.time(),
+            'karten': []
+        }
+        _schreibe_json(os.path.join(job_dir, 'status.json'), status)
+
+        threading.Thread(target=self._run, args=(job_dir, status, guests, settings, template, force),
+                         name=f"card-job-{job_id[:8]}", daemon=True).start()
+        logger.info(f"🃏 Karten-Job {job_id[:8]} gestartet ({len(guests)} Gäste)")
+        return job_id
+
+    def cancel(self, job_id):
+        """Bricht einen laufenden Job ab (auch aus einem anderen Prozess)"""
+        status = self._lese_status(job_id)
+        if not status:
+            return False
+        if status['status'] == 'laeuft':
+            open(os.path.join(self._job_dir(job_id), 'abbrechen'), 'w').close()
+            # Verwaiste Jobs liest niemand mehr ab - status() trägt sie gleich als abgebrochen ein
+            self.status(job_id)
+        return True
+
+    def _run(self, job_dir, status, guests, settings, template, force=False):
+        """Job-Thread: verteilt die Gäste und schreibt nach jeder Karte den Status"""
+        start = time.perf_counter()
+        auftraege = deque()
+        lock = threading.Lock()
+        abbruch_pfad = os.path.join(job_dir, 'abbrechen')
+        status_pfad = os.path.join(job_dir, 'status.json')
+
+        def naechster_auftrag():
+            if os.path.exists(abbruch_pfad):
+                return None
+            with lock:
+                return auftraege.popleft() if auftraege else None
+
+        def zurueckstellen(auftrag):
+            with lock:
+                auftraege.appendleft(auftrag)
+
+        def melde(ergebnis):
+            with lock:
+                if 'datei' in ergebnis:
+                    status['fertig'] += 1
+                    status['karten'].append({'datei': ergebnis['datei'], 'name': ergebnis['name']})
+                    if ergebnis.get('wiederverwendet'):
+                        status['wiederverwendet'] += 1
+                else:
+                    status['fehler'] += 1
+                    logger.warning(f"⚠️ Karte für Gast {ergebnis.get('gast_id')} fehlgeschlagen: {ergebnis.get('fehler')}")
+                status['lebenszeichen'] = time.time()
+                _schreibe_json(status_pfad, status)
+
+        try:
+            # Unveränderte Karten sofort übernehmen, nur der Rest wird gerendert
+            generator = erstelle_kartengenerator(self.data_manager, settings)
+            cache_dir = card_cache_dir(self.data_dir)
+            for index, eintrag in enumerate(pruefe_karten_cache(self.data_dir, generator, guests, template)):
+                if eintrag['status'] == 'aktuell' and not force:
+                    melde({'index': index, 'datei': eintrag['datei'], 'wiederverwendet': True,
+                           'name': generator.card_filename(eintrag['guest'])})
+                else:
+                    auftraege.append((index, eintrag['guest'], eintrag['datei']))
+
+            anzahl = min(self.worker_count, len(auftraege))
+            if anzahl > 0:
+                threads = [threading.Thread(target=self._worker_schleife,
+                                            args=(job_dir, naechster_auftrag, zurueckstellen, melde),
+                                            daemon=True)
+                           for _ in range(anzahl)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            else:
+                auftrag = naechster_auftrag()
+                while auftrag:
+                    melde(_rendere_karte(generator, cache_dir, template, *auftrag))
+                    auftrag = naechster_auftrag()
+
+            with lock:
+                if os.path.exists(abbruch_pfad):
+                    status['status'] = 'abgebrochen'
+                elif status['fertig'] + status['fehler'] < status['gesamt']:
+                    status['status'] = 'fehler'
+                else:
+                    status['status'] = 'fertig'
+        except Exception as e:
+            logger.error(f"❌ Karten-Job abgebrochen: {e}")
+            status['status'] = 'fehler'
+
+        with lock:
+            status['beendet'] = datetime.now().isoformat()
+            status['lebenszeichen'] = time.time()
+            _schreibe_json(status_pfad, status)
+        logger.info(f"🃏 Karten-Job {status['job_id'][:8]}: {status['fertig']}/{status['gesamt']} Karten "
+                    f"({status['wiederverwendet']} aus dem Cache) in {time.perf_counter() - start:.1f} s "
+                    f"({status['status']})")
+
+    def _worker_schleife(self, job_dir, naechster_auftrag, zurueckstellen, melde):
+        """
+        Versorgt einen Render-Prozess mit Gästen, bis keine mehr übrig sind
+
+        Stirbt der Prozess, geht sein Gast an die übrigen Worker zurück.
+        """
+        script = os.path.abspath(__file__)
+        process = subprocess.Popen(
+            [sys.executable, script, self.data_dir, '--job-dir', job_dir],
+            cwd=os.path.dirname(script),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            close_fds=True
+        )
+        try:
+            auftrag = naechster_auftrag()
+            while auftrag:
+                index, guest, datei = auftrag
+                process.stdin.write(json.dumps({'index': index, 'guest': guest, 'datei': datei},
+                                               ensure_ascii=False, default=str) + '\n')
+                process.stdin.flush()
+                zeile = process.stdout.readline()
+                if not zeile:
+                    logger.warning(f"⚠️ Render-Prozess für Karten-Job beendet (Exit-Code {process.wait()})")
+                    zurueckstellen(auftrag)
+                    break
+                melde(json.loads(zeile))
+                auftrag = naechster_auftrag()
+        except Exception as e:
+            logger.error(f"❌ Render-Prozess für Karten-Job fehlgeschlagen: {e}")
+        finally:
+            try:
+                process.stdin.close()
+                process.wait(5)
+            except Exception:
+                process.kill()
+
+    def iter_karten(self, job_id):
+        """
+        Liefert (Name im Archiv, Kartendaten) in Fertigstellungsreihenfolge
+
+        Läuft der Job noch, wird auf weitere Karten gewartet - der Download
+        kann also sofort nach dem Start beginnen. Kommt STREAM_MAX_WARTEN
+        Sekunden keine neue Karte, wird das Archiv mit den vorhandenen beendet.
+        """
+        cache_dir = card_cache_dir(self.data_dir)
+        gesendet = 0
+        zuletzt = time.monotonic()
+        while True:
+            status = self.status(job_id)
+            if not status:
+                return
+            neue = status['karten'][gesendet:]
+            for karte in neue:
+                # Karten sind klein: gleich lesen, damit ein parallel neu gerenderter
+                # Stand das Archiv nicht mitten im Eintrag abschneidet
+                try:
+                    with open(os.path.join(cache_dir, karte['datei']), 'rb') as f:
+                        daten = f.read()
+                except FileNotFoundError:
+                    logger.warning(f"⚠️ Karten-Job {job_id[:8]}: {karte['datei']} nicht mehr im Cache")
+                    continue
+                yield karte['name'], daten
+            gesendet += len(neue)
+            if status['status'] != 'laeuft':
+                return
+            if neue:
+                zuletzt = time.monotonic()
+            elif time.monotonic() - zuletzt > STREAM_MAX_WARTEN:
+                logger.warning(f"⚠️ Karten-Job {job_id[:8]}: seit {STREAM_MAX_WARTEN} s keine neue Karte, "
+                               f"Download wird mit {gesendet} Karten beendet")
+                return
+            time.sleep(STREAM_INTERVALL)
+
+    def cleanup_alte_jobs(self):
+        """Löscht Jobs, die älter als JOB_AUFBEWAHRUNG_STUNDEN sind"""
+        grenze = time.time() - JOB_AUFBEWAHRUNG_STUNDEN * 3600
+        basis = jobs_dir(self.data_dir)
+        entfernt = 0
+        for name in os.listdir(basis):
+            pfad = os.path.join(basis, name)
+            try:
+                if _JOB_ID.match(name) and os.path.getmtime(os.path.join(pfad, 'status.json')) < grenze:
+                    shutil.rmtree(pfad)
+                    entfernt += 1
+            except OSError:
+                continue
+        if entfernt:
+            logger.info(f"🧹 {entfernt} alte Karten-Jobs entfernt")
+        return entfernt
+
+
+# =============================================================================
+# Editor-Vorschau
+# =============================================================================
+
+class CardPreviewService:
+    """
+    Schnelle Kartenvorschau für den Einladungs-Editor
+
+    Pro Editor-Sitzung rendert immer nur eine Vorschau gleichzeitig. Anfragen,
+    die während des Renderns eingehen, warten; ist bis dahin schon eine neuere
+    Anfrage derselben Sitzung eingetroffen, entfallen sie (None) - gerendert
+    wird nur der letzte Stand. Ist der Fingerabdruck der Karte (Einstellungen,
+    Gast, Foto, Namen und Datum aus der Datenbank) unverändert, wird die zuletzt
+    gerenderte Vorschau ohne neues Rendern geliefert.
+    """
+
+    def __init__(self, data_manager, max_sitzungen=VORSCHAU_SITZUNGEN):
+        self.data_manager = data_manager
+        self.max_sitzungen = max_sitzungen
+        self._sitzungen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sitzung(self, sitzung_id):
+        with self._lock:
+            zustand = self._sitzungen.get(sitzung_id)
+            if zustand is None:
+                zustand = {'lock': threading.Lock(), 'nummer': 0, 'letzte': None}
+                self._sitzungen[sitzung_id] = zustand
+                while len(self._sitzungen) > self.max_sitzungen:
+                    self._sitzungen.popitem(last=False)
+            self._sitzungen.move_to_end(sitzung_id)
+            zustand['nummer'] += 1
+            return zustand, zustand['nummer']
+
+    def render(self, sitzung_id, guest, settings, template, image_format='jpeg', scale=None):
+        """
+        Rendert die Vorschau einer Karte (oder None, wenn überholt)
+
+        Returns:
+            Dict mit 'data' (Bilddaten), 'ms' (Renderzeit) und 'wiederverwendet'
+            oder None, wenn inzwischen eine neuere Anfrage der Sitzung vorliegt
+        """
+        renderer = kartenrenderer()
+        if scale is None:
+            scale = renderer.PREVIEW_SCALE
+        generator = erstelle_kartengenerator(self.data_manager, settings, editor_einstellungen=True)
+        schluessel = hashlib.sha256(json.dumps(
+            [generator.card_fingerprint(guest, template), image_format, scale]
+        ).encode('utf-8')).hexdigest()
+
+        zustand, nummer = self._sitzung(sitzung_id)
+        with zustand['lock']:
+            letzte = zustand['letzte']
+            if letzte and letzte[0] == schluessel:
+                return {'data': letzte[1], 'ms': 0, 'wiederverwendet': True}
+            if nummer != zustand['nummer']:
+                return None
+
+            start = time.perf_counter()
+            daten = generator.create_card_preview(guest, template, image_format, scale)
+            zustand['letzte'] = (schluessel, daten)
+            return {'data': daten, 'ms': round((time.perf_counter() - start) * 1000, 1), 'wiederverwendet': False}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render-Prozess für Karten-Jobs')
+    parser.add_argument('data_dir', help='Datenverzeichnis mit hochzeit.db')
+    parser.add_argument('--job-dir', required=True, help='Verzeichnis des Jobs (wird vom CardJobManager gesetzt)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    card_worker_main(args.data_dir, args.job_dir)
+
+
+if __name__ == "__main__":
+    main()
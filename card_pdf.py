@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Druck-PDF für Einladungskarten
+Setzt mehrere Karten auf einen A4/A3-Bogen mit Schnittmarken. Der gemeinsame
+Kartenhintergrund wird nur einmal als Bild-XObject eingebettet, QR-Code und
+Texte jedes Gastes werden als Vektoren gezeichnet (scharf in jeder Auflösung).
+TrueType-Schriften werden mit Identity-H-Kodierung eingebettet, damit auch
+Namen außerhalb von Latin-1 (z.B. "Łukasz") korrekt erscheinen.
+Das PDF entsteht wie bei zip_stream blockweise, Bogen für Bogen.
+"""
+
+import io
+import re
+import zlib
+import struct
+from datetime import datetime
+
+from PIL import Image, ImageColor, ImageDraw, ImageFont
+
+# Punkte (1/72 Zoll) pro Millimeter
+MM = 72 / 25.4
+
+PAPIERFORMATE = {
+    'A4': (210, 297),
+    'A3': (297, 420),
+}
+
+# Rand um das Kartenraster (Platz für die Schnittmarken) und Abstand der Karten
+BOGEN_RAND_MM = 10
+KARTEN_ABSTAND_MM = 4
+SCHNITTMARKE_ABSTAND_MM = 2
+SCHNITTMARKE_LAENGE_MM = 6
+SCHNITTMARKE_STAERKE = 0.3
+
+# zlib-Stufe für Seiteninhalte und eingebettete Schriften
+PDF_KOMPRESSION = 6
+
+
+def bogen_layout(papier, karte_breite, karte_hoehe):
+    """
+    Verteilt die Karten auf dem Bogen (Hoch- oder Querformat, je nachdem was mehr Karten fasst)
+
+    Args:
+        papier: 'A4' oder 'A3'
+        karte_breite / karte_hoehe: Kartengröße in Punkten
+
+    Returns:
+        Dict mit 'seite' (Breite, Höhe), 'plaetze' (linke untere Ecke je Karte,
+        Reihenfolge zeilenweise von oben links), 'schnitte_x'/'schnitte_y'
+        (Schnittlinien) und 'raster' (x0, y0, x1, y1 des Kartenblocks)
+
+    Raises:
+        ValueError: Unbekanntes Papierformat oder Karte größer als der Bogen
+    """
+    if papier not in PAPIERFORMATE:
+        raise ValueError(f"Unbekanntes Papierformat: {papier}")
+
+    rand = BOGEN_RAND_MM * MM
+    abstand = KARTEN_ABSTAND_MM * MM
+    kandidaten = []
+    for breite_mm, hoehe_mm in (PAPIERFORMATE[papier], PAPIERFORMATE[papier][::-1]):
+        breite, hoehe = breite_mm * MM, hoehe_mm * MM
+        spalten = int((breite - 2 * rand + abstand) // (karte_breite + abstand))
+        zeilen = int((hoehe - 2 * rand + abstand) // (karte_hoehe + abstand))
+        kandidaten.append((spalten * zeilen, breite, hoehe, spalten, zeilen))
+
+    anzahl, breite, hoehe, spalten, zeilen = max(kandidaten, key=lambda k: k[0])
+    if anzahl == 0:
+        raise ValueError(f"Karte passt nicht auf einen {papier}-Bogen")
+
+    # Kartenblock auf dem Bogen zentrieren
+    block_breite = spalten * karte_breite + (spalten - 1) * abstand
+    block_hoehe = zeilen * karte_hoehe + (zeilen - 1) * abstand
+    x0 = (breite - block_breite) / 2
+    y1 = (hoehe + block_hoehe) / 2
+
+    plaetze = []
+    for zeile in range(zeilen):
+        for spalte in range(spalten):
+            plaetze.append((x0 + spalte * (karte_breite + abstand),
+                            y1 - (zeile + 1) * karte_hoehe - zeile * abstand))
+
+    schnitte_x = sorted({x for x, _ in plaetze} | {x + karte_breite for x, _ in plaetze})
+    schnitte_y = sorted({y for _, y in plaetze} | {y + karte_hoehe for _, y in plaetze})
+    return {
+        'seite': (breite, hoehe),
+        'plaetze': plaetze,
+        'schnitte_x': schnitte_x,
+        'schnitte_y': schnitte_y,
+        'raster': (x0, y1 - block_hoehe, x0 + block_breite, y1)
+    }
+
+
+def _zahl(wert):
+    """Kompakte Zahl für den Inhaltsstrom"""
+    text = f"{wert:.3f}".rstrip('0').rstrip('.')
+    return text if text not in ('', '-0') else '0'
+
+
+def _farbe(fill):
+    """Füllfarbe ('#rrggbb' oder Farbname) als PDF-RGB-Operanden"""
+    rot, gruen, blau = ImageColor.getrgb(fill)[:3]
+    return f"{_zahl(rot / 255)} {_zahl(gruen / 255)} {_zahl(blau / 255)}"
+
+
+def _pdf_literal(daten):
+    """Bytes als PDF-Literal (Klammern, Backslash und Nicht-ASCII maskiert)"""
+    ergebnis = bytearray(b'(')
+    for byte in daten:
+        if byte in (0x28, 0x29, 0x5C):
+            ergebnis += b'\\' + bytes([byte])
+        elif 32 <= byte < 127:
+            ergebnis.append(byte)
+        else:
+            ergebnis += f"\\{byte:03o}".encode('ascii')
+    ergebnis += b')'
+    return bytes(ergebnis)
+
+
+def _pdf_text(text):
+    """Text für das Info-Dict: Latin-1 als Literal, sonst UTF-16BE mit Byte-Order-Mark"""
+    try:
+        return _pdf_literal(text.encode('latin-1'))
+    except UnicodeEncodeError:
+        return b'<FEFF' + text.encode('utf-16-be').hex().upper().encode('ascii') + b'>'
+
+
+def _truetype_cmap(schriftdaten):
+    """
+    Zuordnung Unicode -> Glyph-ID aus der cmap-Tabelle einer TrueType-Schrift
+    
+    Unterstützt die Unicode-Subtabellen in Format 12 (voller Unicode-Bereich)
+    und Format 4 (BMP); ohne passende Subtabelle ist das Ergebnis leer.
+    """
+    cmap = None
+    for index in range(struct.unpack_from('>H', schriftdaten, 4)[0]):
+        tag, _, offset, _ = struct.unpack_from('>4sIII', schriftdaten, 12 + 16 * index)
+        if tag == b'cmap':
+            cmap = offset
+    if cmap is None:
+        return {}
+    
+    subtabellen = {}
+    for index in range(struct.unpack_from('>H', schriftdaten, cmap + 2)[0]):
+        plattform, kodierung, offset = struct.unpack_from('>HHI', schriftdaten, cmap + 4 + 8 * index)
+        subtabellen[(plattform, kodierung)] = cmap + offset
+    
+    zuordnung = {}
+    for schluessel in ((3, 10), (0, 4), (3, 1), (0, 3)):
+        start = subtabellen.get(schluessel)
+        if start is None:
+            continue
+        format = struct.unpack_from('>H', schriftdaten, start)[0]
+        if format == 12:
+            for gruppe in range(struct.unpack_from('>I', schriftdaten, start + 12)[0]):
+                erstes, letztes, glyph = struct.unpack_from('>III', schriftdaten, start + 16 + 12 * gruppe)
+                for code in range(erstes, letztes + 1):
+                    zuordnung[code] = glyph + code - erstes
+            return zuordnung
+        if format == 4:
+            segmente = struct.unpack_from('>H', schriftdaten, start + 6)[0] // 2
+            enden = struct.unpack_from(f'>{segmente}H', schriftdaten, start + 14)
+            anfaenge = struct.unpack_from(f'>{segmente}H', schriftdaten, start + 16 + 2 * segmente)
+            deltas = struct.unpack_from(f'>{segmente}h', schriftdaten, start + 16 + 4 * segmente)
+            bereich_start = start + 16 + 6 * segmente
+            bereiche = struct.unpack_from(f'>{segmente}H', schriftdaten, bereich_start)
+            for segment in range(segmente):
+                for code in range(anfaenge[segment], min(enden[segment], 0xFFFE) + 1):
+                    if bereiche[segment] == 0:
+                        glyph = (code + deltas[segment]) & 0xFFFF
+                    else:
+                        position = (bereich_start + 2 * segment + bereiche[segment]
+                                    + 2 * (code - anfaenge[segment]))
+                        glyph = struct.unpack_from('>H', schriftdaten, position)[0]
+                        if glyph:
+                            glyph = (glyph + deltas[segment]) & 0xFFFF
+                    if glyph:
+                        zuordnung[code] = glyph
+            return zuordnung
+    return zuordnung
+
+
+def _text_als_bild(element):
+    """
+    Text als transparentes Bild, so wie er im PNG gezeichnet wird
+    
+    Für Zeichen, die die Ersatzschrift (Helvetica, WinAnsi) nicht kodieren kann.
+    
+    Returns:
+        (Bild, Versatz in x) - der Versatz gleicht links überhängende Glyphen aus
+    """
+    font = element['font']
+    links, _, rechts, unten = font.getbbox(element['text'])
+    versatz = min(0, links)
+    bild = Image.new('RGBA', (max(1, rechts - versatz), max(1, unten)), (0, 0, 0, 0))
+    ImageDraw.Draw(bild).text((-versatz, 0), element['text'], font=font, fill=element['fill'])
+    return bild, versatz
+
+
+def _png_bilddaten(bild):
+    """
+    Bilddaten für ein FlateDecode-XObject
+
+    Pillow kodiert das Bild als PNG (mit Zeilenfiltern, in C); die IDAT-Daten
+    sind genau ein FlateDecode-Strom mit PNG-Prädiktor.
+    """
+    puffer = io.BytesIO()
+    bild.save(puffer, 'PNG', compress_level=PDF_KOMPRESSION)
+    png = puffer.getvalue()
+
+    daten = bytearray()
+    position = 8
+    while position < len(png):
+        laenge, typ = struct.unpack('>I4s', png[position:position + 8])
+        if typ == b'IDAT':
+            daten += png[position + 8:position + 8 + laenge]
+        position += 12 + laenge
+    return bytes(daten)
+
+
+class _PDFSchreiber:
+    """Schreibt PDF-Objekte fortlaufend und merkt sich deren Byte-Positionen für die xref-Tabelle"""
+
+    def __init__(self):
+        self.positionen = {}
+        self.position = 0
+        self.anzahl = 0
+
+    def reserviere(self):
+        self.anzahl += 1
+        return self.anzahl
+
+    def roh(self, daten):
+        self.position += len(daten)
+        return daten
+
+    def objekt(self, nummer, inhalt, stream=None):
+        self.positionen[nummer] = self.position
+        daten = f"{nummer} 0 obj\n".encode('ascii') + inhalt
+        if stream is not None:
+            daten += b"\nstream\n" + stream + b"\nendstream"
+        return self.roh(daten + b"\nendobj\n")
+
+    def abschluss(self, katalog, info):
+        xref_position = self.position
+        zeilen = [f"xref\n0 {self.anzahl + 1}\n", "0000000000 65535 f \n"]
+        for nummer in range(1, self.anzahl + 1):
+            zeilen.append(f"{self.positionen[nummer]:010d} 00000 n \n")
+        zeilen.append(f"trailer\n<< /Size {self.anzahl + 1} /Root {katalog} 0 R /Info {info} 0 R >>\n")
+        zeilen.append(f"startxref\n{xref_position}\n%%EOF\n")
+        return self.roh(''.join(zeilen).encode('ascii'))
+
+
+class _Schrift:
+    """
+    Eine im PDF verwendete Schrift
+    
+    TrueType-Schriften werden als Type0/Identity-H eingebettet (Text als
+    Glyph-IDs, ToUnicode-CMap für Suche und Kopieren). Ohne TrueType-Datei
+    bleibt Helvetica mit WinAnsi; was darin nicht darstellbar ist, zeichnet
+    stream_karten_pdf als Bild.
+    """
+
+    def __init__(self, font, name):
+        self.name = name
+        pfad = getattr(font, 'path', None)
+        self.pfad = pfad if isinstance(pfad, str) and pfad.lower().endswith('.ttf') else None
+        self._schriftdaten = None
+        self._cmap = None
+        # Verwendete Glyph-IDs -> Zeichen (für Breiten und ToUnicode)
+        self._glyphen = {}
+    
+    def kodiere(self, text):
+        """Text als Operand für Tj; None, wenn die Schrift ihn nicht kodieren kann"""
+        if not self.pfad:
+            try:
+                return _pdf_literal(text.encode('cp1252'))
+            except UnicodeEncodeError:
+                return None
+        
+        if self._cmap is None:
+            with open(self.pfad, 'rb') as datei:
+                self._schriftdaten = datei.read()
+            self._cmap = _truetype_cmap(self._schriftdaten)
+        
+        # Fehlende Glyphen werden wie im PNG als .notdef (Glyph 0) gesetzt
+        glyphen = []
+        for zeichen in text:
+            glyph = self._cmap.get(ord(zeichen), 0)
+            self._glyphen.setdefault(glyph, zeichen)
+            glyphen.append(f"{glyph:04X}")
+        return f"<{''.join(glyphen)}>".encode('ascii')
+    
+    def _to_unicode(self):
+        """ToUnicode-CMap der verwendeten Glyphen (höchstens 100 Einträge je Block)"""
+        eintraege = [f"<{glyph:04X}> <{zeichen.encode('utf-16-be').hex().upper()}>"
+                     for glyph, zeichen in sorted(self._glyphen.items()) if glyph]
+        bloecke = []
+        for start in range(0, len(eintraege), 100):
+            block = eintraege[start:start + 100]
+            bloecke.append(f"{len(block)} beginbfchar\n" + '\n'.join(block) + "\nendbfchar")
+        return ("/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+                "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+                "/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+                "1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+                + '\n'.join(bloecke)
+                + "\nendcmap\nCMapName currentdict /CMapResource defineresource pop\nend\nend").encode('ascii')
+
+    def objekte(self, schreiber, nummer):
+        """Schriftobjekte schreiben (Schrift-Dict unter `nummer`)"""
+        if not self.pfad:
+            return schreiber.objekt(nummer, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+                                            b"/Encoding /WinAnsiEncoding >>")
+
+        # Breiten der verwendeten Glyphen in 1/1000 em aus der Schrift selbst
+        messschrift = ImageFont.truetype(self.pfad, 1000)
+        breiten = ' '.join(f"{glyph} [{round(messschrift.getlength(zeichen))}]"
+                           for glyph, zeichen in sorted(self._glyphen.items()))
+        oberlaenge, unterlaenge = messschrift.getmetrics()
+        familie, stil = messschrift.getname()
+        basisname = re.sub(r'[^A-Za-z0-9-]', '', f"{familie}-{stil}") or 'Schrift'
+
+        schriftdaten = self._schriftdaten
+        gepackt = zlib.compress(schriftdaten, PDF_KOMPRESSION)
+        to_unicode = zlib.compress(self._to_unicode(), PDF_KOMPRESSION)
+
+        datei_nummer = schreiber.reserviere()
+        beschreibung_nummer = schreiber.reserviere()
+        cid_nummer = schreiber.reserviere()
+        to_unicode_nummer = schreiber.reserviere()
+        teile = [
+            schreiber.objekt(datei_nummer, f"<< /Length {len(gepackt)} /Length1 {len(schriftdaten)} "
+                                           f"/Filter /FlateDecode >>".encode('ascii'), gepackt),
+            schreiber.objekt(beschreibung_nummer, (
+                f"<< /Type /FontDescriptor /FontName /{basisname} /Flags 32 "
+                f"/FontBBox [-500 -{unterlaenge} 1500 {oberlaenge}] /ItalicAngle 0 "
+                f"/Ascent {oberlaenge} /Descent -{unterlaenge} /CapHeight {oberlaenge} /StemV 80 "
+                f"/FontFile2 {datei_nummer} 0 R >>").encode('ascii')),
+            schreiber.objekt(cid_nummer, (
+                f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{basisname} "
+                f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+                f"/FontDescriptor {beschreibung_nummer} 0 R /DW 1000 /W [{breiten}] "
+                f"/CIDToGIDMap /Identity >>").encode('ascii')),
+            schreiber.objekt(to_unicode_nummer, f"<< /Length {len(to_unicode)} /Filter /FlateDecode >>".encode('ascii'),
+                             to_unicode),
+            schreiber.objekt(nummer, (
+                f"<< /Type /Font /Subtype /Type0 /BaseFont /{basisname} /Encoding /Identity-H "
+                f"/DescendantFonts [{cid_nummer} 0 R] /ToUnicode {to_unicode_nummer} 0 R >>").encode('ascii'))
+        ]
+        return b''.join(teile)
+
+
+def _bild_objekte(schreiber, bild):
+    """Bild als XObject schreiben (Transparenz als SMask); liefert (Objektnummer, bytes)"""
+    teile = []
+    smask = ''
+    if bild.mode in ('RGBA', 'LA') or (bild.mode == 'P' and 'transparency' in bild.info):
+        bild = bild.convert('RGBA')
+        daten = _png_bilddaten(bild.getchannel('A'))
+        maske_nummer = schreiber.reserviere()
+        teile.append(schreiber.objekt(maske_nummer, (
+            f"<< /Type /XObject /Subtype /Image /Width {bild.width} /Height {bild.height} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode "
+            f"/DecodeParms << /Predictor 15 /Colors 1 /BitsPerComponent 8 /Columns {bild.width} >> "
+            f"/Length {len(daten)} >>").encode('ascii'), daten))
+        smask = f"/SMask {maske_nummer} 0 R "
+
+    bild = bild.convert('RGB')
+    daten = _png_bilddaten(bild)
+    nummer = schreiber.reserviere()
+    teile.append(schreiber.objekt(nummer, (
+        f"<< /Type /XObject /Subtype /Image /Width {bild.width} /Height {bild.height} "
+        f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode "
+        f"/DecodeParms << /Predictor 15 /Colors 3 /BitsPerComponent 8 /Columns {bild.width} >> "
+        f"{smask}/Length {len(daten)} >>").encode('ascii'), daten))
+    return nummer, b''.join(teile)
+
+
+def _qr_pfad(element, kartenhoehe):
+    """QR-Code als Rechtecke (dunkle Module zeilenweise zu Streifen zusammengefasst)"""
+    matrix = element['matrix']
+    modul = element['size'] / len(matrix)
+    x0, y0 = element['x'], kartenhoehe - element['y']
+    befehle = [f"{_farbe(element['hintergrund'])} rg "
+               f"{_zahl(x0)} {_zahl(y0 - element['size'])} {_zahl(element['size'])} {_zahl(element['size'])} re f",
+               f"{_farbe(element['farbe'])} rg"]
+    for zeile, werte in enumerate(matrix):
+        y = y0 - (zeile + 1) * modul
+        spalte = 0
+        while spalte < len(werte):
+            if not werte[spalte]:
+                spalte += 1
+                continue
+            start = spalte
+            while spalte < len(werte) and werte[spalte]:
+                spalte += 1
+            befehle.append(f"{_zahl(x0 + start * modul)} {_zahl(y)} {_zahl((spalte - start) * modul)} {_zahl(modul)} re")
+    befehle.append("f")
+    return '\n'.join(befehle)
+
+
+def _schnittmarken(layout):
+    """Schnittmarken im Bogenrand, verlängert jede Schnittlinie des Kartenblocks"""
+    x0, y0, x1, y1 = layout['raster']
+    abstand = SCHNITTMARKE_ABSTAND_MM * MM
+    laenge = SCHNITTMARKE_LAENGE_MM * MM
+    befehle = [f"q {_zahl(SCHNITTMARKE_STAERKE)} w 0 0 0 RG"]
+    for x in layout['schnitte_x']:
+        befehle.append(f"{_zahl(x)} {_zahl(y0 - abstand)} m {_zahl(x)} {_zahl(y0 - abstand - laenge)} l")
+        befehle.append(f"{_zahl(x)} {_zahl(y1 + abstand)} m {_zahl(x)} {_zahl(y1 + abstand + laenge)} l")
+    for y in layout['schnitte_y']:
+        befehle.append(f"{_zahl(x0 - abstand)} {_zahl(y)} m {_zahl(x0 - abstand - laenge)} {_zahl(y)} l")
+        befehle.append(f"{_zahl(x1 + abstand)} {_zahl(y)} m {_zahl(x1 + abstand + laenge)} {_zahl(y)} l")
+    befehle.append("S Q")
+    return '\n'.join(befehle)
+
+
+def stream_karten_pdf(hintergrund, karten, dpi=300, papier='A4', titel='Einladungskarten'):
+    """
+    Generator, der ein druckfertiges PDF mit mehreren Karten pro Bogen liefert
+
+    Args:
+        hintergrund: Gemeinsamer Kartenhintergrund (PIL-Bild, Kartengröße in Pixeln)
+        karten: Iterable mit den Overlay-Elementen je Karte (Positionen in Kartenpixeln):
+                'qr' (matrix, size, farbe, hintergrund), 'text' (text, font, fill)
+                und 'bild' (bild, schluessel - jedes Bild wird nur einmal eingebettet)
+        dpi: Auflösung des Hintergrunds (bestimmt die gedruckte Kartengröße)
+        papier: 'A4' oder 'A3'
+
+    Yields:
+        bytes-Blöcke des PDFs
+    """
+    skalierung = 72 / dpi
+    kartenbreite, kartenhoehe = hintergrund.size
+    layout = bogen_layout(papier, kartenbreite * skalierung, kartenhoehe * skalierung)
+    seitenbreite, seitenhoehe = layout['seite']
+    pro_bogen = len(layout['plaetze'])
+    marken = _schnittmarken(layout)
+
+    schreiber = _PDFSchreiber()
+    katalog_nummer = schreiber.reserviere()
+    seiten_nummer = schreiber.reserviere()
+    ressourcen_nummer = schreiber.reserviere()
+    yield schreiber.roh(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    hintergrund_nummer, daten = _bild_objekte(schreiber, hintergrund)
+    yield daten
+
+    bilder = {'Hg': hintergrund_nummer}
+    bild_namen = {}
+    schriften = {}
+    seiten = []
+
+    def karte_zeichnen(elemente, x, y):
+        befehle = [f"q {_zahl(skalierung)} 0 0 {_zahl(skalierung)} {_zahl(x)} {_zahl(y)} cm",
+                   f"q {kartenbreite} 0 0 {kartenhoehe} 0 0 cm /Hg Do Q"]
+        neue_objekte = []
+        
+        def bild_zeichnen(schluessel, bild, bild_x, bild_y):
+            name = bild_namen.get(schluessel)
+            if name is None:
+                name = f"Im{len(bild_namen) + 1}"
+                bild_namen[schluessel] = name
+                bilder[name], daten = _bild_objekte(schreiber, bild)
+                neue_objekte.append(daten)
+            breite, hoehe = bild.size
+            befehle.append(f"q {breite} 0 0 {hoehe} {_zahl(bild_x)} "
+                           f"{_zahl(kartenhoehe - bild_y - hoehe)} cm /{name} Do Q")
+        
+        for element in elemente:
+            if element['art'] == 'qr':
+                befehle.append(_qr_pfad(element, kartenhoehe))
+            elif element['art'] == 'bild':
+                bild_zeichnen(element['schluessel'], element['bild'], element['x'], element['y'])
+            else:
+                font = element['font']
+                schluessel = getattr(font, 'path', None) if isinstance(getattr(font, 'path', None), str) else None
+                schrift = schriften.get(schluessel)
+                if schrift is None:
+                    schrift = _Schrift(font, f"F{len(schriften) + 1}")
+                    schriften[schluessel] = schrift
+                operand = schrift.kodiere(element['text'])
+                if operand is None:
+                    bild, versatz = _text_als_bild(element)
+                    bild_zeichnen(('text', schluessel, font.size, element['fill'], element['text']),
+                                  bild, element['x'] + versatz, element['y'])
+                    continue
+                # Pillow setzt Text an die Oberkante (Ascender), PDF an die Grundlinie
+                grundlinie = kartenhoehe - element['y'] - font.getmetrics()[0]
+                befehle.append(f"BT /{schrift.name} {_zahl(font.size)} Tf {_farbe(element['fill'])} rg "
+                               f"{_zahl(element['x'])} {_zahl(grundlinie)} Td "
+                               + operand.decode('latin-1') + " Tj ET")
+        befehle.append("Q")
+        return '\n'.join(befehle), neue_objekte
+
+    def bogen_schreiben(inhalt):
+        strom = zlib.compress('\n'.join(inhalt).encode('latin-1'), PDF_KOMPRESSION)
+        inhalt_nummer = schreiber.reserviere()
+        seite = schreiber.reserviere()
+        seiten.append(seite)
+        return (schreiber.objekt(inhalt_nummer, f"<< /Length {len(strom)} /Filter /FlateDecode >>".encode('ascii'),
+                                 strom)
+                + schreiber.objekt(seite, (
+                    f"<< /Type /Page /Parent {seiten_nummer} 0 R "
+                    f"/MediaBox [0 0 {_zahl(seitenbreite)} {_zahl(seitenhoehe)}] "
+                    f"/Resources {ressourcen_nummer} 0 R /Contents {inhalt_nummer} 0 R >>").encode('ascii')))
+
+    inhalt = [marken]
+    platz = 0
+    for elemente in karten:
+        x, y = layout['plaetze'][platz]
+        befehle, neue_objekte = karte_zeichnen(elemente, x, y)
+        for daten in neue_objekte:
+            yield daten
+        inhalt.append(befehle)
+        platz += 1
+        if platz == pro_bogen:
+            yield bogen_schreiben(inhalt)
+            inhalt = [marken]
+            platz = 0
+    if platz or not seiten:
+        yield bogen_schreiben(inhalt)
+
+    # Schriften, Ressourcen und Seitenbaum stehen erst nach der letzten Karte fest
+    schrift_verweise = []
+    for schrift in schriften.values():
+        nummer = schreiber.reserviere()
+        yield schrift.objekte(schreiber, nummer)
+        schrift_verweise.append(f"/{schrift.name} {nummer} 0 R")
+
+    bild_verweise = ' '.join(f"/{name} {nummer} 0 R" for name, nummer in bilder.items())
+    yield schreiber.objekt(ressourcen_nummer, (
+        f"<< /ProcSet [/PDF /Text /ImageC] /XObject << {bild_verweise} >> "
+        f"/Font << {' '.join(schrift_verweise)} >> >>").encode('ascii'))
+    yield schreiber.objekt(seiten_nummer, (
+        f"<< /Type /Pages /Count {len(seiten)} /Kids [{' '.join(f'{seite} 0 R' for seite in seiten)}] >>"
+    ).encode('ascii'))
+    yield schreiber.objekt(katalog_nummer, f"<< /Type /Catalog /Pages {seiten_nummer} 0 R >>".encode('ascii'))
+
+    info_nummer = schreiber.reserviere()
+    datum = datetime.now().strftime('%Y%m%d%H%M%S')
+    yield schreiber.objekt(info_nummer, b"<< /Title " + _pdf_text(titel) + b" /Producer (Hochzeitsplaner) "
+                                        + f"/CreationDate (D:{datum}) >>".encode('ascii'))
+    yield schreiber.abschluss(katalog_nummer, info_nummer)
@@ -173,6 +173,12 @@ def get_data_directory():
     """Einfache Funktion zum Abrufen des Datenverzeichnisses"""
     import datetime
     
+    # Explizit gesetztes Datenverzeichnis (z.B. Benchmarks) hat Vorrang und
+    # legt keine app_config.json an
+    data_path = os.environ.get('DATA_PATH')
+    if data_path and os.path.exists(data_path):
+        return data_path
+    
     config_manager = ConfigManager()
     
     if config_manager.is_first_run():
@@ -129,6 +129,111 @@ class EmailManager:
                 "message": f"Verbindungsfehler: {str(e)}"
             }
     
+    def build_message(self,
+                      to_emails: List[str],
+                      subject: str,
+                      body: str,
+                      html_body: Optional[str] = None,
+                      cc_emails: Optional[List[str]] = None,
+                      bcc_emails: Optional[List[str]] = None,
+                      attachments: Optional[List[str]] = None,
+                      mit_signatur: bool = True,
+                      signatur: Optional[Dict[str, Any]] = None):
+        """
+        Baut eine E-Mail inklusive personalisierter Signatur zusammen
+        
+        Args:
+            mit_signatur: False, wenn Text und HTML die Signatur bereits enthalten
+            signatur: Vorab geladene signatur_teile() (spart das Laden der Einstellungen)
+            (übrige Argumente wie send_email)
+            
+        Returns:
+            tuple: (MIMEMultipart-Nachricht, Liste aller Empfänger inkl. CC/BCC)
+        """
+        # E-Mail-Konfiguration
+        email_config = self.config['email']
+        
+        # E-Mail erstellen
+        msg = MIMEMultipart('alternative')
+        
+        # Header setzen
+        from_email = email_config.get('from_email', email_config.get('username', ''))
+        from_name = email_config.get('from_name', 'Hochzeitsplaner')
+        
+        msg['From'] = f"{from_name} <{from_email}>"
+        msg['To'] = ', '.join(to_emails)
+        msg['Subject'] = f"{email_config.get('default_subject_prefix', '')}{subject}"
+        
+        if email_config.get('reply_to'):
+            msg['Reply-To'] = email_config['reply_to']
+        
+        if cc_emails:
+            msg['Cc'] = ', '.join(cc_emails)
+        
+        # Schöne sichtbare Signatur hinzufügen
+        # Bestimme personalisierte Signatur basierend auf Empfänger
+        if mit_signatur and signatur is None:
+            signatur = self.signatur_teile()
+        signature = self.waehle_signatur(signatur, to_emails, 'text') if mit_signatur else ''
+        
+        body_with_signature = body + signature
+        
+        # Text-Teil hinzufügen
+        text_part = MIMEText(body_with_signature, 'plain', 'utf-8')
+        msg.attach(text_part)
+        
+        # HTML-Teil hinzufügen (falls vorhanden)
+        if html_body:
+            # Schöne HTML-Signatur
+            html_signature = self.waehle_signatur(signatur, to_emails, 'html') if mit_signatur else ''
+            
+            html_with_signature = html_body + html_signature
+            html_part = MIMEText(html_with_signature, 'html', 'utf-8')
+            msg.attach(html_part)
+        
+        # Anhänge hinzufügen
+        if attachments:
+            for file_path in attachments:
+                if os.path.isfile(file_path):
+                    with open(file_path, 'rb') as attachment:
+                        part = MIMEBase('application', 'octet-stream')
+                        part.set_payload(attachment.read())
+                        encoders.encode_base64(part)
+                        part.add_header(
+                            'Content-Disposition',
+                            f'attachment; filename= {os.path.basename(file_path)}'
+                        )
+                        msg.attach(part)
+        
+        # Alle Empfänger sammeln
+        all_recipients = list(to_emails)
+        if cc_emails:
+            all_recipients.extend(cc_emails)
+        if bcc_emails:
+            all_recipients.extend(bcc_emails)
+        
+        return msg, all_recipients
+    
+    def smtp_verbinden(self, timeout: Optional[float] = None, smtp_klasse=smtplib.SMTP) -> smtplib.SMTP:
+        """
+        Öffnet eine angemeldete SMTP-Verbindung (STARTTLS laut Konfiguration)
+        
+        Args:
+            timeout: Socket-Timeout in Sekunden (Standard: email.smtp_timeout bzw. 30)
+            smtp_klasse: smtplib.SMTP oder eine Unterklasse (z.B. mit PIPELINING)
+        """
+        email_config = self.config['email']
+        if timeout is None:
+            timeout = email_config.get('smtp_timeout', 30)
+        
+        server = smtp_klasse(email_config['smtp_server'], email_config['smtp_port'], timeout=timeout)
+        
+        if email_config.get('use_tls', True):
+            server.starttls()
+        
+        server.login(email_config['username'], email_config['password'])
+        return server
+    
     def send_email(self, 
                    to_emails: List[str], 
                    subject: str, 
@@ -138,7 +243,10 @@ class EmailManager:
                    bcc_emails: Optional[List[str]] = None,
                    attachments: Optional[List[str]] = None) -> Dict[str, Any]:
         """
-        Sendet eine E-Mail
+        Sendet eine E-Mail sofort über eine eigene SMTP-Verbindung
+        
+        Für Serien- und Gästemails die Outbox verwenden (email_outbox.py), die
+        eine Verbindung für viele Nachrichten nutzt und bei Fehlern erneut sendet.
         
         Args:
             to_emails: Liste der Empfänger-E-Mail-Adressen
@@ -165,74 +273,12 @@ class EmailManager:
             }
         
         try:
-            # E-Mail-Konfiguration
-            email_config = self.config['email']
-            
-            # E-Mail erstellen
-            msg = MIMEMultipart('alternative')
-            
-            # Header setzen
-            from_email = email_config.get('from_email', email_config.get('username', ''))
-            from_name = email_config.get('from_name', 'Hochzeitsplaner')
-            
-            msg['From'] = f"{from_name} <{from_email}>"
-            msg['To'] = ', '.join(to_emails)
-            msg['Subject'] = f"{email_config.get('default_subject_prefix', '')}{subject}"
-            
-            if email_config.get('reply_to'):
-                msg['Reply-To'] = email_config['reply_to']
-            
-            if cc_emails:
-                msg['Cc'] = ', '.join(cc_emails)
-            
-            # Schöne sichtbare Signatur hinzufügen
-            # Bestimme personalisierte Signatur basierend auf Empfänger
-            signature = self._get_personalized_signature(to_emails)
-            
-            body_with_signature = body + signature
-            
-            # Text-Teil hinzufügen
-            text_part = MIMEText(body_with_signature, 'plain', 'utf-8')
-            msg.attach(text_part)
-            
-            # HTML-Teil hinzufügen (falls vorhanden)
-            if html_body:
-                # Schöne HTML-Signatur
-                html_signature = self._get_personalized_html_signature(to_emails)
-                
-                html_with_signature = html_body + html_signature
-                html_part = MIMEText(html_with_signature, 'html', 'utf-8')
-                msg.attach(html_part)
-            
-            # Anhänge hinzufügen
-            if attachments:
-                for file_path in attachments:
-                    if os.path.isfile(file_path):
-                        with open(file_path, 'rb') as attachment:
-                            part = MIMEBase('application', 'octet-stream')
-                            part.set_payload(attachment.read())
-                            encoders.encode_base64(part)
-                            part.add_header(
-                                'Content-Disposition',
-                                f'attachment; filename= {os.path.basename(file_path)}'
-                            )
-                            msg.attach(part)
+            msg, all_recipients = self.build_message(
+                to_emails, subject, body, html_body, cc_emails, bcc_emails, attachments
+            )
             
             # E-Mail senden
-            server = smtplib.SMTP(email_config['smtp_server'], email_config['smtp_port'])
-            
-            if email_config.get('use_tls', True):
-                server.starttls()
-            
-            server.login(email_config['username'], email_config['password'])
-            
-            # Alle Empfänger sammeln
-            all_recipients = to_emails.copy()
-            if cc_emails:
-                all_recipients.extend(cc_emails)
-            if bcc_emails:
-                all_recipients.extend(bcc_emails)
-            
+            server = self.smtp_verbinden()
             server.send_message(msg, to_addrs=all_recipients)
             server.quit()
             
@@ -270,6 +316,18 @@ class EmailManager:
         Returns:
             Dict mit Status und Details
         """
+        subject, body, html_body = self.invitation_content(guest_name, event_date, event_location, rsvp_link)
+        
+        return self.send_email(
+            to_emails=[guest_email],
+            subject=subject,
+            body=body,
+            html_body=html_body
+        )
+    
+    def invitation_content(self, guest_name: str, event_date: str, event_location: str,
+                           rsvp_link: Optional[str] = None):
+        """Betreff, Text und HTML der Einladungs-E-Mail (ohne Signatur)"""
         subject = "Einladung zu unserer Hochzeit"
         
         # Plain Text Version
@@ -326,12 +384,7 @@ Pascal & Käthe"""
         </html>
         """
         
-        return self.send_email(
-            to_emails=[guest_email],
-            subject=subject,
-            body=body,
-            html_body=html_body
-        )
+        return subject, body, html_body
     
     def send_reminder_email(self, guest_email: str, guest_name: str,
                           reminder_text: str) -> Dict[str, Any]:
@@ -346,6 +399,17 @@ Pascal & Käthe"""
         Returns:
             Dict mit Status und Details
         """
+        subject, body, html_body = self.reminder_content(guest_name, reminder_text)
+        
+        return self.send_email(
+            to_emails=[guest_email],
+            subject=subject,
+            body=body,
+            html_body=html_body
+        )
+    
+    def reminder_content(self, guest_name: str, reminder_text: str):
+        """Betreff, Text und HTML der Erinnerungs-E-Mail (ohne Signatur)"""
         subject = "Erinnerung: Unsere Hochzeit"
         
         body = f"""Liebe/r {guest_name},
@@ -374,12 +438,7 @@ Pascal & Käthe"""
         </html>
         """
         
-        return self.send_email(
-            to_emails=[guest_email],
-            subject=subject,
-            body=body,
-            html_body=html_body
-        )
+        return subject, body, html_body
     
     def send_task_email(self, 
                        task_id: int,
@@ -1068,74 +1127,18 @@ Pascal & Käthe"""
             self.logger.error(f"Fehler beim Laden der Ignored-Liste aus SQLite: {e}")
             return []
 
-    def _get_personalized_signature(self, to_emails):
+    def signatur_teile(self) -> Dict[str, Any]:
         """
-        Erstellt eine personalisierte Signatur basierend auf den Empfängern
+        Alle Signatur-Varianten aus einmal geladenen Einstellungen
+        
+        Für Serienbriefe einmal pro Lauf erstellen und mit waehle_signatur()
+        je Empfänger auswählen, statt für jede E-Mail die Einstellungen zu laden.
         
-        Args:
-            to_emails: Liste der Empfänger-E-Mail-Adressen
-            
         Returns:
-            str: Personalisierte Signatur
+            Dict mit 'emails' (Braut/Bräutigam, kleingeschrieben) sowie 'text'
+            und 'html' je Variante 'braut', 'braeutigam' und 'standard'
         """
-        try:
-            if not self.data_manager:
-                # Fallback zur Standard-Signatur - verwende allgemeine Namen
-                return f"""
-
----
-
-Mit freundlichen Grüßen
-Braut & Bräutigam
-
-
-❤️ Powered by Hochzeitsplaner"""
-            
-            # Lade Einstellungen für E-Mail-Adressen
-            settings = self.data_manager.get_settings()
-            braut_email = settings.get('braut_email', '').lower()
-            braeutigam_email = settings.get('braeutigam_email', '').lower()
-            braut_name = settings.get('braut_name', 'Katharina Schaffrath')
-            braeutigam_name = settings.get('braeutigam_name', 'Pascal Schumacher')
-            
-            # Prüfe ob einer der Empfänger Braut oder Bräutigam ist
-            recipient_emails = [email.lower() for email in to_emails]
-            
-            if braut_email in recipient_emails:
-                # E-Mail geht an die Braut -> Grüße vom Bräutigam
-                return f"""
-
----
-
-In Liebe, dein Verlobter
-
-
-❤️ Powered by Hochzeitsplaner"""
-            elif braeutigam_email in recipient_emails:
-                # E-Mail geht an den Bräutigam -> Grüße von der Braut
-                return f"""
-
----
-
-In Liebe, deine Verlobte
-
-
-❤️ Powered by Hochzeitsplaner"""
-            else:
-                # Standard-Signatur für andere Empfänger
-                return f"""
-
----
-
-Mit freundlichen Grüßen
-{braut_name} & {braeutigam_name}
-
-
-❤️ Powered by Hochzeitsplaner"""
-                
-        except Exception as e:
-            # Fallback bei Fehlern
-            return f"""
+        standard_text = """
 
 ---
 
@@ -1144,21 +1147,7 @@ Braut & Bräutigam
 
 
 ❤️ Powered by Hochzeitsplaner"""
-
-    def _get_personalized_html_signature(self, to_emails):
-        """
-        Erstellt eine personalisierte HTML-Signatur basierend auf den Empfängern
-        
-        Args:
-            to_emails: Liste der Empfänger-E-Mail-Adressen
-            
-        Returns:
-            str: Personalisierte HTML-Signatur
-        """
-        try:
-            if not self.data_manager:
-                # Fallback zur Standard-HTML-Signatur - verwende allgemeine Namen
-                return """
+        standard_html = """
                 <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
                 <div style="font-family: Arial, sans-serif; font-size: 14px; color: #333; line-height: 1.5;">
                     <p style="margin: 0; margin-bottom: 10px;"><strong>Mit freundlichen Grüßen</strong></p>
@@ -1169,28 +1158,34 @@ Braut & Bräutigam
                     </p>
                 </div>
                 """
+        fallback = {
+            'emails': {'braut': '', 'braeutigam': ''},
+            'text': {'braut': standard_text, 'braeutigam': standard_text, 'standard': standard_text},
+            'html': {'braut': standard_html, 'braeutigam': standard_html, 'standard': standard_html}
+        }
+        
+        try:
+            if not self.data_manager:
+                # Fallback zur Standard-Signatur - verwende allgemeine Namen
+                return fallback
             
             # Lade Einstellungen für E-Mail-Adressen
             settings = self.data_manager.get_settings()
-            braut_email = settings.get('braut_email', '').lower()
-            braeutigam_email = settings.get('braeutigam_email', '').lower()
             braut_name = settings.get('braut_name', 'Katharina Schaffrath')
             braeutigam_name = settings.get('braeutigam_name', 'Pascal Schumacher')
             
-            # Prüfe ob einer der Empfänger Braut oder Bräutigam ist
-            recipient_emails = [email.lower() for email in to_emails]
+            def text_signatur(gruss):
+                return f"""
+
+---
+
+{gruss}
+
+
+❤️ Powered by Hochzeitsplaner"""
             
-            if braut_email in recipient_emails:
-                # E-Mail geht an die Braut -> Grüße vom Bräutigam
-                greeting = "In Liebe, dein Verlobter"
-            elif braeutigam_email in recipient_emails:
-                # E-Mail geht an den Bräutigam -> Grüße von der Braut
-                greeting = "In Liebe, deine Verlobte"
-            else:
-                # Standard-Grußformel für andere Empfänger
-                greeting = f"Mit freundlichen Grüßen<br>{braut_name} & {braeutigam_name}"
-                
-            return f"""
+            def html_signatur(greeting):
+                return f"""
                 <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
                 <div style="font-family: Arial, sans-serif; font-size: 14px; color: #333; line-height: 1.5;">
                     <p style="margin: 0; margin-bottom: 20px;"><strong>{greeting}</strong></p>
@@ -1200,20 +1195,71 @@ Braut & Bräutigam
                     </p>
                 </div>
                 """
-                
+            
+            return {
+                'emails': {
+                    'braut': settings.get('braut_email', '').lower(),
+                    'braeutigam': settings.get('braeutigam_email', '').lower()
+                },
+                'text': {
+                    # E-Mail geht an die Braut -> Grüße vom Bräutigam (und umgekehrt)
+                    'braut': text_signatur("In Liebe, dein Verlobter"),
+                    'braeutigam': text_signatur("In Liebe, deine Verlobte"),
+                    'standard': text_signatur(f"Mit freundlichen Grüßen\n{braut_name} & {braeutigam_name}")
+                },
+                'html': {
+                    'braut': html_signatur("In Liebe, dein Verlobter"),
+                    'braeutigam': html_signatur("In Liebe, deine Verlobte"),
+                    'standard': html_signatur(f"Mit freundlichen Grüßen<br>{braut_name} & {braeutigam_name}")
+                }
+            }
+            
         except Exception as e:
             # Fallback bei Fehlern
-            return """
-                <hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">
-                <div style="font-family: Arial, sans-serif; font-size: 14px; color: #333; line-height: 1.5;">
-                    <p style="margin: 0; margin-bottom: 10px;"><strong>Mit freundlichen Grüßen</strong></p>
-                    <p style="margin: 0; margin-bottom: 20px;">Braut & Bräutigam</p>
-                    
-                    <p style="margin: 0; font-size: 12px; color: #888; font-style: italic;">
-                        ❤️ <em>Powered by Hochzeitsplaner</em>
-                    </p>
-                </div>
-                """
+            return fallback
+    
+    @staticmethod
+    def waehle_signatur(teile: Dict[str, Any], to_emails, art: str = 'text') -> str:
+        """
+        Wählt die passende Signatur für die Empfänger
+        
+        Args:
+            teile: Ergebnis von signatur_teile()
+            to_emails: Liste der Empfänger-E-Mail-Adressen
+            art: 'text' oder 'html'
+        """
+        # Prüfe ob einer der Empfänger Braut oder Bräutigam ist
+        recipient_emails = [email.lower() for email in to_emails]
+        
+        if teile['emails']['braut'] and teile['emails']['braut'] in recipient_emails:
+            return teile[art]['braut']
+        if teile['emails']['braeutigam'] and teile['emails']['braeutigam'] in recipient_emails:
+            return teile[art]['braeutigam']
+        return teile[art]['standard']
+    
+    def _get_personalized_signature(self, to_emails):
+        """
+        Erstellt eine personalisierte Signatur basierend auf den Empfängern
+        
+        Args:
+            to_emails: Liste der Empfänger-E-Mail-Adressen
+            
+        Returns:
+            str: Personalisierte Signatur
+        """
+        return self.waehle_signatur(self.signatur_teile(), to_emails, 'text')
+    
+    def _get_personalized_html_signature(self, to_emails):
+        """
+        Erstellt eine personalisierte HTML-Signatur basierend auf den Empfängern
+        
+        Args:
+            to_emails: Liste der Empfänger-E-Mail-Adressen
+            
+        Returns:
+            str: Personalisierte HTML-Signatur
+        """
+        return self.waehle_signatur(self.signatur_teile(), to_emails, 'html')
 
 def get_email_manager() -> EmailManager:
     """Factory-Funktion für den E-Mail Manager"""
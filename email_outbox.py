@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+E-Mail-Outbox für Hochzeitsplaner
+Versendet E-Mails aus der SQLite-Tabelle email_outbox im Hintergrund über
+eine angemeldete SMTP-Verbindung, die für viele Nachrichten offen bleibt
+"""
+
+import os
+import re
+import time
+import socket
+import smtplib
+import logging
+import threading
+from email.utils import formatdate, make_msgid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Abfrageintervall, wenn die Outbox leer ist (Sekunden)
+POLL_INTERVALL = 2.0
+
+# Anzahl der E-Mails, die pro Durchgang abgeholt werden
+BATCH_GROESSE = 20
+
+# Standardwerte der SMTP-Sitzung (überschreibbar in auth_config.json, Abschnitt "email")
+MAX_NACHRICHTEN_PRO_VERBINDUNG = 100
+LEERLAUF_SEKUNDEN = 30
+RATE_LIMIT_PRO_MINUTE = 60
+
+# Pausen nach Rate-Limit-Antworten, Anmelde- und Verbindungsfehlern (Sekunden)
+RATE_LIMIT_PAUSE = 60
+ANMELDUNG_PAUSE = 300
+VERBINDUNG_PAUSE = 30
+
+# Schlüsselwörter, an denen Anbieter ihre Drosselung erkennen lassen (421/45x)
+RATE_LIMIT_HINWEISE = ('rate', 'too many', 'limit', 'throttl', 'try again later', 'slow down')
+
+
+# =============================================================================
+# Fehlerklassifikation
+# =============================================================================
+
+def klassifiziere_fehler(fehler):
+    """
+    Ordnet einen Versandfehler ein
+
+    Returns:
+        tuple: (Art, SMTP-Code oder None, Text) mit Art
+        'rate' (Anbieter drosselt), 'anmeldung' (Zugangsdaten),
+        'temporaer' (4xx, Verbindungsabbruch) oder 'dauerhaft' (5xx)
+    """
+    if isinstance(fehler, smtplib.SMTPAuthenticationError):
+        return 'anmeldung', fehler.smtp_code, _smtp_text(fehler.smtp_error)
+
+    if isinstance(fehler, smtplib.SMTPRecipientsRefused):
+        # Alle Empfänger abgelehnt: maßgeblich ist die "beste" Antwort
+        antworten = list(fehler.recipients.values())
+        code, text = min(antworten, key=lambda antwort: antwort[0]) if antworten else (None, b'')
+        return _art_nach_code(code, _smtp_text(text)), code, _smtp_text(text)
+
+    if isinstance(fehler, smtplib.SMTPResponseException):
+        text = _smtp_text(fehler.smtp_error)
+        return _art_nach_code(fehler.smtp_code, text), fehler.smtp_code, text
+
+    if isinstance(fehler, (smtplib.SMTPException, OSError)):
+        # Verbindungsabbruch, Timeout, DNS ...
+        return 'temporaer', None, str(fehler)
+
+    return 'dauerhaft', None, str(fehler)
+
+
+def _smtp_text(text):
+    if isinstance(text, bytes):
+        return text.decode('utf-8', errors='replace')
+    return str(text)
+
+
+def _art_nach_code(code, text):
+    if code is None:
+        return 'temporaer'
+    if code == 421 or 450 <= code < 460:
+        if any(hinweis in text.lower() for hinweis in RATE_LIMIT_HINWEISE):
+            return 'rate'
+    if 400 <= code < 500:
+        return 'temporaer'
+    return 'dauerhaft'
+
+
+# =============================================================================
+# SMTP-Sitzung und Drosselung
+# =============================================================================
+
+class PipeliningSMTP(smtplib.SMTP):
+    """
+    smtplib.SMTP mit PIPELINING (RFC 2920)
+
+    Bietet der Server PIPELINING an, gehen MAIL, alle RCPT und DATA in einem
+    Schreibvorgang raus und die Antworten werden danach gesammelt gelesen -
+    zwei statt 3 + Empfänger Round-Trips pro Nachricht. Sonst wie smtplib.
+    """
+
+    def sendmail(self, from_addr, to_addrs, msg, mail_options=(), rcpt_options=()):
+        self.ehlo_or_helo_if_needed()
+        if not self.has_extn('pipelining'):
+            return super().sendmail(from_addr, to_addrs, msg, mail_options, rcpt_options)
+
+        if isinstance(msg, str):
+            msg = re.sub(r'(?:\r\n|\n|\r(?!\n))', '\r\n', msg).encode('ascii')
+        if isinstance(to_addrs, str):
+            to_addrs = [to_addrs]
+
+        mail_optionen = list(mail_options)
+        if self.has_extn('size'):
+            mail_optionen.insert(0, f"size={len(msg)}")
+        if any(option.lower() == 'smtputf8' for option in mail_optionen):
+            if not self.has_extn('smtputf8'):
+                raise smtplib.SMTPNotSupportedError('SMTPUTF8 not supported by server')
+            self.command_encoding = 'utf-8'
+
+        def optionen(liste):
+            return ''.join(f" {option}" for option in liste)
+
+        befehle = [f"mail FROM:{smtplib.quoteaddr(from_addr)}{optionen(mail_optionen)}\r\n"]
+        befehle += [f"rcpt TO:{smtplib.quoteaddr(adresse)}{optionen(rcpt_options)}\r\n" for adresse in to_addrs]
+        befehle.append("data\r\n")
+        self.send(''.join(befehle))
+
+        # Alle Antworten lesen, bevor ausgewertet wird (sonst gerät der Dialog aus dem Takt)
+        mail_code, mail_antwort = self.getreply()
+        abgelehnt = {}
+        for adresse in to_addrs:
+            code, antwort = self.getreply()
+            if code not in (250, 251):
+                abgelehnt[adresse] = (code, antwort)
+        data_code, data_antwort = self.getreply()
+
+        if data_code == 354 and (mail_code != 250 or len(abgelehnt) == len(to_addrs)):
+            # Server hätte DATA ablehnen müssen: leere Nachricht abschließen und verwerfen
+            self.send(b".\r\n")
+            self.getreply()
+            data_code = 503
+
+        if mail_code != 250 or len(abgelehnt) == len(to_addrs) or data_code != 354:
+            if 421 in (mail_code, data_code):
+                self.close()
+            else:
+                self._rset()
+            if mail_code != 250:
+                raise smtplib.SMTPSenderRefused(mail_code, mail_antwort, from_addr)
+            if len(abgelehnt) == len(to_addrs):
+                raise smtplib.SMTPRecipientsRefused(abgelehnt)
+            raise smtplib.SMTPDataError(data_code, data_antwort)
+
+        daten = re.sub(br'(?m)^\.', b'..', msg)
+        if not daten.endswith(b'\r\n'):
+            daten += b'\r\n'
+        self.send(daten + b'.\r\n')
+        code, antwort = self.getreply()
+        if code != 250:
+            if code == 421:
+                self.close()
+            else:
+                self._rset()
+            raise smtplib.SMTPDataError(code, antwort)
+        return abgelehnt
+
+
+class Drosselung:
+    """Token-Bucket: höchstens pro_minute Nachrichten, kurze Spitzen bis zur Bucket-Größe"""
+
+    def __init__(self, pro_minute, stop_event=None):
+        self.pro_minute = pro_minute
+        self.stop_event = stop_event or threading.Event()
+        self.kapazitaet = max(1.0, min(float(pro_minute or 1), 10.0))
+        self._tokens = self.kapazitaet
+        self._zuletzt = time.monotonic()
+
+    def warten(self):
+        """Blockiert bis zum nächsten erlaubten Versand; False, wenn gestoppt wurde"""
+        if not self.pro_minute:
+            return not self.stop_event.is_set()
+        while True:
+            jetzt = time.monotonic()
+            self._tokens = min(self.kapazitaet, self._tokens + (jetzt - self._zuletzt) * self.pro_minute / 60.0)
+            self._zuletzt = jetzt
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            if self.stop_event.wait((1 - self._tokens) * 60.0 / self.pro_minute):
+                return False
+
+
+class SMTPSitzung:
+    """
+    Angemeldete SMTP-Verbindung, die über viele Nachrichten offen bleibt
+
+    Nach max_nachrichten oder leerlauf Sekunden ohne Versand wird neu verbunden;
+    eine vom Server geschlossene Verbindung wird beim nächsten Versand einmal
+    automatisch wieder aufgebaut.
+    """
+
+    def __init__(self, email_manager, max_nachrichten=MAX_NACHRICHTEN_PRO_VERBINDUNG, leerlauf=LEERLAUF_SEKUNDEN):
+        self.email_manager = email_manager
+        self.max_nachrichten = max_nachrichten
+        self.leerlauf = leerlauf
+        self._server = None
+        self._gesendet = 0
+        self._zuletzt = 0.0
+        self.verbindungen = 0
+
+    def _verbinden(self):
+        self.schliessen()
+        self._server = self.email_manager.smtp_verbinden(smtp_klasse=PipeliningSMTP)
+        self._gesendet = 0
+        self._zuletzt = time.monotonic()
+        self.verbindungen += 1
+
+    def verbinde_bei_bedarf(self):
+        """Baut die Verbindung auf, falls keine offen ist oder sie erneuert werden soll"""
+        if (self._server is None or self._gesendet >= self.max_nachrichten
+                or time.monotonic() - self._zuletzt > self.leerlauf):
+            self._verbinden()
+
+    def senden(self, msg, empfaenger):
+        """
+        Sendet eine Nachricht über die offene Verbindung
+
+        Returns:
+            dict: Abgelehnte Empfänger (leer, wenn alle angenommen wurden)
+        """
+        self.verbinde_bei_bedarf()
+
+        try:
+            abgelehnt = self._server.send_message(msg, to_addrs=empfaenger)
+        except smtplib.SMTPServerDisconnected:
+            # Server hat die Verbindung zwischen zwei Nachrichten geschlossen
+            self._verbinden()
+            abgelehnt = self._server.send_message(msg, to_addrs=empfaenger)
+        except smtplib.SMTPResponseException as e:
+            # Nach einer Fehlerantwort steht der Server mitten in der Transaktion
+            if e.smtp_code == 421:
+                self._server = None
+            else:
+                self._zuruecksetzen()
+            raise
+        except (smtplib.SMTPException, OSError):
+            self._zuruecksetzen()
+            raise
+
+        self._gesendet += 1
+        self._zuletzt = time.monotonic()
+        return abgelehnt
+
+    def _zuruecksetzen(self):
+        if self._server is None:
+            return
+        try:
+            self._server.rset()
+        except (smtplib.SMTPException, OSError):
+            self._server = None
+
+    def schliessen(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                self._server.close()
+            except OSError:
+                pass
+        self._server = None
+
+
+# =============================================================================
+# Outbox
+# =============================================================================
+
+class EmailOutbox:
+    """
+    Hintergrund-Versand der E-Mail-Outbox
+
+    Die E-Mails liegen in der SQLite-Tabelle email_outbox und überleben damit
+    Neustarts; ein abgebrochener Lauf wird einfach fortgesetzt. Über eine
+    Lock-Datei im Datenverzeichnis wird sichergestellt, dass auch bei mehreren
+    Gunicorn-Workern nur ein Prozess sendet - alle anderen reihen nur ein.
+    """
+
+    def __init__(self, data_manager, email_manager, data_dir, poll_interval=POLL_INTERVALL):
+        self.data_manager = data_manager
+        self.email_manager = email_manager
+        self.data_dir = data_dir
+        self.poll_interval = poll_interval
+        self.worker_name = f"{socket.gethostname()}:{os.getpid()}:email"
+
+        email_config = email_manager.config.get('email', {}) if email_manager else {}
+        self.batch_groesse = max(1, min(BATCH_GROESSE, int(email_config.get('rate_limit_per_minute',
+                                                                            RATE_LIMIT_PRO_MINUTE) or BATCH_GROESSE)))
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._drosselung = Drosselung(email_config.get('rate_limit_per_minute', RATE_LIMIT_PRO_MINUTE), self._stop)
+        self._sitzung = SMTPSitzung(
+            email_manager,
+            max_nachrichten=email_config.get('max_messages_per_connection', MAX_NACHRICHTEN_PRO_VERBINDUNG),
+            leerlauf=email_config.get('connection_idle_seconds', LEERLAUF_SEKUNDEN)
+        )
+        self._verarbeitung_lock = threading.Lock()
+        self._thread = None
+        self._lock_file = None
+        self._owner_pid = None
+        self.pause_bis = 0.0
+        self.pause_grund = None
+
+    def is_enabled(self):
+        return (os.environ.get('EMAIL_OUTBOX', '1') != '0'
+                and self.email_manager is not None and self.email_manager.is_enabled())
+
+    def _acquire_lock(self):
+        if fcntl is None:
+            return True
+        try:
+            self._lock_file = open(os.path.join(self.data_dir, 'email_outbox.lock'), 'w')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if self._lock_file:
+                self._lock_file.close()
+                self._lock_file = None
+            return False
+
+    def start(self):
+        """Startet den Versand-Thread (falls nicht bereits in einem anderen Prozess aktiv)"""
+        if not self.is_enabled():
+            logger.info("ℹ️ E-Mail-Outbox deaktiviert")
+            return False
+
+        if not self._acquire_lock():
+            logger.info("ℹ️ E-Mail-Outbox wird bereits von einem anderen Prozess versendet")
+            return False
+
+        self._owner_pid = os.getpid()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='email-outbox', daemon=True)
+        self._thread.start()
+        logger.info("✅ E-Mail-Outbox gestartet")
+        return True
+
+    def stop(self, timeout=5.0):
+        """Beendet den Versand-Thread (nur im startenden Prozess)"""
+        if self._owner_pid != os.getpid():
+            return
+
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self._sitzung.schliessen()
+
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def wake(self):
+        """Weckt den Versand-Thread (neue E-Mails eingereiht)"""
+        self._wake.set()
+
+    def enqueue(self, nachrichten, batch_id=None):
+        """Reiht E-Mails ein (siehe enqueue_emails) und weckt den Versand"""
+        ids = self.data_manager.enqueue_emails(nachrichten, batch_id=batch_id)
+        if ids:
+            self.wake()
+        return ids
+
+    def status(self):
+        return {
+            'running': self.is_running(),
+            'worker': self.worker_name if self.is_running() else None,
+            'paused_seconds': max(0, round(self.pause_bis - time.monotonic())),
+            'pause_reason': self.pause_grund if self.pause_bis > time.monotonic() else None,
+            'rate_limit_per_minute': self._drosselung.pro_minute,
+            'smtp_connections': self._sitzung.verbindungen
+        }
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                ergebnis = self.verarbeite_faellige()
+                if ergebnis['abgeholt']:
+                    continue
+            except Exception as e:
+                logger.error(f"❌ Fehler im E-Mail-Versand: {e}")
+
+            # Leerlauf: Verbindung nicht unnötig offen halten
+            self._sitzung.schliessen()
+            wartezeit = max(self.poll_interval, self.pause_bis - time.monotonic())
+            self._wake.wait(wartezeit)
+            self._wake.clear()
+
+    def _pausieren(self, sekunden, grund):
+        self.pause_bis = time.monotonic() + sekunden
+        self.pause_grund = grund
+        self._sitzung.schliessen()
+
+    def verarbeite_faellige(self, max_anzahl=None):
+        """
+        Versendet fällige E-Mails, bis die Outbox leer ist (oder max_anzahl erreicht)
+
+        Wird vom Versand-Thread aufgerufen, kann aber auch direkt genutzt werden
+        (z.B. in Tests oder wenn die Outbox in einem Skript geleert werden soll).
+
+        Returns:
+            dict: Zähler des Durchgangs und Dauer in ms
+        """
+        ergebnis = {'abgeholt': 0, 'gesendet': 0, 'erneut': 0, 'fehlgeschlagen': 0, 'zurueckgestellt': 0}
+        start = time.perf_counter()
+
+        with self._verarbeitung_lock:
+            while not self._stop.is_set() and time.monotonic() >= self.pause_bis:
+                limit = self.batch_groesse
+                if max_anzahl is not None:
+                    limit = min(limit, max_anzahl - ergebnis['abgeholt'])
+                    if limit <= 0:
+                        break
+
+                nachrichten = self.data_manager.claim_emails(self.worker_name, limit=limit)
+                if not nachrichten:
+                    break
+                ergebnis['abgeholt'] += len(nachrichten)
+                self._sende_batch(nachrichten, ergebnis)
+
+        ergebnis['dauer_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        if ergebnis['gesendet'] or ergebnis['erneut'] or ergebnis['fehlgeschlagen']:
+            logger.info(f"📧 Outbox: {ergebnis['gesendet']} gesendet, {ergebnis['erneut']} erneut geplant, "
+                        f"{ergebnis['fehlgeschlagen']} fehlgeschlagen in {ergebnis['dauer_ms']:.0f} ms")
+        return ergebnis
+
+    def _sende_batch(self, nachrichten, ergebnis):
+        # Signaturen einmal pro Batch laden (Serienbriefe bringen ihre schon mit)
+        signatur = self.email_manager.signatur_teile() if any(n['mit_signatur'] for n in nachrichten) else None
+
+        for index, nachricht in enumerate(nachrichten):
+            if not self._drosselung.warten():
+                ergebnis['zurueckgestellt'] += self.data_manager.release_emails(
+                    [n['id'] for n in nachrichten[index:]])
+                return
+
+            try:
+                msg, empfaenger = self._baue_nachricht(nachricht, signatur)
+            except Exception as e:
+                self.data_manager.fail_email(nachricht['id'], f"Nachricht konnte nicht erstellt werden: {e}",
+                                             dauerhaft=True)
+                ergebnis['fehlgeschlagen'] += 1
+                continue
+
+            try:
+                self._sitzung.verbinde_bei_bedarf()
+            except Exception as e:
+                # Server nicht erreichbar oder Anmeldung abgelehnt: betrifft alle übrigen Nachrichten
+                art, code, text = klassifiziere_fehler(e)
+                self._zurueckstellen(nachrichten[index:], art if art in ('rate', 'anmeldung') else 'verbindung',
+                                     code, text, ergebnis)
+                return
+
+            try:
+                abgelehnt = self._sitzung.senden(msg, empfaenger)
+            except Exception as e:
+                art, code, text = klassifiziere_fehler(e)
+
+                if art in ('rate', 'anmeldung'):
+                    self._zurueckstellen(nachrichten[index:], art, code, text, ergebnis)
+                    return
+
+                status = self.data_manager.fail_email(nachricht['id'], text, smtp_code=code,
+                                                      dauerhaft=art == 'dauerhaft')
+                ergebnis['erneut' if status == 'pending' else 'fehlgeschlagen'] += 1
+                logger.warning(f"⚠️ E-Mail {nachricht['id']} an {', '.join(nachricht['to_emails'])}: "
+                               f"{code or ''} {text}")
+                continue
+
+            if abgelehnt:
+                logger.warning(f"⚠️ E-Mail {nachricht['id']}: Empfänger abgelehnt: {', '.join(abgelehnt)}")
+            self.data_manager.complete_email(nachricht['id'], msg['Message-ID'])
+            ergebnis['gesendet'] += 1
+
+    def _zurueckstellen(self, nachrichten, grund, code, text, ergebnis):
+        """Stellt Nachrichten ohne Anrechnung eines Versuchs zurück und pausiert den Versand"""
+        pause = {'rate': RATE_LIMIT_PAUSE, 'anmeldung': ANMELDUNG_PAUSE}.get(grund, VERBINDUNG_PAUSE)
+        fehler = f"{code or ''} {text}".strip()
+        ergebnis['zurueckgestellt'] += self.data_manager.release_emails(
+            [nachricht['id'] for nachricht in nachrichten], wartezeit=pause, fehler=fehler)
+        self._pausieren(pause, grund)
+        logger.warning(f"⚠️ E-Mail-Versand für {pause} s pausiert ({grund}): {fehler}")
+
+    def _baue_nachricht(self, nachricht, signatur=None):
+        msg, empfaenger = self.email_manager.build_message(
+            nachricht['to_emails'], nachricht['subject'], nachricht['body'], nachricht['html_body'],
+            nachricht['cc_emails'], nachricht['bcc_emails'], mit_signatur=nachricht['mit_signatur'],
+            signatur=signatur
+        )
+        email_config = self.email_manager.config['email']
+        absender = email_config.get('from_email', email_config.get('username', ''))
+        msg['Date'] = formatdate(localtime=True)
+        msg['Message-ID'] = make_msgid(domain=absender.rpartition('@')[2] or None)
+        return msg, empfaenger
@@ -7,6 +7,7 @@ Hochzeitsplaner Web-Anwendung
 
 import multiprocessing
 import os
+import sys
 
 # Server-Einstellungen - Dual-Stack 
 # Note: Echtes Dual-Stack wird durch launcher.py mit mehreren --bind Parametern erreicht
@@ -41,6 +42,36 @@ limit_request_field_size = 8190
 def post_fork(server, worker):
     """Nach dem Worker-Fork ausgeführt"""
     server.log.info("Worker spawned (pid: %s)", worker.pid)
+    # Kartenrenderer vorwärmen - nur wenn die App bereits geladen ist (preload_app),
+    # sonst würde sie hier vor dem gevent-Patching importiert
+    app_modul = sys.modules.get('app')
+    if app_modul is not None and hasattr(app_modul, 'warm_up_worker'):
+        try:
+            app_modul.warm_up_worker()
+        except Exception as e:
+            server.log.warning("Warm-up fehlgeschlagen (pid: %s): %s", worker.pid, e)
+
+def post_worker_init(worker):
+    """Nach der Worker-Initialisierung ausgeführt (beim gevent-Worker nach dem Monkey-Patching)"""
+    # Hintergrunddienste (Medien-Worker, E-Mail-Outbox) erst hier starten: in post_fork
+    # liefen ihre Threads und Prozesse noch ungepatcht neben den gepatchten Request-Greenlets.
+    # Die Lock-Dateien wählen genau einen Worker.
+    app_modul = sys.modules.get('app')
+    if app_modul is not None and hasattr(app_modul, 'start_background_services'):
+        try:
+            app_modul.start_background_services()
+        except Exception as e:
+            worker.log.warning("Hintergrunddienste nicht gestartet (pid: %s): %s", worker.pid, e)
+
+def worker_exit(server, worker):
+    """Beim Beenden eines Workers ausgeführt"""
+    # Gestartete Hintergrunddienste mitnehmen, damit der Nachfolger sie übernehmen kann
+    app_modul = sys.modules.get('app')
+    if app_modul is not None and hasattr(app_modul, 'cleanup'):
+        try:
+            app_modul.cleanup()
+        except Exception as e:
+            server.log.warning("Cleanup fehlgeschlagen (pid: %s): %s", worker.pid, e)
 
 def worker_int(worker):
     """Bei Worker-Interrupt ausgeführt"""
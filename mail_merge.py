@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Serienbriefe (Mail-Merge) für Hochzeitsplaner
+Erstellt personalisierte Einladungen und Erinnerungen für viele Gäste in
+einem Lauf: Vorlagen werden einmal zerlegt, Einstellungen und Signaturen
+einmal geladen und alle E-Mails in einer Transaktion in die Outbox
+(email_outbox.py) eingereiht
+"""
+
+import html
+import time
+import uuid
+import string
+import logging
+from datetime import datetime
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+# Vorlagen: API-Name -> Outbox-Kategorie
+VORLAGEN = {
+    'invitation': 'einladung',
+    'reminder': 'erinnerung',
+    'custom': 'serienbrief'
+}
+
+# Platzhalter, die jede Vorlage verwenden kann (dazu alle übergebenen variables)
+GAST_FELDER = ('vorname', 'nachname', 'name', 'email', 'kategorie', 'seite', 'status',
+               'anzahl_personen', 'guest_code', 'guest_password', 'login_link')
+LAUF_FELDER = ('event_date', 'event_location', 'braut_name', 'braeutigam_name', 'reminder_text')
+
+VORSCHAU_STANDARD = 5
+VORSCHAU_MAXIMUM = 50
+
+
+class Vorlage:
+    """
+    Einmal zerlegte Vorlage mit {platzhalter}
+
+    render() setzt nur noch die vorbereiteten Teile zusammen; unbekannte oder
+    formatierte Platzhalter ({x!r}, {x:>5}) werden schon beim Zerlegen abgelehnt.
+    """
+
+    def __init__(self, text, erlaubte_felder):
+        self.teile = []
+        for literal, feld, format_spec, konversion in string.Formatter().parse(text or ''):
+            if feld is not None:
+                if format_spec or konversion or feld not in erlaubte_felder:
+                    raise ValueError(f"Unbekannter Platzhalter in der Vorlage: {{{feld}}}")
+            self.teile.append((literal, feld))
+
+    def render(self, werte):
+        return ''.join(literal + werte[feld] if feld else literal for literal, feld in self.teile)
+
+
+def _als_menge(wert):
+    if not wert:
+        return None
+    return {wert} if isinstance(wert, (str, int)) else set(wert)
+
+
+def filtere_gaeste(gaeste, gast_filter, bereits_erhalten=()):
+    """
+    Wählt die Empfänger eines Serienbriefs aus
+
+    Args:
+        gast_filter: guest_ids, kategorie, seite, status (jeweils Wert oder Liste)
+        bereits_erhalten: Gast-IDs (als Text), die diese Kategorie schon bekommen haben
+
+    Returns:
+        tuple: (Liste der Gäste, Zähler der übersprungenen Gäste)
+    """
+    ids = {int(guest_id) for guest_id in gast_filter.get('guest_ids') or []}
+    kategorien = _als_menge(gast_filter.get('kategorie'))
+    seiten = _als_menge(gast_filter.get('seite'))
+    status = _als_menge(gast_filter.get('status'))
+
+    ausgewaehlt = []
+    uebersprungen = {'ohne_email': 0, 'bereits_erhalten': 0}
+    for gast in gaeste:
+        if ids and gast.get('id') not in ids:
+            continue
+        if kategorien and gast.get('kategorie') not in kategorien:
+            continue
+        if seiten and gast.get('seite') not in seiten:
+            continue
+        if status and gast.get('status') not in status:
+            continue
+        if '@' not in (gast.get('email') or ''):
+            uebersprungen['ohne_email'] += 1
+            continue
+        if str(gast.get('id')) in bereits_erhalten:
+            uebersprungen['bereits_erhalten'] += 1
+            continue
+        ausgewaehlt.append(gast)
+    return ausgewaehlt, uebersprungen
+
+
+def _html_wert(wert):
+    return html.escape(str(wert)).replace('\n', '<br>')
+
+
+def _datum(wert):
+    """ISO-Datum aus den Einstellungen als TT.MM.JJJJ"""
+    try:
+        return datetime.strptime(str(wert)[:10], '%Y-%m-%d').strftime('%d.%m.%Y')
+    except ValueError:
+        return str(wert or '')
+
+
+class MailMerge:
+    """
+    Serienbriefe an Gäste über die E-Mail-Outbox
+
+    Ein Auftrag (Dict wie der Body von POST /api/email/mail-merge):
+        template: 'invitation', 'reminder' oder 'custom'
+        subject, body, html_body: Vorlagen mit {platzhalter} (nur bei 'custom' Pflicht,
+                                  sonst überschreiben sie die Standardtexte)
+        filter: guest_ids, kategorie, seite, status
+        variables: zusätzliche Platzhalter bzw. event_date, event_location, reminder_text
+        skip_already_sent: Gäste überspringen, die diese Kategorie schon erhalten haben
+                           (Standard nur bei Einladungen)
+        priority: Priorität in der Outbox
+    """
+
+    def __init__(self, data_manager, email_manager, outbox=None):
+        self.data_manager = data_manager
+        self.email_manager = email_manager
+        self.outbox = outbox
+
+    def _vorlagen(self, auftrag, erlaubte_felder):
+        art = auftrag.get('template', 'invitation')
+        if art not in VORLAGEN:
+            raise ValueError(f"Unbekannte Vorlage: {art} (erlaubt: {', '.join(VORLAGEN)})")
+
+        # Standardtexte mit Platzhaltern statt Gastdaten erzeugen
+        if art == 'invitation':
+            texte = self.email_manager.invitation_content('{name}', '{event_date}', '{event_location}', '{login_link}')
+        elif art == 'reminder':
+            texte = self.email_manager.reminder_content('{name}', '{reminder_text}')
+        else:
+            texte = (None, None, None)
+
+        betreff = auftrag.get('subject') or texte[0]
+        text = auftrag.get('body') or texte[1]
+        html_text = auftrag.get('html_body') if auftrag.get('html_body') is not None else texte[2]
+        if not betreff or not text:
+            raise ValueError("Für eigene Serienbriefe sind subject und body erforderlich")
+
+        return VORLAGEN[art], (Vorlage(betreff, erlaubte_felder), Vorlage(text, erlaubte_felder),
+                               Vorlage(html_text, erlaubte_felder) if html_text else None)
+
+    def _lauf_werte(self, auftrag, settings):
+        location = settings.get('hochzeitslocation_name', '') or ''
+        if location and settings.get('hochzeitslocation_adresse'):
+            location = f"{location}, {settings['hochzeitslocation_adresse']}"
+
+        werte = {
+            'event_date': _datum(settings.get('hochzeitsdatum', '')),
+            'event_location': location,
+            'braut_name': settings.get('braut_name', '') or '',
+            'braeutigam_name': settings.get('braeutigam_name', '') or '',
+            'reminder_text': ''
+        }
+        werte.update({str(schluessel): '' if wert is None else str(wert)
+                      for schluessel, wert in (auftrag.get('variables') or {}).items()})
+        return werte
+
+    def erstellen(self, auftrag, login_basis='', anzahl=None):
+        """
+        Rendert die E-Mails eines Auftrags (ohne sie einzureihen)
+
+        Args:
+            login_basis: Login-URL ohne Parameter (für {login_link})
+            anzahl: Nur die ersten n E-Mails rendern
+
+        Returns:
+            tuple: (Liste der Outbox-Nachrichten, Bericht)
+        """
+        start = time.perf_counter()
+        settings = self.data_manager.load_settings()
+        lauf_werte = self._lauf_werte(auftrag, settings)
+        kategorie, (betreff, text, html_text) = self._vorlagen(auftrag, set(GAST_FELDER) | set(lauf_werte))
+
+        skip = auftrag.get('skip_already_sent', kategorie == 'einladung')
+        bereits = self.data_manager.get_email_outbox_referenzen(kategorie) if skip else set()
+        gaeste, uebersprungen = filtere_gaeste(self.data_manager.get_all_guests(), auftrag.get('filter') or {},
+                                               bereits)
+        vorbereitung_ms = (time.perf_counter() - start) * 1000
+
+        # Einmal pro Lauf: Signaturen und HTML-kodierte Lauf-Werte
+        start = time.perf_counter()
+        signatur = self.email_manager.signatur_teile()
+        lauf_werte_html = {schluessel: _html_wert(wert) for schluessel, wert in lauf_werte.items()}
+        login_basis = lauf_werte.get('login_url') or login_basis
+        prioritaet = int(auftrag.get('priority', 0))
+
+        nachrichten = []
+        for gast in gaeste[:anzahl] if anzahl is not None else gaeste:
+            email = gast['email'].strip()
+            guest_code = gast.get('guest_code') or ''
+            guest_password = gast.get('guest_password') or ''
+            gast_werte = {
+                'vorname': gast.get('vorname') or '',
+                'nachname': gast.get('nachname') or '',
+                'name': f"{gast.get('vorname') or ''} {gast.get('nachname') or ''}".strip(),
+                'email': email,
+                'kategorie': gast.get('kategorie') or '',
+                'seite': gast.get('seite') or '',
+                'status': gast.get('status') or '',
+                'anzahl_personen': str(gast.get('anzahl_personen') or 1),
+                'guest_code': guest_code,
+                'guest_password': guest_password,
+                'login_link': (f"{login_basis}?{urlencode({'guest_code': guest_code, 'password': guest_password})}"
+                               if guest_code and guest_password else login_basis)
+            }
+            werte = {**lauf_werte, **gast_werte}
+
+            nachricht = {
+                'kategorie': kategorie,
+                'referenz': gast.get('id'),
+                'to_emails': [email],
+                'subject': betreff.render(werte),
+                'body': text.render(werte) + self.email_manager.waehle_signatur(signatur, [email], 'text'),
+                'html_body': None,
+                'mit_signatur': False,
+                'prioritaet': prioritaet
+            }
+            if html_text:
+                werte_html = {**lauf_werte_html, **{feld: _html_wert(wert) for feld, wert in gast_werte.items()}}
+                nachricht['html_body'] = (html_text.render(werte_html)
+                                          + self.email_manager.waehle_signatur(signatur, [email], 'html'))
+            nachrichten.append(nachricht)
+
+        render_ms = (time.perf_counter() - start) * 1000
+        bericht = {
+            'template': auftrag.get('template', 'invitation'),
+            'kategorie': kategorie,
+            'gesamt': len(gaeste),
+            'gerendert': len(nachrichten),
+            'uebersprungen': uebersprungen,
+            'vorbereitung_ms': round(vorbereitung_ms, 1),
+            'render_ms': round(render_ms, 1),
+            'render_pro_s': round(len(nachrichten) / (render_ms / 1000), 1) if nachrichten and render_ms else None
+        }
+        return nachrichten, bericht
+
+    def vorschau(self, auftrag, login_basis='', anzahl=VORSCHAU_STANDARD):
+        """Dry-Run: rendert die ersten n E-Mails, reiht nichts ein"""
+        anzahl = max(1, min(int(anzahl), VORSCHAU_MAXIMUM))
+        nachrichten, bericht = self.erstellen(auftrag, login_basis, anzahl)
+        bericht['dry_run'] = True
+        vorschau = [
+            {
+                'guest_id': nachricht['referenz'],
+                'to_emails': nachricht['to_emails'],
+                'subject': nachricht['subject'],
+                'body': nachricht['body'],
+                'html_body': nachricht['html_body']
+            }
+            for nachricht in nachrichten
+        ]
+        return vorschau, bericht
+
+    def starten(self, auftrag, login_basis=''):
+        """
+        Rendert alle E-Mails und reiht sie in einer Transaktion in die Outbox ein
+
+        Returns:
+            dict: Bericht mit batch_id, Anzahl und Durchsatz (leer eingereiht = 'eingereiht': 0)
+        """
+        gesamt_start = time.perf_counter()
+        nachrichten, bericht = self.erstellen(auftrag, login_basis)
+
+        batch_id = f"mm-{datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:6]}"
+        start = time.perf_counter()
+        ids = []
+        if nachrichten:
+            ids = (self.outbox.enqueue(nachrichten, batch_id=batch_id) if self.outbox
+                   else self.data_manager.enqueue_emails(nachrichten, batch_id=batch_id))
+            if not ids:
+                raise RuntimeError("E-Mails konnten nicht in die Outbox eingereiht werden")
+        einreihen_ms = (time.perf_counter() - start) * 1000
+        gesamt_ms = (time.perf_counter() - gesamt_start) * 1000
+
+        bericht.update({
+            'batch_id': batch_id,
+            'eingereiht': len(ids),
+            'einreihen_ms': round(einreihen_ms, 1),
+            'gesamt_ms': round(gesamt_ms, 1),
+            'eingereiht_pro_s': round(len(ids) / (gesamt_ms / 1000), 1) if ids else None
+        })
+        logger.info(f"📬 Serienbrief {batch_id}: {len(ids)} E-Mails ({bericht['kategorie']}) "
+                    f"in {gesamt_ms:.0f} ms eingereiht")
+        return bericht
+
+    def status(self, batch_id):
+        """Versandstand und -durchsatz eines Laufs"""
+        statistik = self.data_manager.get_email_outbox_statistics(batch_id=batch_id)
+        gesendet = statistik['emails'].get('sent', 0)
+        sekunden = statistik.get('sending_seconds')
+        statistik['batch_id'] = batch_id
+        statistik['gesamt'] = sum(statistik['emails'].values())
+        statistik['versendet_pro_minute'] = round(gesendet / sekunden * 60, 1) if gesendet and sekunden else None
+        return statistik
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Medien-Auslieferung für Hochzeitsplaner
+Liefert Upload-Dateien mit ETag, bedingten Anfragen und Byte-Ranges aus
+(Video-Spulen auf Mobilgeräten), nach Möglichkeit ohne Kopie per sendfile
+
+Modus über die Umgebungsvariable MEDIA_SENDFILE:
+    ''                  Flask liefert selbst aus (Standard); unter Gunicorn
+                        überträgt der Worker die Datei per sendfile
+    'x-accel-redirect'  nginx liefert aus - nach der Berechtigungsprüfung wird nur
+                        X-Accel-Redirect auf MEDIA_ACCEL_PREFIX + relativer Pfad gesetzt
+    'x-sendfile'        Apache/lighttpd liefern aus (X-Sendfile mit absolutem Pfad)
+
+Beispiel nginx (Upload-Verzeichnis als interne Location):
+    location /geschuetzte-medien/ {
+        internal;
+        alias /pfad/zu/uploads/;
+    }
+"""
+
+import os
+import mimetypes
+import unicodedata
+from urllib.parse import quote
+
+from flask import Response, request
+from werkzeug.http import http_date
+
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE', '').strip().lower()
+MEDIA_ACCEL_PREFIX = os.environ.get('MEDIA_ACCEL_PREFIX', '/geschuetzte-medien/')
+
+# Blockgröße, wenn der Server keinen file_wrapper anbietet
+LESE_BLOCKGROESSE = 256 * 1024
+
+
+def _datei_etag(stat_ergebnis):
+    """ETag aus Größe und Änderungszeit (falls kein Inhalts-Hash bekannt ist)"""
+    return f"{stat_ergebnis.st_size:x}-{stat_ergebnis.st_mtime_ns:x}"
+
+
+def _if_range_passt(etag, last_modified):
+    """
+    Prüft If-Range: der Range gilt nur, wenn die Datei unverändert ist
+
+    Ein ETag im If-Range muss stark übereinstimmen, ein Datum exakt.
+    """
+    if_range = request.if_range
+    if if_range.etag is None and if_range.date is None:
+        return True
+    if if_range.etag is not None:
+        return if_range.etag == etag
+    return if_range.date is not None and int(if_range.date.timestamp()) == int(last_modified)
+
+
+def _ist_unveraendert(etag, last_modified):
+    """If-None-Match / If-Modified-Since auswerten (304)"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since is not None:
+        return int(request.if_modified_since.timestamp()) >= int(last_modified)
+    return False
+
+
+def _datei_body(pfad, start, laenge, ganze_datei):
+    """
+    Response-Body ab `start`
+
+    Unter Gunicorn wird die bereits positionierte Datei an den file_wrapper
+    übergeben - der Worker sendet dann per sendfile genau Content-Length Bytes
+    ab der aktuellen Position. Andere Server erhalten einen begrenzten Generator.
+    """
+    datei = open(pfad, 'rb')
+    datei.seek(start)
+
+    wrapper = request.environ.get('wsgi.file_wrapper')
+    if wrapper is not None and (ganze_datei or request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn')):
+        return wrapper(datei, LESE_BLOCKGROESSE)
+
+    def lesen():
+        try:
+            rest = laenge
+            while rest > 0:
+                block = datei.read(min(LESE_BLOCKGROESSE, rest))
+                if not block:
+                    break
+                rest -= len(block)
+                yield block
+        finally:
+            datei.close()
+
+    return lesen()
+
+
+def _content_disposition(download_name):
+    """Content-Disposition für Downloads, Umlaute zusätzlich als filename* (RFC 6266)"""
+    try:
+        download_name.encode('ascii')
+        return {'filename': download_name}
+    except UnicodeEncodeError:
+        einfach = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+        return {'filename': einfach, 'filename*': "UTF-8''" + quote(download_name, safe="!#$&+^`|~")}
+
+
+def _offload_response(pfad, upload_root, response):
+    """Überlässt die Übertragung dem vorgeschalteten Webserver"""
+    if MEDIA_SENDFILE == 'x-sendfile':
+        response.headers['X-Sendfile'] = pfad
+        return True
+
+    if MEDIA_SENDFILE == 'x-accel-redirect' and upload_root:
+        relativ = os.path.relpath(pfad, upload_root)
+        if relativ.startswith('..'):
+            # Liegt außerhalb des Upload-Verzeichnisses - selbst ausliefern
+            return False
+        response.headers['X-Accel-Redirect'] = MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + quote(relativ.replace(os.sep, '/'))
+        return True
+
+    return False
+
+
+def sende_mediendatei(pfad, mimetype=None, etag=None, upload_root=None, as_attachment=False,
+                      download_name=None, max_age=86400):
+    """
+    Liefert eine Mediendatei mit ETag, 304, Range/If-Range und 416 aus
+
+    Args:
+        pfad: Absoluter Dateipfad
+        mimetype: Content-Type der Datei
+        etag: Starker ETag (z.B. Inhalts-Hash); sonst aus Größe und Änderungszeit
+        upload_root: Basis für X-Accel-Redirect
+        as_attachment / download_name: Content-Disposition für Downloads
+        max_age: Cache-Dauer für den Browser (private)
+
+    Raises:
+        FileNotFoundError: Datei existiert nicht (mehr)
+    """
+    stat_ergebnis = os.stat(pfad)
+    groesse = stat_ergebnis.st_size
+    last_modified = stat_ergebnis.st_mtime
+    etag = etag or _datei_etag(stat_ergebnis)
+
+    if not mimetype:
+        mimetype = mimetypes.guess_type(download_name or pfad)[0] or 'application/octet-stream'
+
+    response = Response(mimetype=mimetype, direct_passthrough=True)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Cache-Control'] = f'private, max-age={max_age}'
+    response.headers['Last-Modified'] = http_date(last_modified)
+    response.set_etag(etag)
+    if as_attachment:
+        response.headers.set('Content-Disposition', 'attachment',
+                             **_content_disposition(download_name or os.path.basename(pfad)))
+
+    if request.method in ('GET', 'HEAD') and _ist_unveraendert(etag, last_modified):
+        response.status_code = 304
+        return response
+
+    if _offload_response(pfad, upload_root, response):
+        return response
+
+    start, laenge = 0, groesse
+    byte_range = request.range
+    if byte_range is not None and byte_range.units == 'bytes' and len(byte_range.ranges) == 1 \
+            and _if_range_passt(etag, last_modified):
+        bereich = byte_range.range_for_length(groesse)
+        if bereich is None:
+            response.status_code = 416
+            response.headers['Content-Range'] = f'bytes */{groesse}'
+            return response
+        start, ende = bereich
+        laenge = ende - start
+        response.status_code = 206
+        response.headers['Content-Range'] = f'bytes {start}-{ende - 1}/{groesse}'
+
+    response.content_length = laenge
+    if request.method != 'HEAD':
+        response.response = _datei_body(pfad, start, laenge, response.status_code == 200)
+    return response
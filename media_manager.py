@@ -0,0 +1,808 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Medien-Manager für Hochzeitsplaner
+Verarbeitet Gäste-Uploads im Hintergrund (Thumbnails usw.), damit
+Galerie-Requests nur noch fertige Dateien ausliefern
+"""
+
+import os
+import sys
+import math
+import time
+import hashlib
+import shutil
+import signal
+import socket
+import logging
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageOps, features
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Derivat-Varianten: Name -> maximale Kantenlänge in Pixeln (aufsteigend)
+DERIVAT_VARIANTEN = {
+    'thumb': 300,
+    'medium': 1024,
+    'large': 2048
+}
+
+JPEG_QUALITAET = 85
+
+
+def _unterstuetzt(codec):
+    try:
+        return PIL_AVAILABLE and bool(features.check(codec))
+    except Exception:
+        return False
+
+
+# Ausgabeformate der Bild-Derivate: format -> (MIME-Type, Pillow-Format, Speicher-Optionen)
+# WebP/AVIF nur, wenn Pillow sie kodieren kann
+BILD_FORMATE = {
+    'jpeg': ('image/jpeg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True})
+}
+if _unterstuetzt('webp'):
+    BILD_FORMATE['webp'] = ('image/webp', 'WEBP', {'quality': 80, 'method': 4})
+if _unterstuetzt('avif'):
+    BILD_FORMATE['avif'] = ('image/avif', 'AVIF', {'quality': 60, 'speed': 6})
+
+# Bevorzugte Reihenfolge bei der Auslieferung (kleinste Dateien zuerst)
+FORMAT_PRIORITAET = ['avif', 'webp', 'jpeg']
+
+# Videos: Poster-Frame und kurze Vorschau per ffmpeg (nur wenn lokal installiert)
+FFMPEG = os.environ.get('FFMPEG_PATH') or shutil.which('ffmpeg')
+VIDEO_POSTER_SEKUNDE = 1
+VIDEO_VORSCHAU_SEKUNDEN = 6
+VIDEO_VORSCHAU_KANTE = 480
+FFMPEG_TIMEOUT = 300
+
+
+def get_upload_root(data_manager, data_dir):
+    """Ermittelt das Upload-Verzeichnis (absolut) aus den gecachten Upload-Einstellungen"""
+    settings = data_manager.get_upload_settings() if data_manager else {}
+    return os.path.abspath(settings.get('upload_path', '') or os.path.join(data_dir, 'uploads'))
+
+
+def finde_upload_datei(upload, upload_root, data_dir):
+    """
+    Sucht die Datei eines Uploads in den bekannten Ablageorten
+
+    Nur für Uploads ohne gespeicherten Pfad (Altbestand) - neue Uploads
+    bekommen resolved_path bereits beim Speichern.
+    
+    Returns:
+        Absoluter Pfad oder None
+    """
+    filename = upload['filename']
+    moegliche_pfade = [
+        # 1. Standard Upload-Pfad mit Dateiname
+        os.path.join(upload_root, filename),
+        # 2. Ursprünglicher Pfad aus der Datenbank (falls noch gültig)
+        upload.get('file_path', ''),
+        # 3. Alternatives Upload-Verzeichnis
+        os.path.join(data_dir, 'uploads', filename),
+        # 4. Uploads-Verzeichnis im Hauptverzeichnis
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Uploads', filename),
+        # 5. Data-Verzeichnis direkt
+        os.path.join(data_dir, filename)
+    ]
+
+    for pfad in moegliche_pfade:
+        if pfad and os.path.isfile(pfad):
+            return os.path.realpath(pfad)
+    return None
+
+
+def loese_upload_pfad(data_manager, upload, upload_root, data_dir):
+    """
+    Gibt den gespeicherten Dateipfad eines Uploads zurück
+    
+    Fehlt der Pfad (Altbestand), wird die Datei einmalig gesucht und das
+    Ergebnis in gaeste_uploads.resolved_path nachgetragen ('' = nicht gefunden).
+    
+    Returns:
+        Absoluter Pfad oder None
+    """
+    pfad = upload.get('resolved_path')
+    if pfad is None:
+        pfad = finde_upload_datei(upload, upload_root, data_dir) or ''
+        data_manager.set_upload_resolved_path(upload['id'], pfad)
+        upload['resolved_path'] = pfad
+    return pfad or None
+
+
+def gleiche_upload_pfade_ab(data_manager, data_dir, auch_fehlende=False):
+    """
+    Trägt für alle Uploads ohne gespeicherten Pfad den aufgelösten Dateipfad nach
+    
+    Args:
+        auch_fehlende: Uploads, deren Datei zuletzt nicht gefunden wurde, erneut suchen
+    
+    Returns:
+        Dict mit 'geprueft', 'gefunden' und 'fehlend'
+    """
+    upload_root = get_upload_root(data_manager, data_dir)
+    stats = {'geprueft': 0, 'gefunden': 0, 'fehlend': 0}
+    
+    for upload in data_manager.get_uploads_fuer_pfad_abgleich(auch_fehlende):
+        pfad = finde_upload_datei(upload, upload_root, data_dir)
+        data_manager.set_upload_resolved_path(upload['id'], pfad or '')
+        stats['geprueft'] += 1
+        stats['gefunden' if pfad else 'fehlend'] += 1
+    
+    if stats['geprueft']:
+        logger.info(f"📁 Upload-Pfade abgeglichen: {stats['gefunden']} gefunden, {stats['fehlend']} fehlend")
+    return stats
+
+
+# =============================================================================
+# Derivate erzeugen
+# =============================================================================
+
+def berechne_datei_hash(pfad, blockgroesse=1024 * 1024):
+    """SHA-256 des Dateiinhalts (Hex)"""
+    sha = hashlib.sha256()
+    with open(pfad, 'rb') as f:
+        for block in iter(lambda: f.read(blockgroesse), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _speichere_bild(img, ziel, format):
+    """Speichert atomar (tmp + rename), damit nie halbe Dateien ausgeliefert werden"""
+    _, pil_format, optionen = BILD_FORMATE[format]
+    tmp_ziel = f"{ziel}.tmp"
+    img.save(tmp_ziel, pil_format, **optionen)
+    os.replace(tmp_ziel, ziel)
+
+
+def erstelle_bild_derivate(quelle, ziel_dir, datei_hash):
+    """
+    Erzeugt alle Größen und Formate eines Bildes
+    
+    Das Original wird nur einmal dekodiert; jede Variante wird aus der
+    nächstgrößeren verkleinert. Die Dateien heißen nach dem Inhalts-Hash,
+    identische Uploads teilen sich also dieselben Derivate.
+
+    Returns:
+        Liste von Derivat-Dicts für complete_media_job
+    """
+    os.makedirs(ziel_dir, exist_ok=True)
+    varianten = sorted(DERIVAT_VARIANTEN.items(), key=lambda v: v[1], reverse=True)
+
+    with Image.open(quelle) as original:
+        # JPEG direkt in reduzierter Auflösung dekodieren (deutlich schneller bei Handyfotos)
+        original.draft('RGB', (varianten[0][1], varianten[0][1]))
+        img = ImageOps.exif_transpose(original)
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+
+        derivate = []
+        vorherige_kante = None
+        for variante, max_kante in varianten:
+            if max(img.size) > max_kante:
+                img = img.copy()
+                img.thumbnail((max_kante, max_kante), Image.Resampling.LANCZOS)
+            
+            # Kleine Originale: mehrere Varianten teilen sich dieselbe Datei
+            kante = max(img.size)
+            datei_variante = variante if kante != vorherige_kante else datei_variante
+            vorherige_kante = kante
+            
+            for format, (mime_type, _, _) in BILD_FORMATE.items():
+                ziel = os.path.join(ziel_dir, f"{datei_hash}_{datei_variante}.{format}")
+                if not os.path.exists(ziel):
+                    _speichere_bild(img, ziel, format)
+                derivate.append(_derivat_info(variante, ziel, img.size[0], img.size[1], format, mime_type))
+
+    return derivate
+
+
+# EXIF-Tags
+_EXIF_IFD = 0x8769
+_EXIF_AUFNAHME_ZEIT = 0x9003
+_EXIF_DIGITALISIERT = 0x9004
+_EXIF_DATUM = 0x0132
+_EXIF_ORIENTIERUNG = 0x0112
+
+
+def lese_bild_metadaten(quelle):
+    """
+    Aufnahmezeit, Ausrichtung und Maße aus dem Bild-Header (ohne zu dekodieren)
+    
+    Returns:
+        Dict mit 'aufnahme_zeit' ('YYYY-MM-DD HH:MM:SS' oder None),
+        'orientierung' (EXIF 1-8) sowie 'breite'/'hoehe' wie angezeigt
+    """
+    with Image.open(quelle) as img:
+        breite, hoehe = img.size
+        exif = img.getexif()
+    
+    orientierung = exif.get(_EXIF_ORIENTIERUNG) or 1
+    if orientierung in (5, 6, 7, 8):
+        # Um 90° gedreht gespeichert
+        breite, hoehe = hoehe, breite
+    
+    aufnahme_zeit = None
+    exif_ifd = exif.get_ifd(_EXIF_IFD)
+    for wert in (exif_ifd.get(_EXIF_AUFNAHME_ZEIT), exif_ifd.get(_EXIF_DIGITALISIERT), exif.get(_EXIF_DATUM)):
+        try:
+            aufnahme_zeit = datetime.strptime(str(wert).strip('\x00 '), '%Y:%m:%d %H:%M:%S').strftime('%Y-%m-%d %H:%M:%S')
+            break
+        except (TypeError, ValueError):
+            continue
+    
+    return {'aufnahme_zeit': aufnahme_zeit, 'orientierung': orientierung, 'breite': breite, 'hoehe': hoehe}
+
+
+def berechne_phash(pfad):
+    """
+    Wahrnehmungs-Hash (dHash, 64 Bit) für das Erkennen nahezu gleicher Bilder
+    
+    Vergleicht die Helligkeit benachbarter Pixel eines 9x8-Graustufenbildes;
+    Serienbilder unterscheiden sich nur in wenigen Bits (Hamming-Abstand).
+    Wird aus dem Thumbnail berechnet - das Original muss nicht erneut dekodiert werden.
+    
+    Returns:
+        64-Bit-Hash als 16-stelliger Hex-String
+    """
+    with Image.open(pfad) as img:
+        klein = img.convert('L').resize((9, 8), Image.Resampling.LANCZOS)
+    pixel = list(klein.getdata())
+    
+    wert = 0
+    for zeile in range(8):
+        for spalte in range(8):
+            links = pixel[zeile * 9 + spalte]
+            rechts = pixel[zeile * 9 + spalte + 1]
+            wert = (wert << 1) | (1 if links > rechts else 0)
+    return f"{wert:016x}"
+
+
+def erstelle_video_platzhalter(ziel, groesse=300):
+    """Erstellt ein generisches Vorschaubild mit Play-Symbol für Videos"""
+    # Gradient-Hintergrund in einem Schritt statt Zeile für Zeile
+    verlauf = Image.linear_gradient('L').resize((groesse, groesse))
+    img = Image.merge('RGB', [
+        verlauf.point(lambda p, basis=basis: basis + p * 40 // 255)
+        for basis in (44, 64, 74)
+    ])
+    draw = ImageDraw.Draw(img)
+
+    # Play-Symbol (großer Kreis mit Dreieck)
+    center = groesse // 2
+    circle_radius = groesse // 5
+    draw.ellipse([center - circle_radius, center - circle_radius,
+                  center + circle_radius, center + circle_radius],
+                 fill='#ffffff', outline='#ecf0f1', width=3)
+
+    triangle_size = groesse // 12
+    draw.polygon([
+        (center - triangle_size // 2, center - triangle_size),
+        (center - triangle_size // 2, center + triangle_size),
+        (center + triangle_size, center)
+    ], fill='#3498db')
+
+    # Video-Icon in der Ecke
+    draw.rectangle([10, 10, 34, 34], fill='#e74c3c')
+    draw.polygon([(15, 18), (15, 26), (25, 22)], fill='#ffffff')
+
+    try:
+        font = ImageFont.truetype("arial.ttf", 16)
+    except OSError:
+        font = ImageFont.load_default()
+
+    text = "VIDEO"
+    text_bbox = draw.textbbox((0, 0), text, font=font)
+    text_x = (groesse - (text_bbox[2] - text_bbox[0])) // 2
+    text_y = int(groesse * 0.8)
+    draw.text((text_x + 1, text_y + 1), text, fill='#000000', font=font)
+    draw.text((text_x, text_y), text, fill='#ffffff', font=font)
+
+    tmp_ziel = f"{ziel}.{os.getpid()}.tmp"
+    img.save(tmp_ziel, 'JPEG', quality=JPEG_QUALITAET, optimize=True)
+    os.replace(tmp_ziel, ziel)
+    return img.size
+
+
+def video_platzhalter_pfad(upload_root, groesse=DERIVAT_VARIANTEN['thumb']):
+    """
+    Gemeinsames Platzhalterbild für Videos ohne Poster-Frame
+    
+    Wird nur einmal gerendert und von allen Videos geteilt.
+    
+    Returns:
+        (Pfad, (Breite, Höhe))
+    """
+    ziel = os.path.join(upload_root, 'video_thumbnails', f"platzhalter_{groesse}.jpg")
+    if os.path.exists(ziel):
+        return ziel, (groesse, groesse)
+    os.makedirs(os.path.dirname(ziel), exist_ok=True)
+    return ziel, erstelle_video_platzhalter(ziel, groesse)
+
+
+def erstelle_bild_platzhalter(ziel, groesse=300):
+    """Erstellt ein neutrales Vorschaubild für Bilder, deren Thumbnail noch berechnet wird"""
+    verlauf = Image.linear_gradient('L').resize((groesse, groesse))
+    img = Image.merge('RGB', [
+        verlauf.point(lambda p, basis=basis: basis + p * 30 // 255)
+        for basis in (214, 219, 223)
+    ])
+    draw = ImageDraw.Draw(img)
+    
+    # Schlichtes Bild-Symbol (Sonne über zwei Bergen)
+    einheit = groesse // 10
+    center = groesse // 2
+    draw.ellipse([center + einheit, center - 3 * einheit, center + 2 * einheit, center - 2 * einheit],
+                 fill='#ffffff')
+    draw.polygon([(center - 3 * einheit, center + 2 * einheit), (center - einheit, center - einheit),
+                  (center + einheit, center + 2 * einheit)], fill='#95a5a6')
+    draw.polygon([(center, center + 2 * einheit), (center + 3 * einheit // 2, center),
+                  (center + 3 * einheit, center + 2 * einheit)], fill='#7f8c8d')
+    
+    tmp_ziel = f"{ziel}.{os.getpid()}.tmp"
+    img.save(tmp_ziel, 'JPEG', quality=JPEG_QUALITAET, optimize=True)
+    os.replace(tmp_ziel, ziel)
+    return img.size
+
+
+def bild_platzhalter_pfad(upload_root, groesse=DERIVAT_VARIANTEN['thumb']):
+    """
+    Gemeinsames Platzhalterbild für Bilder, solange ihr Thumbnail in Arbeit ist
+    
+    Returns:
+        (Pfad, (Breite, Höhe))
+    """
+    ziel = os.path.join(upload_root, 'derivate', f"platzhalter_{groesse}.jpg")
+    if os.path.exists(ziel):
+        return ziel, (groesse, groesse)
+    os.makedirs(os.path.dirname(ziel), exist_ok=True)
+    return ziel, erstelle_bild_platzhalter(ziel, groesse)
+
+
+def _ffmpeg(argumente):
+    """Führt ffmpeg aus; True bei Erfolg"""
+    try:
+        ergebnis = subprocess.run(
+            [FFMPEG, '-hide_banner', '-loglevel', 'error', '-nostdin', '-y', *argumente],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=FFMPEG_TIMEOUT
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"⚠️ ffmpeg fehlgeschlagen: {e}")
+        return False
+    if ergebnis.returncode != 0:
+        logger.warning(f"⚠️ ffmpeg fehlgeschlagen: {ergebnis.stderr.decode('utf-8', 'replace').strip()[-300:]}")
+        return False
+    return True
+
+
+def extrahiere_poster(quelle, ziel):
+    """
+    Extrahiert einen Poster-Frame (repräsentatives Bild nahe dem Anfang)
+    
+    Sehr kurze Videos haben nach VIDEO_POSTER_SEKUNDE keinen Frame mehr -
+    dann wird ab dem Anfang gesucht.
+    """
+    tmp_ziel = f"{ziel}.{os.getpid()}.tmp"
+    for sekunde in (VIDEO_POSTER_SEKUNDE, 0):
+        if _ffmpeg(['-ss', str(sekunde), '-i', quelle, '-vf', 'thumbnail=25', '-frames:v', '1',
+                    '-q:v', '2', '-f', 'image2', tmp_ziel]) \
+                and os.path.exists(tmp_ziel) and os.path.getsize(tmp_ziel) > 0:
+            os.replace(tmp_ziel, ziel)
+            return True
+    if os.path.exists(tmp_ziel):
+        os.remove(tmp_ziel)
+    return False
+
+
+def erstelle_video_vorschau(quelle, ziel):
+    """Kurzer, stummer Vorschau-Clip (H.264, niedrige Bitrate, faststart für sofortiges Abspielen)"""
+    kante = VIDEO_VORSCHAU_KANTE
+    tmp_ziel = f"{ziel}.{os.getpid()}.tmp"
+    ok = _ffmpeg([
+        '-i', quelle, '-t', str(VIDEO_VORSCHAU_SEKUNDEN), '-an',
+        '-vf', f"scale='if(gt(iw,ih),min({kante},iw),-2)':'if(gt(iw,ih),-2,min({kante},ih))'",
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '30', '-maxrate', '600k', '-bufsize', '1200k',
+        '-pix_fmt', 'yuv420p', '-movflags', '+faststart', '-f', 'mp4', tmp_ziel
+    ])
+    if ok and os.path.exists(tmp_ziel):
+        os.replace(tmp_ziel, ziel)
+        return True
+    if os.path.exists(tmp_ziel):
+        os.remove(tmp_ziel)
+    return False
+
+
+def erstelle_video_derivate(quelle, ziel_dir, datei_hash):
+    """
+    Poster-Frame (in allen Bildgrößen/-formaten) und Vorschau-Clip eines Videos
+    
+    Alles wird nach dem Inhalts-Hash benannt; bereits vorhandene Dateien
+    werden wiederverwendet, ffmpeg läuft also pro Inhalt nur einmal.
+    
+    Returns:
+        Liste von Derivat-Dicts oder None, wenn kein Poster erzeugt werden konnte
+    """
+    os.makedirs(ziel_dir, exist_ok=True)
+    
+    poster = os.path.join(ziel_dir, f"{datei_hash}_poster.jpg")
+    if not os.path.exists(poster) and not extrahiere_poster(quelle, poster):
+        return None
+    derivate = erstelle_bild_derivate(poster, ziel_dir, datei_hash)
+    with Image.open(poster) as img:
+        breite, hoehe = img.size
+    derivate.append(_derivat_info('poster', poster, breite, hoehe))
+    
+    vorschau = os.path.join(ziel_dir, f"{datei_hash}_preview.mp4")
+    if os.path.exists(vorschau) or erstelle_video_vorschau(quelle, vorschau):
+        faktor = min(1.0, VIDEO_VORSCHAU_KANTE / max(breite, hoehe))
+        derivate.append(_derivat_info('preview', vorschau, int(breite * faktor) // 2 * 2,
+                                      int(hoehe * faktor) // 2 * 2, 'mp4', 'video/mp4'))
+    return derivate
+
+
+def erstelle_derivate(upload, upload_root, data_dir):
+    """
+    Erzeugt alle Derivate eines Uploads
+
+    Returns:
+        (Liste von Derivat-Dicts für complete_media_job, Inhalts-Hash oder None,
+         Bild-Metadaten aus lese_bild_metadaten oder None)
+
+    Raises:
+        FileNotFoundError wenn die Originaldatei fehlt
+    """
+    if not PIL_AVAILABLE:
+        raise RuntimeError("PIL/Pillow nicht verfügbar")
+
+    derivate = []
+    mime_type = upload.get('mime_type') or ''
+
+    if mime_type.startswith('video/'):
+        if FFMPEG:
+            quelle = upload.get('resolved_path') or finde_upload_datei(upload, upload_root, data_dir)
+            if not quelle:
+                raise FileNotFoundError(f"Originaldatei für Upload {upload['id']} nicht gefunden")
+            
+            datei_hash = upload.get('content_hash') or berechne_datei_hash(quelle)
+            ziel_dir = os.path.join(upload_root, 'derivate', datei_hash[:2])
+            video_derivate = erstelle_video_derivate(quelle, ziel_dir, datei_hash)
+            if video_derivate:
+                return video_derivate, datei_hash, None
+        
+        # Ohne ffmpeg (oder bei unlesbarem Video) nur der gemeinsame Platzhalter
+        ziel, (breite, hoehe) = video_platzhalter_pfad(upload_root)
+        derivate.append(_derivat_info('thumb', ziel, breite, hoehe))
+        return derivate, upload.get('content_hash'), None
+
+    if not mime_type.startswith('image/'):
+        return derivate, None, None
+
+    quelle = upload.get('resolved_path') or finde_upload_datei(upload, upload_root, data_dir)
+    if not quelle:
+        raise FileNotFoundError(f"Originaldatei für Upload {upload['id']} nicht gefunden")
+
+    datei_hash = upload.get('content_hash') or berechne_datei_hash(quelle)
+    ziel_dir = os.path.join(upload_root, 'derivate', datei_hash[:2])
+    return erstelle_bild_derivate(quelle, ziel_dir, datei_hash), datei_hash, lese_bild_metadaten(quelle)
+
+
+_BLURHASH_ZEICHEN = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def _base83(wert, laenge):
+    return ''.join(_BLURHASH_ZEICHEN[(wert // 83 ** (laenge - i)) % 83] for i in range(1, laenge + 1))
+
+
+def _srgb_zu_linear(wert):
+    v = wert / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _linear_zu_srgb(wert):
+    v = max(0.0, min(1.0, wert))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def berechne_blurhash(pfad, komponenten_x=4, komponenten_y=3, kante=32):
+    """
+    BlurHash eines Bildes (https://blurha.sh) als unscharfer Platzhalter für die Galerie
+    
+    Wird aus dem bereits verkleinerten Thumbnail auf 32px berechnet - wenige
+    Millisekunden pro Upload.
+    """
+    with Image.open(pfad) as img:
+        klein = img.convert('RGB')
+        klein.thumbnail((kante, kante))
+    breite, hoehe = klein.size
+    linear = [tuple(_srgb_zu_linear(c) for c in pixel) for pixel in klein.getdata()]
+    
+    faktoren = []
+    for j in range(komponenten_y):
+        cos_y = [math.cos(math.pi * j * y / hoehe) for y in range(hoehe)]
+        for i in range(komponenten_x):
+            cos_x = [math.cos(math.pi * i * x / breite) for x in range(breite)]
+            norm = (1 if i == 0 and j == 0 else 2) / (breite * hoehe)
+            r = g = b = 0.0
+            for y in range(hoehe):
+                zeile = y * breite
+                for x in range(breite):
+                    basis = cos_x[x] * cos_y[y]
+                    pr, pg, pb = linear[zeile + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            faktoren.append((r * norm, g * norm, b * norm))
+    
+    dc, ac = faktoren[0], faktoren[1:]
+    ergebnis = _base83((komponenten_x - 1) + (komponenten_y - 1) * 9, 1)
+    
+    if ac:
+        groesster = max(abs(v) for faktor in ac for v in faktor)
+        quantisiert = max(0, min(82, int(groesster * 166 - 0.5)))
+        maximum = (quantisiert + 1) / 166
+    else:
+        quantisiert, maximum = 0, 1
+    ergebnis += _base83(quantisiert, 1)
+    
+    ergebnis += _base83((_linear_zu_srgb(dc[0]) << 16) + (_linear_zu_srgb(dc[1]) << 8) + _linear_zu_srgb(dc[2]), 4)
+    
+    def quant(v):
+        return max(0, min(18, int(math.copysign(abs(v / maximum) ** 0.5, v) * 9 + 9.5)))
+    
+    for r, g, b in ac:
+        ergebnis += _base83(quant(r) * 19 * 19 + quant(g) * 19 + quant(b), 2)
+    return ergebnis
+
+
+def _derivat_info(variante, pfad, breite, hoehe, format='jpeg', mime_type='image/jpeg'):
+    return {
+        'variante': variante,
+        'format': format,
+        'mime_type': mime_type,
+        'pfad': pfad,
+        'breite': breite,
+        'hoehe': hoehe,
+        'dateigroesse': os.path.getsize(pfad)
+    }
+
+
+def waehle_derivat(derivate, variante=None, breite=None, accept=''):
+    """
+    Wählt das passende Derivat für einen Request
+    
+    Args:
+        derivate: Alle Derivate eines Uploads (get_upload_derivate)
+        variante: Feste Variante (z.B. 'thumb'), sonst Auswahl über die Breite
+        breite: Gewünschte Breite in Gerätepixeln (Width-Hint des Clients)
+        accept: Accept-Header des Clients (für WebP/AVIF)
+    
+    Returns:
+        Derivat-Dict oder None
+    """
+    if variante:
+        derivate = [d for d in derivate if d['variante'] == variante]
+    if not derivate:
+        return None
+    
+    accept = (accept or '').lower()
+    kandidaten = []
+    for format in FORMAT_PRIORITAET:
+        if format != 'jpeg' and f"image/{format}" not in accept:
+            continue
+        kandidaten = [d for d in derivate if d['format'] == format]
+        if kandidaten:
+            break
+    if not kandidaten:
+        kandidaten = derivate
+    
+    kandidaten = sorted(kandidaten, key=lambda d: d.get('breite') or 0)
+    if breite:
+        for derivat in kandidaten:
+            if (derivat.get('breite') or 0) >= breite:
+                return derivat
+        return kandidaten[-1]
+    
+    # Ohne Hinweis: größte Variante (statt des Originals)
+    return kandidaten[-1]
+
+
+def verarbeite_job(data_manager, data_dir, job):
+    """Führt einen Job aus und schreibt das Ergebnis zurück in die Queue"""
+    try:
+        upload = data_manager.get_upload_by_id(job['upload_id'])
+        if not upload:
+            # Upload wurde inzwischen gelöscht
+            data_manager.complete_media_job(job['id'], job['upload_id'], [])
+            return True
+
+        start = time.perf_counter()
+        derivate, datei_hash, metadaten = erstelle_derivate(upload, get_upload_root(data_manager, data_dir), data_dir)
+        
+        blurhash = None
+        thumb = next((d for d in derivate if d['variante'] == 'thumb' and d['format'] == 'jpeg'), None)
+        if thumb:
+            blurhash = berechne_blurhash(thumb['pfad'])
+            if metadaten is not None:
+                metadaten['phash'] = berechne_phash(thumb['pfad'])
+        
+        data_manager.complete_media_job(job['id'], upload['id'], derivate, datei_hash, blurhash, metadaten)
+        logger.info(f"✅ Medien-Job {job['id']}: {len(derivate)} Derivate für Upload {upload['id']} "
+                    f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return True
+
+    except Exception as e:
+        data_manager.fail_media_job(job['id'], e)
+        return False
+
+
+# =============================================================================
+# Worker-Prozesse
+# =============================================================================
+
+def media_worker_main(data_dir, worker_name, poll_interval=1.0):
+    """Hauptschleife eines Worker-Prozesses: Jobs abholen, verarbeiten, zurückmelden"""
+    from sqlite_datenmanager import SQLiteHochzeitsDatenManager
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    parent_pid = os.getppid()
+
+    data_manager = SQLiteHochzeitsDatenManager(data_dir)
+    logger.info(f"🖼️ Medien-Worker {worker_name} gestartet")
+
+    # Beenden, sobald der startende Prozess nicht mehr existiert
+    while not stop_event.is_set() and os.getppid() == parent_pid:
+        job = data_manager.claim_media_job(worker_name)
+        if not job:
+            stop_event.wait(poll_interval)
+            continue
+        verarbeite_job(data_manager, data_dir, job)
+
+    logger.info(f"🛑 Medien-Worker {worker_name} beendet")
+
+
+class MediaManager:
+    """
+    Startet und überwacht die Worker-Prozesse der Medien-Pipeline
+
+    Die Jobs liegen in der SQLite-Tabelle media_jobs und werden von den
+    Workern atomar abgeholt. Über eine Lock-Datei im Datenverzeichnis wird
+    sichergestellt, dass auch bei mehreren Gunicorn-Workern nur ein Pool läuft.
+    Die Worker sind eigenständige Interpreter (python media_manager.py ...),
+    damit sie weder Flask noch den gevent-Zustand des Servers erben.
+    """
+
+    def __init__(self, data_manager, data_dir, worker_count=None):
+        self.data_manager = data_manager
+        self.data_dir = data_dir
+        if worker_count is None:
+            worker_count = int(os.environ.get('MEDIA_WORKERS', 2))
+        # Als .exe (PyInstaller) gibt es kein separates Skript für die Worker
+        if getattr(sys, 'frozen', False):
+            worker_count = 0
+        self.worker_count = worker_count
+        self._processes = []
+        self._lock_file = None
+        self._owner_pid = None
+
+    def is_enabled(self):
+        return self.worker_count > 0 and PIL_AVAILABLE
+
+    def _acquire_lock(self):
+        if fcntl is None:
+            return True
+        try:
+            self._lock_file = open(os.path.join(self.data_dir, 'media_worker.lock'), 'w')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            if self._lock_file:
+                self._lock_file.close()
+                self._lock_file = None
+            return False
+
+    def start(self):
+        """Startet den Worker-Pool (falls nicht bereits in einem anderen Prozess aktiv)"""
+        if not self.is_enabled():
+            logger.info("ℹ️ Medien-Pipeline deaktiviert")
+            return False
+
+        if not self._acquire_lock():
+            logger.info("ℹ️ Medien-Worker laufen bereits in einem anderen Prozess")
+            return False
+
+        # Altbestand ohne gespeicherten Dateipfad bzw. ohne Derivate nachholen
+        gleiche_upload_pfade_ab(self.data_manager, self.data_dir)
+        self.data_manager.enqueue_missing_media_jobs(videos_ohne_poster=bool(FFMPEG))
+
+        self._owner_pid = os.getpid()
+        script = os.path.abspath(__file__)
+        for index in range(self.worker_count):
+            worker_name = f"{socket.gethostname()}:{os.getpid()}:{index}"
+            self._processes.append(subprocess.Popen(
+                [sys.executable, script, self.data_dir, '--worker-name', worker_name],
+                cwd=os.path.dirname(script),
+                close_fds=True
+            ))
+
+        logger.info(f"✅ Medien-Pipeline gestartet ({self.worker_count} Worker-Prozesse)")
+        return True
+
+    def stop(self, timeout=5.0):
+        """Beendet die Worker-Prozesse (nur im startenden Prozess)"""
+        if self._owner_pid != os.getpid():
+            return
+
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes = []
+
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def process_now(self, upload_id):
+        """
+        Verarbeitet einen Upload sofort im aufrufenden Prozess
+
+        Nur für den Fall, dass keine Worker laufen (MEDIA_WORKERS=0).
+        """
+        self.data_manager.enqueue_media_job(upload_id, prioritaet=10)
+        job = self.data_manager.claim_media_job(f"inline:{os.getpid()}", upload_id=upload_id)
+        if job:
+            return verarbeite_job(self.data_manager, self.data_dir, job)
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Medien-Worker für Hochzeitsplaner')
+    parser.add_argument('data_dir', nargs='?',
+                        default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'),
+                        help='Datenverzeichnis mit hochzeit.db')
+    parser.add_argument('--worker-name', help='Einzelnen Worker ausführen (wird vom MediaManager gestartet)')
+    parser.add_argument('--workers', type=int, default=None, help='Anzahl Worker im eigenständigen Betrieb')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if args.worker_name:
+        media_worker_main(args.data_dir, args.worker_name)
+        return
+
+    # Eigenständiger Betrieb, z.B. wenn die App mit MEDIA_WORKERS=0 läuft
+    from sqlite_datenmanager import SQLiteHochzeitsDatenManager
+    manager = MediaManager(SQLiteHochzeitsDatenManager(args.data_dir), args.data_dir, args.workers)
+    if manager.start():
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            manager.stop()
+
+
+if __name__ == "__main__":
+    main()
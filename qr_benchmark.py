@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+QR-Benchmark für Hochzeitsplaner
+================================
+Vergleicht die frühere QR-Erzeugung der Einladungskarten (qrcode mit
+Versionssuche, Rasterbild mit box_size 8, LANCZOS-Verkleinerung auf die
+QR-Größe) mit der pro URL gecachten Modulmatrix, die direkt in Zielgröße
+gezeichnet wird (qr_card_generator.qr_matrix / render_qr_image).
+
+Gemessen werden je Zielgröße:
+- Durchsatz (Codes/s): alt, neu kalt (Matrix wird berechnet), neu warm
+  (Matrix aus dem Cache) und SVG
+- Lesbarkeit von alt, direkt (immer Nearest) und neu (render_qr_image, das
+  unter QR_MIN_MODULE_PIXELS geglättet verkleinert): Anteil korrekt
+  abgetasteter Module (Modulmitte gegen die Schwelle zwischen QR- und
+  Hintergrundfarbe) und, falls ein Decoder installiert ist (zxing-cpp, pyzbar
+  oder OpenCV), die Dekodierquote - für das Bild selbst und für eine
+  unscharfe JPEG-Kopie (grob wie eine Kamera)
+
+Die Ergebnisse werden als JSON geschrieben, damit Regressionen verglichen
+werden können.
+
+Beispiel:
+    python qr_benchmark.py --sizes 60 80 100 120 160 --codes 200
+"""
+
+import io
+import os
+import json
+import time
+import random
+import string
+import logging
+import argparse
+import platform
+import contextlib
+from datetime import datetime
+from urllib.parse import urlencode
+
+from PIL import Image, ImageColor, ImageFilter
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from qr_card_generator import qrcode, qr_matrix, render_qr_image, qr_svg
+
+BASIS_URL = "https://pascalundkäthe-heiraten.de/login"
+
+# Ruhezone um das Bild beim Dekodieren (Pixel)
+DEKODIER_RAND = 16
+
+
+# =============================================================================
+# Erzeugung
+# =============================================================================
+
+def generate_urls(anzahl, rnd, basis_url):
+    """Login-URLs wie auf den Karten (Gast-Code + Passwort)"""
+    urls = []
+    for nummer in range(anzahl):
+        passwort = ''.join(rnd.choice(string.ascii_letters + string.digits) for _ in range(10))
+        urls.append(f"{basis_url}?{urlencode({'guest_code': f'GUEST{nummer + 1}', 'password': passwort})}")
+    return urls
+
+
+def qr_alt(url, groesse, farbe, hintergrund):
+    """Bisheriges Verfahren: Versionssuche, Rasterbild, LANCZOS-Verkleinerung"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        box_size=8,
+        border=2,
+    )
+    qr.add_data(url)
+    qr.make(fit=True)
+    bild = qr.make_image(fill_color=farbe, back_color=hintergrund)
+    return bild.resize((groesse, groesse), Image.Resampling.LANCZOS).convert('RGB')
+
+
+def qr_neu_kalt(url, groesse, farbe, hintergrund):
+    return render_qr_image(qr_matrix.__wrapped__(url), groesse, farbe, hintergrund)
+
+
+def qr_neu_warm(url, groesse, farbe, hintergrund):
+    return render_qr_image(qr_matrix(url), groesse, farbe, hintergrund)
+
+
+def qr_neu_svg(url, groesse, farbe, hintergrund):
+    return qr_svg(qr_matrix(url), groesse, farbe, hintergrund)
+
+
+def qr_direkt(url, groesse, farbe, hintergrund):
+    """Module immer per Nearest in Zielgröße (ohne Glättung kleiner Codes)"""
+    matrix = qr_matrix(url)
+    anzahl = len(matrix)
+    module = Image.frombytes('P', (anzahl, anzahl), bytes(wert for zeile in matrix for wert in zeile))
+    module.putpalette(list(ImageColor.getrgb(hintergrund)[:3]) + list(ImageColor.getrgb(farbe)[:3]))
+    return module.resize((groesse, groesse), Image.Resampling.NEAREST).convert('RGB')
+
+
+VERFAHREN = {
+    'alt': qr_alt,
+    'neu_kalt': qr_neu_kalt,
+    'neu_warm': qr_neu_warm,
+    'svg': qr_neu_svg
+}
+
+
+# =============================================================================
+# Lesbarkeit
+# =============================================================================
+
+def lade_decoder():
+    """
+    Sucht einen installierten QR-Decoder
+
+    Returns:
+        tuple: (Name, Funktion Bild -> Liste dekodierter Texte) oder (None, None)
+    """
+    try:
+        import zxingcpp
+        return 'zxing-cpp', lambda bild: [ergebnis.text for ergebnis in zxingcpp.read_barcodes(bild)]
+    except ImportError:
+        pass
+
+    try:
+        from pyzbar import pyzbar
+        return 'pyzbar', lambda bild: [ergebnis.data.decode('utf-8') for ergebnis in pyzbar.decode(bild)]
+    except ImportError:
+        pass
+
+    try:
+        import cv2
+        import numpy
+        detektor = cv2.QRCodeDetector()
+
+        def opencv_decode(bild):
+            text, _, _ = detektor.detectAndDecode(cv2.cvtColor(numpy.array(bild), cv2.COLOR_RGB2BGR))
+            return [text] if text else []
+
+        return 'opencv', opencv_decode
+    except ImportError:
+        pass
+
+    return None, None
+
+
+def modul_treue(bild, matrix, farbe, hintergrund):
+    """Anteil der Module, deren Mittelpunkt auf der richtigen Seite der Helligkeitsschwelle liegt"""
+    grau = bild.convert('L')
+    hell_vorne = ImageColor.getcolor(farbe, 'L')
+    hell_hinten = ImageColor.getcolor(hintergrund, 'L')
+    schwelle = (hell_vorne + hell_hinten) / 2
+    dunkel_ist_vorne = hell_vorne < hell_hinten
+
+    anzahl = len(matrix)
+    schritt = bild.width / anzahl
+    richtig = 0
+    for zeile in range(anzahl):
+        for spalte in range(anzahl):
+            wert = grau.getpixel((int((spalte + 0.5) * schritt), int((zeile + 0.5) * schritt)))
+            ist_vorne = (wert < schwelle) if dunkel_ist_vorne else (wert > schwelle)
+            richtig += ist_vorne == matrix[zeile][spalte]
+    return richtig / (anzahl * anzahl)
+
+
+def kamera_kopie(bild):
+    """Unscharfe JPEG-Kopie (grobe Annäherung an ein Kamerabild)"""
+    puffer = io.BytesIO()
+    bild.filter(ImageFilter.GaussianBlur(0.8)).save(puffer, 'JPEG', quality=60)
+    puffer.seek(0)
+    return Image.open(puffer).convert('RGB')
+
+
+def mit_rand(bild):
+    rahmen = Image.new('RGB', (bild.width + 2 * DEKODIER_RAND, bild.height + 2 * DEKODIER_RAND), 'white')
+    rahmen.paste(bild, (DEKODIER_RAND, DEKODIER_RAND))
+    return rahmen
+
+
+def bewerte_lesbarkeit(urls, groesse, farbe, hintergrund, decoder):
+    ergebnis = {}
+    for name, verfahren in (('alt', qr_alt), ('direkt', qr_direkt), ('neu', qr_neu_warm)):
+        treue = []
+        dekodiert = dekodiert_kamera = 0
+        for url in urls:
+            bild = verfahren(url, groesse, farbe, hintergrund)
+            treue.append(modul_treue(bild, qr_matrix(url), farbe, hintergrund))
+            if decoder:
+                dekodiert += url in decoder(mit_rand(bild))
+                dekodiert_kamera += url in decoder(mit_rand(kamera_kopie(bild)))
+        ergebnis[name] = {
+            'module_accuracy_min': round(min(treue), 4),
+            'module_accuracy_mean': round(sum(treue) / len(treue), 4),
+            'decode_rate': round(dekodiert / len(urls), 3) if decoder else None,
+            'decode_rate_camera': round(dekodiert_kamera / len(urls), 3) if decoder else None
+        }
+    return ergebnis
+
+
+# =============================================================================
+# Messung
+# =============================================================================
+
+def measure(funktion, wiederholungen):
+    zeiten = []
+    for _ in range(wiederholungen):
+        start = time.perf_counter()
+        funktion()
+        zeiten.append(time.perf_counter() - start)
+    zeiten.sort()
+    return zeiten[len(zeiten) // 2]
+
+
+def run_case(urls, groesse, args, decoder):
+    # Cache für neu_warm vorab füllen
+    for url in urls:
+        qr_matrix(url)
+
+    durchsatz = {}
+    for name, verfahren in VERFAHREN.items():
+        dauer = measure(lambda: [verfahren(url, groesse, args.fill, args.background) for url in urls], args.repeat)
+        durchsatz[name] = {
+            'median_ms': round(dauer * 1000, 2),
+            'ms_per_code': round(dauer * 1000 / len(urls), 3),
+            'codes_per_s': round(len(urls) / dauer, 1)
+        }
+
+    stichprobe = urls[:args.scan_codes]
+    return {
+        'size': groesse,
+        'modules': len(qr_matrix(urls[0])),
+        'throughput': durchsatz,
+        'readability': bewerte_lesbarkeit(stichprobe, groesse, args.fill, args.background, decoder)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark der QR-Erzeugung für Einladungskarten')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[60, 80, 100, 120, 160, 240],
+                        help='QR-Größen in Pixeln')
+    parser.add_argument('--codes', type=int, default=200, help='Anzahl der Login-URLs je Messung')
+    parser.add_argument('--scan-codes', type=int, default=50, help='Anzahl der Codes für die Lesbarkeitsprüfung')
+    parser.add_argument('--fill', default='#d4af37', help='QR-Farbe (Standard: Akzentfarbe der Karten)')
+    parser.add_argument('--background', default='#ffffff', help='Hintergrundfarbe')
+    parser.add_argument('--base-url', default=BASIS_URL, help='Login-URL ohne Parameter')
+    parser.add_argument('--seed', type=int, default=42, help='Seed für die Passwörter')
+    parser.add_argument('--repeat', type=int, default=3, help='Wiederholungen je Messung')
+    parser.add_argument('--output', default='qr_benchmark.json', help='Ergebnisdatei (JSON)')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    decoder_name, decoder = lade_decoder()
+
+    print("🔲 QR-Benchmark")
+    print("=" * 40)
+    if not decoder:
+        print("⚠️ Kein QR-Decoder installiert (zxing-cpp, pyzbar, opencv) - nur Modul-Treue wird geprüft")
+
+    urls = generate_urls(args.codes, random.Random(args.seed), args.base_url)
+    faelle = []
+    for groesse in args.sizes:
+        fall = run_case(urls, groesse, args, decoder)
+        faelle.append(fall)
+        durchsatz, lesbarkeit = fall['throughput'], fall['readability']
+        zeile = (f"📐 {groesse:>4}px ({fall['modules']} Module) | "
+                 f"alt {durchsatz['alt']['codes_per_s']:>8} /s | "
+                 f"kalt {durchsatz['neu_kalt']['codes_per_s']:>8} /s | "
+                 f"warm {durchsatz['neu_warm']['codes_per_s']:>9} /s | "
+                 f"Treue alt {lesbarkeit['alt']['module_accuracy_min']:.3f} "
+                 f"neu {lesbarkeit['neu']['module_accuracy_min']:.3f}")
+        if decoder:
+            zeile += ' | lesbar (Bild/Kamera)' + ''.join(
+                f" {name} {lesbarkeit[name]['decode_rate']:.0%}/{lesbarkeit[name]['decode_rate_camera']:.0%}"
+                for name in ('alt', 'direkt', 'neu'))
+        print(zeile)
+
+    ergebnis = {
+        'benchmark': 'qr',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'decoder': decoder_name,
+        'parameters': {
+            'sizes': args.sizes,
+            'codes': args.codes,
+            'scan_codes': args.scan_codes,
+            'fill': args.fill,
+            'background': args.background,
+            'seed': args.seed,
+            'repeat': args.repeat
+        },
+        'cases': faelle
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(ergebnis, f, indent=2, ensure_ascii=False)
+    print(f"📂 Ergebnisse gespeichert: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,64 +8,31 @@ Integrierte Version des QR-Card Generators für die Hochzeitsplaner Web-App
 """
 
 import os
-import sys
 import json
 import base64
-import subprocess
 import urllib.request
 import re
 import io
 import zipfile
 import urllib.error
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 import io
 import zipfile
 from urllib.parse import urlencode
 
-# Automatische Installation benötigter Bibliotheken
-def install_required_packages():
-    """Installiert alle benötigten externe Bibliotheken falls nicht vorhanden"""
-    required_packages = [
-        ('PIL', 'Pillow', 'PIL (Python Imaging Library)'),
-        ('qrcode', 'qrcode[pil]', 'QR-Code Generator')
-    ]
-    
-    installed_packages = []
-    
-    for import_name, package_name, display_name in required_packages:
-        try:
-            if import_name == 'PIL':
-                from PIL import Image, ImageDraw, ImageFont
-            elif import_name == 'qrcode':
-                import qrcode
-            print(f"✅ {display_name} bereits installiert")
-        except ImportError:
-            print(f"📦 {display_name} nicht gefunden, installiere automatisch...")
-            try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", package_name])
-                print(f"✅ {display_name} erfolgreich installiert")
-                installed_packages.append(display_name)
-            except Exception as e:
-                print(f"❌ Fehler beim Installieren von {display_name}: {e}")
-                raise ImportError(f"Konnte {display_name} nicht installieren")
-    
-    if installed_packages:
-        print(f"🔄 {len(installed_packages)} Pakete neu installiert. Script wird fortgesetzt...")
-    
-    # Nach Installation die Module importieren
-    try:
-        from PIL import Image, ImageDraw, ImageFont
-        import qrcode
-        return qrcode
-    except ImportError as e:
-        raise ImportError(f"Fehler beim Importieren nach Installation: {e}")
+import qrcode
+from PIL import Image, ImageColor, ImageDraw, ImageFont
 
-# Installiere alle benötigten Pakete
-qrcode = install_required_packages()
+from card_pdf import stream_karten_pdf
 
-# Importiere PIL-Module nach der Installation
-from PIL import Image, ImageDraw, ImageFont
+# Mitgelieferte Schriften (fehlende lädt `python qr_card_generator.py` herunter -
+# beim Import und in Requests gibt es keine Netzwerkzugriffe)
+FONTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts')
 
 def download_dancing_script():
     """Lädt Dancing Script Font von Google Fonts herunter"""
@@ -164,9 +131,196 @@ def download_emoji_font():
         print(f"⚠️ Fehler beim Herunterladen des Emoji Fonts: {e}")
         return None
 
-# Fonts beim Import herunterladen
-dancing_script_regular_path, dancing_script_bold_path = download_dancing_script()
-emoji_font_path = download_emoji_font()
+def _vorhandene_schrift(dateiname: str) -> Optional[str]:
+    """Pfad einer mitgelieferten Schrift, falls vorhanden"""
+    pfad = os.path.join(FONTS_DIR, dateiname)
+    return pfad if os.path.exists(pfad) else None
+
+dancing_script_regular_path = _vorhandene_schrift('DancingScript-Regular.ttf')
+dancing_script_bold_path = _vorhandene_schrift('DancingScript-Bold.ttf')
+emoji_font_path = _vorhandene_schrift('NotoColorEmoji.ttf')
+
+# Fallback-Ketten der Schriftvarianten (Windows-Namen zuerst, dann Linux)
+SYSTEM_FONTS = [
+    'arial.ttf',       # Windows - beste Unicode-Unterstützung für &
+    'calibri.ttf',     # Windows modern
+    'Arial',           # Cross-platform standard
+    'Calibri',         # Cross-platform modern
+    'DejaVu Sans',     # Linux - gute Unicode-Unterstützung
+    'Liberation Sans'  # Linux
+]
+SYSTEM_BOLD_FONTS = [
+    'arialbd.ttf',     # Windows Arial Bold - beste Unicode-Unterstützung
+    'calibrib.ttf',    # Windows Calibri Bold
+    'Arial Bold',      # Cross-platform
+    'Calibri Bold',    # Cross-platform
+    'DejaVu Sans Bold',# Linux - gute Unicode-Unterstützung
+    'Liberation Sans Bold'
+]
+SERIF_BOLD_FONTS = [
+    'georgiai.ttf',    # Windows Georgia Bold
+    'timesbd.ttf',     # Windows Times Bold
+    'arialbd.ttf',     # Windows Arial Bold
+    'Georgia Bold',    # Cross-platform
+    'Times New Roman Bold',
+    'Arial Bold',
+    'DejaVu Serif Bold',
+    'Liberation Serif Bold'
+]
+
+# Geladene Schriften (Pfad, Größe) und gemessene Textboxen, pro Prozess
+FONT_CACHE_SIZE = 64
+TEXT_BBOX_CACHE_SIZE = 4096
+
+def _font_candidates(variant: str) -> List[Optional[str]]:
+    """Kandidaten einer Schriftvariante in Prioritätsreihenfolge"""
+    if variant == 'elegant':
+        return [dancing_script_regular_path]
+    if variant == 'elegant_bold':
+        return [dancing_script_bold_path, dancing_script_regular_path]
+    if variant == 'system_bold':
+        return SYSTEM_BOLD_FONTS + SYSTEM_FONTS
+    if variant == 'serif_bold':
+        return [dancing_script_bold_path] + SERIF_BOLD_FONTS
+    return SYSTEM_FONTS
+
+@lru_cache(maxsize=FONT_CACHE_SIZE)
+def load_font(path: str, size: int):
+    """Lädt eine TrueType-Schrift einmal pro (Pfad, Größe); None falls nicht ladbar"""
+    try:
+        return ImageFont.truetype(path, size)
+    except (OSError, IOError):
+        return None
+
+@lru_cache(maxsize=None)
+def resolve_font_path(variant: str) -> Optional[str]:
+    """
+    Löst die Fallback-Kette einer Schriftvariante einmal pro Prozess auf
+    
+    Namen wie 'DejaVu Sans' lässt Pillow in den System-Schriftverzeichnissen
+    suchen - das passiert so nur beim ersten Aufruf statt bei jeder Schrift.
+    
+    Returns:
+        str oder None: Dateipfad der ersten ladbaren Schrift
+    """
+    for candidate in _font_candidates(variant):
+        if not candidate:
+            continue
+        font = load_font(candidate, 12)
+        if font is not None:
+            return font.path
+    return None
+
+@lru_cache(maxsize=None)
+def default_font():
+    """Pillow-Standardschrift als letzter Fallback"""
+    return ImageFont.load_default()
+
+_measure_draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+
+@lru_cache(maxsize=TEXT_BBOX_CACHE_SIZE)
+def text_bbox(text: str, font) -> tuple:
+    """Textbox wie draw.textbbox((0, 0), ...), für wiederkehrende Texte gemerkt"""
+    return _measure_draw.textbbox((0, 0), text, font=font)
+
+def warm_font_cache():
+    """Löst alle Schriftvarianten vorab auf (z.B. beim Start eines Workers)"""
+    return {variant: resolve_font_path(variant)
+            for variant in ('elegant', 'elegant_bold', 'system', 'system_bold', 'serif_bold')}
+
+# QR-Modulmatrizen pro Login-URL, pro Prozess
+QR_MATRIX_CACHE_SIZE = 2048
+
+# Unter dieser Modulbreite (Pixel) wird geglättet verkleinert statt direkt gezeichnet:
+# ungleich breite 2-Pixel-Module lesen Kameras schlechter (siehe qr_benchmark.py)
+QR_MIN_MODULE_PIXELS = 2.5
+
+@lru_cache(maxsize=QR_MATRIX_CACHE_SIZE)
+def qr_matrix(data: str) -> tuple:
+    """
+    Modulmatrix eines QR-Codes inklusive Ruhezone (2 Module), True = dunkel
+    
+    Fehlerkorrektur M, kleinste passende Version - die Versions- und
+    Maskensuche von qrcode läuft so nur einmal pro URL.
+    """
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        box_size=1,
+        border=2,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+def render_qr_image(matrix: tuple, size: int, fill_color: str, back_color: str):
+    """
+    Zeichnet die Module direkt in Zielgröße (ohne Interpolation)
+    
+    Jedes Modul wird auf ganze Pixel abgebildet (Nearest) - die Kanten bleiben
+    scharf, statt wie beim Verkleinern mit LANCZOS in Grautöne zu verlaufen.
+    Nur sehr kleine Codes (unter QR_MIN_MODULE_PIXELS) werden wie früher aus
+    8-Pixel-Modulen geglättet verkleinert.
+    """
+    anzahl = len(matrix)
+    module = Image.frombytes('P', (anzahl, anzahl), bytes(wert for zeile in matrix for wert in zeile))
+    module.putpalette(list(ImageColor.getrgb(back_color)[:3]) + list(ImageColor.getrgb(fill_color)[:3]))
+    if size / anzahl < QR_MIN_MODULE_PIXELS:
+        gross = module.resize((anzahl * 8, anzahl * 8), Image.Resampling.NEAREST).convert('RGB')
+        return gross.resize((size, size), Image.Resampling.LANCZOS)
+    return module.resize((size, size), Image.Resampling.NEAREST).convert('RGB')
+
+def qr_svg(matrix: tuple, size: int, fill_color: str, back_color: str) -> str:
+    """QR-Code als SVG (dunkle Module zeilenweise zu Streifen zusammengefasst)"""
+    anzahl = len(matrix)
+    pfad = []
+    for y, zeile in enumerate(matrix):
+        x = 0
+        while x < anzahl:
+            if not zeile[x]:
+                x += 1
+                continue
+            start = x
+            while x < anzahl and zeile[x]:
+                x += 1
+            pfad.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {anzahl} {anzahl}" '
+            f'width="{size}" height="{size}" shape-rendering="crispEdges">'
+            f'<rect width="{anzahl}" height="{anzahl}" fill="{back_color}"/>'
+            f'<path fill="{fill_color}" d="{"".join(pfad)}"/></svg>')
+
+# Vorgerenderte Kartenhintergründe (Einstellungs-Hash -> (Bild, Layout)), pro Prozess
+BACKGROUND_CACHE_SIZE = 8
+_background_cache = OrderedDict()
+_background_cache_lock = threading.Lock()
+
+# Bei Änderungen am Kartenlayout erhöhen - macht alle gespeicherten Karten ungültig
+CARD_RENDER_VERSION = 2
+
+# zlib-Stufe für Karten-PNGs: optimize (Stufe 9) kostet das Dreifache bei ~3 % kleinerer Datei
+CARD_PNG_COMPRESS_LEVEL = 6
+
+# Zugeschnittene Hochzeitsfotos ((Quelle, Größe, Radius) -> RGBA-Bild), pro Prozess -
+# Farb- und Textänderungen im Editor rendern den Hintergrund neu, das Foto bleibt gleich
+PHOTO_CACHE_SIZE = 6
+_photo_cache = OrderedDict()
+_photo_cache_lock = threading.Lock()
+
+# Editor-Vorschau: verkleinert und verlustbehaftet kodiert statt PNG in voller Größe
+PREVIEW_SCALE = 0.5
+PREVIEW_FORMATS = {
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 82}),
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 0})
+}
+
+# Demo-Gast für Test-Karten und die Editor-Vorschau ohne ausgewählten Gast
+DEMO_GUEST = {
+    'id': 999,
+    'vorname': 'Max',
+    'nachname': 'Mustermann',
+    'guest_code': 'DEMO123',
+    'guest_password': 'test456'
+}
 
 class WebQRCardGenerator:
     """Generator für personalisierte QR-Code-Karten (Web-Integration)"""
@@ -180,6 +334,9 @@ class WebQRCardGenerator:
         """
         self.data_manager = data_manager
         
+        # Einstellungstabelle, einmal pro Generator geladen (siehe _db_setting)
+        self._settings_snapshot = None
+        
         # Karten-Dimensionen (Hochformat)
         self.card_width = 800
         self.card_height = 1200
@@ -263,6 +420,9 @@ class WebQRCardGenerator:
         
         # Basis-URL für Login (ohne GET-Parameter und ohne Port)
         self.base_url = "https://pascalundkäthe-heiraten.de/login"
+        
+        # Gastunabhängige Karteninhalte aus der Datenbank (siehe _get_card_data)
+        self._card_data = None
     
     def set_colors(self, primary=None, accent=None, background=None):
         """
@@ -294,6 +454,21 @@ class WebQRCardGenerator:
         if height:
             self.card_height = height
     
+    def _db_settings(self) -> Dict[str, Any]:
+        """
+        Alle Einstellungen aus der Datenbank, einmal pro Generator geladen
+        
+        get_setting lädt bei jedem Aufruf die ganze Tabelle (samt Base64-Foto);
+        ein Generator lebt nur für eine Anfrage bzw. einen Job.
+        """
+        if self._settings_snapshot is None:
+            self._settings_snapshot = self.data_manager.load_settings() or {}
+        return self._settings_snapshot
+    
+    def _db_setting(self, key: str, default=None):
+        """Einzelne Einstellung aus _db_settings"""
+        return self._db_settings().get(key, default)
+    
     def _load_invitation_generator_settings(self) -> Dict[str, Any]:
         """
         Lädt alle Einladungsgenerator-Einstellungen aus der Datenbank
@@ -326,7 +501,7 @@ class WebQRCardGenerator:
             
             for key in settings_keys:
                 try:
-                    value = self.data_manager.get_setting(key, None)
+                    value = self._db_setting(key, None)
                     if value is not None and value != '':
                         # Konvertiere die Schlüssel zu dem Format, das die Web-App verwendet
                         # Database keys already have camelCase format after invitation_ prefix
@@ -373,6 +548,15 @@ class WebQRCardGenerator:
         """
         self.base_url = url
     
+    def set_frontend_settings(self, settings):
+        """
+        Setzt die Editor-Einstellungen (Texte, Foto, Schrift, Login-Daten) für das Rendering
+        
+        Args:
+            settings: Einstellungen wie vom Einladungs-Editor gespeichert (None = keine)
+        """
+        self._frontend_settings = dict(settings or {})
+    
     def get_font(self, size: int, bold: bool = False, elegant: bool = True) -> ImageFont.FreeTypeFont:
         """
         Lädt die Dancing Script Schriftart in der gewünschten Größe
@@ -383,64 +567,24 @@ class WebQRCardGenerator:
             elegant: Ob elegante Schriftart verwendet werden soll (Dancing Script)
         
         Returns:
-            ImageFont.FreeTypeFont: Geladene Schriftart
+            ImageFont.FreeTypeFont: Geladene Schriftart (aus dem prozessweiten Cache)
         """
-        # Für Title-Fonts oder wenn explizit nicht elegant: Verwende robuste System-Fonts
-        if not elegant:
-            return self._get_system_font(size, bold)
-        
-        if elegant and dancing_script_regular_path and os.path.exists(dancing_script_regular_path):
-            try:
-                if bold and dancing_script_bold_path and os.path.exists(dancing_script_bold_path):
-                    return ImageFont.truetype(dancing_script_bold_path, size)
-                else:
-                    return ImageFont.truetype(dancing_script_regular_path, size)
-            except Exception as e:
-                print(f"⚠️ Fehler beim Laden von Dancing Script: {e}")
+        if elegant:
+            path = resolve_font_path('elegant_bold' if bold else 'elegant')
+            if path:
+                return load_font(path, size)
         
         # Fallback zu System-Fonts
         return self._get_system_font(size, bold)
     
     def _get_system_font(self, size: int, bold: bool = False):
-        """Lädt robuste System-Fonts mit guter Unicode-Unterstützung"""
-        # Für fette Schriftarten
-        if bold:
-            bold_fonts = [
-                'arialbd.ttf',     # Windows Arial Bold - beste Unicode-Unterstützung
-                'calibrib.ttf',    # Windows Calibri Bold
-                'Arial Bold',      # Cross-platform
-                'Calibri Bold',    # Cross-platform
-                'DejaVu Sans Bold',# Linux - gute Unicode-Unterstützung
-                'Liberation Sans Bold'
-            ]
-            
-            for font_name in bold_fonts:
-                try:
-                    return ImageFont.truetype(font_name, size)
-                except (OSError, IOError):
-                    continue
-        
-        # Normale Schriftarten mit bester Unicode-Unterstützung
-        fallback_fonts = [
-            'arial.ttf',       # Windows - beste Unicode-Unterstützung für &
-            'calibri.ttf',     # Windows modern
-            'Arial',           # Cross-platform standard
-            'Calibri',         # Cross-platform modern  
-            'DejaVu Sans',     # Linux - gute Unicode-Unterstützung
-            'Liberation Sans'  # Linux
-        ]
-        
-        for font_name in fallback_fonts:
-            try:
-                return ImageFont.truetype(font_name, size)
-            except (OSError, IOError):
-                continue
+        """Lädt robuste System-Fonts mit guter Unicode-Unterstützung (fett: erst fette, dann normale)"""
+        path = resolve_font_path('system_bold' if bold else 'system')
+        if path:
+            return load_font(path, size)
         
         # Letzter Fallback: Standard-Font
-        try:
-            return ImageFont.load_default()
-        except:
-            return ImageFont.load_default()
+        return default_font()
     
     def _process_invitation_text(self, text: str, base_font=None, max_width: int = 400) -> List[Dict]:
         """
@@ -554,12 +698,6 @@ class WebQRCardGenerator:
         Returns:
             List[Dict]: Liste von Text-Zeilen
         """
-        from PIL import ImageDraw
-        
-        # Temporäres Draw-Objekt für Textmessung
-        temp_img = Image.new('RGB', (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-        
         result_lines = []
         current_line_segments = []
         current_line_width = 0
@@ -572,13 +710,13 @@ class WebQRCardGenerator:
                 test_segment = {'text': word, 'font': segment['font']}
                 
                 try:
-                    bbox = temp_draw.textbbox((0, 0), word, font=segment['font'])
+                    bbox = text_bbox(word, segment['font'])
                     word_width = bbox[2] - bbox[0]
                     
                     # Füge Leerzeichen hinzu wenn nicht am Zeilenanfang
                     space_width = 0
                     if current_line_segments:
-                        space_bbox = temp_draw.textbbox((0, 0), ' ', font=segment['font'])
+                        space_bbox = text_bbox(' ', segment['font'])
                         space_width = space_bbox[2] - space_bbox[0]
                 except:
                     # Fallback
@@ -640,7 +778,7 @@ class WebQRCardGenerator:
         
         for segment in segments:
             try:
-                bbox = draw.textbbox((0, 0), segment['text'], font=segment['font'])
+                bbox = text_bbox(segment['text'], segment['font'])
                 segment_width = bbox[2] - bbox[0]
                 segment_height = bbox[3] - bbox[1]
                 
@@ -661,7 +799,7 @@ class WebQRCardGenerator:
                      fill=color, font=segment['font'])
             
             try:
-                bbox = draw.textbbox((0, 0), segment['text'], font=segment['font'])
+                bbox = text_bbox(segment['text'], segment['font'])
                 segment_width = bbox[2] - bbox[0]
                 current_x += segment_width
             except:
@@ -736,30 +874,11 @@ class WebQRCardGenerator:
         Returns:
             ImageFont: Fette Schriftart oder Basis-Schriftart als Fallback
         """
-        try:
-            # Versuche Dancing Script Bold zu verwenden falls verfügbar
-            if dancing_script_bold_path and os.path.exists(dancing_script_bold_path):
-                return ImageFont.truetype(dancing_script_bold_path, base_font.size)
-        except:
-            pass
-        
-        # Fallback: Versuche andere fette System-Fonts
-        fallback_bold_fonts = [
-            'georgiai.ttf',    # Windows Georgia Bold
-            'timesbd.ttf',     # Windows Times Bold
-            'arialbd.ttf',     # Windows Arial Bold
-            'Georgia Bold',    # Cross-platform
-            'Times New Roman Bold',
-            'Arial Bold',
-            'DejaVu Serif Bold',
-            'Liberation Serif Bold'
-        ]
-        
-        for font_name in fallback_bold_fonts:
-            try:
-                return ImageFont.truetype(font_name, base_font.size)
-            except (OSError, IOError):
-                continue
+        # Dancing Script Bold, sonst fette Serifen-/System-Fonts
+        path = resolve_font_path('serif_bold')
+        size = getattr(base_font, 'size', None)
+        if path and size:
+            return load_font(path, size)
         
         # Letzter Fallback: Basis-Schriftart
         return base_font
@@ -776,12 +895,6 @@ class WebQRCardGenerator:
         Returns:
             List[str]: Liste der umgebrochenen Zeilen
         """
-        from PIL import ImageDraw
-        
-        # Temporäres Draw-Objekt für Textmessung
-        temp_img = Image.new('RGB', (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-        
         words = text.split()
         lines = []
         current_line = ""
@@ -791,7 +904,7 @@ class WebQRCardGenerator:
             test_line = current_line + (" " + word if current_line else word)
             
             try:
-                bbox = temp_draw.textbbox((0, 0), test_line, font=font)
+                bbox = text_bbox(test_line, font)
                 text_width = bbox[2] - bbox[0]
             except:
                 # Fallback: Zeichenanzahl-basierte Schätzung
@@ -821,7 +934,7 @@ class WebQRCardGenerator:
         """
         try:
             # Versuche das Datum aus der Hochzeitsplaner-Config zu laden
-            wedding_date = self.data_manager.get_setting('wedding_date', '25. July 2026')
+            wedding_date = self._db_setting('wedding_date', '25. July 2026')
             
             # Falls es ein String-Datum ist, versuche es zu formatieren
             if isinstance(wedding_date, str) and wedding_date != '25. July 2026':
@@ -850,8 +963,8 @@ class WebQRCardGenerator:
             tuple: (braut_name, braeutigam_name)
         """
         try:
-            braut_name = self.data_manager.get_setting('braut_name', 'Katharina')
-            braeutigam_name = self.data_manager.get_setting('braeutigam_name', 'Pascal')
+            braut_name = self._db_setting('braut_name', 'Katharina')
+            braeutigam_name = self._db_setting('braeutigam_name', 'Pascal')
             
             return braut_name, braeutigam_name
             
@@ -871,7 +984,7 @@ class WebQRCardGenerator:
                 return None
             
             # Lade Einstellungen aus der Datenbank
-            settings = self.data_manager.load_settings()
+            settings = self._db_settings()
             
             if not settings:
                 return None
@@ -887,7 +1000,7 @@ class WebQRCardGenerator:
         except Exception as e:
             print(f"❌ Fehler beim Laden des Hochzeitsfotos aus Datenbank: {e}")
             return None
-
+    
     def get_wedding_photo_path(self) -> Optional[str]:
         """
         Sucht nach einem Hochzeitsfoto in verschiedenen Verzeichnissen
@@ -913,68 +1026,193 @@ class WebQRCardGenerator:
         
         return None
     
-    def create_guest_card(self, guest_data: Dict[str, Any], template: str = "elegant") -> bytes:
+    def _get_card_data(self) -> Dict[str, Any]:
         """
-        Erstellt eine QR-Code-Karte für einen Gast
+        Lädt die gastunabhängigen Karteninhalte einmal pro Generator
         
-        Args:
-            guest_data: Gast-Daten aus der Datenbank
-            template: Template-Stil ("elegant", "classic", "modern")
+        Namen, Datum und Foto kommen aus der Datenbank; ohne diese Zwischenablage
+        würde jede Karte die Einstellungen neu laden und das Foto neu dekodieren.
+        """
+        if self._card_data is None:
+            photo_data = self.get_wedding_photo_from_database()
+            photo_path = self.get_wedding_photo_path()
+            self._card_data = {
+                'couple_names': list(self.get_couple_names()),
+                'wedding_date': self.get_wedding_date(),
+                'photo': hashlib.sha256(photo_data.encode('utf-8')).hexdigest() if photo_data else None,
+                'photo_path': [photo_path, os.path.getmtime(photo_path)] if photo_path else None
+            }
+        return self._card_data
+    
+    def _card_background_key(self, template: str) -> str:
+        """Hash aller Einstellungen, von denen der Kartenhintergrund abhängt"""
+        inputs = {
+            'template': template,
+            'size': [self.card_width, self.card_height],
+            'colors': self.colors,
+            'qr_size': self.qr_size,
+            'scan_text': self.scan_text,
+            'greeting': [self.greeting1, self.greeting2],
+            'invitation_text': self.invitation_text,
+            'frontend_settings': getattr(self, '_frontend_settings', {}),
+            'data': self._get_card_data()
+        }
+        encoded = json.dumps(inputs, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    def _get_card_background(self, template: str):
+        """
+        Liefert den vorgerenderten Kartenhintergrund (Rahmen, Titel, Datum, Foto, Texte)
+        
+        Der Hintergrund wird pro Prozess nach Einstellungs-Hash zwischengespeichert,
+        pro Gast wird nur noch das Overlay (QR-Code, Name, Login-Daten) gezeichnet.
         
         Returns:
-            bytes: PNG-Bilddaten der erstellten Karte
+            tuple: (Hintergrundbild, Layout-Positionen für das Overlay)
         """
-        # Gast-Informationen extrahieren
-        gast_id = guest_data.get('id', 1)
-        vorname = guest_data.get('vorname', 'Gast')
-        nachname = guest_data.get('nachname', '')
-        full_name = f"{vorname} {nachname}".strip()
+        key = self._card_background_key(template)
+        with _background_cache_lock:
+            cached = _background_cache.get(key)
+            if cached is not None:
+                _background_cache.move_to_end(key)
+                return cached
+        
+        img = Image.new('RGB', (self.card_width, self.card_height), self.colors['background'])
+        draw = ImageDraw.Draw(img)
+        if template == "modern":
+            layout = self._draw_modern_background(draw, img)
+        elif template == "classic":
+            layout = self._draw_classic_background(draw, img)
+        else:  # elegant (default)
+            layout = self._draw_elegant_background(draw, img)
+        
+        with _background_cache_lock:
+            _background_cache[key] = (img, layout)
+            while len(_background_cache) > BACKGROUND_CACHE_SIZE:
+                _background_cache.popitem(last=False)
         
-        # Login-Daten generieren falls nicht vorhanden
+        print(f"🖼️ Kartenhintergrund '{template}' vorgerendert ({key[:12]})")
+        return img, layout
+    
+    def _guest_credentials(self, guest_data: Dict[str, Any]) -> tuple:
+        """Login-Daten des Gastes (generiert falls nicht vorhanden)"""
+        gast_id = guest_data.get('id', 1)
         guest_code = guest_data.get('guest_code') or f'GUEST{gast_id}'
         guest_password = guest_data.get('guest_password') or f'pass{gast_id}'
+        return guest_code, guest_password
+    
+    def card_fingerprint(self, guest_data: Dict[str, Any], template: str = "elegant") -> str:
+        """
+        Fingerabdruck einer Karte: ändert sich genau dann, wenn die Karte anders aussähe
         
-        # Login-URL erstellen
+        Umfasst die Gast-Felder auf der Karte, die Login-Daten, den Hintergrund
+        (Template, Farben, Einstellungen, Foto) und CARD_RENDER_VERSION.
+        """
+        inputs = {
+            'version': CARD_RENDER_VERSION,
+            'background': self._card_background_key(template),
+            'guest': [guest_data.get('id', 1), guest_data.get('vorname', 'Gast'), guest_data.get('nachname', '')],
+            'credentials': list(self._guest_credentials(guest_data)),
+            'qr': [self.base_url, self.qr_size, self.qr_color, self.qr_background]
+        }
+        encoded = json.dumps(inputs, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+    
+    def _login_url(self, guest_code: str, guest_password: str) -> str:
+        """Login-URL des Gastes (Inhalt des QR-Codes)"""
         login_params = {
             'guest_code': guest_code,
             'password': guest_password
         }
         query_string = urlencode(login_params)
-        full_login_url = f'{self.base_url}?{query_string}'
-        
-        # QR-Code erstellen
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_M,
-            box_size=8,
-            border=2,
-        )
-        qr.add_data(full_login_url)
-        qr.make(fit=True)
-        
-        # QR-Code als Bild
-        qr_img = qr.make_image(fill_color=self.qr_color, back_color=self.qr_background)
-        qr_img = qr_img.resize((self.qr_size, self.qr_size), Image.Resampling.LANCZOS)
-        
-        # Hauptbild erstellen
-        img = Image.new('RGB', (self.card_width, self.card_height), self.colors['background'])
-        draw = ImageDraw.Draw(img)
+        return f'{self.base_url}?{query_string}'
+    
+    def guest_qr_svg(self, guest_data: Dict[str, Any], size: Optional[int] = None) -> str:
+        """QR-Code der Karte eines Gastes als SVG (Kartenfarben, Standard: QR-Größe der Karte)"""
+        matrix = qr_matrix(self._login_url(*self._guest_credentials(guest_data)))
+        return qr_svg(matrix, size or self.qr_size, self.qr_color, self.qr_background)
+    
+    def _overlay_elements(self, template, layout, full_name, guest_code, guest_password) -> List[Dict]:
+        """
+        Gastspezifische Overlay-Elemente des Templates in Zeichenreihenfolge
         
-        # Template-spezifisches Layout
+        Jedes Element ist ein Dict mit 'art' ('qr', 'kamera' oder 'text') und
+        Position in Kartenpixeln - gezeichnet wird es als PNG (_draw_overlay)
+        oder als Vektorgrafik im Druck-PDF (card_pdf).
+        """
         if template == "modern":
-            self._draw_modern_template(draw, img, qr_img, full_name, guest_code, guest_password)
-        elif template == "classic":
-            self._draw_classic_template(draw, img, qr_img, full_name, guest_code, guest_password)
-        else:  # elegant (default)
-            self._draw_elegant_template(draw, img, qr_img, full_name, guest_code, guest_password)
+            return self._modern_overlay_elements(layout, full_name, guest_code, guest_password)
+        if template == "classic":
+            return self._classic_overlay_elements(layout, full_name, guest_code, guest_password)
+        return self._elegant_overlay_elements(layout, full_name, guest_code, guest_password)
+    
+    def _compose_guest_card(self, guest_data: Dict[str, Any], template: str = "elegant"):
+        """Karte eines Gastes als Bild: gecachter Hintergrund plus gastspezifisches Overlay"""
+        # Gast-Informationen extrahieren
+        vorname = guest_data.get('vorname', 'Gast')
+        nachname = guest_data.get('nachname', '')
+        full_name = f"{vorname} {nachname}".strip()
+        
+        guest_code, guest_password = self._guest_credentials(guest_data)
+        
+        # QR-Module (pro URL gecacht) werden im Overlay direkt in Zielgröße gezeichnet
+        matrix = qr_matrix(self._login_url(guest_code, guest_password))
+        
+        # Gastunabhängigen Hintergrund aus dem Cache kopieren, nur das Overlay zeichnen
+        background, layout = self._get_card_background(template)
+        img = background.copy()
+        draw = ImageDraw.Draw(img)
+        self._draw_overlay(draw, img, self._overlay_elements(template, layout, full_name, guest_code, guest_password),
+                           matrix)
+        return img
+    
+    def create_guest_card(self, guest_data: Dict[str, Any], template: str = "elegant") -> bytes:
+        """
+        Erstellt eine QR-Code-Karte für einen Gast
+        
+        Args:
+            guest_data: Gast-Daten aus der Datenbank
+            template: Template-Stil ("elegant", "classic", "modern")
+        
+        Returns:
+            bytes: PNG-Bilddaten der erstellten Karte
+        """
+        img = self._compose_guest_card(guest_data, template)
         
         # Als PNG in Memory speichern
         img_buffer = io.BytesIO()
-        img.save(img_buffer, 'PNG', dpi=(self.dpi, self.dpi), optimize=True)
+        img.save(img_buffer, 'PNG', dpi=(self.dpi, self.dpi), compress_level=CARD_PNG_COMPRESS_LEVEL)
         img_buffer.seek(0)
         
         return img_buffer.getvalue()
     
+    def create_card_preview(self, guest_data: Dict[str, Any], template: str = "elegant",
+                            image_format: str = "jpeg", scale: float = PREVIEW_SCALE) -> bytes:
+        """
+        Schnelle Vorschau einer Karte für den Editor
+        
+        Gleicher Inhalt wie create_guest_card, aber verkleinert (BOX-Filter) und
+        als JPEG/WebP kodiert - das PNG der vollen Karte kostet ein Vielfaches.
+        
+        Args:
+            guest_data: Gast-Daten aus der Datenbank
+            template: Template-Stil ("elegant", "classic", "modern")
+            image_format: Schlüssel aus PREVIEW_FORMATS
+            scale: Verkleinerungsfaktor (0 < scale <= 1)
+        
+        Returns:
+            bytes: Bilddaten im gewählten Format
+        """
+        pil_format, _, options = PREVIEW_FORMATS[image_format]
+        img = self._compose_guest_card(guest_data, template)
+        if scale < 1:
+            img = img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                             Image.Resampling.BOX)
+        
+        img_buffer = io.BytesIO()
+        img.save(img_buffer, pil_format, **options)
+        return img_buffer.getvalue()
+    
     def _sanitize_filename(self, filename: str) -> str:
         """Bereinigt einen Dateinamen von ungültigen Zeichen für Windows/Linux"""
         import re
@@ -1058,8 +1296,8 @@ class WebQRCardGenerator:
             if hasattr(self, '_frontend_settings'):
                 delattr(self, '_frontend_settings')
     
-    def _draw_elegant_template(self, draw, img, qr_img, full_name, guest_code, guest_password):
-        """Zeichnet das elegante Template mit Frontend-Settings"""
+    def _draw_elegant_background(self, draw, img) -> Dict[str, Any]:
+        """Zeichnet den gastunabhängigen Teil des eleganten Templates"""
         # Frontend-Settings verwenden falls verfügbar
         frontend_settings = getattr(self, '_frontend_settings', {})
         
@@ -1069,7 +1307,6 @@ class WebQRCardGenerator:
         date_font = self.get_font(28, elegant=elegant_font)
         greeting_font = self.get_font(32, elegant=elegant_font)
         text_font = self.get_font(20, elegant=elegant_font)
-        login_font = self.get_font(16, elegant=False)  # Login-Daten (Standard-Schrift!)
         scan_font = self.get_font(18, elegant=elegant_font)
         
         # Layout-Berechnungen
@@ -1083,7 +1320,7 @@ class WebQRCardGenerator:
             braut_name, braeutigam_name = self.get_couple_names()
             header_text = f"{braut_name} und {braeutigam_name} heiraten"
         
-        header_bbox = draw.textbbox((0, 0), header_text, font=title_font)
+        header_bbox = text_bbox(header_text, title_font)
         header_width = header_bbox[2] - header_bbox[0]
         header_x = center_x - header_width // 2
         
@@ -1093,7 +1330,7 @@ class WebQRCardGenerator:
         # Hochzeitsdatum - verwende Frontend-Settings falls vorhanden
         current_y += 60
         date_text = frontend_settings.get('dateText') or self.get_wedding_date()
-        date_bbox = draw.textbbox((0, 0), date_text, font=date_font)
+        date_bbox = text_bbox(date_text, date_font)
         date_width = date_bbox[2] - date_bbox[0]
         date_x = center_x - date_width // 2
         
@@ -1128,7 +1365,8 @@ class WebQRCardGenerator:
                     wedding_photo = Image.open(BytesIO(image_data))
                     
                     # Foto mit abgerundeten Ecken erstellen
-                    photo_with_rounded_corners = self._create_rounded_image(wedding_photo, photo_width, photo_height, corner_radius=15)
+                    photo_with_rounded_corners = self._create_rounded_image(wedding_photo, photo_width, photo_height, corner_radius=15,
+                                                                            cache_key=self._get_card_data()['photo'])
                     
                     # Weißer Hintergrund für besseren Kontrast
                     draw.rectangle([
@@ -1160,7 +1398,8 @@ class WebQRCardGenerator:
                             wedding_photo = Image.open(wedding_photo_path)
                             
                             # Foto mit abgerundeten Ecken erstellen
-                            photo_with_rounded_corners = self._create_rounded_image(wedding_photo, photo_width, photo_height, corner_radius=15)
+                            photo_with_rounded_corners = self._create_rounded_image(wedding_photo, photo_width, photo_height, corner_radius=15,
+                                                                                    cache_key=str(self._get_card_data()['photo_path']))
                             
                             # Weißer Hintergrund für besseren Kontrast
                             draw.rectangle([
@@ -1191,7 +1430,7 @@ class WebQRCardGenerator:
                             ], outline=self.colors['primary'], fill='#f8f9fa', width=2)
                             
                             placeholder_text = "Hochzeitsfoto"
-                            placeholder_bbox = draw.textbbox((0, 0), placeholder_text, font=text_font)
+                            placeholder_bbox = text_bbox(placeholder_text, text_font)
                             placeholder_width = placeholder_bbox[2] - placeholder_bbox[0]
                             placeholder_x = photo_x + (photo_width - placeholder_width) // 2
                             placeholder_y = photo_y + photo_height // 2 - 20
@@ -1219,7 +1458,7 @@ class WebQRCardGenerator:
                 line_text = line_data['text']
                 font_to_use = line_data.get('font', greeting_font)
                 
-                line_bbox = draw.textbbox((0, 0), line_text, font=font_to_use)
+                line_bbox = text_bbox(line_text, font_to_use)
                 line_width = line_bbox[2] - line_bbox[0]
                 line_x = center_x - line_width // 2
                 
@@ -1255,7 +1494,7 @@ class WebQRCardGenerator:
                 line_text = line_data['text']
                 font_to_use = line_data.get('font', text_font)
                 
-                line_bbox = draw.textbbox((0, 0), line_text, font=font_to_use)
+                line_bbox = text_bbox(line_text, font_to_use)
                 line_width = line_bbox[2] - line_bbox[0]
                 line_x = center_x - line_width // 2
                 
@@ -1283,21 +1522,9 @@ class WebQRCardGenerator:
             qr_x + self.qr_size + qr_frame_thickness, qr_y + self.qr_size + qr_frame_thickness
         ], fill=self.colors['accent'])
         
-        # QR-Code einfügen
-        img.paste(qr_img, (qr_x, qr_y))
-        
-        # Kamera-Icon links oben vom QR-Code mit +45° Drehung (Mitte der Kamera auf QR-Code-Ecke)
-        camera_size = 50
-        # Berechne Position so, dass die Mitte der Kamera genau auf der oberen linken QR-Code-Ecke liegt
-        camera_x = qr_x - camera_size // 2   # Mitte der Kamera auf X-Position der QR-Code-Ecke
-        camera_y = qr_y - camera_size // 2   # Mitte der Kamera auf Y-Position der QR-Code-Ecke
-        
-        # Kamera-Icon mit Rotation zeichnen
-        self._draw_camera_icon_with_rotation(draw, camera_x, camera_y, camera_size, 45)
-        
         # "Scan me" Text unter QR-Code (hart kodiert)
         scan_text = self.scan_text  # Hart kodiert als "Scan me"
-        scan_bbox = draw.textbbox((0, 0), scan_text, font=scan_font)
+        scan_bbox = text_bbox(scan_text, scan_font)
         scan_width = scan_bbox[2] - scan_bbox[0]
         scan_x = qr_x + (self.qr_size - scan_width) // 2
         scan_y = qr_y + self.qr_size + 15
@@ -1305,22 +1532,42 @@ class WebQRCardGenerator:
         draw.text((scan_x, scan_y), scan_text, 
                  fill=self.colors['accent'], font=scan_font)
         
+        return {'qr_x': qr_x, 'qr_y': qr_y}
+    
+    def _elegant_overlay_elements(self, layout, full_name, guest_code, guest_password) -> List[Dict]:
+        """Overlay des eleganten Templates: QR-Code, Kamera-Icon und Login-Daten des Gastes"""
+        frontend_settings = getattr(self, '_frontend_settings', {})
+        login_font = self.get_font(16, elegant=False)  # Login-Daten (Standard-Schrift!)
+        content_margin = 50
+        qr_x, qr_y = layout['qr_x'], layout['qr_y']
+        
+        # QR-Code einfügen
+        elements = [{'art': 'qr', 'x': qr_x, 'y': qr_y, 'size': self.qr_size}]
+        
+        # Kamera-Icon links oben vom QR-Code mit +45° Drehung (Mitte der Kamera auf QR-Code-Ecke)
+        camera_size = 50
+        # Berechne Position so, dass die Mitte der Kamera genau auf der oberen linken QR-Code-Ecke liegt
+        camera_x = qr_x - camera_size // 2   # Mitte der Kamera auf X-Position der QR-Code-Ecke
+        camera_y = qr_y - camera_size // 2   # Mitte der Kamera auf Y-Position der QR-Code-Ecke
+        
+        # Kamera-Icon mit Rotation (liegt über dem QR-Code)
+        elements.append({'art': 'kamera', 'x': camera_x, 'y': camera_y, 'size': camera_size, 'rotation': 45})
+        
         # Login-Daten unten links (falls aktiviert)
         show_login = frontend_settings.get('showLoginData', True)
         if show_login:
             login_x = content_margin
             login_y = self.card_height - 80
             
-            login_text = f"Login: {guest_code}"
-            draw.text((login_x, login_y), login_text, 
-                     fill=self.colors['text'], font=login_font)
-            
-            password_text = f"Password: {guest_password}"
-            draw.text((login_x, login_y + 25), password_text, 
-                     fill=self.colors['text'], font=login_font)
+            elements.append({'art': 'text', 'x': login_x, 'y': login_y, 'text': f"Login: {guest_code}",
+                             'fill': self.colors['text'], 'font': login_font})
+            elements.append({'art': 'text', 'x': login_x, 'y': login_y + 25, 'text': f"Password: {guest_password}",
+                             'fill': self.colors['text'], 'font': login_font})
+        
+        return elements
     
-    def _draw_classic_template(self, draw, img, qr_img, full_name, guest_code, guest_password):
-        """Zeichnet das klassische Template mit Frontend-Settings"""
+    def _draw_classic_background(self, draw, img) -> Dict[str, Any]:
+        """Zeichnet den gastunabhängigen Teil des klassischen Templates"""
         # Frontend-Settings verwenden falls verfügbar
         frontend_settings = getattr(self, '_frontend_settings', {})
         
@@ -1328,7 +1575,6 @@ class WebQRCardGenerator:
         elegant_font = frontend_settings.get('elegantFont', False)
         title_font = self.get_font(36, bold=True, elegant=elegant_font)  # Behalte ursprünglich elegant_font
         text_font = self.get_font(18, elegant=elegant_font)
-        login_font = self.get_font(14, elegant=False)
         
         center_x = self.card_width // 2
         current_y = 60
@@ -1339,7 +1585,7 @@ class WebQRCardGenerator:
             braut_name, braeutigam_name = self.get_couple_names()
             title_text = f"{braut_name} & {braeutigam_name}"
         
-        title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
+        title_bbox = text_bbox(title_text, title_font)
         title_width = title_bbox[2] - title_bbox[0]
         title_x = center_x - title_width // 2
         
@@ -1349,7 +1595,7 @@ class WebQRCardGenerator:
         # Datum - verwende Frontend-Text falls vorhanden
         current_y += 80
         date_text = frontend_settings.get('dateText') or self.get_wedding_date()
-        date_bbox = draw.textbbox((0, 0), date_text, font=text_font)
+        date_bbox = text_bbox(date_text, text_font)
         date_width = date_bbox[2] - date_bbox[0]
         date_x = center_x - date_width // 2
         
@@ -1390,7 +1636,8 @@ class WebQRCardGenerator:
                     wedding_photo = Image.open(BytesIO(image_data))
                     
                     # Foto mit abgerundeten Ecken erstellen
-                    photo_with_rounded_corners = self._create_rounded_image(wedding_photo, photo_width, photo_height, corner_radius=10)
+                    photo_with_rounded_corners = self._create_rounded_image(wedding_photo, photo_width, photo_height, corner_radius=10,
+                                                                            cache_key=self._get_card_data()['photo'])
                     
                     # Weißer Hintergrund für besseren Kontrast
                     draw.rectangle([
@@ -1439,7 +1686,7 @@ class WebQRCardGenerator:
                     line_text = line_data['text']
                     font_to_use = line_data.get('font', text_font)
                     
-                    line_bbox = draw.textbbox((0, 0), line_text, font=font_to_use)
+                    line_bbox = text_bbox(line_text, font_to_use)
                     line_width = line_bbox[2] - line_bbox[0]
                     line_x = center_x - line_width // 2
                     
@@ -1468,7 +1715,7 @@ class WebQRCardGenerator:
                     line_text = line_data['text']
                     font_to_use = line_data.get('font', text_font)
                     
-                    line_bbox = draw.textbbox((0, 0), line_text, font=font_to_use)
+                    line_bbox = text_bbox(line_text, font_to_use)
                     line_width = line_bbox[2] - line_bbox[0]
                     line_x = center_x - line_width // 2
                     
@@ -1484,12 +1731,20 @@ class WebQRCardGenerator:
                 elif line_data['type'] == 'break':
                     current_y += line_data.get('spacing', 15)
         
-        # QR-Code zentriert
+        # QR-Code zentriert - Position hängt von der Textlänge ab
         current_y += 50
         qr_x = center_x - self.qr_size // 2
         qr_y = current_y
         
-        img.paste(qr_img, (qr_x, qr_y))
+        return {'qr_x': qr_x, 'qr_y': qr_y}
+    
+    def _classic_overlay_elements(self, layout, full_name, guest_code, guest_password) -> List[Dict]:
+        """Overlay des klassischen Templates: QR-Code und Login-Daten des Gastes"""
+        frontend_settings = getattr(self, '_frontend_settings', {})
+        login_font = self.get_font(14, elegant=False)
+        center_x = self.card_width // 2
+        
+        elements = [{'art': 'qr', 'x': layout['qr_x'], 'y': layout['qr_y'], 'size': self.qr_size}]
         
         # Login-Daten unten (falls aktiviert)
         show_login = frontend_settings.get('showLoginData', True)
@@ -1497,30 +1752,31 @@ class WebQRCardGenerator:
             login_y = self.card_height - 100
             
             login_text = f"Code: {guest_code}"
-            login_bbox = draw.textbbox((0, 0), login_text, font=login_font)
+            login_bbox = text_bbox(login_text, login_font)
             login_width = login_bbox[2] - login_bbox[0]
             login_x = center_x - login_width // 2
             
-            draw.text((login_x, login_y), login_text, 
-                     fill=self.colors['text'], font=login_font)
+            elements.append({'art': 'text', 'x': login_x, 'y': login_y, 'text': login_text,
+                             'fill': self.colors['text'], 'font': login_font})
             
             password_text = f"Passwort: {guest_password}"
-            password_bbox = draw.textbbox((0, 0), password_text, font=login_font)
+            password_bbox = text_bbox(password_text, login_font)
             password_width = password_bbox[2] - password_bbox[0]
             password_x = center_x - password_width // 2
             
-            draw.text((password_x, login_y + 25), password_text, 
-                     fill=self.colors['text'], font=login_font)
+            elements.append({'art': 'text', 'x': password_x, 'y': login_y + 25, 'text': password_text,
+                             'fill': self.colors['text'], 'font': login_font})
+        
+        return elements
     
-    def _draw_modern_template(self, draw, img, qr_img, full_name, guest_code, guest_password):
-        """Zeichnet das moderne Template mit Frontend-Settings"""
+    def _draw_modern_background(self, draw, img) -> Dict[str, Any]:
+        """Zeichnet den gastunabhängigen Teil des modernen Templates"""
         # Frontend-Settings verwenden falls verfügbar
         frontend_settings = getattr(self, '_frontend_settings', {})
         
         # Schriftarten
         elegant_font = frontend_settings.get('elegantFont', True)
         title_font = self.get_font(40, bold=False, elegant=elegant_font)  # Behalte ursprünglich elegant_font
-        subtitle_font = self.get_font(24, elegant=elegant_font)
         text_font = self.get_font(16, elegant=False)
         
         center_x = self.card_width // 2
@@ -1532,7 +1788,7 @@ class WebQRCardGenerator:
             braut_name, braeutigam_name = self.get_couple_names()
             title_text = f"{braut_name} ♥ {braeutigam_name}"
         
-        title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
+        title_bbox = text_bbox(title_text, title_font)
         title_width = title_bbox[2] - title_bbox[0]
         title_x = center_x - title_width // 2
         
@@ -1567,7 +1823,8 @@ class WebQRCardGenerator:
                     wedding_photo = Image.open(BytesIO(image_data))
                     
                     # Foto mit abgerundeten Ecken erstellen (kleinerer Radius für modern)
-                    photo_with_rounded_corners = self._create_rounded_image(wedding_photo, photo_width, photo_height, corner_radius=8)
+                    photo_with_rounded_corners = self._create_rounded_image(wedding_photo, photo_width, photo_height, corner_radius=8,
+                                                                            cache_key=self._get_card_data()['photo'])
                     
                     # Weißer Hintergrund für besseren Kontrast
                     draw.rectangle([
@@ -1609,7 +1866,6 @@ class WebQRCardGenerator:
         if large_qr_size < 150:
             large_qr_size = 200  # Mindestgröße für modernes Template
         
-        qr_img_large = qr_img.resize((large_qr_size, large_qr_size), Image.Resampling.LANCZOS)
         qr_x = center_x - large_qr_size // 2
         qr_y = current_y
         
@@ -1620,22 +1876,14 @@ class WebQRCardGenerator:
             qr_x + large_qr_size + shadow_offset, qr_y + large_qr_size + shadow_offset
         ], fill='#e0e0e0')
         
-        img.paste(qr_img_large, (qr_x, qr_y))
-        
-        # Gast-Name unter QR-Code
+        # Gast-Name unter QR-Code (im Overlay)
         current_y += large_qr_size + 50
-        guest_text = full_name
-        guest_bbox = draw.textbbox((0, 0), guest_text, font=subtitle_font)
-        guest_width = guest_bbox[2] - guest_bbox[0]
-        guest_x = center_x - guest_width // 2
-        
-        draw.text((guest_x, current_y), guest_text, 
-                 fill=self.colors['primary'], font=subtitle_font)
+        layout = {'qr_x': qr_x, 'qr_y': qr_y, 'qr_size': large_qr_size, 'name_y': current_y}
         
         # Datum - verwende Frontend-Text falls vorhanden
         current_y += 50
         date_text = frontend_settings.get('dateText') or self.get_wedding_date()
-        date_bbox = draw.textbbox((0, 0), date_text, font=text_font)
+        date_bbox = text_bbox(date_text, text_font)
         date_width = date_bbox[2] - date_bbox[0]
         date_x = center_x - date_width // 2
         
@@ -1663,7 +1911,7 @@ class WebQRCardGenerator:
                         if len(line_text) > 50:
                             line_text = line_text[:47] + "..."
                         
-                        line_bbox = draw.textbbox((0, 0), line_text, font=text_font)
+                        line_bbox = text_bbox(line_text, text_font)
                         line_width = line_bbox[2] - line_bbox[0]
                         line_x = center_x - line_width // 2
                         
@@ -1675,7 +1923,7 @@ class WebQRCardGenerator:
                     if len(line_data) > 50:
                         line_data = line_data[:47] + "..."
                     
-                    line_bbox = draw.textbbox((0, 0), line_data, font=text_font)
+                    line_bbox = text_bbox(line_data, text_font)
                     line_width = line_bbox[2] - line_bbox[0]
                     line_x = center_x - line_width // 2
                     
@@ -1707,7 +1955,7 @@ class WebQRCardGenerator:
                         if len(line_text) > 60:
                             line_text = line_text[:57] + "..."
                         
-                        line_bbox = draw.textbbox((0, 0), line_text, font=text_font)
+                        line_bbox = text_bbox(line_text, text_font)
                         line_width = line_bbox[2] - line_bbox[0]
                         line_x = center_x - line_width // 2
                         
@@ -1720,7 +1968,7 @@ class WebQRCardGenerator:
                     if len(line_data) > 60:
                         line_data = line_data[:57] + "..."
                     
-                    line_bbox = draw.textbbox((0, 0), line_data, font=text_font)
+                    line_bbox = text_bbox(line_data, text_font)
                     line_width = line_bbox[2] - line_bbox[0]
                     line_x = center_x - line_width // 2
                     
@@ -1729,20 +1977,60 @@ class WebQRCardGenerator:
                     current_y += 25
                     lines_shown += 1
         
+        return layout
+    
+    def _modern_overlay_elements(self, layout, full_name, guest_code, guest_password) -> List[Dict]:
+        """Overlay des modernen Templates: großer QR-Code, Name und Login-Daten des Gastes"""
+        frontend_settings = getattr(self, '_frontend_settings', {})
+        elegant_font = frontend_settings.get('elegantFont', True)
+        subtitle_font = self.get_font(24, elegant=elegant_font)
+        text_font = self.get_font(16, elegant=False)
+        center_x = self.card_width // 2
+        
+        elements = [{'art': 'qr', 'x': layout['qr_x'], 'y': layout['qr_y'], 'size': layout['qr_size']}]
+        
+        # Gast-Name unter QR-Code
+        guest_text = full_name
+        guest_bbox = text_bbox(guest_text, subtitle_font)
+        guest_width = guest_bbox[2] - guest_bbox[0]
+        guest_x = center_x - guest_width // 2
+        
+        elements.append({'art': 'text', 'x': guest_x, 'y': layout['name_y'], 'text': guest_text,
+                         'fill': self.colors['primary'], 'font': subtitle_font})
+        
         # Login-Daten kompakt unten (falls aktiviert)
         show_login = frontend_settings.get('showLoginData', True)
         if show_login:
             login_y = self.card_height - 60
             login_text = f"{guest_code} • {guest_password}"
-            login_bbox = draw.textbbox((0, 0), login_text, font=text_font)
+            login_bbox = text_bbox(login_text, text_font)
             login_width = login_bbox[2] - login_bbox[0]
             login_x = center_x - login_width // 2
             
-            draw.text((login_x, login_y), login_text, 
-                     fill=self.colors['text'], font=text_font)
+            elements.append({'art': 'text', 'x': login_x, 'y': login_y, 'text': login_text,
+                             'fill': self.colors['text'], 'font': text_font})
+        
+        return elements
     
-    def _draw_camera_icon_with_rotation(self, draw, x, y, size, rotation_degrees):
-        """Zeichnet ein Kamera-Icon mit Rotation (wie im HTML-Preview)"""
+    def _draw_overlay(self, draw, img, elements, matrix):
+        """Zeichnet die Overlay-Elemente eines Gastes in das Kartenbild"""
+        for element in elements:
+            if element['art'] == 'qr':
+                qr_img = render_qr_image(matrix, element['size'], self.qr_color, self.qr_background)
+                img.paste(qr_img, (element['x'], element['y']))
+            elif element['art'] == 'kamera':
+                self._draw_camera_icon_with_rotation(draw, element['x'], element['y'], element['size'],
+                                                     element['rotation'])
+            else:
+                draw.text((element['x'], element['y']), element['text'], fill=element['fill'], font=element['font'])
+    
+    def _camera_icon_image(self, size, rotation_degrees):
+        """
+        Gedrehtes Kamera-Icon als RGBA-Bild
+        
+        Returns:
+            tuple: (Bild, Rand) - das Bild ist um `Rand` Pixel größer als das Icon
+        """
         # Erstelle temporäres Bild für die Rotation
         temp_size = size + 40  # Extra Platz für Rotation
         temp_img = Image.new('RGBA', (temp_size, temp_size), (255, 255, 255, 0))
@@ -1754,18 +2042,22 @@ class WebQRCardGenerator:
         self._draw_camera_icon(temp_draw, temp_x, temp_y, size)
         
         # Rotiere das temporäre Bild
-        rotated_img = temp_img.rotate(rotation_degrees, expand=False)
+        return temp_img.rotate(rotation_degrees, expand=False), (temp_size - size) // 2
+    
+    def _draw_camera_icon_with_rotation(self, draw, x, y, size, rotation_degrees):
+        """Zeichnet ein Kamera-Icon mit Rotation (wie im HTML-Preview)"""
+        rotated_img, rand = self._camera_icon_image(size, rotation_degrees)
         
         # Füge rotiertes Bild in das Hauptbild ein
-        paste_x = x - (temp_size - size) // 2
-        paste_y = y - (temp_size - size) // 2
+        paste_x = x - rand
+        paste_y = y - rand
         
         # Paste mit Alpha-Kanal für Transparenz
         if rotated_img.mode == 'RGBA':
             draw._image.paste(rotated_img, (paste_x, paste_y), rotated_img)
         else:
             draw._image.paste(rotated_img, (paste_x, paste_y))
-
+    
     def _draw_camera_icon(self, draw, x, y, size):
         """Zeichnet ein deutlich sichtbares Kamera-Icon mit Herz im Inneren (ohne Rotation - wird von _draw_camera_icon_with_rotation gehandhabt)"""
         # Kamera-Body (gefülltes Rechteck für bessere Sichtbarkeit)
@@ -1813,20 +2105,21 @@ class WebQRCardGenerator:
         heart_center_y = lens_y + lens_size // 2 + 2
         
         # Versuche Emoji-Font zu verwenden
-        emoji_font_path = os.path.join(os.path.dirname(__file__), 'fonts', 'NotoColorEmoji.ttf')
-        if os.path.exists(emoji_font_path):
+        if emoji_font_path:
             try:
                 from PIL import ImageFont
                 # Sichere Font-Größe für Emoji - etwas größer für bessere Sichtbarkeit
                 safe_font_size = max(14, min(heart_size, 42))
-                emoji_font = ImageFont.truetype(emoji_font_path, safe_font_size)
+                emoji_font = load_font(emoji_font_path, safe_font_size)
+                if emoji_font is None:
+                    raise OSError("Emoji-Font nicht ladbar")
                 
                 # Herz-Emoji (Unicode Herz)
                 emoji_heart = "♥"  # Unicode Herz (U+2665)
                 
                 # Textmaße berechnen
                 try:
-                    emoji_bbox = draw.textbbox((0, 0), emoji_heart, font=emoji_font)
+                    emoji_bbox = text_bbox(emoji_heart, emoji_font)
                     emoji_width = emoji_bbox[2] - emoji_bbox[0]
                     emoji_height = emoji_bbox[3] - emoji_bbox[1]
                 except:
@@ -1847,7 +2140,7 @@ class WebQRCardGenerator:
         else:
             # Fallback: Pixel-Herz
             self._draw_pixel_heart_fallback(draw, heart_center_x, heart_center_y, heart_size)
-
+    
     def _draw_pixel_heart_fallback(self, draw, heart_center_x, heart_center_y, heart_size):
         """Zeichnet ein Pixel-Herz als Fallback (wie in der Referenz)"""
         # Herzfarbe in Gold für bessere Sichtbarkeit (wie in der Referenz)
@@ -1877,7 +2170,7 @@ class WebQRCardGenerator:
                         px + pixel_size, py + pixel_size
                     ], fill=heart_color)
     
-    def _create_rounded_image(self, image, max_width, max_height, corner_radius=15):
+    def _create_rounded_image(self, image, max_width, max_height, corner_radius=15, cache_key=None):
         """
         Erstellt ein Bild mit abgerundeten Ecken
         
@@ -1886,10 +2179,20 @@ class WebQRCardGenerator:
             max_width: Maximale Breite
             max_height: Maximale Höhe
             corner_radius: Radius für abgerundete Ecken
+            cache_key: Kennung der Bildquelle (z.B. Foto-Hash); mit Schlüssel wird das
+                Ergebnis pro Prozess wiederverwendet, ohne das Foto erneut zu dekodieren
         
         Returns:
             PIL Image mit abgerundeten Ecken und Alpha-Kanal
         """
+        if cache_key:
+            cache_key = (cache_key, max_width, max_height, corner_radius)
+            with _photo_cache_lock:
+                cached = _photo_cache.get(cache_key)
+                if cached is not None:
+                    _photo_cache.move_to_end(cache_key)
+                    return cached
+        
         # Skaliere das Bild auf die gewünschte Größe
         image = image.copy()
         image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
@@ -1913,6 +2216,12 @@ class WebQRCardGenerator:
         # Wende die Maske an
         rounded_image.putalpha(mask)
         
+        if cache_key:
+            with _photo_cache_lock:
+                _photo_cache[cache_key] = rounded_image
+                while len(_photo_cache) > PHOTO_CACHE_SIZE:
+                    _photo_cache.popitem(last=False)
+        
         return rounded_image
     
     def _draw_corner_frame(self, draw, x, y, width, height, color):
@@ -1958,7 +2267,7 @@ class WebQRCardGenerator:
         draw.line([right, top + corner_radius + line_shortening, 
                   right, bottom - corner_radius - line_shortening], 
                  fill=color, width=stroke_width)
-
+    
     def _draw_photo_placeholder(self, draw, x, y, width, height):
         """Zeichnet einen Foto-Platzhalter"""
         # Foto-Rahmen
@@ -1976,7 +2285,7 @@ class WebQRCardGenerator:
         # "BRAUTPAAR" Text im Platzhalter
         photo_text = "BRAUTPAAR"
         photo_text_font = self.get_font(16, elegant=True)
-        photo_bbox = draw.textbbox((0, 0), photo_text, font=photo_text_font)
+        photo_bbox = text_bbox(photo_text, photo_text_font)
         photo_text_width = photo_bbox[2] - photo_bbox[0]
         photo_text_x = x + (width - photo_text_width) // 2
         photo_text_y = y + height // 2 - 10
@@ -1984,16 +2293,17 @@ class WebQRCardGenerator:
         draw.text((photo_text_x, photo_text_y), photo_text, 
                  fill=self.colors['text'], font=photo_text_font)
     
-    def generate_all_cards(self, template: str = "elegant", output_format: str = "zip") -> bytes:
+    def generate_all_cards(self, template: str = "elegant", output_format: str = "zip", paper: str = "A4") -> bytes:
         """
         Generiert QR-Karten für alle Gäste
         
         Args:
             template: Template-Stil ("elegant", "classic", "modern")
-            output_format: Ausgabeformat ("zip" oder "single")
+            output_format: Ausgabeformat ("zip", "pdf" oder "single")
+            paper: Bogenformat für "pdf" ("A4" oder "A3")
         
         Returns:
-            bytes: ZIP-Archiv mit allen Karten oder einzelne Karte
+            bytes: ZIP-Archiv mit allen Karten, Druck-PDF oder einzelne Karte
         """
         # Alle Gäste laden
         guests = self.data_manager.get_all_guests()
@@ -2001,29 +2311,16 @@ class WebQRCardGenerator:
         if not guests:
             raise ValueError("Keine Gäste in der Datenbank gefunden")
         
+        if output_format == "pdf":
+            return b''.join(self.iter_print_pdf(template, guests, paper))
+        
         if output_format == "zip":
             # ZIP-Archiv erstellen
             zip_buffer = io.BytesIO()
             
             with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for guest in guests:
-                    try:
-                        # Karte generieren
-                        card_data = self.create_guest_card(guest, template)
-                        
-                        # Dateiname erstellen und bereinigen
-                        vorname = guest.get('vorname', 'Gast')
-                        nachname = guest.get('nachname', '')
-                        full_name = f"{vorname} {nachname}".strip()
-                        safe_name = self._sanitize_filename(full_name)
-                        filename = f"wedding_card_{safe_name}_{guest.get('id', 'unknown')}.png"
-                        
-                        # Zur ZIP hinzufügen
-                        zip_file.writestr(filename, card_data)
-                        
-                    except Exception as e:
-                        print(f"⚠️ Fehler bei Gast {guest.get('id', 'unknown')}: {e}")
-                        continue
+                for filename, card_data in self.iter_all_cards(template, guests):
+                    zip_file.writestr(filename, card_data)
             
             zip_buffer.seek(0)
             return zip_buffer.getvalue()
@@ -2035,6 +2332,91 @@ class WebQRCardGenerator:
             else:
                 raise ValueError("Keine Gäste verfügbar")
     
+    def card_filename(self, guest: Dict[str, Any]) -> str:
+        """Bereinigter Dateiname der Karte eines Gastes im ZIP-Archiv"""
+        vorname = guest.get('vorname', 'Gast')
+        nachname = guest.get('nachname', '')
+        full_name = f"{vorname} {nachname}".strip()
+        safe_name = self._sanitize_filename(full_name)
+        return f"wedding_card_{safe_name}_{guest.get('id', 'unknown')}.png"
+    
+    def iter_all_cards(self, template: str = "elegant", guests: Optional[List[Dict[str, Any]]] = None):
+        """
+        Generiert die Karten aller Gäste nacheinander (für Streaming-Downloads)
+        
+        Args:
+            template: Template-Stil ("elegant", "classic", "modern")
+            guests: Gästeliste (Standard: alle Gäste aus der Datenbank)
+        
+        Yields:
+            (Dateiname, PNG-Bilddaten) je Gast
+        """
+        if guests is None:
+            guests = self.data_manager.get_all_guests()
+        
+        for guest in guests:
+            try:
+                # Karte generieren
+                card_data = self.create_guest_card(guest, template)
+                
+                yield self.card_filename(guest), card_data
+                
+            except Exception as e:
+                print(f"⚠️ Fehler bei Gast {guest.get('id', 'unknown')}: {e}")
+                continue
+    
+    def iter_print_pdf(self, template: str = "elegant", guests: Optional[List[Dict[str, Any]]] = None,
+                       paper: str = "A4"):
+        """
+        Erzeugt ein druckfertiges PDF mit mehreren Karten pro Bogen und Schnittmarken
+        
+        Der Hintergrund wird einmal eingebettet, QR-Code und Texte jedes Gastes
+        sind Vektoren (siehe card_pdf).
+        
+        Args:
+            template: Template-Stil ("elegant", "classic", "modern")
+            guests: Gästeliste (Standard: alle Gäste aus der Datenbank)
+            paper: Bogenformat ("A4" oder "A3")
+        
+        Yields:
+            bytes-Blöcke des PDFs
+        """
+        if guests is None:
+            guests = self.data_manager.get_all_guests()
+        
+        background, layout = self._get_card_background(template)
+        return stream_karten_pdf(background, self._iter_pdf_overlays(template, layout, guests),
+                                 dpi=self.dpi, papier=paper, titel=f"Einladungskarten ({template})")
+    
+    def _iter_pdf_overlays(self, template, layout, guests):
+        """Overlay-Elemente je Gast, ergänzt um QR-Matrix und Icon-Bilder für das PDF"""
+        icons = {}
+        for guest in guests:
+            try:
+                vorname = guest.get('vorname', 'Gast')
+                nachname = guest.get('nachname', '')
+                full_name = f"{vorname} {nachname}".strip()
+                guest_code, guest_password = self._guest_credentials(guest)
+                
+                elements = []
+                for element in self._overlay_elements(template, layout, full_name, guest_code, guest_password):
+                    if element['art'] == 'qr':
+                        element = {**element, 'matrix': qr_matrix(self._login_url(guest_code, guest_password)),
+                                   'farbe': self.qr_color, 'hintergrund': self.qr_background}
+                    elif element['art'] == 'kamera':
+                        key = (element['size'], element['rotation'])
+                        if key not in icons:
+                            icons[key] = self._camera_icon_image(*key)
+                        icon, rand = icons[key]
+                        element = {'art': 'bild', 'bild': icon, 'schluessel': f"kamera_{key[0]}_{key[1]}",
+                                   'x': element['x'] - rand, 'y': element['y'] - rand}
+                    elements.append(element)
+                yield elements
+                
+            except Exception as e:
+                print(f"⚠️ Fehler bei Gast {guest.get('id', 'unknown')}: {e}")
+                continue
+    
     def generate_test_card(self, template: str = "elegant") -> bytes:
         """
         Generiert eine Test-Karte mit Demo-Daten
@@ -2045,13 +2427,11 @@ class WebQRCardGenerator:
         Returns:
             bytes: PNG-Bilddaten der Test-Karte
         """
-        # Demo-Gast-Daten
-        test_guest = {
-            'id': 999,
-            'vorname': 'Max',
-            'nachname': 'Mustermann',
-            'guest_code': 'DEMO123',
-            'guest_password': 'test456'
-        }
-        
-        return self.create_guest_card(test_guest, template)
+        return self.create_guest_card(DEMO_GUEST, template)
+
+
+if __name__ == "__main__":
+    # Einmalige Einrichtung: fehlende Schriften herunterladen
+    regular, bold = download_dancing_script()
+    emoji = download_emoji_font()
+    print(f"📂 Schriften: {regular}, {bold}, {emoji}")
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lokaler SMTP-Testserver für Hochzeitsplaner
+Nimmt E-Mails an, ohne sie zuzustellen, damit Outbox und Serienbriefe
+ohne echten Anbieter getestet werden können. Optional lassen sich
+Rate-Limits, abgelehnte Empfänger, vorübergehende Fehler und Latenz
+simulieren.
+
+Konfiguration in auth_config.json (Abschnitt "email"):
+    "smtp_server": "127.0.0.1", "smtp_port": 8025, "use_tls": false
+
+Beispiel:
+    python smtp_testserver.py --port 8025 --rate-limit 30 --reject gast@example.com --save-dir data/testmails
+"""
+
+import os
+import time
+import base64
+import select
+import logging
+import argparse
+import threading
+import socketserver
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Eine SMTP-Sitzung (ein Client-Socket)
+
+    Antworten werden gesammelt und erst geschrieben, wenn keine weiteren
+    Befehle anliegen - so kostet die Latenz einen Round-Trip, egal ob der
+    Client mit PIPELINING mehrere Befehle auf einmal geschickt hat.
+    """
+
+    # Ungepuffert lesen, damit select() anliegende Befehle zuverlässig erkennt
+    rbufsize = 0
+
+    def setup(self):
+        super().setup()
+        self._antworten = []
+
+    def antworten(self, zeile):
+        self._antworten.append(zeile.encode('utf-8') + b'\r\n')
+
+    def _senden(self):
+        if not self._antworten:
+            return
+        if self.server.testserver.latenz:
+            time.sleep(self.server.testserver.latenz)
+        self.wfile.write(b''.join(self._antworten))
+        self._antworten = []
+
+    def _lesen(self, limit):
+        if self._antworten and not select.select([self.connection], [], [], 0)[0]:
+            self._senden()
+        return self.rfile.readline(limit)
+
+    def zeile_lesen(self):
+        zeile = self._lesen(65536)
+        if not zeile:
+            return None
+        return zeile.decode('utf-8', errors='replace').rstrip('\r\n')
+
+    def handle(self):
+        testserver = self.server.testserver
+        testserver._verbindung_geoeffnet()
+        angemeldet = testserver.benutzer is None
+        absender, empfaenger = None, []
+
+        self.antworten(f"220 {testserver.hostname} ESMTP Hochzeitsplaner-Testserver")
+        while True:
+            zeile = self.zeile_lesen()
+            if zeile is None:
+                return
+            befehl, _, argument = zeile.partition(' ')
+            befehl = befehl.upper()
+
+            if befehl == 'EHLO':
+                self.antworten(f"250-{testserver.hostname}\r\n250-PIPELINING\r\n250-8BITMIME\r\n250-SMTPUTF8\r\n"
+                               "250 AUTH PLAIN LOGIN")
+            elif befehl == 'HELO':
+                self.antworten(f"250 {testserver.hostname}")
+            elif befehl == 'AUTH':
+                angemeldet = self._anmelden(argument)
+            elif befehl == 'MAIL':
+                if not angemeldet:
+                    self.antworten("530 5.7.0 Authentication required")
+                    continue
+                if testserver._rate_limit_erreicht():
+                    self.antworten("451 4.7.0 Rate limit exceeded, try again later")
+                    continue
+                absender, empfaenger = argument.partition(':')[2].strip().strip('<>').split('>')[0], []
+                self.antworten("250 2.1.0 Ok")
+            elif befehl == 'RCPT':
+                if absender is None:
+                    self.antworten("503 5.5.1 Need MAIL command")
+                    continue
+                adresse = argument.partition(':')[2].strip().strip('<>').split('>')[0]
+                if adresse.lower() in testserver.ablehnen:
+                    self.antworten(f"550 5.1.1 <{adresse}>: Recipient address rejected: User unknown")
+                    continue
+                empfaenger.append(adresse)
+                self.antworten("250 2.1.5 Ok")
+            elif befehl == 'DATA':
+                if not empfaenger:
+                    self.antworten("503 5.5.1 Need RCPT command")
+                    continue
+                self.antworten("354 End data with <CR><LF>.<CR><LF>")
+                daten = self._daten_lesen()
+                if daten is None:
+                    return
+                if testserver._voruebergehender_fehler():
+                    self.antworten("451 4.3.0 Temporary local problem, please retry")
+                else:
+                    nummer = testserver._ablegen(absender, empfaenger, daten)
+                    self.antworten(f"250 2.0.0 Ok: queued as {nummer}")
+                absender, empfaenger = None, []
+            elif befehl == 'RSET':
+                absender, empfaenger = None, []
+                self.antworten("250 2.0.0 Ok")
+            elif befehl == 'NOOP':
+                self.antworten("250 2.0.0 Ok")
+            elif befehl == 'QUIT':
+                self.antworten("221 2.0.0 Bye")
+                self._senden()
+                return
+            elif befehl == 'STARTTLS':
+                self.antworten("454 4.7.0 TLS not available")
+            else:
+                self.antworten("502 5.5.2 Command not recognized")
+
+    def _anmelden(self, argument):
+        testserver = self.server.testserver
+        verfahren, _, rest = argument.partition(' ')
+        verfahren = verfahren.upper()
+        try:
+            if verfahren == 'PLAIN':
+                if not rest:
+                    self.antworten("334 ")
+                    rest = self.zeile_lesen() or ''
+                _, benutzer, passwort = base64.b64decode(rest).decode('utf-8').split('\0')
+            elif verfahren == 'LOGIN':
+                if rest:
+                    benutzer = base64.b64decode(rest).decode('utf-8')
+                else:
+                    self.antworten("334 VXNlcm5hbWU6")
+                    benutzer = base64.b64decode(self.zeile_lesen() or '').decode('utf-8')
+                self.antworten("334 UGFzc3dvcmQ6")
+                passwort = base64.b64decode(self.zeile_lesen() or '').decode('utf-8')
+            else:
+                self.antworten("504 5.5.4 Unrecognized authentication type")
+                return False
+        except ValueError:
+            self.antworten("501 5.5.2 Cannot decode response")
+            return False
+
+        if testserver.benutzer is not None and (benutzer, passwort) != (testserver.benutzer, testserver.passwort):
+            self.antworten("535 5.7.8 Authentication credentials invalid")
+            return False
+        self.antworten("235 2.7.0 Authentication successful")
+        return True
+
+    def _daten_lesen(self):
+        zeilen = []
+        while True:
+            zeile = self._lesen(1024 * 1024)
+            if not zeile:
+                return None
+            if zeile in (b'.\r\n', b'.\n'):
+                return b''.join(zeilen)
+            if zeile.startswith(b'.'):
+                zeile = zeile[1:]
+            zeilen.append(zeile)
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class SMTPTestServer:
+    """
+    SMTP-Testserver in einem Hintergrund-Thread
+
+    Args:
+        port: 0 wählt einen freien Port (siehe self.port)
+        benutzer, passwort: Zugangsdaten für AUTH (None = jede Anmeldung gilt)
+        rate_limit: Höchstens so viele Nachrichten je rate_fenster Sekunden (451 danach)
+        ablehnen: Empfängeradressen, die mit 550 abgelehnt werden
+        fehler_alle: Jede n-te Nachricht mit 451 nach DATA ablehnen (0 = nie)
+        latenz: Verzögerung je Antwort in Sekunden (simuliert einen entfernten Server)
+        ablage: Verzeichnis, in dem angenommene Nachrichten als .eml landen
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, benutzer=None, passwort=None, rate_limit=None,
+                 rate_fenster=60.0, ablehnen=(), fehler_alle=0, latenz=0.0, ablage=None):
+        self.host = host
+        self.hostname = 'localhost'
+        self.benutzer = benutzer
+        self.passwort = passwort
+        self.rate_limit = rate_limit
+        self.rate_fenster = rate_fenster
+        self.ablehnen = {adresse.lower() for adresse in ablehnen}
+        self.fehler_alle = fehler_alle
+        self.latenz = latenz
+        self.ablage = ablage
+
+        self.nachrichten = []
+        self.verbindungen = 0
+        self._versuche = 0
+        self._annahmen = deque()
+        self._lock = threading.Lock()
+
+        self._server = _ThreadingServer((host, port), _SMTPHandler)
+        self._server.testserver = self
+        self.port = self._server.server_address[1]
+        self._thread = None
+
+    def start(self):
+        if self.ablage:
+            os.makedirs(self.ablage, exist_ok=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, name='smtp-testserver', daemon=True)
+        self._thread.start()
+        logger.info(f"📮 SMTP-Testserver läuft auf {self.host}:{self.port}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _verbindung_geoeffnet(self):
+        with self._lock:
+            self.verbindungen += 1
+
+    def _rate_limit_erreicht(self):
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            grenze = time.monotonic() - self.rate_fenster
+            while self._annahmen and self._annahmen[0] < grenze:
+                self._annahmen.popleft()
+            return len(self._annahmen) >= self.rate_limit
+
+    def _voruebergehender_fehler(self):
+        with self._lock:
+            self._versuche += 1
+            return bool(self.fehler_alle) and self._versuche % self.fehler_alle == 0
+
+    def _ablegen(self, absender, empfaenger, daten):
+        with self._lock:
+            self._annahmen.append(time.monotonic())
+            self.nachrichten.append({
+                'mail_from': absender,
+                'rcpt_to': list(empfaenger),
+                'data': daten,
+                'empfangen': datetime.now().isoformat()
+            })
+            nummer = len(self.nachrichten)
+
+        if self.ablage:
+            with open(os.path.join(self.ablage, f"{datetime.now():%Y%m%d-%H%M%S}-{nummer:05d}.eml"), 'wb') as f:
+                f.write(daten)
+        logger.info(f"📨 Nachricht {nummer} von {absender} an {', '.join(empfaenger)}")
+        return nummer
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokaler SMTP-Testserver (stellt nichts zu)')
+    parser.add_argument('--host', default='127.0.0.1', help='Adresse')
+    parser.add_argument('--port', type=int, default=8025, help='Port')
+    parser.add_argument('--user', help='Benutzername für AUTH (Standard: jede Anmeldung gilt)')
+    parser.add_argument('--password', help='Passwort für AUTH')
+    parser.add_argument('--rate-limit', type=int, help='Nachrichten je Minute, danach 451')
+    parser.add_argument('--reject', nargs='*', default=[], help='Empfänger, die mit 550 abgelehnt werden')
+    parser.add_argument('--fail-every', type=int, default=0, help='Jede n-te Nachricht mit 451 ablehnen')
+    parser.add_argument('--latency', type=float, default=0.0, help='Verzögerung je Antwort in Millisekunden')
+    parser.add_argument('--save-dir', help='Angenommene Nachrichten als .eml speichern')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    server = SMTPTestServer(args.host, args.port, args.user, args.password, args.rate_limit,
+                            ablehnen=args.reject, fehler_alle=args.fail_every,
+                            latenz=args.latency / 1000, ablage=args.save_dir)
+    server.start()
+    print(f"📮 SMTP-Testserver auf {args.host}:{server.port} - Beenden mit Strg+C")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(f"👋 {len(server.nachrichten)} Nachrichten in {server.verbindungen} Verbindungen angenommen")
+
+
+if __name__ == "__main__":
+    main()
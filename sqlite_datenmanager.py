@@ -10,12 +10,15 @@ import json
 import os
 import logging
 import threading
+import time
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 import hashlib
 import random
 import string
 
+from tischplan_szenarien import SitzplanSzenario, bewerte_sitzplan
+
 # Pandas als Lazy Import - nur laden wenn Excel-Features benötigt werden
 pd = None
 
@@ -34,6 +37,20 @@ def get_pandas():
 
 logger = logging.getLogger(__name__)
 
+# Anzahl der Sitzplan-Änderungen, die für die Live-Tischplanung vorgehalten werden
+TISCHPLAN_EVENTS_BEHALTEN = 1000
+
+# Gültigkeit der gecachten Upload-Einstellungen (andere Gunicorn-Worker sehen Änderungen spätestens danach)
+UPLOAD_SETTINGS_CACHE_SEKUNDEN = 30
+
+# Nahezu gleiche Bilder (Serienbilder): Wahrnehmungs-Hash mit 64 Bit, aufgeteilt
+# in 8 Bänder à 8 Bit. Liegen zwei Hashes höchstens 7 Bit auseinander, stimmt
+# mindestens ein Band exakt überein (Schubfachprinzip) - Kandidaten kommen so
+# direkt aus dem Index statt aus einem Vergleich aller Paare.
+PHASH_BAENDER = 8
+SERIEN_MAX_ABSTAND = 6
+SERIEN_ZEITFENSTER_SEKUNDEN = 120
+
 class SQLiteHochzeitsDatenManager:
     """
     Zentraler Datenmanager für Hochzeitsdaten mit SQLite-Backend
@@ -57,6 +74,15 @@ class SQLiteHochzeitsDatenManager:
         # Thread-Lock für threadsichere Operationen
         self._lock = threading.RLock()
         
+        # Cache für die Tischbelegung (gültig solange die Planversion gleich bleibt)
+        self._tisch_belegung_cache = None
+        
+        # Cache für die Serienbilder (gültig solange die Serienversion gleich bleibt)
+        self._upload_serien_cache = None
+        
+        # Cache für die Upload-Einstellungen (Upload-Verzeichnis wird bei jedem Medienabruf benötigt)
+        self._upload_settings_cache = None
+        
         # Datenverzeichnis erstellen falls nicht vorhanden
         os.makedirs(self.data_directory, exist_ok=True)
         os.makedirs(os.path.dirname(self.schema_path), exist_ok=True)
@@ -109,6 +135,12 @@ class SQLiteHochzeitsDatenManager:
                 # Alle wichtigen Tabellen sicherstellen
                 self._ensure_all_tables()
                 
+                # Medien-Pipeline (Job-Queue und Derivate)
+                self._init_media_tables()
+                
+                # E-Mail-Outbox (persistente Versand-Queue)
+                self._init_email_outbox_table()
+                
                 # Checkliste-Tabelle migrieren falls nötig
                 self._migrate_checkliste_table()
                 
@@ -509,6 +541,24 @@ class SQLiteHochzeitsDatenManager:
                         'guest_code': 'TEXT UNIQUE',
                         'guest_password': 'TEXT',
                         'max_personen': 'INTEGER'
+                    },
+                    'tische': {
+                        'beschreibung': 'TEXT',
+                        'aktiv': 'BOOLEAN DEFAULT 1'
+                    },
+                    'tisch_zuordnungen': {
+                        'notizen': 'TEXT'
+                    },
+                    'gaeste_uploads': {
+                        'media_status': "TEXT DEFAULT 'pending'",
+                        'content_hash': 'TEXT',
+                        'resolved_path': 'TEXT',
+                        'blurhash': 'TEXT',
+                        'aufnahme_zeit': 'TEXT',
+                        'orientierung': 'INTEGER',
+                        'bild_breite': 'INTEGER',
+                        'bild_hoehe': 'INTEGER',
+                        'phash': 'TEXT'
                     }
                 }
                 
@@ -1743,10 +1793,11 @@ class SQLiteHochzeitsDatenManager:
                 conn = sqlite3.connect(self.db_path)
                 cursor = conn.cursor()
                 
+                self._bump_tischplan_version_fuer_gast(cursor, guest_id)
                 cursor.execute("DELETE FROM gaeste WHERE id = ?", (guest_id,))
+                deleted_rows = cursor.rowcount
                 
                 conn.commit()
-                deleted_rows = cursor.rowcount
                 conn.close()
                 
                 return deleted_rows > 0
@@ -1831,6 +1882,7 @@ class SQLiteHochzeitsDatenManager:
                     int(datetime.now().timestamp() * 1000),
                     guest_id
                 ))
+                self._bump_tischplan_version_fuer_gast(cursor, guest_id)
                 
                 conn.commit()
                 conn.close()
@@ -1910,6 +1962,7 @@ class SQLiteHochzeitsDatenManager:
                         last_modified = ?
                     WHERE id = ?
                 """, (status, anzahl_personen, bemerkungen, new_timestamp, guest_id))
+                self._bump_tischplan_version_fuer_gast(cursor, guest_id)
                 
                 conn.commit()
                 conn.close()
@@ -4656,7 +4709,11 @@ class SQLiteHochzeitsDatenManager:
     # ============================
     
     def get_upload_settings(self):
-        """Lädt die Upload-Einstellungen"""
+        """Lädt die Upload-Einstellungen (für UPLOAD_SETTINGS_CACHE_SEKUNDEN gecacht)"""
+        cache = self._upload_settings_cache
+        if cache is not None and time.monotonic() - cache['geladen_am'] < UPLOAD_SETTINGS_CACHE_SEKUNDEN:
+            return dict(cache['settings'])
+        
         try:
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
@@ -4692,7 +4749,8 @@ class SQLiteHochzeitsDatenManager:
                     if key not in settings:
                         settings[key] = default_value
                 
-                return settings
+                self._upload_settings_cache = {'geladen_am': time.monotonic(), 'settings': settings}
+                return dict(settings)
                 
         except Exception as e:
             logger.error(f"Fehler beim Laden der Upload-Einstellungen: {e}")
@@ -4722,13 +4780,15 @@ class SQLiteHochzeitsDatenManager:
                 
                 conn.commit()
                 conn.close()
+                self._upload_settings_cache = None
                 return True
                 
         except Exception as e:
             logger.error(f"Fehler beim Speichern der Upload-Einstellungen: {e}")
             return False
     
-    def add_upload(self, gast_id, original_filename, filename, file_path, file_size, mime_type, beschreibung=''):
+    def add_upload(self, gast_id, original_filename, filename, file_path, file_size, mime_type, beschreibung='',
+                   content_hash=None):
         """Fügt einen neuen Upload hinzu"""
         try:
             with self._lock:
@@ -4738,13 +4798,29 @@ class SQLiteHochzeitsDatenManager:
                 # Bestimme file_type aus mime_type oder filename
                 file_type = self._get_file_type_from_mime(mime_type) or self._get_file_type_from_filename(filename)
                 
+                # Inhalt bereits von einem anderen Gast hochgeladen und entschieden: Entscheidung übernehmen
+                admin_approved = 0
+                if content_hash:
+                    cursor.execute("""
+                        SELECT admin_approved FROM gaeste_uploads
+                        WHERE content_hash = ? AND admin_approved != 0
+                        ORDER BY id LIMIT 1
+                    """, (content_hash,))
+                    entschieden = cursor.fetchone()
+                    if entschieden:
+                        admin_approved = entschieden[0]
+                
+                resolved_path = self._resolve_upload_path(file_path)
                 cursor.execute("""
                     INSERT INTO gaeste_uploads 
-                    (gast_id, original_filename, filename, file_path, file_size, file_type, mime_type, beschreibung, admin_approved, upload_date)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, CURRENT_TIMESTAMP)
-                """, (gast_id, original_filename, filename, file_path, file_size, file_type, mime_type, beschreibung))
+                    (gast_id, original_filename, filename, file_path, file_size, file_type, mime_type, beschreibung, admin_approved, upload_date,
+                     resolved_path, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?, ?)
+                """, (gast_id, original_filename, filename, file_path, file_size, file_type, mime_type, beschreibung,
+                      admin_approved, resolved_path, content_hash))
                 
                 upload_id = cursor.lastrowid
+                self._referenziere_blob(cursor, content_hash, resolved_path, file_size)
                 conn.commit()
                 conn.close()
                 
@@ -4755,7 +4831,8 @@ class SQLiteHochzeitsDatenManager:
             logger.error(f"Fehler beim Hinzufügen des Uploads: {e}")
             return None
     
-    def add_admin_upload(self, admin_user, original_filename, filename, file_path, file_size, mime_type, beschreibung=''):
+    def add_admin_upload(self, admin_user, original_filename, filename, file_path, file_size, mime_type, beschreibung='',
+                         content_hash=None):
         """Fügt einen Admin-Upload hinzu - wird automatisch genehmigt"""
         try:
             with self._lock:
@@ -4770,14 +4847,18 @@ class SQLiteHochzeitsDatenManager:
                 
                 # Admin-Upload mit admin_gast_id und automatischer Genehmigung
                 beschreibung_mit_admin = f"{beschreibung} (Admin: {admin_user})" if beschreibung else f"Admin-Upload von {admin_user}"
+                resolved_path = self._resolve_upload_path(file_path)
                 
                 cursor.execute("""
                     INSERT INTO gaeste_uploads 
-                    (gast_id, original_filename, filename, file_path, file_size, file_type, mime_type, beschreibung, admin_approved, upload_date)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, CURRENT_TIMESTAMP)
-                """, (admin_gast_id, original_filename, filename, file_path, file_size, file_type, mime_type, beschreibung_mit_admin))
+                    (gast_id, original_filename, filename, file_path, file_size, file_type, mime_type, beschreibung, admin_approved, upload_date,
+                     resolved_path, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, CURRENT_TIMESTAMP, ?, ?)
+                """, (admin_gast_id, original_filename, filename, file_path, file_size, file_type, mime_type, beschreibung_mit_admin,
+                      resolved_path, content_hash))
                 
                 upload_id = cursor.lastrowid
+                self._referenziere_blob(cursor, content_hash, resolved_path, file_size)
                 conn.commit()
                 conn.close()
                 
@@ -4788,6 +4869,110 @@ class SQLiteHochzeitsDatenManager:
             logger.error(f"Fehler beim Hinzufügen des Admin-Uploads: {e}")
             return None
     
+    @staticmethod
+    def _resolve_upload_path(file_path):
+        """Absoluter, kanonischer Pfad einer vorhandenen Upload-Datei (sonst None)"""
+        if file_path and os.path.isfile(file_path):
+            return os.path.realpath(file_path)
+        return None
+    
+    @staticmethod
+    def _referenziere_blob(cursor, content_hash, pfad, dateigroesse):
+        """Erhöht den Referenzzähler der Datei zu content_hash (legt den Eintrag bei Bedarf an)"""
+        if not content_hash or not pfad:
+            return
+        cursor.execute("""
+            INSERT INTO upload_blobs (content_hash, pfad, dateigroesse, ref_count)
+            VALUES (?, ?, ?, 1)
+            ON CONFLICT(content_hash) DO UPDATE SET ref_count = ref_count + 1, pfad = excluded.pfad
+        """, (content_hash, pfad, dateigroesse))
+    
+    def get_upload_blob(self, content_hash):
+        """Lädt den Speicher-Eintrag zu einem Inhalts-Hash (oder None)"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT content_hash, pfad, dateigroesse, ref_count FROM upload_blobs
+                    WHERE content_hash = ?
+                """, (content_hash,))
+                row = cursor.fetchone()
+                conn.close()
+                if not row:
+                    return None
+                return {'content_hash': row[0], 'pfad': row[1], 'dateigroesse': row[2], 'ref_count': row[3]}
+        
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des Upload-Speichereintrags: {e}")
+            return None
+    
+    def find_guest_upload_by_hash(self, gast_id, content_hash):
+        """ID eines vorhandenen Uploads desselben Gastes mit identischem Inhalt (oder None)"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id FROM gaeste_uploads
+                    WHERE content_hash = ? AND gast_id = ?
+                    ORDER BY id LIMIT 1
+                """, (content_hash, gast_id))
+                row = cursor.fetchone()
+                conn.close()
+                return row[0] if row else None
+        
+        except Exception as e:
+            logger.error(f"Fehler bei der Duplikatsuche: {e}")
+            return None
+    
+    def set_upload_resolved_path(self, upload_id, resolved_path):
+        """
+        Speichert den aufgelösten Dateipfad eines Uploads
+        
+        Args:
+            resolved_path: Absoluter Pfad, '' wenn die Datei nicht gefunden wurde,
+                           None um eine erneute Suche zu erzwingen
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                cursor.execute("UPDATE gaeste_uploads SET resolved_path = ? WHERE id = ?",
+                               (resolved_path, upload_id))
+                conn.commit()
+                conn.close()
+                return True
+        
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern des Upload-Pfads {upload_id}: {e}")
+            return False
+    
+    def get_uploads_fuer_pfad_abgleich(self, auch_fehlende=False):
+        """
+        Lädt Uploads ohne gespeicherten Dateipfad (Altbestand)
+        
+        Args:
+            auch_fehlende: Auch Uploads erneut prüfen, deren Datei zuletzt nicht gefunden wurde
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                bedingung = "resolved_path IS NULL OR resolved_path = ''" if auch_fehlende else "resolved_path IS NULL"
+                cursor.execute(f"""
+                    SELECT id, filename, file_path FROM gaeste_uploads
+                    WHERE {bedingung}
+                    ORDER BY id
+                """)
+                uploads = [{'id': row[0], 'filename': row[1], 'file_path': row[2]} for row in cursor.fetchall()]
+                conn.close()
+                return uploads
+        
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Uploads für den Pfad-Abgleich: {e}")
+            return []
+    
     def _get_or_create_admin_guest(self):
         """Erstellt oder holt den Admin-Gast-Eintrag"""
         try:
@@ -4896,17 +5081,18 @@ class SQLiteHochzeitsDatenManager:
     def get_upload_by_id(self, upload_id):
         """Lädt einen Upload anhand der ID"""
         try:
-            logger.info(f"🎯 Database: get_upload_by_id called for ID: {upload_id}")
+            logger.debug(f"🎯 Database: get_upload_by_id called for ID: {upload_id}")
             
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
                 cursor = conn.cursor()
                 
-                logger.info(f"📡 Database: Executing query for upload ID: {upload_id}")
+                logger.debug(f"📡 Database: Executing query for upload ID: {upload_id}")
                 cursor.execute("""
                     SELECT gu.id, gu.gast_id, gu.original_filename, gu.filename, gu.file_path,
                            gu.file_size, gu.file_type, gu.mime_type, gu.beschreibung, gu.upload_date,
-                           gu.admin_approved, g.vorname, g.nachname
+                           gu.admin_approved, g.vorname, g.nachname, gu.media_status, gu.content_hash,
+                           gu.resolved_path
                     FROM gaeste_uploads gu
                     JOIN gaeste g ON gu.gast_id = g.id
                     WHERE gu.id = ?
@@ -4929,9 +5115,12 @@ class SQLiteHochzeitsDatenManager:
                         'upload_date': row[9],
                         'admin_approved': row[10],
                         'gast_vorname': row[11],
-                        'gast_nachname': row[12]
+                        'gast_nachname': row[12],
+                        'media_status': row[13],
+                        'content_hash': row[14],
+                        'resolved_path': row[15]
                     }
-                    logger.info(f"📋 Database: Found upload {upload_id}: {upload['original_filename']} (approved: {upload['admin_approved']})")
+                    logger.debug(f"📋 Database: Found upload {upload_id}: {upload['original_filename']} (approved: {upload['admin_approved']})")
                     return upload
                 else:
                     logger.warning(f"📭 Database: Upload {upload_id} not found in database")
@@ -4942,202 +5131,1340 @@ class SQLiteHochzeitsDatenManager:
             return None
     
     def delete_upload(self, upload_id):
-        """Löscht einen Upload"""
+        """
+        Löscht einen Upload samt Originaldatei und Derivaten
+        
+        Dateien werden nur entfernt, wenn kein anderer Upload sie noch
+        referenziert (gleicher Inhalts-Hash bzw. gleicher Pfad).
+        """
         try:
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
                 cursor = conn.cursor()
                 
-                cursor.execute("DELETE FROM gaeste_uploads WHERE id = ?", (upload_id,))
+                cursor.execute("SELECT content_hash, resolved_path FROM gaeste_uploads WHERE id = ?", (upload_id,))
+                row = cursor.fetchone()
+                content_hash, resolved_path = row if row else (None, None)
+                
+                # Vorberechnete Derivate mit entfernen (Dateien nur, wenn kein anderer Upload sie nutzt)
+                cursor.execute("SELECT DISTINCT pfad FROM upload_derivate WHERE upload_id = ?", (upload_id,))
+                derivat_pfade = [row[0] for row in cursor.fetchall()]
+                cursor.execute("DELETE FROM upload_derivate WHERE upload_id = ?", (upload_id,))
+                if derivat_pfade:
+                    cursor.execute(f"""
+                        SELECT DISTINCT pfad FROM upload_derivate
+                        WHERE pfad IN ({','.join('?' * len(derivat_pfade))})
+                    """, derivat_pfade)
+                    noch_genutzt = {row[0] for row in cursor.fetchall()}
+                    derivat_pfade = [pfad for pfad in derivat_pfade if pfad not in noch_genutzt]
+                cursor.execute("DELETE FROM media_jobs WHERE upload_id = ?", (upload_id,))
+                cursor.execute("DELETE FROM upload_phash_baender WHERE upload_id = ?", (upload_id,))
                 
+                cursor.execute("DELETE FROM gaeste_uploads WHERE id = ?", (upload_id,))
                 rows_affected = cursor.rowcount
+                if rows_affected:
+                    self._bump_serien_version(cursor)
+                
+                # Originaldatei: Referenzzähler herunterzählen, erst beim letzten Verweis löschen
+                datei_pfade = list(derivat_pfade)
+                if rows_affected and resolved_path:
+                    cursor.execute("""
+                        UPDATE upload_blobs SET ref_count = ref_count - 1
+                        WHERE content_hash = ? AND pfad = ? RETURNING ref_count, pfad
+                    """, (content_hash, resolved_path))
+                    blob = cursor.fetchone()
+                    if blob:
+                        if blob[0] <= 0:
+                            cursor.execute("DELETE FROM upload_blobs WHERE content_hash = ?", (content_hash,))
+                            datei_pfade.append(blob[1])
+                    else:
+                        # Upload aus der Zeit vor dem inhaltsadressierten Speicher
+                        cursor.execute("SELECT 1 FROM gaeste_uploads WHERE resolved_path = ? LIMIT 1", (resolved_path,))
+                        if not cursor.fetchone():
+                            datei_pfade.append(resolved_path)
+                
                 conn.commit()
                 conn.close()
                 
+                for pfad in datei_pfade:
+                    try:
+                        if os.path.exists(pfad):
+                            os.remove(pfad)
+                    except OSError as e:
+                        logger.warning(f"⚠️ Datei konnte nicht gelöscht werden: {pfad} ({e})")
+                
                 return rows_affected > 0
                 
         except Exception as e:
             logger.error(f"Fehler beim Löschen des Uploads: {e}")
             return False
     
-    def get_upload_statistics(self):
-        """Lädt Upload-Statistiken für Admin"""
+    # =============================================================================
+    # Medien-Pipeline (Hintergrund-Verarbeitung von Uploads)
+    # =============================================================================
+    
+    def _init_media_tables(self):
+        """Initialisiert die Tabellen der Medien-Pipeline"""
         try:
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
                 cursor = conn.cursor()
                 
-                # Gesamt-Uploads
-                cursor.execute("SELECT COUNT(*) FROM gaeste_uploads")
-                total_uploads = cursor.fetchone()[0]
-                
-                # Gesamt-Größe
-                cursor.execute("SELECT COALESCE(SUM(file_size), 0) FROM gaeste_uploads")
-                total_size = cursor.fetchone()[0]
+                # Persistente Job-Queue
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS media_jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        upload_id INTEGER NOT NULL,
+                        typ TEXT NOT NULL DEFAULT 'derivate',
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        prioritaet INTEGER NOT NULL DEFAULT 0,
+                        versuche INTEGER NOT NULL DEFAULT 0,
+                        max_versuche INTEGER NOT NULL DEFAULT 5,
+                        naechster_versuch DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        gesperrt_von TEXT,
+                        gesperrt_am DATETIME,
+                        letzter_fehler TEXT,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        CONSTRAINT chk_media_job_status CHECK (status IN ('pending', 'processing', 'done', 'failed'))
+                    )
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_media_jobs_queue
+                    ON media_jobs(status, prioritaet DESC, naechster_versuch)
+                """)
+                # Pro Upload und Typ höchstens ein offener Job
+                cursor.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS idx_media_jobs_offen
+                    ON media_jobs(upload_id, typ) WHERE status IN ('pending', 'processing')
+                """)
                 
-                # Bilder zählen (nach file_type)
-                cursor.execute("SELECT COUNT(*) FROM gaeste_uploads WHERE file_type = 'image'")
-                total_images = cursor.fetchone()[0]
+                # Vorberechnete Derivate (Thumbnails usw.)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS upload_derivate (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        upload_id INTEGER NOT NULL,
+                        variante TEXT NOT NULL,
+                        format TEXT NOT NULL,
+                        mime_type TEXT NOT NULL,
+                        pfad TEXT NOT NULL,
+                        breite INTEGER,
+                        hoehe INTEGER,
+                        dateigroesse INTEGER,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        UNIQUE(upload_id, variante, format)
+                    )
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_upload_derivate_pfad ON upload_derivate(pfad)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_gaeste_uploads_hash ON gaeste_uploads(content_hash)")
+                # Galerie-Seiten per Keyset (admin_approved, upload_date, id)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_gaeste_uploads_galerie
+                    ON gaeste_uploads(admin_approved, upload_date, id)
+                """)
+                # Zeitleiste (EXIF-Aufnahmezeit) und Serienbilder (Wahrnehmungs-Hash in Bändern)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_gaeste_uploads_aufnahme ON gaeste_uploads(aufnahme_zeit)")
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS upload_phash_baender (
+                        upload_id INTEGER NOT NULL,
+                        band INTEGER NOT NULL,
+                        wert INTEGER NOT NULL,
+                        PRIMARY KEY (upload_id, band)
+                    )
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_upload_phash_baender ON upload_phash_baender(band, wert)")
                 
-                # Videos zählen (nach file_type)
-                cursor.execute("SELECT COUNT(*) FROM gaeste_uploads WHERE file_type = 'video'")
-                total_videos = cursor.fetchone()[0]
+                # Serienversion (wird bei jeder Änderung an Genehmigung oder Wahrnehmungs-Hash erhöht)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS upload_serien_version (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        version INTEGER NOT NULL DEFAULT 0
+                    )
+                """)
+                cursor.execute("INSERT OR IGNORE INTO upload_serien_version (id, version) VALUES (1, 0)")
                 
-                # Aktive Gäste (mit Uploads)
+                # Inhaltsadressierter Speicher: eine Datei pro Inhalts-Hash, mit Referenzzähler
                 cursor.execute("""
-                    SELECT COUNT(DISTINCT gast_id) FROM gaeste_uploads
+                    CREATE TABLE IF NOT EXISTS upload_blobs (
+                        content_hash TEXT PRIMARY KEY,
+                        pfad TEXT NOT NULL,
+                        dateigroesse INTEGER,
+                        ref_count INTEGER NOT NULL DEFAULT 0,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
                 """)
-                active_guests = cursor.fetchone()[0]
                 
-                # Uploads der letzten 7 Tage
+                # Laufende, fortsetzbare Uploads (Datei wird blockweise in eine .part-Datei geschrieben)
                 cursor.execute("""
-                    SELECT COUNT(*) FROM gaeste_uploads 
-                    WHERE upload_date >= datetime('now', '-7 days')
+                    CREATE TABLE IF NOT EXISTS upload_sessions (
+                        token TEXT PRIMARY KEY,
+                        gast_id INTEGER NOT NULL,
+                        original_filename TEXT NOT NULL,
+                        mime_type TEXT,
+                        beschreibung TEXT,
+                        total_size INTEGER NOT NULL,
+                        received INTEGER NOT NULL DEFAULT 0,
+                        part_path TEXT NOT NULL,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
                 """)
-                recent_uploads = cursor.fetchone()[0]
                 
+                conn.commit()
                 conn.close()
-                
-                return {
-                    'total_uploads': total_uploads,
-                    'total_images': total_images,
-                    'total_videos': total_videos,
-                    'total_size': total_size,
-                    'active_guests': active_guests,
-                    'recent_uploads': recent_uploads
-                }
+                logger.info("✅ Medien-Pipeline-Tabellen initialisiert")
                 
         except Exception as e:
-            logger.error(f"Fehler beim Laden der Upload-Statistiken: {e}")
-            return {
-                'total_uploads': 0,
-                'total_images': 0,
-                'total_videos': 0,
-                'total_size': 0,
-                'active_guests': 0,
-                'recent_uploads': 0
-            }
+            logger.error(f"❌ Fehler beim Initialisieren der Medien-Pipeline-Tabellen: {e}")
     
-    def get_all_uploads(self):
-        """Lädt alle Uploads für Admin"""
+    def create_upload_session(self, token, gast_id, original_filename, mime_type, beschreibung, total_size, part_path):
+        """Legt eine Session für einen fortsetzbaren Upload an"""
         try:
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
                 cursor = conn.cursor()
-                
                 cursor.execute("""
-                    SELECT gu.id, gu.gast_id, gu.original_filename, gu.filename, gu.file_path,
-                           gu.file_size, gu.file_type, gu.mime_type, gu.beschreibung, gu.upload_date,
-                           gu.admin_approved, g.vorname, g.nachname
-                    FROM gaeste_uploads gu
-                    JOIN gaeste g ON gu.gast_id = g.id
-                    ORDER BY gu.upload_date DESC
-                """)
-                
-                uploads = []
-                for row in cursor.fetchall():
-                    uploads.append({
-                        'id': row[0],
-                        'gast_id': row[1],
-                        'original_filename': row[2],
-                        'filename': row[3],
-                        'file_path': row[4],
-                        'file_size': row[5],
-                        'file_type': row[6],
-                        'mime_type': row[7],
-                        'beschreibung': row[8],
-                        'upload_date': row[9],
-                        'admin_approved': row[10],
-                        'gast_vorname': row[11],
-                        'gast_nachname': row[12]
-                    })
-                
+                    INSERT INTO upload_sessions
+                    (token, gast_id, original_filename, mime_type, beschreibung, total_size, part_path)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (token, gast_id, original_filename, mime_type, beschreibung, total_size, part_path))
+                conn.commit()
                 conn.close()
-                return uploads
-                
+                return True
+        
         except Exception as e:
-            logger.error(f"Fehler beim Laden aller Uploads: {e}")
-            return []
+            logger.error(f"Fehler beim Anlegen der Upload-Session: {e}")
+            return False
     
-    def get_guests_with_uploads(self):
-        """Lädt Gäste mit Upload-Anzahl für Filter"""
+    def get_upload_session(self, token):
+        """Lädt eine Upload-Session (oder None)"""
         try:
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
+                conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
-                
-                cursor.execute("""
-                    SELECT g.id, g.vorname, g.nachname, COUNT(gu.id) as upload_count
-                    FROM gaeste g
-                    JOIN gaeste_uploads gu ON g.id = gu.gast_id
-                    GROUP BY g.id, g.vorname, g.nachname
-                    ORDER BY upload_count DESC, g.nachname, g.vorname
-                """)
-                
-                guests = []
-                for row in cursor.fetchall():
-                    guests.append({
-                        'id': row[0],
-                        'vorname': row[1],
-                        'nachname': row[2],
-                        'upload_count': row[3]
-                    })
-                
+                cursor.execute("SELECT * FROM upload_sessions WHERE token = ?", (token,))
+                row = cursor.fetchone()
                 conn.close()
-                return guests
-                
+                return dict(row) if row else None
+        
         except Exception as e:
-            logger.error(f"Fehler beim Laden der Gäste mit Uploads: {e}")
-            return []
+            logger.error(f"Fehler beim Laden der Upload-Session: {e}")
+            return None
     
-    def get_upload_details(self, upload_id):
-        """Lädt detaillierte Upload-Informationen"""
+    def update_upload_session_received(self, token, received):
+        """Speichert den bestätigten Fortschritt einer Upload-Session"""
         try:
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
                 cursor = conn.cursor()
-                
                 cursor.execute("""
-                    SELECT gu.id, gu.gast_id, gu.original_filename, gu.filename, gu.file_path,
-                           gu.file_size, gu.file_type, gu.mime_type, gu.beschreibung, gu.upload_date,
-                           g.vorname, g.nachname, g.email
-                    FROM gaeste_uploads gu
-                    JOIN gaeste g ON gu.gast_id = g.id
-                    WHERE gu.id = ?
-                """, (upload_id,))
-                
-                row = cursor.fetchone()
+                    UPDATE upload_sessions SET received = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE token = ?
+                """, (received, token))
+                conn.commit()
                 conn.close()
-                
-                if row:
-                    return {
-                        'id': row[0],
-                        'gast_id': row[1],
-                        'original_filename': row[2],
-                        'filename': row[3],
-                        'file_path': row[4],
-                        'file_size': row[5],
-                        'file_type': row[6],
-                        'mime_type': row[7],
-                        'beschreibung': row[8],
-                        'upload_date': row[9],
-                        'gast_vorname': row[10],
-                        'gast_nachname': row[11],
+                return True
+        
+        except Exception as e:
+            logger.error(f"Fehler beim Aktualisieren der Upload-Session: {e}")
+            return False
+    
+    def delete_upload_session(self, token):
+        """Entfernt eine Upload-Session (die .part-Datei löscht der Aufrufer)"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM upload_sessions WHERE token = ?", (token,))
+                conn.commit()
+                conn.close()
+                return True
+        
+        except Exception as e:
+            logger.error(f"Fehler beim Löschen der Upload-Session: {e}")
+            return False
+    
+    def get_abgelaufene_upload_sessions(self, stunden=24):
+        """Upload-Sessions, die seit mehr als `stunden` Stunden nicht fortgesetzt wurden"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT * FROM upload_sessions
+                    WHERE updated_at < datetime('now', ?)
+                """, (f'-{int(stunden)} hours',))
+                sessions = [dict(row) for row in cursor.fetchall()]
+                conn.close()
+                return sessions
+        
+        except Exception as e:
+            logger.error(f"Fehler beim Laden abgelaufener Upload-Sessions: {e}")
+            return []
+    
+    @staticmethod
+    def _uebernehme_derivate(cursor, upload_id):
+        """Kopiert die Derivate eines fertig verarbeiteten Uploads mit gleichem Inhalts-Hash"""
+        cursor.execute("""
+            SELECT quelle.id FROM gaeste_uploads quelle
+            JOIN gaeste_uploads ziel ON ziel.content_hash = quelle.content_hash
+            WHERE ziel.id = ? AND quelle.id != ziel.id AND quelle.media_status = 'ready'
+              AND EXISTS (SELECT 1 FROM upload_derivate WHERE upload_id = quelle.id)
+            ORDER BY quelle.id LIMIT 1
+        """, (upload_id,))
+        quelle = cursor.fetchone()
+        if not quelle:
+            return False
+        
+        cursor.execute("""
+            INSERT OR IGNORE INTO upload_derivate
+            (upload_id, variante, format, mime_type, pfad, breite, hoehe, dateigroesse)
+            SELECT ?, variante, format, mime_type, pfad, breite, hoehe, dateigroesse
+            FROM upload_derivate WHERE upload_id = ?
+        """, (upload_id, quelle[0]))
+        cursor.execute("""
+            UPDATE gaeste_uploads
+            SET media_status = 'ready',
+                (blurhash, aufnahme_zeit, orientierung, bild_breite, bild_hoehe, phash) = (
+                    SELECT blurhash, aufnahme_zeit, orientierung, bild_breite, bild_hoehe, phash
+                    FROM gaeste_uploads WHERE id = ?
+                )
+            WHERE id = ?
+        """, (quelle[0], upload_id))
+        cursor.execute("""
+            INSERT OR REPLACE INTO upload_phash_baender (upload_id, band, wert)
+            SELECT ?, band, wert FROM upload_phash_baender WHERE upload_id = ?
+        """, (upload_id, quelle[0]))
+        self._bump_serien_version(cursor)
+        return True
+    
+    @staticmethod
+    def _phash_baender(phash):
+        """Zerlegt einen 64-Bit-Hash (Hex) in PHASH_BAENDER Bänder für den Index"""
+        wert = int(phash, 16)
+        bits = 64 // PHASH_BAENDER
+        maske = (1 << bits) - 1
+        return [(band, (wert >> (band * bits)) & maske) for band in range(PHASH_BAENDER)]
+    
+    @staticmethod
+    def _bump_serien_version(cursor):
+        """Erhöht die Serienversion innerhalb der laufenden Transaktion (verwirft gecachte Serien)"""
+        cursor.execute("UPDATE upload_serien_version SET version = version + 1 WHERE id = 1")
+    
+    def _speichere_bild_metadaten(self, cursor, upload_id, metadaten):
+        """Schreibt EXIF-Daten und Wahrnehmungs-Hash eines Uploads (samt Band-Index)"""
+        cursor.execute("""
+            UPDATE gaeste_uploads
+            SET aufnahme_zeit = ?, orientierung = ?, bild_breite = ?, bild_hoehe = ?, phash = ?
+            WHERE id = ?
+        """, (metadaten.get('aufnahme_zeit'), metadaten.get('orientierung'), metadaten.get('breite'),
+              metadaten.get('hoehe'), metadaten.get('phash'), upload_id))
+        
+        cursor.execute("DELETE FROM upload_phash_baender WHERE upload_id = ?", (upload_id,))
+        if metadaten.get('phash'):
+            cursor.executemany(
+                "INSERT INTO upload_phash_baender (upload_id, band, wert) VALUES (?, ?, ?)",
+                [(upload_id, band, wert) for band, wert in self._phash_baender(metadaten['phash'])]
+            )
+        self._bump_serien_version(cursor)
+    
+    def enqueue_media_job(self, upload_id, typ='derivate', prioritaet=0):
+        """
+        Reiht einen Verarbeitungs-Job für einen Upload ein
+        
+        Existiert bereits ein offener Job, wird höchstens dessen Priorität erhöht.
+        Wurde derselbe Inhalt schon verarbeitet, werden dessen Derivate übernommen.
+        
+        Returns:
+            True wenn ein Job offen ist (bzw. die Derivate übernommen wurden), sonst False
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                # Gleicher Inhalt bereits verarbeitet: Derivate übernehmen statt neu zu rechnen
+                if typ == 'derivate' and self._uebernehme_derivate(cursor, upload_id):
+                    conn.commit()
+                    conn.close()
+                    return True
+                
+                cursor.execute("""
+                    INSERT OR IGNORE INTO media_jobs (upload_id, typ, prioritaet)
+                    VALUES (?, ?, ?)
+                """, (upload_id, typ, prioritaet))
+                
+                if cursor.rowcount == 0:
+                    cursor.execute("""
+                        UPDATE media_jobs SET prioritaet = MAX(prioritaet, ?), updated_at = CURRENT_TIMESTAMP
+                        WHERE upload_id = ? AND typ = ? AND status IN ('pending', 'processing')
+                    """, (prioritaet, upload_id, typ))
+                else:
+                    cursor.execute("UPDATE gaeste_uploads SET media_status = 'pending' WHERE id = ?", (upload_id,))
+                
+                conn.commit()
+                conn.close()
+                return True
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Einreihen des Medien-Jobs für Upload {upload_id}: {e}")
+            return False
+    
+    def enqueue_missing_media_jobs(self, videos_ohne_poster=False):
+        """
+        Reiht Jobs für alle Uploads ein, deren Derivate noch fehlen (z.B. Altbestand)
+        
+        Args:
+            videos_ohne_poster: Auch Videos, die bisher nur den Platzhalter haben
+                                (sobald ffmpeg verfügbar ist)
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                # Offene Uploads sowie Bilder (bzw. Videos), denen die großen Varianten noch fehlen
+                dateitypen = ['image', 'video'] if videos_ohne_poster else ['image']
+                cursor.execute(f"""
+                    INSERT OR IGNORE INTO media_jobs (upload_id, typ)
+                    SELECT gu.id, 'derivate' FROM gaeste_uploads gu
+                    WHERE (COALESCE(gu.media_status, 'pending') IN ('pending', 'processing')
+                           OR (gu.media_status = 'ready'
+                               AND gu.file_type IN ({','.join('?' * len(dateitypen))})
+                               AND NOT EXISTS (
+                                   SELECT 1 FROM upload_derivate ud
+                                   WHERE ud.upload_id = gu.id AND ud.variante = 'large'
+                               ))
+                           OR (gu.media_status = 'ready'
+                               AND (gu.blurhash IS NULL OR (gu.file_type = 'image' AND gu.phash IS NULL))
+                               AND EXISTS (
+                                   SELECT 1 FROM upload_derivate ud
+                                   WHERE ud.upload_id = gu.id AND ud.variante = 'thumb'
+                               )))
+                      AND NOT EXISTS (
+                          SELECT 1 FROM media_jobs mj
+                          WHERE mj.upload_id = gu.id AND mj.status IN ('pending', 'processing')
+                      )
+                """, dateitypen)
+                eingereiht = cursor.rowcount
+                
+                conn.commit()
+                conn.close()
+                
+                if eingereiht:
+                    logger.info(f"🖼️ {eingereiht} Medien-Jobs für bestehende Uploads eingereiht")
+                return eingereiht
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Einreihen fehlender Medien-Jobs: {e}")
+            return 0
+    
+    def claim_media_job(self, worker_name, sperrzeit_sekunden=600, upload_id=None):
+        """
+        Holt atomar den nächsten fälligen Job aus der Queue
+        
+        Jobs, deren Sperre abgelaufen ist (abgestürzter Worker), werden erneut vergeben.
+        Mit upload_id wird nur ein Job dieses Uploads abgeholt.
+        
+        Returns:
+            Dict mit 'id', 'upload_id', 'typ', 'versuche' oder None
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE media_jobs
+                    SET status = 'processing', versuche = versuche + 1, gesperrt_von = ?,
+                        gesperrt_am = datetime('now'), updated_at = CURRENT_TIMESTAMP
+                    WHERE id = (
+                        SELECT id FROM media_jobs
+                        WHERE ((status = 'pending' AND naechster_versuch <= datetime('now'))
+                               OR (status = 'processing' AND gesperrt_am <= datetime('now', ?)))
+                          AND (? IS NULL OR upload_id = ?)
+                        ORDER BY prioritaet DESC, id
+                        LIMIT 1
+                    )
+                    RETURNING id, upload_id, typ, versuche
+                """, (worker_name, f'-{int(sperrzeit_sekunden)} seconds', upload_id, upload_id))
+                row = cursor.fetchone()
+                
+                if row:
+                    cursor.execute("UPDATE gaeste_uploads SET media_status = 'processing' WHERE id = ?", (row[1],))
+                
+                conn.commit()
+                conn.close()
+                
+                if not row:
+                    return None
+                return {'id': row[0], 'upload_id': row[1], 'typ': row[2], 'versuche': row[3]}
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Abholen eines Medien-Jobs: {e}")
+            return None
+    
+    def complete_media_job(self, job_id, upload_id, derivate, content_hash=None, blurhash=None, metadaten=None):
+        """
+        Schließt einen Job ab und speichert die erzeugten Derivate
+        
+        Args:
+            derivate: Liste von Dicts mit 'variante', 'format', 'mime_type', 'pfad',
+                      'breite', 'hoehe', 'dateigroesse'
+            content_hash: SHA-256 der Originaldatei (falls berechnet)
+            blurhash: Unscharfer Platzhalter für die Galerie (falls berechnet)
+            metadaten: EXIF-Aufnahmezeit, Ausrichtung, Maße und Wahrnehmungs-Hash (nur Bilder)
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO upload_derivate
+                    (upload_id, variante, format, mime_type, pfad, breite, hoehe, dateigroesse)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (upload_id, d['variante'], d['format'], d['mime_type'], d['pfad'],
+                     d.get('breite'), d.get('hoehe'), d.get('dateigroesse'))
+                    for d in derivate
+                ])
+                
+                cursor.execute("""
+                    UPDATE media_jobs
+                    SET status = 'done', gesperrt_von = NULL, letzter_fehler = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (job_id,))
+                cursor.execute("""
+                    UPDATE gaeste_uploads
+                    SET media_status = 'ready', content_hash = COALESCE(?, content_hash),
+                        blurhash = COALESCE(?, blurhash)
+                    WHERE id = ?
+                """, (content_hash, blurhash, upload_id))
+                if metadaten:
+                    self._speichere_bild_metadaten(cursor, upload_id, metadaten)
+                
+                # Wartende Uploads mit gleichem Inhalt gleich mitversorgen
+                if derivate:
+                    cursor.execute("""
+                        SELECT gu.id FROM gaeste_uploads gu
+                        JOIN media_jobs mj ON mj.upload_id = gu.id AND mj.typ = 'derivate' AND mj.status = 'pending'
+                        WHERE gu.content_hash = (SELECT content_hash FROM gaeste_uploads WHERE id = ?)
+                          AND gu.id != ?
+                    """, (upload_id, upload_id))
+                    for (duplikat_id,) in cursor.fetchall():
+                        if self._uebernehme_derivate(cursor, duplikat_id):
+                            cursor.execute("""
+                                UPDATE media_jobs SET status = 'done', updated_at = CURRENT_TIMESTAMP
+                                WHERE upload_id = ? AND typ = 'derivate' AND status = 'pending'
+                            """, (duplikat_id,))
+                
+                conn.commit()
+                conn.close()
+                return True
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Abschließen des Medien-Jobs {job_id}: {e}")
+            return False
+    
+    def fail_media_job(self, job_id, fehler):
+        """
+        Markiert einen Job als fehlgeschlagen
+        
+        Solange Versuche übrig sind, wird er mit exponentiellem Backoff erneut eingeplant.
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT upload_id, versuche, max_versuche FROM media_jobs WHERE id = ?", (job_id,))
+                row = cursor.fetchone()
+                if not row:
+                    conn.close()
+                    return False
+                
+                upload_id, versuche, max_versuche = row
+                if versuche < max_versuche:
+                    wartezeit = min(30 * 2 ** (versuche - 1), 3600)
+                    cursor.execute("""
+                        UPDATE media_jobs
+                        SET status = 'pending', gesperrt_von = NULL, letzter_fehler = ?,
+                            naechster_versuch = datetime('now', ?), updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ?
+                    """, (str(fehler)[:1000], f'+{wartezeit} seconds', job_id))
+                    cursor.execute("UPDATE gaeste_uploads SET media_status = 'pending' WHERE id = ?", (upload_id,))
+                else:
+                    cursor.execute("""
+                        UPDATE media_jobs
+                        SET status = 'failed', gesperrt_von = NULL, letzter_fehler = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ?
+                    """, (str(fehler)[:1000], job_id))
+                    cursor.execute("UPDATE gaeste_uploads SET media_status = 'failed' WHERE id = ?", (upload_id,))
+                
+                conn.commit()
+                conn.close()
+                
+                logger.warning(f"⚠️ Medien-Job {job_id} (Upload {upload_id}) fehlgeschlagen, Versuch {versuche}/{max_versuche}: {fehler}")
+                return True
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Markieren des Medien-Jobs {job_id}: {e}")
+            return False
+    
+    def retry_failed_media_jobs(self):
+        """Plant alle endgültig fehlgeschlagenen Jobs erneut ein"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE gaeste_uploads SET media_status = 'pending'
+                    WHERE id IN (SELECT upload_id FROM media_jobs WHERE status = 'failed')
+                """)
+                cursor.execute("""
+                    UPDATE OR IGNORE media_jobs
+                    SET status = 'pending', versuche = 0, naechster_versuch = datetime('now'),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE status = 'failed'
+                """)
+                anzahl = cursor.rowcount
+                
+                conn.commit()
+                conn.close()
+                return anzahl
+                
+        except Exception as e:
+            logger.error(f"Fehler beim erneuten Einplanen der Medien-Jobs: {e}")
+            return 0
+    
+    def get_media_job_statistics(self, fehler_limit=20):
+        """Backlog-Übersicht der Medien-Pipeline für Admins"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT status, COUNT(*) FROM media_jobs GROUP BY status")
+                jobs = {'pending': 0, 'processing': 0, 'done': 0, 'failed': 0}
+                jobs.update({status: anzahl for status, anzahl in cursor.fetchall()})
+                
+                cursor.execute("""
+                    SELECT CAST((julianday('now') - julianday(MIN(created_at))) * 86400 AS INTEGER)
+                    FROM media_jobs WHERE status = 'pending'
+                """)
+                aeltester_job = cursor.fetchone()[0]
+                
+                cursor.execute("""
+                    SELECT COALESCE(media_status, 'pending'), COUNT(*) FROM gaeste_uploads
+                    GROUP BY COALESCE(media_status, 'pending')
+                """)
+                uploads = dict(cursor.fetchall())
+                
+                cursor.execute("""
+                    SELECT mj.id, mj.upload_id, gu.original_filename, mj.status, mj.versuche,
+                           mj.letzter_fehler, mj.updated_at
+                    FROM media_jobs mj
+                    LEFT JOIN gaeste_uploads gu ON gu.id = mj.upload_id
+                    WHERE mj.letzter_fehler IS NOT NULL AND mj.status IN ('pending', 'failed')
+                    ORDER BY mj.updated_at DESC
+                    LIMIT ?
+                """, (fehler_limit,))
+                fehler = [
+                    {
+                        'job_id': row[0],
+                        'upload_id': row[1],
+                        'original_filename': row[2],
+                        'status': row[3],
+                        'versuche': row[4],
+                        'fehler': row[5],
+                        'updated_at': row[6]
+                    }
+                    for row in cursor.fetchall()
+                ]
+                
+                conn.close()
+                return {
+                    'jobs': jobs,
+                    'backlog': jobs['pending'] + jobs['processing'],
+                    'oldest_pending_seconds': aeltester_job,
+                    'uploads': uploads,
+                    'errors': fehler
+                }
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Medien-Pipeline-Statistik: {e}")
+            return {'jobs': {}, 'backlog': 0, 'oldest_pending_seconds': None, 'uploads': {}, 'errors': []}
+    
+    def get_upload_derivate(self, upload_id):
+        """Lädt alle vorberechneten Derivate eines Uploads"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT variante, format, mime_type, pfad, breite, hoehe, dateigroesse
+                    FROM upload_derivate WHERE upload_id = ?
+                """, (upload_id,))
+                rows = cursor.fetchall()
+                conn.close()
+                
+                return [
+                    {
+                        'variante': row[0],
+                        'format': row[1],
+                        'mime_type': row[2],
+                        'pfad': row[3],
+                        'breite': row[4],
+                        'hoehe': row[5],
+                        'dateigroesse': row[6]
+                    }
+                    for row in rows
+                ]
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Derivate für Upload {upload_id}: {e}")
+            return []
+    
+    def get_upload_statistics(self):
+        """Lädt Upload-Statistiken für Admin"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                # Gesamt-Uploads
+                cursor.execute("SELECT COUNT(*) FROM gaeste_uploads")
+                total_uploads = cursor.fetchone()[0]
+                
+                # Gesamt-Größe
+                cursor.execute("SELECT COALESCE(SUM(file_size), 0) FROM gaeste_uploads")
+                total_size = cursor.fetchone()[0]
+                
+                # Bilder zählen (nach file_type)
+                cursor.execute("SELECT COUNT(*) FROM gaeste_uploads WHERE file_type = 'image'")
+                total_images = cursor.fetchone()[0]
+                
+                # Videos zählen (nach file_type)
+                cursor.execute("SELECT COUNT(*) FROM gaeste_uploads WHERE file_type = 'video'")
+                total_videos = cursor.fetchone()[0]
+                
+                # Aktive Gäste (mit Uploads)
+                cursor.execute("""
+                    SELECT COUNT(DISTINCT gast_id) FROM gaeste_uploads
+                """)
+                active_guests = cursor.fetchone()[0]
+                
+                # Uploads der letzten 7 Tage
+                cursor.execute("""
+                    SELECT COUNT(*) FROM gaeste_uploads 
+                    WHERE upload_date >= datetime('now', '-7 days')
+                """)
+                recent_uploads = cursor.fetchone()[0]
+                
+                conn.close()
+                
+                return {
+                    'total_uploads': total_uploads,
+                    'total_images': total_images,
+                    'total_videos': total_videos,
+                    'total_size': total_size,
+                    'active_guests': active_guests,
+                    'recent_uploads': recent_uploads
+                }
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Upload-Statistiken: {e}")
+            return {
+                'total_uploads': 0,
+                'total_images': 0,
+                'total_videos': 0,
+                'total_size': 0,
+                'active_guests': 0,
+                'recent_uploads': 0
+            }
+    
+    def get_all_uploads(self):
+        """Lädt alle Uploads für Admin"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT gu.id, gu.gast_id, gu.original_filename, gu.filename, gu.file_path,
+                           gu.file_size, gu.file_type, gu.mime_type, gu.beschreibung, gu.upload_date,
+                           gu.admin_approved, g.vorname, g.nachname
+                    FROM gaeste_uploads gu
+                    JOIN gaeste g ON gu.gast_id = g.id
+                    ORDER BY gu.upload_date DESC
+                """)
+                
+                uploads = []
+                for row in cursor.fetchall():
+                    uploads.append({
+                        'id': row[0],
+                        'gast_id': row[1],
+                        'original_filename': row[2],
+                        'filename': row[3],
+                        'file_path': row[4],
+                        'file_size': row[5],
+                        'file_type': row[6],
+                        'mime_type': row[7],
+                        'beschreibung': row[8],
+                        'upload_date': row[9],
+                        'admin_approved': row[10],
+                        'gast_vorname': row[11],
+                        'gast_nachname': row[12]
+                    })
+                
+                conn.close()
+                return uploads
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden aller Uploads: {e}")
+            return []
+    
+    def get_guests_with_uploads(self):
+        """Lädt Gäste mit Upload-Anzahl für Filter"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT g.id, g.vorname, g.nachname, COUNT(gu.id) as upload_count
+                    FROM gaeste g
+                    JOIN gaeste_uploads gu ON g.id = gu.gast_id
+                    GROUP BY g.id, g.vorname, g.nachname
+                    ORDER BY upload_count DESC, g.nachname, g.vorname
+                """)
+                
+                guests = []
+                for row in cursor.fetchall():
+                    guests.append({
+                        'id': row[0],
+                        'vorname': row[1],
+                        'nachname': row[2],
+                        'upload_count': row[3]
+                    })
+                
+                conn.close()
+                return guests
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Gäste mit Uploads: {e}")
+            return []
+    
+    def get_upload_details(self, upload_id):
+        """Lädt detaillierte Upload-Informationen"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT gu.id, gu.gast_id, gu.original_filename, gu.filename, gu.file_path,
+                           gu.file_size, gu.file_type, gu.mime_type, gu.beschreibung, gu.upload_date,
+                           g.vorname, g.nachname, g.email
+                    FROM gaeste_uploads gu
+                    JOIN gaeste g ON gu.gast_id = g.id
+                    WHERE gu.id = ?
+                """, (upload_id,))
+                
+                row = cursor.fetchone()
+                conn.close()
+                
+                if row:
+                    return {
+                        'id': row[0],
+                        'gast_id': row[1],
+                        'original_filename': row[2],
+                        'filename': row[3],
+                        'file_path': row[4],
+                        'file_size': row[5],
+                        'file_type': row[6],
+                        'mime_type': row[7],
+                        'beschreibung': row[8],
+                        'upload_date': row[9],
+                        'gast_vorname': row[10],
+                        'gast_nachname': row[11],
                         'gast_email': row[12]
                     }
                 
-                return None
+                return None
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Upload-Details: {e}")
+            return None
+
+    # =============================================================================
+    # E-Mail-Outbox (persistente Versand-Queue, siehe email_outbox.py)
+    # =============================================================================
+    
+    def _init_email_outbox_table(self):
+        """Initialisiert die Tabelle der E-Mail-Outbox"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                # Empfängerlisten als JSON; mit_signatur = 0, wenn Text/HTML die Signatur schon enthalten
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS email_outbox (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        kategorie TEXT NOT NULL DEFAULT 'manuell',
+                        batch_id TEXT,
+                        referenz TEXT,
+                        empfaenger TEXT NOT NULL,
+                        cc TEXT,
+                        bcc TEXT,
+                        betreff TEXT NOT NULL,
+                        text TEXT NOT NULL,
+                        html TEXT,
+                        mit_signatur INTEGER NOT NULL DEFAULT 1,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        prioritaet INTEGER NOT NULL DEFAULT 0,
+                        versuche INTEGER NOT NULL DEFAULT 0,
+                        max_versuche INTEGER NOT NULL DEFAULT 6,
+                        naechster_versuch DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        gesperrt_von TEXT,
+                        gesperrt_am DATETIME,
+                        letzter_fehler TEXT,
+                        smtp_code INTEGER,
+                        message_id TEXT,
+                        gesendet_am DATETIME,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        CONSTRAINT chk_email_outbox_status
+                            CHECK (status IN ('pending', 'sending', 'sent', 'failed', 'cancelled'))
+                    )
+                """)
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_email_outbox_queue
+                    ON email_outbox(status, prioritaet DESC, naechster_versuch)
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_email_outbox_batch ON email_outbox(batch_id)")
+                
+                conn.commit()
+                conn.close()
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Initialisieren der E-Mail-Outbox: {e}")
+    
+    @staticmethod
+    def _outbox_zeile(row):
+        return {
+            'id': row[0],
+            'kategorie': row[1],
+            'batch_id': row[2],
+            'referenz': row[3],
+            'to_emails': json.loads(row[4]),
+            'cc_emails': json.loads(row[5]) if row[5] else [],
+            'bcc_emails': json.loads(row[6]) if row[6] else [],
+            'subject': row[7],
+            'body': row[8],
+            'html_body': row[9],
+            'mit_signatur': bool(row[10]),
+            'versuche': row[11]
+        }
+    
+    def enqueue_emails(self, nachrichten, batch_id=None):
+        """
+        Reiht E-Mails in einer Transaktion in die Outbox ein
+        
+        Args:
+            nachrichten: Liste von Dicts mit 'to_emails', 'subject', 'body' und optional
+                         'html_body', 'cc_emails', 'bcc_emails', 'kategorie', 'referenz',
+                         'mit_signatur' (Standard True), 'prioritaet'
+            batch_id: Gemeinsame Kennung (z.B. eines Serienbrief-Laufs)
+        
+        Returns:
+            Liste der Outbox-IDs (leer bei Fehler)
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                ids = []
+                for nachricht in nachrichten:
+                    cursor.execute("""
+                        INSERT INTO email_outbox
+                        (kategorie, batch_id, referenz, empfaenger, cc, bcc, betreff, text, html, mit_signatur, prioritaet)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        nachricht.get('kategorie', 'manuell'),
+                        batch_id,
+                        str(nachricht['referenz']) if nachricht.get('referenz') is not None else None,
+                        json.dumps(nachricht['to_emails'], ensure_ascii=False),
+                        json.dumps(nachricht['cc_emails'], ensure_ascii=False) if nachricht.get('cc_emails') else None,
+                        json.dumps(nachricht['bcc_emails'], ensure_ascii=False) if nachricht.get('bcc_emails') else None,
+                        nachricht['subject'],
+                        nachricht['body'],
+                        nachricht.get('html_body'),
+                        1 if nachricht.get('mit_signatur', True) else 0,
+                        nachricht.get('prioritaet', 0)
+                    ))
+                    ids.append(cursor.lastrowid)
+                
+                conn.commit()
+                conn.close()
+                return ids
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Einreihen von {len(nachrichten)} E-Mails: {e}")
+            return []
+    
+    def claim_emails(self, worker_name, limit=20, sperrzeit_sekunden=300):
+        """
+        Holt atomar die nächsten fälligen E-Mails aus der Outbox
+        
+        E-Mails, deren Sperre abgelaufen ist (abgestürzter Sender), werden erneut vergeben.
+        
+        Returns:
+            Liste von Dicts (siehe _outbox_zeile), nach Priorität und Alter sortiert
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE email_outbox
+                    SET status = 'sending', versuche = versuche + 1, gesperrt_von = ?,
+                        gesperrt_am = datetime('now'), updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN (
+                        SELECT id FROM email_outbox
+                        WHERE (status = 'pending' AND naechster_versuch <= datetime('now'))
+                           OR (status = 'sending' AND gesperrt_am <= datetime('now', ?))
+                        ORDER BY prioritaet DESC, id
+                        LIMIT ?
+                    )
+                    RETURNING id, kategorie, batch_id, referenz, empfaenger, cc, bcc, betreff, text, html,
+                              mit_signatur, versuche, prioritaet
+                """, (worker_name, f'-{int(sperrzeit_sekunden)} seconds', limit))
+                rows = cursor.fetchall()
+                
+                conn.commit()
+                conn.close()
+                
+                rows.sort(key=lambda row: (-row[12], row[0]))
+                return [self._outbox_zeile(row) for row in rows]
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Abholen von E-Mails aus der Outbox: {e}")
+            return []
+    
+    def complete_email(self, email_id, message_id=None):
+        """Markiert eine E-Mail der Outbox als versendet"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE email_outbox
+                    SET status = 'sent', message_id = ?, gesendet_am = datetime('now'), gesperrt_von = NULL,
+                        letzter_fehler = NULL, smtp_code = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (message_id, email_id))
+                
+                conn.commit()
+                conn.close()
+                return True
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Abschließen der E-Mail {email_id}: {e}")
+            return False
+    
+    def fail_email(self, email_id, fehler, smtp_code=None, dauerhaft=False, wartezeit=None):
+        """
+        Markiert einen Versandversuch als fehlgeschlagen
+        
+        Vorübergehende Fehler werden mit exponentiellem Backoff erneut eingeplant,
+        solange Versuche übrig sind; dauerhafte (z.B. 550 Empfänger unbekannt) nicht.
+        
+        Returns:
+            Neuer Status ('pending' oder 'failed') oder None bei Fehler
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT versuche, max_versuche FROM email_outbox WHERE id = ?", (email_id,))
+                row = cursor.fetchone()
+                if not row:
+                    conn.close()
+                    return None
+                
+                versuche, max_versuche = row
+                if not dauerhaft and versuche < max_versuche:
+                    status = 'pending'
+                    if wartezeit is None:
+                        wartezeit = min(60 * 2 ** (versuche - 1), 3600)
+                else:
+                    status = 'failed'
+                    wartezeit = 0
+                
+                cursor.execute("""
+                    UPDATE email_outbox
+                    SET status = ?, gesperrt_von = NULL, letzter_fehler = ?, smtp_code = ?,
+                        naechster_versuch = datetime('now', ?), updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (status, str(fehler)[:1000], smtp_code, f'+{int(wartezeit)} seconds', email_id))
+                
+                conn.commit()
+                conn.close()
+                return status
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Markieren der E-Mail {email_id}: {e}")
+            return None
+    
+    def release_emails(self, email_ids, wartezeit=0, fehler=None):
+        """
+        Gibt abgeholte, aber nicht versuchte E-Mails zurück (z.B. bei Rate-Limit)
+        
+        Der Versuch wird nicht angerechnet.
+        """
+        if not email_ids:
+            return 0
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                cursor.execute(f"""
+                    UPDATE email_outbox
+                    SET status = 'pending', versuche = MAX(versuche - 1, 0), gesperrt_von = NULL,
+                        letzter_fehler = COALESCE(?, letzter_fehler),
+                        naechster_versuch = datetime('now', ?), updated_at = CURRENT_TIMESTAMP
+                    WHERE id IN ({','.join('?' * len(email_ids))}) AND status = 'sending'
+                """, [fehler, f'+{int(wartezeit)} seconds'] + list(email_ids))
+                anzahl = cursor.rowcount
+                
+                conn.commit()
+                conn.close()
+                return anzahl
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Zurückgeben von E-Mails an die Outbox: {e}")
+            return 0
+    
+    def get_outbox_emails(self, email_ids=None, batch_id=None, status=None, limit=200):
+        """
+        Versandstatus einzelner E-Mails der Outbox
+        
+        Args:
+            email_ids: Nur diese IDs
+            batch_id: Nur E-Mails dieses Laufs
+            status: Nur E-Mails mit diesem Status
+        """
+        try:
+            bedingungen, parameter = [], []
+            if email_ids:
+                bedingungen.append(f"id IN ({','.join('?' * len(email_ids))})")
+                parameter.extend(email_ids)
+            if batch_id:
+                bedingungen.append("batch_id = ?")
+                parameter.append(batch_id)
+            if status:
+                bedingungen.append("status = ?")
+                parameter.append(status)
+            where = f"WHERE {' AND '.join(bedingungen)}" if bedingungen else ""
+            
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute(f"""
+                    SELECT id, kategorie, batch_id, referenz, empfaenger, betreff, status, versuche,
+                           naechster_versuch, letzter_fehler, smtp_code, message_id, gesendet_am, created_at
+                    FROM email_outbox {where}
+                    ORDER BY id DESC
+                    LIMIT ?
+                """, parameter + [limit])
+                rows = cursor.fetchall()
+                conn.close()
+                
+                return [
+                    {
+                        'id': row[0],
+                        'kategorie': row[1],
+                        'batch_id': row[2],
+                        'referenz': row[3],
+                        'to_emails': json.loads(row[4]),
+                        'subject': row[5],
+                        'status': row[6],
+                        'versuche': row[7],
+                        'naechster_versuch': row[8],
+                        'fehler': row[9],
+                        'smtp_code': row[10],
+                        'message_id': row[11],
+                        'gesendet_am': row[12],
+                        'created_at': row[13]
+                    }
+                    for row in rows
+                ]
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Outbox-E-Mails: {e}")
+            return []
+    
+    def get_email_outbox_referenzen(self, kategorie):
+        """Referenzen (z.B. Gast-IDs), an die E-Mails dieser Kategorie eingereiht oder versendet sind"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT DISTINCT referenz FROM email_outbox
+                    WHERE kategorie = ? AND referenz IS NOT NULL AND status IN ('pending', 'sending', 'sent')
+                """, (kategorie,))
+                referenzen = {row[0] for row in cursor.fetchall()}
+                conn.close()
+                return referenzen
                 
         except Exception as e:
-            logger.error(f"Fehler beim Laden der Upload-Details: {e}")
-            return None
-
+            logger.error(f"Fehler beim Laden der Outbox-Referenzen ({kategorie}): {e}")
+            return set()
+    
+    def get_email_outbox_statistics(self, batch_id=None, fehler_limit=20):
+        """Backlog-Übersicht der E-Mail-Outbox (optional für einen Lauf)"""
+        try:
+            filter_sql = "WHERE batch_id = ?" if batch_id else ""
+            filter_parameter = [batch_id] if batch_id else []
+            
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute(f"SELECT status, COUNT(*) FROM email_outbox {filter_sql} GROUP BY status",
+                               filter_parameter)
+                emails = {'pending': 0, 'sending': 0, 'sent': 0, 'failed': 0, 'cancelled': 0}
+                emails.update({status: anzahl for status, anzahl in cursor.fetchall()})
+                
+                cursor.execute(f"""
+                    SELECT CAST((julianday('now') - julianday(MIN(created_at))) * 86400 AS INTEGER),
+                           MIN(naechster_versuch)
+                    FROM email_outbox {filter_sql} {'AND' if filter_sql else 'WHERE'} status = 'pending'
+                """, filter_parameter)
+                aelteste, naechster_versuch = cursor.fetchone()
+                
+                cursor.execute(f"""
+                    SELECT id, empfaenger, status, versuche, smtp_code, letzter_fehler, updated_at
+                    FROM email_outbox {filter_sql} {'AND' if filter_sql else 'WHERE'} letzter_fehler IS NOT NULL
+                      AND status IN ('pending', 'failed')
+                    ORDER BY updated_at DESC
+                    LIMIT ?
+                """, filter_parameter + [fehler_limit])
+                fehler = [
+                    {
+                        'id': row[0],
+                        'to_emails': json.loads(row[1]),
+                        'status': row[2],
+                        'versuche': row[3],
+                        'smtp_code': row[4],
+                        'fehler': row[5],
+                        'updated_at': row[6]
+                    }
+                    for row in cursor.fetchall()
+                ]
+                
+                statistik = {
+                    'emails': emails,
+                    'oldest_pending_seconds': aelteste,
+                    'next_attempt': naechster_versuch,
+                    'errors': fehler
+                }
+                
+                if batch_id:
+                    # Zeitraum eines Laufs (für den Durchsatz)
+                    cursor.execute("""
+                        SELECT MIN(created_at), MIN(gesendet_am), MAX(gesendet_am),
+                               CAST((julianday(MAX(gesendet_am)) - julianday(MIN(created_at))) * 86400 AS INTEGER)
+                        FROM email_outbox WHERE batch_id = ?
+                    """, (batch_id,))
+                    erstellt, erste, letzte, sekunden = cursor.fetchone()
+                    statistik.update({
+                        'created_at': erstellt,
+                        'first_sent_at': erste,
+                        'last_sent_at': letzte,
+                        'sending_seconds': sekunden
+                    })
+                conn.close()
+                
+                return statistik
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Outbox-Statistik: {e}")
+            return {'emails': {}, 'oldest_pending_seconds': None, 'next_attempt': None, 'errors': []}
+    
+    def retry_failed_emails(self, batch_id=None):
+        """Plant endgültig fehlgeschlagene E-Mails erneut ein"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE email_outbox
+                    SET status = 'pending', versuche = 0, naechster_versuch = datetime('now'),
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE status = 'failed' AND (? IS NULL OR batch_id = ?)
+                """, (batch_id, batch_id))
+                anzahl = cursor.rowcount
+                
+                conn.commit()
+                conn.close()
+                return anzahl
+                
+        except Exception as e:
+            logger.error(f"Fehler beim erneuten Einplanen der E-Mails: {e}")
+            return 0
+    
+    def cancel_emails(self, batch_id=None, email_ids=None):
+        """Bricht noch nicht versendete E-Mails ab (ganzer Lauf oder einzelne IDs)"""
+        if not batch_id and not email_ids:
+            return 0
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                if email_ids:
+                    cursor.execute(f"""
+                        UPDATE email_outbox SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP
+                        WHERE status = 'pending' AND id IN ({','.join('?' * len(email_ids))})
+                    """, list(email_ids))
+                else:
+                    cursor.execute("""
+                        UPDATE email_outbox SET status = 'cancelled', updated_at = CURRENT_TIMESTAMP
+                        WHERE status = 'pending' AND batch_id = ?
+                    """, (batch_id,))
+                anzahl = cursor.rowcount
+                
+                conn.commit()
+                conn.close()
+                return anzahl
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Abbrechen von E-Mails: {e}")
+            return 0
+    
     # =============================================================================
     # PHOTO GALLERY METHODEN
     # =============================================================================
     
     def approve_upload(self, upload_id):
-        """Genehmigt einen Upload für die Foto-Galerie"""
+        """Genehmigt einen Upload für die Foto-Galerie (inkl. ausstehender Duplikate mit gleichem Inhalt)"""
         try:
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
@@ -5146,10 +6473,13 @@ class SQLiteHochzeitsDatenManager:
                 cursor.execute("""
                     UPDATE gaeste_uploads 
                     SET admin_approved = 1, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ? AND admin_approved = 0
-                """, (upload_id,))
+                    WHERE admin_approved = 0
+                      AND (id = ? OR content_hash = (SELECT content_hash FROM gaeste_uploads WHERE id = ?))
+                """, (upload_id, upload_id))
                 
                 rows_affected = cursor.rowcount
+                if rows_affected:
+                    self._bump_serien_version(cursor)
                 conn.commit()
                 conn.close()
                 
@@ -5165,7 +6495,7 @@ class SQLiteHochzeitsDatenManager:
             return False
     
     def reject_upload(self, upload_id):
-        """Lehnt einen Upload ab (setzt admin_approved auf -1)"""
+        """Lehnt einen Upload ab (setzt admin_approved auf -1, auch für ausstehende Duplikate)"""
         try:
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
@@ -5175,9 +6505,13 @@ class SQLiteHochzeitsDatenManager:
                     UPDATE gaeste_uploads 
                     SET admin_approved = -1, updated_at = CURRENT_TIMESTAMP
                     WHERE id = ?
-                """, (upload_id,))
+                       OR (admin_approved = 0
+                           AND content_hash = (SELECT content_hash FROM gaeste_uploads WHERE id = ?))
+                """, (upload_id, upload_id))
                 
                 rows_affected = cursor.rowcount
+                if rows_affected:
+                    self._bump_serien_version(cursor)
                 conn.commit()
                 conn.close()
                 
@@ -5193,7 +6527,12 @@ class SQLiteHochzeitsDatenManager:
             return False
     
     def get_pending_uploads(self):
-        """Lädt alle noch nicht genehmigten Uploads (admin_approved = 0)"""
+        """
+        Lädt alle noch nicht genehmigten Uploads (admin_approved = 0)
+        
+        Uploads mit identischem Inhalt werden zu einem Eintrag zusammengefasst;
+        die weiteren stehen in 'duplicates' und werden mit genehmigt/abgelehnt.
+        """
         try:
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
@@ -5202,7 +6541,7 @@ class SQLiteHochzeitsDatenManager:
                 cursor.execute("""
                     SELECT gu.id, gu.gast_id, gu.original_filename, gu.filename, gu.file_path,
                            gu.file_size, gu.file_type, gu.mime_type, gu.beschreibung, gu.upload_date,
-                           gu.admin_approved, g.vorname, g.nachname
+                           gu.admin_approved, g.vorname, g.nachname, gu.content_hash
                     FROM gaeste_uploads gu
                     JOIN gaeste g ON gu.gast_id = g.id
                     WHERE gu.admin_approved = 0
@@ -5210,8 +6549,20 @@ class SQLiteHochzeitsDatenManager:
                 """)
                 
                 uploads = []
+                nach_hash = {}
                 for row in cursor.fetchall():
-                    uploads.append({
+                    content_hash = row[13]
+                    if content_hash and content_hash in nach_hash:
+                        nach_hash[content_hash]['duplicates'].append({
+                            'id': row[0],
+                            'gast_id': row[1],
+                            'gast_vorname': row[11],
+                            'gast_nachname': row[12],
+                            'upload_date': row[9]
+                        })
+                        continue
+                    
+                    upload = {
                         'id': row[0],
                         'gast_id': row[1],
                         'original_filename': row[2],
@@ -5224,8 +6575,12 @@ class SQLiteHochzeitsDatenManager:
                         'upload_date': row[9],
                         'admin_approved': row[10],
                         'gast_vorname': row[11],
-                        'gast_nachname': row[12]
-                    })
+                        'gast_nachname': row[12],
+                        'duplicates': []
+                    }
+                    if content_hash:
+                        nach_hash[content_hash] = upload
+                    uploads.append(upload)
                 
                 conn.close()
                 return uploads
@@ -5237,13 +6592,10 @@ class SQLiteHochzeitsDatenManager:
     def get_approved_uploads(self):
         """Lädt alle genehmigten Uploads für die Foto-Galerie (admin_approved = 1)"""
         try:
-            logger.info("🎯 Database: get_approved_uploads called")
-            
             with self._lock:
                 conn = sqlite3.connect(self.db_path)
                 cursor = conn.cursor()
                 
-                logger.info("📡 Database: Executing query for approved uploads...")
                 cursor.execute("""
                     SELECT gu.id, gu.gast_id, gu.original_filename, gu.filename, gu.file_path,
                            gu.file_size, gu.file_type, gu.mime_type, gu.beschreibung, gu.upload_date,
@@ -5259,15 +6611,12 @@ class SQLiteHochzeitsDatenManager:
                     FROM gaeste_uploads gu
                     LEFT JOIN gaeste g ON gu.gast_id = g.id
                     WHERE gu.admin_approved = 1
-                    ORDER BY gu.upload_date DESC
+                    ORDER BY gu.upload_date DESC, gu.id DESC
                 """)
                 
-                rows = cursor.fetchall()
-                logger.info(f"📦 Database: Found {len(rows)} approved uploads in database")
-                
                 uploads = []
-                for row in rows:
-                    upload = {
+                for row in cursor.fetchall():
+                    uploads.append({
                         'id': row[0],
                         'gast_id': row[1],
                         'original_filename': row[2],
@@ -5281,17 +6630,311 @@ class SQLiteHochzeitsDatenManager:
                         'admin_approved': row[10],
                         'gast_vorname': row[11],
                         'gast_nachname': row[12]
-                    }
-                    uploads.append(upload)
-                    logger.info(f"📋 Database: Upload {upload['id']}: {upload['original_filename']} by {upload['gast_vorname']} {upload['gast_nachname']}")
+                    })
                 
                 conn.close()
-                logger.info(f"✅ Database: Returning {len(uploads)} approved uploads")
+                logger.debug(f"Database: {len(uploads)} genehmigte Uploads geladen")
                 return uploads
                 
         except Exception as e:
             logger.error(f"❌ Database: Fehler beim Laden der genehmigten Uploads: {e}")
             return []
+    
+    def get_approved_uploads_seite(self, limit=50, nach=None, file_type=None, zeitraum=None, ausblenden=None):
+        """
+        Eine Seite der Foto-Galerie per Keyset-Paginierung (neueste zuerst)
+        
+        Statt OFFSET wird ab dem letzten gelieferten (upload_date, id) weitergelesen -
+        über den Index idx_gaeste_uploads_galerie, stabil auch wenn währenddessen
+        neue Uploads genehmigt werden.
+        
+        Args:
+            limit: Anzahl Einträge pro Seite
+            nach: (upload_date, id) des letzten Eintrags der vorigen Seite oder None
+            file_type: Optional 'image' oder 'video'
+            zeitraum: Optional (von, bis) als 'YYYY-MM-DD HH:MM:SS' - nur Aufnahmen
+                      in diesem Zeitraum (EXIF-Aufnahmezeit)
+            ausblenden: Optional Upload-IDs, die nicht geliefert werden (z.B. weitere
+                        Bilder einer Serie)
+        
+        Returns:
+            (Liste kompakter Einträge, (upload_date, id) für die nächste Seite oder None)
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                bedingungen = ["gu.admin_approved = 1"]
+                parameter = []
+                if nach:
+                    bedingungen.append("(gu.upload_date, gu.id) < (?, ?)")
+                    parameter.extend(nach)
+                if file_type:
+                    bedingungen.append("gu.file_type = ?")
+                    parameter.append(file_type)
+                if zeitraum:
+                    bedingungen.append("gu.aufnahme_zeit >= ? AND gu.aufnahme_zeit < ?")
+                    parameter.extend(zeitraum)
+                if ausblenden:
+                    bedingungen.append("gu.id NOT IN (SELECT value FROM json_each(?))")
+                    parameter.append(json.dumps(list(ausblenden)))
+                
+                # Maße des Thumbnails für das Seitenverhältnis im Raster
+                cursor.execute(f"""
+                    SELECT gu.id, gu.original_filename, gu.file_type, gu.mime_type, gu.upload_date,
+                           gu.blurhash, ud.breite, ud.hoehe, gu.aufnahme_zeit,
+                           CASE 
+                               WHEN g.guest_code = 'admin_uploads' THEN 'Brautpaar'
+                               ELSE COALESCE(g.vorname, 'Administrator') 
+                           END as vorname, 
+                           CASE 
+                               WHEN g.guest_code = 'admin_uploads' THEN ''
+                               ELSE COALESCE(g.nachname, '') 
+                           END as nachname
+                    FROM gaeste_uploads gu
+                    LEFT JOIN gaeste g ON gu.gast_id = g.id
+                    LEFT JOIN upload_derivate ud
+                           ON ud.upload_id = gu.id AND ud.variante = 'thumb' AND ud.format = 'jpeg'
+                    WHERE {' AND '.join(bedingungen)}
+                    ORDER BY gu.upload_date DESC, gu.id DESC
+                    LIMIT ?
+                """, parameter + [limit + 1])
+                rows = cursor.fetchall()
+                conn.close()
+                
+                weitere = len(rows) > limit
+                rows = rows[:limit]
+                uploads = [{
+                    'id': row[0],
+                    'original_filename': row[1],
+                    'file_type': row[2],
+                    'mime_type': row[3],
+                    'upload_date': row[4],
+                    'blurhash': row[5],
+                    'breite': row[6],
+                    'hoehe': row[7],
+                    'aufnahme_zeit': row[8],
+                    'gast_vorname': row[9],
+                    'gast_nachname': row[10]
+                } for row in rows]
+                
+                naechste = (rows[-1][4], rows[-1][0]) if weitere and rows else None
+                return uploads, naechste
+                
+        except Exception as e:
+            logger.error(f"❌ Database: Fehler beim Laden der Galerie-Seite: {e}")
+            return [], None
+    
+    @staticmethod
+    def _hamming(phash_a, phash_b):
+        return bin(int(phash_a, 16) ^ int(phash_b, 16)).count('1')
+    
+    def get_aehnliche_uploads(self, upload_id, max_abstand=SERIEN_MAX_ABSTAND):
+        """
+        Nahezu gleiche Bilder zu einem Upload (Hamming-Abstand des Wahrnehmungs-Hashes)
+        
+        Returns:
+            Liste von {'id', 'abstand'} aufsteigend nach Abstand
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT phash FROM gaeste_uploads WHERE id = ?", (upload_id,))
+                row = cursor.fetchone()
+                if not row or not row[0]:
+                    conn.close()
+                    return []
+                phash = row[0]
+                
+                # Kandidaten: mindestens ein Band stimmt exakt überein
+                cursor.execute(f"""
+                    SELECT DISTINCT gu.id, gu.phash
+                    FROM upload_phash_baender b
+                    JOIN gaeste_uploads gu ON gu.id = b.upload_id
+                    WHERE (b.band, b.wert) IN (VALUES {','.join(['(?, ?)'] * PHASH_BAENDER)})
+                      AND b.upload_id != ? AND gu.admin_approved = 1
+                """, [x for band in self._phash_baender(phash) for x in band] + [upload_id])
+                kandidaten = cursor.fetchall()
+                conn.close()
+                
+                aehnliche = []
+                for kandidat_id, kandidat_phash in kandidaten:
+                    abstand = self._hamming(phash, kandidat_phash)
+                    if abstand <= max_abstand:
+                        aehnliche.append({'id': kandidat_id, 'abstand': abstand})
+                return sorted(aehnliche, key=lambda a: (a['abstand'], a['id']))
+                
+        except Exception as e:
+            logger.error(f"Fehler bei der Ähnlichkeitssuche für Upload {upload_id}: {e}")
+            return []
+    
+    def get_upload_serien(self, max_abstand=SERIEN_MAX_ABSTAND, zeitfenster=SERIEN_ZEITFENSTER_SEKUNDEN):
+        """
+        Gruppiert genehmigte, nahezu gleiche Bilder zu Serien (z.B. Serienaufnahmen)
+        
+        Zwei Bilder gehören zusammen, wenn ihre Wahrnehmungs-Hashes höchstens
+        max_abstand Bit auseinanderliegen und - sofern beide eine EXIF-Aufnahmezeit
+        haben - sie innerhalb von zeitfenster Sekunden entstanden sind.
+        
+        Das Ergebnis wird gecacht, bis sich die Serienversion ändert (Genehmigung,
+        Ablehnung, Löschen oder neuer Wahrnehmungs-Hash).
+        
+        Returns:
+            Liste von {'repraesentant': id, 'ids': [...]} (nur Serien mit mehr als einem Bild)
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT version FROM upload_serien_version WHERE id = 1")
+                row = cursor.fetchone()
+                cache_key = (row[0] if row else 0, max_abstand, zeitfenster)
+                cache = self._upload_serien_cache
+                if cache is not None and cache['key'] == cache_key:
+                    conn.close()
+                    return [{'repraesentant': s['repraesentant'], 'ids': list(s['ids'])} for s in cache['serien']]
+                
+                # Paare genehmigter Bilder mit mindestens einem gleichen Band (über den Index)
+                cursor.execute("""
+                    SELECT DISTINCT a.upload_id, b.upload_id
+                    FROM upload_phash_baender a
+                    JOIN gaeste_uploads ga
+                      ON ga.id = a.upload_id AND ga.admin_approved = 1 AND ga.phash IS NOT NULL
+                    JOIN upload_phash_baender b
+                      ON b.band = a.band AND b.wert = a.wert AND b.upload_id > a.upload_id
+                    JOIN gaeste_uploads gb
+                      ON gb.id = b.upload_id AND gb.admin_approved = 1 AND gb.phash IS NOT NULL
+                """)
+                paare = cursor.fetchall()
+                
+                cursor.execute("""
+                    SELECT id, phash, aufnahme_zeit FROM gaeste_uploads
+                    WHERE admin_approved = 1 AND phash IS NOT NULL
+                """)
+                bilder = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+                conn.close()
+            
+            def sekunden(zeit):
+                return datetime.strptime(zeit, '%Y-%m-%d %H:%M:%S').timestamp() if zeit else None
+            
+            # Union-Find über alle passenden Paare
+            eltern = {}
+            
+            def wurzel(x):
+                while eltern[x] != x:
+                    eltern[x] = eltern[eltern[x]]
+                    x = eltern[x]
+                return x
+            
+            for a, b in paare:
+                if a not in bilder or b not in bilder:
+                    continue
+                (phash_a, zeit_a), (phash_b, zeit_b) = bilder[a], bilder[b]
+                if self._hamming(phash_a, phash_b) > max_abstand:
+                    continue
+                if zeit_a and zeit_b and abs(sekunden(zeit_a) - sekunden(zeit_b)) > zeitfenster:
+                    continue
+                eltern.setdefault(a, a)
+                eltern.setdefault(b, b)
+                wurzel_a, wurzel_b = wurzel(a), wurzel(b)
+                if wurzel_a != wurzel_b:
+                    eltern[max(wurzel_a, wurzel_b)] = min(wurzel_a, wurzel_b)
+            
+            gruppen = {}
+            for upload_id in eltern:
+                gruppen.setdefault(wurzel(upload_id), []).append(upload_id)
+            
+            # Das zuerst hochgeladene Bild repräsentiert die Serie
+            serien = [
+                {'repraesentant': min(ids), 'ids': sorted(ids)}
+                for ids in gruppen.values() if len(ids) > 1
+            ]
+            self._upload_serien_cache = {'key': cache_key, 'serien': serien}
+            return [{'repraesentant': s['repraesentant'], 'ids': list(s['ids'])} for s in serien]
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Gruppieren der Serienbilder: {e}")
+            return []
+    
+    def get_zeitplan_zeitfenster(self):
+        """
+        Zeitfenster der Zeitplan-Einträge am Hochzeitstag
+        
+        Die Einträge speichern nur die Uhrzeit verlässlich; das Datum kommt aus der
+        Einstellung 'hochzeitsdatum'. Ohne Endzeit gilt ein Eintrag bis zum Beginn
+        des nächsten (bzw. eine Stunde).
+        
+        Returns:
+            Liste von Dicts mit 'id', 'titel', 'von', 'bis' ('YYYY-MM-DD HH:MM:SS')
+        """
+        hochzeitsdatum = None
+        wert = str(self.get_setting('hochzeitsdatum', '') or '').strip()
+        for format in ('%Y-%m-%d', '%d.%m.%Y'):
+            try:
+                hochzeitsdatum = datetime.strptime(wert[:10], format).date()
+                break
+            except ValueError:
+                continue
+        
+        def zeitpunkt(start_zeit):
+            if not start_zeit:
+                return None
+            teile = str(start_zeit).replace('T', ' ').split(' ')
+            try:
+                uhrzeit = datetime.strptime(teile[-1][:5], '%H:%M').time()
+                datum = hochzeitsdatum or datetime.strptime(teile[0], '%Y-%m-%d').date()
+            except ValueError:
+                return None
+            return datetime.combine(datum, uhrzeit)
+        
+        eintraege = []
+        for eintrag in self.get_zeitplan():
+            von = zeitpunkt(eintrag.get('start_zeit'))
+            if von:
+                eintraege.append((von, zeitpunkt(eintrag.get('end_zeit')), eintrag))
+        eintraege.sort(key=lambda e: e[0])
+        
+        fenster = []
+        for index, (von, bis, eintrag) in enumerate(eintraege):
+            if not bis or bis <= von:
+                naechster = next((e[0] for e in eintraege[index + 1:] if e[0] > von), None)
+                bis = naechster or von + timedelta(hours=1)
+            fenster.append({
+                'id': eintrag['id'],
+                'titel': eintrag.get('titel'),
+                'von': von.strftime('%Y-%m-%d %H:%M:%S'),
+                'bis': bis.strftime('%Y-%m-%d %H:%M:%S')
+            })
+        return fenster
+    
+    def get_zeitplan_galerie(self):
+        """
+        Anzahl genehmigter Aufnahmen je Zeitplan-Eintrag (über den Index auf aufnahme_zeit)
+        
+        Returns:
+            Liste der Zeitfenster aus get_zeitplan_zeitfenster mit 'anzahl'
+        """
+        try:
+            fenster = self.get_zeitplan_zeitfenster()
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                for eintrag in fenster:
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM gaeste_uploads
+                        WHERE aufnahme_zeit >= ? AND aufnahme_zeit < ? AND admin_approved = 1
+                    """, (eintrag['von'], eintrag['bis']))
+                    eintrag['anzahl'] = cursor.fetchone()[0]
+                conn.close()
+            return fenster
+            
+        except Exception as e:
+            logger.error(f"Fehler beim Zuordnen der Aufnahmen zum Zeitplan: {e}")
+            return []
 
     # =============================================================================
     # TISCHPLANUNG METHODEN
@@ -5381,6 +7024,43 @@ class SQLiteHochzeitsDatenManager:
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_zuordnungen_tisch ON tisch_zuordnungen(tisch_id)")
                 cursor.execute("CREATE INDEX IF NOT EXISTS idx_zuordnungen_gast ON tisch_zuordnungen(gast_id)")
                 
+                # Planversion für Optimistic Locking (wird bei jeder Sitzplan-Änderung erhöht)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS tischplan_version (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        version INTEGER NOT NULL DEFAULT 0,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                cursor.execute("INSERT OR IGNORE INTO tischplan_version (id, version) VALUES (1, 0)")
+                
+                # Änderungsprotokoll für die Live-Tischplanung (ein Eintrag pro Planversion)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS tischplan_events (
+                        version INTEGER PRIMARY KEY,
+                        typ TEXT NOT NULL,
+                        daten TEXT,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                
+                # Sitzplan-Szenarien (Gast -> Tisch als kompakte Integer-Arrays)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS tischplan_szenarien (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL UNIQUE,
+                        beschreibung TEXT,
+                        gast_ids BLOB NOT NULL,
+                        tisch_ids BLOB NOT NULL,
+                        basis_version INTEGER,
+                        erstellt_aus INTEGER,
+                        uebernommen_am DATETIME,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                conn.commit()
+                
                 # Standard-Konfiguration
                 cursor.execute("INSERT OR IGNORE INTO tischplanung_config (id, standard_tisch_groesse) VALUES (1, 8)")
                 
@@ -5465,6 +7145,17 @@ class SQLiteHochzeitsDatenManager:
                 ))
                 
                 tisch_id = cursor.lastrowid
+                self._bump_tischplan_version(cursor, 'table_add', {
+                    'tisch': {
+                        'id': tisch_id,
+                        'name': tisch_data.get('name'),
+                        'beschreibung': tisch_data.get('beschreibung', ''),
+                        'max_personen': tisch_data.get('max_personen', 8),
+                        'x_position': tisch_data.get('x_position', 0.0),
+                        'y_position': tisch_data.get('y_position', 0.0),
+                        'farbe': tisch_data.get('farbe', '#007bff')
+                    }
+                })
                 conn.commit()
                 conn.close()
                 
@@ -5512,6 +7203,18 @@ class SQLiteHochzeitsDatenManager:
                 ))
                 
                 success = cursor.rowcount > 0
+                if success:
+                    self._bump_tischplan_version(cursor, 'table_update', {
+                        'tisch': {
+                            'id': tisch_id,
+                            'name': name,
+                            'beschreibung': beschreibung,
+                            'max_personen': max_personen,
+                            'x_position': tisch_data.get('x_position', 0.0),
+                            'y_position': tisch_data.get('y_position', 0.0),
+                            'farbe': farbe
+                        }
+                    })
                 conn.commit()
                 conn.close()
                 
@@ -5537,6 +7240,8 @@ class SQLiteHochzeitsDatenManager:
                 cursor.execute("UPDATE tische SET aktiv = 0, updated_at = CURRENT_TIMESTAMP WHERE id = ?", (tisch_id,))
                 
                 success = cursor.rowcount > 0
+                if success:
+                    self._bump_tischplan_version(cursor, 'table_delete', {'tisch_id': tisch_id})
                 conn.commit()
                 conn.close()
                 
@@ -5708,12 +7413,93 @@ class SQLiteHochzeitsDatenManager:
                     })
                 
                 conn.close()
-                return zuordnungen
+                return zuordnungen
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Tischzuordnungen: {e}")
+            return []
+    
+    def get_tischplan_overview(self):
+        """
+        Lädt alle aktiven Tische samt zugeordneten Gästen und Belegung in einer JOIN-Abfrage
+        
+        Returns:
+            Liste von Tischen mit 'table_id', 'table_name', 'max_personen',
+            'guests' und 'total_persons' (Summe anzahl_essen, mindestens 1 pro Gast)
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT version FROM tischplan_version WHERE id = 1")
+                row = cursor.fetchone()
+                version = row[0] if row else 0
+                
+                cursor.execute("""
+                    SELECT t.id, t.name, t.max_personen,
+                           g.id, g.vorname, g.nachname, g.kategorie, g.seite, g.anzahl_essen, g.kind
+                    FROM tische t
+                    LEFT JOIN tisch_zuordnungen tz ON tz.tisch_id = t.id
+                    LEFT JOIN gaeste g ON g.id = tz.gast_id
+                    WHERE t.aktiv = 1
+                    ORDER BY t.id, tz.position, tz.id
+                """)
+                
+                tables = {}
+                for row in cursor.fetchall():
+                    tisch_id = row[0]
+                    table = tables.get(tisch_id)
+                    if table is None:
+                        table = tables[tisch_id] = {
+                            'table_id': tisch_id,
+                            'table_name': row[1] or f'Tisch {tisch_id}',
+                            'max_personen': row[2],
+                            'guests': [],
+                            'total_persons': 0
+                        }
+                    
+                    if row[3] is None:
+                        continue
+                    
+                    persons_count = row[8] or 1
+                    table['guests'].append({
+                        'guest_id': row[3],
+                        'name': f"{row[4] or ''} {row[5] or ''}".strip(),
+                        'category': row[6] or 'Unbekannt',
+                        'side': row[7] or '',
+                        'persons': persons_count,
+                        'children': row[9] or 0
+                    })
+                    table['total_persons'] += persons_count
+                
+                conn.close()
                 
+                self._tisch_belegung_cache = {
+                    'version': version,
+                    'belegung': {tisch_id: t['total_persons'] for tisch_id, t in tables.items()}
+                }
+                return list(tables.values())
+        
         except Exception as e:
-            logger.error(f"Fehler beim Laden der Tischzuordnungen: {e}")
+            logger.error(f"Fehler beim Laden der Tischübersicht: {e}")
             return []
     
+    def get_tisch_belegung(self):
+        """
+        Gibt die Belegung (Personen je Tisch-ID) zurück
+        
+        Das Ergebnis wird gecacht und verworfen, sobald sich die Planversion ändert
+        (jede Zuordnungs- oder Tischänderung und jede Änderung an zugeordneten Gästen).
+        """
+        cache = self._tisch_belegung_cache
+        if cache is not None and cache['version'] == self.get_tischplan_version():
+            return dict(cache['belegung'])
+        
+        self.get_tischplan_overview()
+        cache = self._tisch_belegung_cache
+        return dict(cache['belegung']) if cache else {}
+    
     def assign_gast_to_tisch(self, gast_id, tisch_id, position=None, zugeordnet_von="System"):
         """Weist einen Gast einem Tisch zu"""
         try:
@@ -5744,6 +7530,7 @@ class SQLiteHochzeitsDatenManager:
                     VALUES (?, ?, ?, ?)
                 """, (tisch_id, gast_id, position, zugeordnet_von))
                 
+                self._bump_tischplan_version(cursor, 'assign', {'gast_id': gast_id, 'tisch_id': tisch_id})
                 conn.commit()
                 conn.close()
                 
@@ -5764,6 +7551,8 @@ class SQLiteHochzeitsDatenManager:
                 cursor.execute("DELETE FROM tisch_zuordnungen WHERE gast_id = ?", (gast_id,))
                 
                 success = cursor.rowcount > 0
+                if success:
+                    self._bump_tischplan_version(cursor, 'unassign', {'gast_id': gast_id})
                 conn.commit()
                 conn.close()
                 
@@ -5785,6 +7574,7 @@ class SQLiteHochzeitsDatenManager:
                 cursor.execute("DELETE FROM tisch_zuordnungen")
                 
                 deleted_count = cursor.rowcount
+                self._bump_tischplan_version(cursor, 'clear')
                 conn.commit()
                 conn.close()
                 
@@ -5795,6 +7585,530 @@ class SQLiteHochzeitsDatenManager:
             logger.error(f"Fehler beim Entfernen aller Zuordnungen: {e}")
             return 0
     
+    def _bump_tischplan_version(self, cursor, typ='update', daten=None):
+        """
+        Erhöht die Planversion innerhalb der laufenden Transaktion und
+        protokolliert die Änderung für die Live-Tischplanung
+        
+        Returns:
+            Die neue Planversion
+        """
+        cursor.execute("""
+            UPDATE tischplan_version
+            SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1
+        """)
+        cursor.execute("SELECT version FROM tischplan_version WHERE id = 1")
+        row = cursor.fetchone()
+        version = row[0] if row else 0
+        
+        cursor.execute(
+            "INSERT OR REPLACE INTO tischplan_events (version, typ, daten) VALUES (?, ?, ?)",
+            (version, typ, json.dumps(daten or {}, separators=(',', ':')))
+        )
+        
+        # Protokoll begrenzen - ältere Clients laden den Plan dann komplett neu
+        if version % 100 == 0:
+            cursor.execute("DELETE FROM tischplan_events WHERE version <= ?",
+                           (version - TISCHPLAN_EVENTS_BEHALTEN,))
+        return version
+    
+    def _bump_tischplan_version_fuer_gast(self, cursor, gast_id):
+        """
+        Erhöht die Planversion, wenn ein zugeordneter Gast geändert oder gelöscht wird
+        
+        So verwerfen alle Worker ihren Belegungs-Cache und Live-Clients laden
+        die Übersicht neu. Für Gäste ohne Tisch bleibt die Version unverändert.
+        
+        Returns:
+            Die neue Planversion oder None
+        """
+        cursor.execute("SELECT tisch_id FROM tisch_zuordnungen WHERE gast_id = ?", (gast_id,))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return self._bump_tischplan_version(cursor, 'guest', {'gast_id': gast_id, 'tisch_id': row[0]})
+    
+    def get_tischplan_events(self, since_version, limit=500):
+        """
+        Lädt protokollierte Sitzplan-Änderungen nach einer Planversion
+        
+        Returns:
+            Liste von Dicts mit 'version', 'typ', 'daten' (aufsteigend sortiert)
+            oder None, wenn die Lücke nicht mehr vollständig im Protokoll liegt
+        """
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT version FROM tischplan_version WHERE id = 1")
+                row = cursor.fetchone()
+                current_version = row[0] if row else 0
+                
+                if current_version <= since_version:
+                    conn.close()
+                    return []
+                
+                cursor.execute("""
+                    SELECT version, typ, daten FROM tischplan_events
+                    WHERE version > ?
+                    ORDER BY version
+                    LIMIT ?
+                """, (since_version, limit))
+                rows = cursor.fetchall()
+                conn.close()
+                
+                # Lückenlos? Sonst muss der Client neu laden
+                if not rows or rows[0][0] != since_version + 1:
+                    return None
+                
+                return [
+                    {'version': version, 'typ': typ, 'daten': json.loads(daten) if daten else {}}
+                    for version, typ, daten in rows
+                ]
+        
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Sitzplan-Änderungen: {e}")
+            return None
+    
+    def get_tischplan_version(self):
+        """Gibt die aktuelle Version des Sitzplans zurück (für Optimistic Locking)"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("SELECT version FROM tischplan_version WHERE id = 1")
+                row = cursor.fetchone()
+                
+                conn.close()
+                return row[0] if row else 0
+        
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Planversion: {e}")
+            return 0
+    
+    def apply_seating_plan(self, plan):
+        """
+        Schreibt einen kompletten Sitzplan atomar in einer einzigen Transaktion
+        
+        Args:
+            plan: Dict mit folgenden Schlüsseln
+                version: Erwartete Planversion; weicht sie ab, wird nichts geschrieben
+                new_tables: Neue Tische, jeweils mit 'ref' als temporärem Schlüssel
+                table_updates: Tisch-Änderungen mit 'id' und optional 'name', 'max_personen', 'farbe'
+                assignments: Zuordnungen mit 'gast_id', 'tisch_id' (ID oder 'ref'),
+                             optional 'position' und 'zugeordnet_von'
+                replace_all: Alle bestehenden Zuordnungen ersetzen (Standard: True)
+        
+        Returns:
+            Dict mit 'success', 'version', 'table_ids' (ref -> neue Tisch-ID)
+            bzw. 'conflict' und 'current_version' bei Versionskonflikt
+        """
+        conn = None
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                
+                # Schreibsperre sofort holen, damit Versionsprüfung und Schreiben atomar sind
+                cursor.execute("BEGIN IMMEDIATE")
+                
+                cursor.execute("SELECT version FROM tischplan_version WHERE id = 1")
+                row = cursor.fetchone()
+                current_version = row[0] if row else 0
+                
+                expected_version = plan.get('version')
+                if expected_version is not None and int(expected_version) != current_version:
+                    conn.rollback()
+                    conn.close()
+                    logger.warning(f"⚠️ Sitzplan-Konflikt: erwartet Version {expected_version}, aktuell {current_version}")
+                    return {
+                        'success': False,
+                        'conflict': True,
+                        'current_version': current_version,
+                        'message': 'Der Sitzplan wurde zwischenzeitlich von einer anderen Session geändert.'
+                    }
+                
+                # Neue Tische anlegen (IDs werden für die Zuordnungen benötigt)
+                table_ids = {}
+                for tisch_data in plan.get('new_tables', []):
+                    cursor.execute("""
+                        INSERT INTO tische (name, beschreibung, max_personen, x_position, y_position, farbe)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """, (
+                        tisch_data.get('name'),
+                        tisch_data.get('beschreibung', ''),
+                        tisch_data.get('max_personen', 8),
+                        tisch_data.get('x_position', 0.0),
+                        tisch_data.get('y_position', 0.0),
+                        tisch_data.get('farbe', '#007bff')
+                    ))
+                    table_ids[tisch_data['ref']] = cursor.lastrowid
+                
+                # Bestehende Tische anpassen
+                table_updates = plan.get('table_updates', [])
+                if table_updates:
+                    cursor.executemany("""
+                        UPDATE tische
+                        SET name = COALESCE(?, name),
+                            max_personen = COALESCE(?, max_personen),
+                            farbe = COALESCE(?, farbe),
+                            updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ?
+                    """, [
+                        (update.get('name'), update.get('max_personen'), update.get('farbe'), update['id'])
+                        for update in table_updates
+                    ])
+                
+                # Zuordnungen auflösen (temporäre Tisch-Referenzen -> echte IDs)
+                rows = []
+                for assignment in plan.get('assignments', []):
+                    tisch_id = assignment['tisch_id']
+                    if tisch_id in table_ids:
+                        tisch_id = table_ids[tisch_id]
+                    elif not isinstance(tisch_id, int):
+                        raise ValueError(f"Unbekannte Tisch-Referenz: {tisch_id}")
+                    rows.append((
+                        tisch_id,
+                        assignment['gast_id'],
+                        assignment.get('position'),
+                        assignment.get('zugeordnet_von', 'System')
+                    ))
+                
+                if plan.get('replace_all', True):
+                    cursor.execute("DELETE FROM tisch_zuordnungen")
+                else:
+                    cursor.executemany("DELETE FROM tisch_zuordnungen WHERE gast_id = ?",
+                                       [(row[1],) for row in rows])
+                
+                cursor.executemany("""
+                    INSERT INTO tisch_zuordnungen (tisch_id, gast_id, position, zugeordnet_von)
+                    VALUES (?, ?, ?, ?)
+                """, rows)
+                
+                new_version = self._bump_tischplan_version(cursor, 'plan', {
+                    'replace_all': bool(plan.get('replace_all', True)),
+                    'assignments': [[row[1], row[0]] for row in rows],
+                    'tables': [
+                        {
+                            'id': table_ids[tisch_data['ref']],
+                            'name': tisch_data.get('name'),
+                            'beschreibung': tisch_data.get('beschreibung', ''),
+                            'max_personen': tisch_data.get('max_personen', 8),
+                            'x_position': tisch_data.get('x_position', 0.0),
+                            'y_position': tisch_data.get('y_position', 0.0),
+                            'farbe': tisch_data.get('farbe', '#007bff')
+                        }
+                        for tisch_data in plan.get('new_tables', [])
+                    ],
+                    'table_updates': [
+                        {key: update.get(key) for key in ('id', 'name', 'max_personen', 'farbe')
+                         if update.get(key) is not None}
+                        for update in table_updates
+                    ]
+                })
+                
+                conn.commit()
+                conn.close()
+                
+                logger.info(f"✅ Sitzplan angewendet: {len(rows)} Zuordnungen, {len(table_ids)} neue Tische, "
+                            f"{len(table_updates)} Tisch-Änderungen (Version {new_version})")
+                return {
+                    'success': True,
+                    'version': new_version,
+                    'table_ids': table_ids,
+                    'assigned_count': len(rows)
+                }
+        
+        except Exception as e:
+            logger.error(f"Fehler beim Anwenden des Sitzplans: {e}")
+            if conn:
+                try:
+                    conn.rollback()
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            return {'success': False, 'message': str(e)}
+    
+    # =============================================================================
+    # Sitzplan-Szenarien
+    # =============================================================================
+    
+    def get_tischplan_szenarien(self):
+        """Lädt alle gespeicherten Sitzplan-Szenarien (ohne Zuordnungsdaten)"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT id, name, beschreibung, length(gast_ids) / 4, basis_version,
+                           erstellt_aus, uebernommen_am, created_at, updated_at
+                    FROM tischplan_szenarien
+                    ORDER BY created_at, id
+                """)
+                
+                szenarien = []
+                for row in cursor.fetchall():
+                    szenarien.append({
+                        'id': row[0],
+                        'name': row[1],
+                        'beschreibung': row[2],
+                        'anzahl_zuordnungen': row[3],
+                        'basis_version': row[4],
+                        'erstellt_aus': row[5],
+                        'uebernommen_am': row[6],
+                        'created_at': row[7],
+                        'updated_at': row[8]
+                    })
+                
+                conn.close()
+                return szenarien
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden der Szenarien: {e}")
+            return []
+    
+    def get_tischplan_szenario(self, szenario_id):
+        """Lädt ein Szenario inkl. SitzplanSzenario-Objekt unter dem Schlüssel 'szenario'"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT id, name, beschreibung, gast_ids, tisch_ids, basis_version,
+                           erstellt_aus, uebernommen_am, created_at, updated_at
+                    FROM tischplan_szenarien
+                    WHERE id = ?
+                """, (szenario_id,))
+                row = cursor.fetchone()
+                conn.close()
+                
+                if not row:
+                    return None
+                
+                return {
+                    'id': row[0],
+                    'name': row[1],
+                    'beschreibung': row[2],
+                    'szenario': SitzplanSzenario.from_bytes(row[3], row[4]),
+                    'basis_version': row[5],
+                    'erstellt_aus': row[6],
+                    'uebernommen_am': row[7],
+                    'created_at': row[8],
+                    'updated_at': row[9]
+                }
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Laden des Szenarios {szenario_id}: {e}")
+            return None
+    
+    def create_tischplan_szenario(self, name, beschreibung='', szenario=None):
+        """
+        Speichert ein neues Szenario
+        
+        Args:
+            name: Eindeutiger Name (z.B. 'Familien zusammen')
+            beschreibung: Optionale Beschreibung
+            szenario: SitzplanSzenario; ohne Angabe wird der aktuelle Sitzplan übernommen
+        
+        Returns:
+            ID des neuen Szenarios oder None
+        """
+        try:
+            basis_version = self.get_tischplan_version()
+            if szenario is None:
+                szenario = SitzplanSzenario.from_zuordnungen(self.get_tisch_zuordnungen())
+            gast_bytes, tisch_bytes = szenario.to_bytes()
+            
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    INSERT INTO tischplan_szenarien (name, beschreibung, gast_ids, tisch_ids, basis_version)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (name, beschreibung, gast_bytes, tisch_bytes, basis_version))
+                
+                szenario_id = cursor.lastrowid
+                conn.commit()
+                conn.close()
+                
+                logger.info(f"✅ Szenario '{name}' gespeichert ({len(szenario)} Zuordnungen, ID: {szenario_id})")
+                return szenario_id
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern des Szenarios: {e}")
+            return None
+    
+    def clone_tischplan_szenario(self, szenario_id, name, beschreibung=None):
+        """Klont ein Szenario unter neuem Namen (kopiert nur die beiden BLOBs)"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    INSERT INTO tischplan_szenarien (name, beschreibung, gast_ids, tisch_ids, basis_version, erstellt_aus)
+                    SELECT ?, COALESCE(?, beschreibung), gast_ids, tisch_ids, basis_version, id
+                    FROM tischplan_szenarien
+                    WHERE id = ?
+                """, (name, beschreibung, szenario_id))
+                
+                new_id = cursor.lastrowid if cursor.rowcount > 0 else None
+                conn.commit()
+                conn.close()
+                
+                if new_id:
+                    logger.info(f"✅ Szenario {szenario_id} als '{name}' geklont (ID: {new_id})")
+                return new_id
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Klonen des Szenarios: {e}")
+            return None
+    
+    def update_tischplan_szenario(self, szenario_id, aenderungen=None, name=None, beschreibung=None):
+        """
+        Ändert ein Szenario
+        
+        Args:
+            aenderungen: Liste von (gast_id, tisch_id); tisch_id None entfernt den Gast
+            name: Neuer Name (optional)
+            beschreibung: Neue Beschreibung (optional)
+        """
+        try:
+            with self._lock:
+                eintrag = self.get_tischplan_szenario(szenario_id)
+                if not eintrag:
+                    return False
+                
+                szenario = eintrag['szenario']
+                for gast_id, tisch_id in aenderungen or []:
+                    if tisch_id is None:
+                        szenario.unassign(gast_id)
+                    else:
+                        szenario.assign(gast_id, tisch_id)
+                gast_bytes, tisch_bytes = szenario.to_bytes()
+                
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    UPDATE tischplan_szenarien
+                    SET name = COALESCE(?, name), beschreibung = COALESCE(?, beschreibung),
+                        gast_ids = ?, tisch_ids = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                """, (name, beschreibung, gast_bytes, tisch_bytes, szenario_id))
+                
+                success = cursor.rowcount > 0
+                conn.commit()
+                conn.close()
+                return success
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Aktualisieren des Szenarios: {e}")
+            return False
+    
+    def delete_tischplan_szenario(self, szenario_id):
+        """Löscht ein Szenario"""
+        try:
+            with self._lock:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                
+                cursor.execute("DELETE FROM tischplan_szenarien WHERE id = ?", (szenario_id,))
+                
+                success = cursor.rowcount > 0
+                conn.commit()
+                conn.close()
+                return success
+                
+        except Exception as e:
+            logger.error(f"Fehler beim Löschen des Szenarios: {e}")
+            return False
+    
+    def compare_tischplan_szenarien(self, szenario_ids, include_live=True):
+        """
+        Bewertet mehrere Szenarien (und optional den aktuellen Sitzplan) mit derselben Zielfunktion
+        
+        Gäste, Beziehungen und Tische werden dafür nur einmal geladen.
+        """
+        gaeste = self.get_gaeste_list()
+        beziehungen = self.get_gast_beziehungen()
+        tische = self.get_tische()
+        
+        vergleich = []
+        if include_live:
+            live = SitzplanSzenario.from_zuordnungen(self.get_tisch_zuordnungen())
+            vergleich.append({
+                'id': None,
+                'name': 'Aktueller Sitzplan',
+                'anzahl_zuordnungen': len(live),
+                'bewertung': bewerte_sitzplan(live, gaeste, beziehungen, tische)
+            })
+        
+        for szenario_id in szenario_ids:
+            eintrag = self.get_tischplan_szenario(szenario_id)
+            if not eintrag:
+                continue
+            vergleich.append({
+                'id': eintrag['id'],
+                'name': eintrag['name'],
+                'anzahl_zuordnungen': len(eintrag['szenario']),
+                'bewertung': bewerte_sitzplan(eintrag['szenario'], gaeste, beziehungen, tische)
+            })
+        
+        return vergleich
+    
+    def promote_tischplan_szenario(self, szenario_id, version=None, zugeordnet_von='Szenario'):
+        """
+        Übernimmt ein Szenario als aktuellen Sitzplan (ersetzt alle tisch_zuordnungen)
+        
+        Zuordnungen zu inzwischen gelöschten Tischen oder Gästen werden übersprungen.
+        """
+        eintrag = self.get_tischplan_szenario(szenario_id)
+        if not eintrag:
+            return {'success': False, 'message': 'Szenario nicht gefunden'}
+        
+        aktive_tische = {t['id'] for t in self.get_tische()}
+        gast_ids = {g['id'] for g in self.get_gaeste_list()}
+        
+        assignments = []
+        uebersprungen = 0
+        for gast_id, tisch_id in eintrag['szenario'].items():
+            if tisch_id not in aktive_tische or gast_id not in gast_ids:
+                uebersprungen += 1
+                continue
+            assignments.append({
+                'gast_id': gast_id,
+                'tisch_id': tisch_id,
+                'zugeordnet_von': f"{zugeordnet_von} '{eintrag['name']}'"
+            })
+        
+        result = self.apply_seating_plan({
+            'version': version,
+            'replace_all': True,
+            'assignments': assignments
+        })
+        
+        if result.get('success'):
+            result['uebersprungen'] = uebersprungen
+            try:
+                with self._lock:
+                    conn = sqlite3.connect(self.db_path)
+                    conn.execute("UPDATE tischplan_szenarien SET uebernommen_am = CURRENT_TIMESTAMP WHERE id = ?",
+                                 (szenario_id,))
+                    conn.commit()
+                    conn.close()
+            except Exception as e:
+                logger.warning(f"Übernahmezeitpunkt für Szenario {szenario_id} nicht gespeichert: {e}")
+            logger.info(f"✅ Szenario '{eintrag['name']}' übernommen ({len(assignments)} Zuordnungen, "
+                        f"{uebersprungen} übersprungen)")
+        return result
+    
     def get_tischplanung_config(self):
         """Lädt die Tischplanung-Konfiguration"""
         try:
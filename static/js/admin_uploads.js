@@ -15,6 +15,7 @@ function initAdminUploads() {
     // Load initial data
     loadUploadStatistics();
     loadAllUploads();
+    loadMediaPipelineStatus();
     
     // Setup filter event listeners
     setupFilterListeners();
@@ -185,6 +186,72 @@ async function loadUploadStatistics() {
     }
 }
 
+/**
+ * Load the backlog of the background media pipeline
+ */
+async function loadMediaPipelineStatus() {
+    try {
+        const response = await fetch('/api/admin/media-jobs', {
+            credentials: 'same-origin'
+        });
+        
+        if (!response.ok) {
+            throw new Error('Fehler beim Laden der Medien-Verarbeitung');
+        }
+        
+        const stats = await response.json();
+        const jobs = stats.jobs || {};
+        
+        const setText = (id, value) => {
+            const element = document.getElementById(id);
+            if (element) element.textContent = value;
+        };
+        
+        setText('mediaJobsPending', jobs.pending || 0);
+        setText('mediaJobsProcessing', jobs.processing || 0);
+        setText('mediaJobsDone', jobs.done || 0);
+        setText('mediaJobsFailed', jobs.failed || 0);
+        setText('mediaWorkers', stats.workers || 0);
+        setText('mediaJobsOldest', stats.oldest_pending_seconds != null ? `${stats.oldest_pending_seconds} s` : '-');
+        
+        const retryButton = document.getElementById('mediaRetryButton');
+        if (retryButton) retryButton.classList.toggle('d-none', !jobs.failed);
+        
+        const errorList = document.getElementById('mediaJobErrors');
+        if (errorList) {
+            errorList.innerHTML = (stats.errors || []).map(error =>
+                `<li>#${error.upload_id} ${escapeHtml(error.original_filename || '')}: ${escapeHtml(error.fehler || '')} (Versuch ${error.versuche})</li>`
+            ).join('');
+        }
+        
+    } catch (error) {
+    
+    }
+}
+
+/**
+ * Re-queue failed media jobs
+ */
+async function retryFailedMediaJobs() {
+    try {
+        const response = await fetch('/api/admin/media-jobs/retry', {
+            method: 'POST',
+            credentials: 'same-origin'
+        });
+        const result = await response.json();
+        
+        if (result.success) {
+            showToast('Medien-Verarbeitung', result.message, 'success');
+        } else {
+            showToast('Fehler', result.error || 'Jobs konnten nicht eingeplant werden', 'error');
+        }
+        loadMediaPipelineStatus();
+        
+    } catch (error) {
+        showToast('Fehler', 'Jobs konnten nicht eingeplant werden', 'error');
+    }
+}
+
 /**
  * Load all uploads and display them
  */
@@ -720,6 +787,7 @@ function refreshUploads() {
 
     loadUploadStatistics();
     loadAllUploads();
+    loadMediaPipelineStatus();
 }
 
 function downloadAllUploads() {
@@ -0,0 +1,103 @@
+// BlurHash-Decoder (https://blurha.sh)
+// Zeichnet den vom Server berechneten Platzhalter als unscharfes Mini-Bild,
+// bis das eigentliche Thumbnail geladen ist
+
+window.Blurhash = {
+    CHARS: '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~',
+    cache: new Map(),
+
+    decode83(str) {
+        let value = 0;
+        for (const char of str) {
+            value = value * 83 + this.CHARS.indexOf(char);
+        }
+        return value;
+    },
+
+    srgbToLinear(value) {
+        const v = value / 255;
+        return v <= 0.04045 ? v / 12.92 : Math.pow((v + 0.055) / 1.055, 2.4);
+    },
+
+    linearToSrgb(value) {
+        const v = Math.max(0, Math.min(1, value));
+        return v <= 0.0031308
+            ? Math.round(v * 12.92 * 255 + 0.5)
+            : Math.round((1.055 * Math.pow(v, 1 / 2.4) - 0.055) * 255 + 0.5);
+    },
+
+    signPow(value, exp) {
+        return Math.sign(value) * Math.pow(Math.abs(value), exp);
+    },
+
+    decode(hash, width, height) {
+        const sizeFlag = this.decode83(hash[0]);
+        const numY = Math.floor(sizeFlag / 9) + 1;
+        const numX = (sizeFlag % 9) + 1;
+        const maxValue = (this.decode83(hash[1]) + 1) / 166;
+
+        const colors = [];
+        for (let i = 0; i < numX * numY; i++) {
+            if (i === 0) {
+                const value = this.decode83(hash.substring(2, 6));
+                colors.push([
+                    this.srgbToLinear(value >> 16),
+                    this.srgbToLinear((value >> 8) & 255),
+                    this.srgbToLinear(value & 255)
+                ]);
+            } else {
+                const value = this.decode83(hash.substring(4 + i * 2, 6 + i * 2));
+                colors.push([
+                    this.signPow((Math.floor(value / 361) - 9) / 9, 2) * maxValue,
+                    this.signPow((Math.floor(value / 19) % 19 - 9) / 9, 2) * maxValue,
+                    this.signPow((value % 19 - 9) / 9, 2) * maxValue
+                ]);
+            }
+        }
+
+        const pixels = new Uint8ClampedArray(width * height * 4);
+        for (let y = 0; y < height; y++) {
+            for (let x = 0; x < width; x++) {
+                let r = 0, g = 0, b = 0;
+                for (let j = 0; j < numY; j++) {
+                    for (let i = 0; i < numX; i++) {
+                        const basis = Math.cos(Math.PI * x * i / width) * Math.cos(Math.PI * y * j / height);
+                        const color = colors[i + j * numX];
+                        r += color[0] * basis;
+                        g += color[1] * basis;
+                        b += color[2] * basis;
+                    }
+                }
+                const offset = 4 * (x + y * width);
+                pixels[offset] = this.linearToSrgb(r);
+                pixels[offset + 1] = this.linearToSrgb(g);
+                pixels[offset + 2] = this.linearToSrgb(b);
+                pixels[offset + 3] = 255;
+            }
+        }
+        return pixels;
+    },
+
+    // Data-URL zur Verwendung als CSS-Hintergrund (gecacht pro Hash)
+    toDataURL(hash, width = 32, height = 32) {
+        if (!hash || hash.length < 6) return null;
+        if (this.cache.has(hash)) return this.cache.get(hash);
+
+        try {
+            const canvas = document.createElement('canvas');
+            canvas.width = width;
+            canvas.height = height;
+            const ctx = canvas.getContext('2d');
+            const imageData = ctx.createImageData(width, height);
+            imageData.data.set(this.decode(hash, width, height));
+            ctx.putImageData(imageData, 0, 0);
+
+            const url = canvas.toDataURL();
+            this.cache.set(hash, url);
+            return url;
+        } catch (error) {
+            console.warn('⚠️ BlurHash konnte nicht dekodiert werden', error);
+            return null;
+        }
+    }
+};
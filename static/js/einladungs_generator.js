@@ -98,6 +98,12 @@ if (typeof selectTemplate === 'undefined') {
         }
     };
 
+    window.generatePrintPdf = function(paper) {
+        if (window.einladungsGenerator) {
+            window.einladungsGenerator.generatePrintPdf(paper);
+        }
+    };
+
     window.downloadTestCard = function() {
 
         if (window.einladungsGenerator) {
@@ -113,6 +119,7 @@ if (typeof selectTemplate === 'undefined') {
     updateColorFromText = window.updateColorFromText;
     generateTestCard = window.generateTestCard;
     generateAllCards = window.generateAllCards;
+    generatePrintPdf = window.generatePrintPdf;
     downloadTestCard = window.downloadTestCard;
     
 
@@ -128,6 +135,10 @@ class EinladungsGenerator {
         
         this.currentTemplate = 'elegant';
         this.guestData = [];
+        this.previewClientId = Math.random().toString(36).slice(2);
+        this.previewTimer = null;
+        this.previewController = null;
+        this.previewUrl = null;
         this.currentSettings = {
             primaryColor: '#8b7355',
             accentColor: '#d4af37',
@@ -451,6 +462,9 @@ class EinladungsGenerator {
         this.updatePreviewColors(preview);
         this.updatePreviewTexts(selectedGuest);
         this.updatePreviewLayout();
+        
+        // Gerenderte Karte nachziehen (wartet auf eine Eingabepause)
+        this.scheduleRenderedPreview();
     }
     
     updatePreviewColors(preview) {
@@ -1078,20 +1092,20 @@ class EinladungsGenerator {
                 template: this.currentTemplate
             };
             
-            const response = await apiRequest('/generate-all-cards', {
+            // Der Server rendert die Karten im Hintergrund - hier nur Fortschritt abfragen
+            const response = await fetch('/api/card-jobs', {
                 method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
                 body: JSON.stringify(requestData)
             });
-            
-            if (response.ok) {
-                const result = await response.json();
-                this.hideProgress();
-                this.showGenerationSuccess(result);
-
-            } else {
-                const error = await response.json();
-                throw new Error(error.error || 'Unbekannter Fehler');
+            const result = await response.json();
+            if (!response.ok) {
+                throw new Error(result.error || 'Unbekannter Fehler');
             }
+            
+            this.pollCardJob(result.job_id);
         } catch (error) {
 
             this.hideProgress();
@@ -1099,6 +1113,55 @@ class EinladungsGenerator {
         }
     }
     
+    async pollCardJob(jobId) {
+        this.cardJobId = jobId;
+        const progressBar = document.getElementById('progressBar');
+        const cancelBtn = document.getElementById('cancelCardsBtn');
+        if (cancelBtn) cancelBtn.onclick = () => this.cancelCardJob(jobId);
+        
+        try {
+            const response = await fetch(`/api/card-jobs/${jobId}`, { cache: 'no-store' });
+            const status = await response.json();
+            if (!response.ok) {
+                throw new Error(status.error || 'Unbekannter Fehler');
+            }
+            
+            if (progressBar) progressBar.style.width = `${status.prozent}%`;
+            
+            if (status.status === 'laeuft') {
+                this.showProgress(`Erstelle Karten... ${status.fertig} von ${status.gesamt}`);
+                setTimeout(() => this.pollCardJob(jobId), 1000);
+                return;
+            }
+            
+            this.hideProgress();
+            if (status.status === 'abgebrochen') {
+                this.showError(`Kartenerstellung abgebrochen (${status.fertig} von ${status.gesamt} Karten fertig).`);
+                return;
+            }
+            if (status.status === 'fehler' && status.meldung) {
+                this.showError(`${status.meldung} (${status.fertig} von ${status.gesamt} Karten fertig).`);
+            } else if (status.fehler > 0) {
+                this.showError(`${status.fehler} Karten konnten nicht erstellt werden.`);
+            }
+            this.downloadCardJob(jobId);
+            this.showGenerationSuccess({ generated_count: status.fertig, job_id: jobId });
+        } catch (error) {
+            
+            this.hideProgress();
+            this.showError('Fehler beim Abfragen des Fortschritts: ' + error.message);
+        }
+    }
+    
+    async cancelCardJob(jobId) {
+        try {
+            await fetch(`/api/card-jobs/${jobId}/cancel`, { method: 'POST' });
+        } catch (error) {
+            
+            this.showError('Abbrechen fehlgeschlagen: ' + error.message);
+        }
+    }
+    
     showProgress(text) {
         const progressDiv = document.querySelector('.generation-progress');
         const successDiv = document.querySelector('.generation-success');
@@ -1114,17 +1177,103 @@ class EinladungsGenerator {
         if (progressDiv) progressDiv.style.display = 'none';
     }
     
+    // Gerenderte Vorschau: eine Anfrage pro Eingabepause, überholte werden abgebrochen
+    scheduleRenderedPreview() {
+        clearTimeout(this.previewTimer);
+        this.previewTimer = setTimeout(() => this.renderServerPreview(), 250);
+    }
+    
+    async renderServerPreview() {
+        const image = document.getElementById('renderedPreview');
+        if (!image) return;
+        
+        if (this.previewController) this.previewController.abort();
+        const controller = new AbortController();
+        this.previewController = controller;
+        
+        const testGuestSelect = document.getElementById('testGuestSelect');
+        const start = performance.now();
+        try {
+            const response = await fetch('/api/card-preview', {
+                method: 'POST',
+                credentials: 'same-origin',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    guest_id: testGuestSelect && testGuestSelect.value ? parseInt(testGuestSelect.value) : null,
+                    settings: this.currentSettings,
+                    template: this.currentTemplate,
+                    format: 'jpeg',
+                    client_id: this.previewClientId
+                }),
+                signal: controller.signal
+            });
+            // 204: eine neuere Anfrage ist bereits unterwegs
+            if (response.status === 204 || controller !== this.previewController) return;
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            
+            const blob = await response.blob();
+            if (this.previewUrl) URL.revokeObjectURL(this.previewUrl);
+            this.previewUrl = URL.createObjectURL(blob);
+            image.src = this.previewUrl;
+            image.style.display = 'block';
+            
+            const info = document.getElementById('renderedPreviewInfo');
+            if (info) {
+                info.textContent = `Gerendert in ${Math.round(performance.now() - start)} ms`;
+            }
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                console.warn('⚠️ Kartenvorschau fehlgeschlagen:', error);
+            }
+        }
+    }
+    
+    generatePrintPdf(paper = 'A4') {
+        // Formular-POST: der Browser übernimmt den PDF-Stream direkt als Download
+        const payload = {
+            settings: this.currentSettings,
+            template: this.currentTemplate,
+            format: 'pdf',
+            paper: paper
+        };
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = '/api/generate-all-cards';
+        form.style.display = 'none';
+        const input = document.createElement('input');
+        input.type = 'hidden';
+        input.name = 'payload';
+        input.value = JSON.stringify(payload);
+        form.appendChild(input);
+        document.body.appendChild(form);
+        form.submit();
+        form.remove();
+        this.showSuccess(`Druck-PDF (${paper}) wird erstellt...`);
+    }
+    
+    downloadCardJob(jobId) {
+        // Direkter Link statt fetch: der Browser schreibt den ZIP-Stream direkt in die Download-Datei
+        const link = document.createElement('a');
+        link.href = `/api/card-jobs/${jobId}/download`;
+        link.style.display = 'none';
+        document.body.appendChild(link);
+        link.click();
+        link.remove();
+    }
+    
     showGenerationSuccess(result) {
         const successDiv = document.querySelector('.generation-success');
         const successText = document.getElementById('successText');
         const downloadBtn = document.getElementById('downloadZipBtn');
         
         if (successDiv) successDiv.style.display = 'block';
-        if (successText) successText.textContent = `${result.generated_count} Karten erfolgreich erstellt!`;
+        if (successText) successText.textContent = `Download von ${result.generated_count} Karten gestartet!`;
         
         if (downloadBtn) {
             downloadBtn.onclick = () => {
-                window.open(`/api/download-zip?filepath=${encodeURIComponent(result.zip_filepath)}`, '_blank');
+                this.downloadCardJob(result.job_id);
             };
         }
     }
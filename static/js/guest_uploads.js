@@ -117,12 +117,12 @@ function setupUploadArea() {
  */
 function setupFileInput() {
     const fileInput = document.getElementById('fileInput');
-
+    
     
     if (!fileInput) return;
     
     fileInput.addEventListener('change', (e) => {
-
+        
         const files = Array.from(e.target.files);
         handleFileSelection(files);
     });
@@ -135,16 +135,16 @@ function setupFileInput() {
  */
 function setupUploadButton() {
     const uploadBtn = document.getElementById('uploadBtn');
-
+    
     
     if (!uploadBtn) return;
     
     uploadBtn.addEventListener('click', () => {
-
+        
         if (selectedFiles.length > 0) {
             startUpload();
         } else {
-
+        
         }
     });
     
@@ -338,24 +338,20 @@ async function startUpload() {
     
     try {
         let uploadedCount = 0;
-        const totalFiles = selectedFiles.length;
+        let uploadedBytes = 0;
+        const totalBytes = selectedFiles.reduce((sum, file) => sum + file.size, 0) || 1;
         
         for (const file of selectedFiles) {
-            const formData = new FormData();
-            formData.append('file', file);
-            formData.append('description', file.description || '');
-            
-            const response = await apiRequest('/guest-upload', {
-                method: 'POST',
-                body: formData
+            // Fortschritt nach übertragenen Bytes (auch innerhalb großer Videos)
+            await uploadFileResumable(file, (fileOffset) => {
+                const progress = Math.round(((uploadedBytes + fileOffset) / totalBytes) * 100);
+                uploadProgressBar.style.width = `${progress}%`;
+                uploadProgressBar.setAttribute('aria-valuenow', progress);
+                uploadPercent.textContent = `${progress}%`;
             });
             
-            // apiRequest already handles HTTP errors, so if we reach here, it was successful
+            uploadedBytes += file.size;
             uploadedCount++;
-            const progress = Math.round((uploadedCount / totalFiles) * 100);
-            uploadProgressBar.style.width = `${progress}%`;
-            uploadProgressBar.setAttribute('aria-valuenow', progress);
-            uploadPercent.textContent = `${progress}%`;
         }
         
         // Erfolg
@@ -370,7 +366,7 @@ async function startUpload() {
         loadMyUploads();
         
     } catch (error) {
-
+        
         showAlert('Upload fehlgeschlagen', error.message, 'danger');
     } finally {
         // UI zurücksetzen
@@ -383,6 +379,107 @@ async function startUpload() {
     }
 }
 
+// Wartezeiten zwischen Wiederholungsversuchen bei Verbindungsabbrüchen (ms)
+const UPLOAD_RETRY_DELAYS = [1000, 2000, 5000, 10000, 20000, 30000];
+
+/**
+ * Lädt eine Datei in Abschnitten hoch (Content-Range) und setzt nach
+ * Verbindungsabbrüchen - auch nach einem Neuladen der Seite - am
+ * zuletzt bestätigten Offset fort
+ * @param {File} file - Hochzuladende Datei
+ * @param {Function} onProgress - Wird mit der Anzahl bestätigter Bytes aufgerufen
+ */
+async function uploadFileResumable(file, onProgress) {
+    const storageKey = `guestUpload:${file.name}:${file.size}:${file.lastModified}`;
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+    let token = localStorage.getItem(storageKey);
+    let chunkSize = 4 * 1024 * 1024;
+    let offset = 0;
+    
+    // Bestehende Session fortsetzen
+    if (token) {
+        const response = await fetch(`/api/guest-upload/sessions/${token}`, { credentials: 'same-origin' });
+        if (response.ok) {
+            offset = (await response.json()).offset;
+        } else {
+            localStorage.removeItem(storageKey);
+            token = null;
+        }
+    }
+    
+    if (!token) {
+        const created = await apiRequest('/guest-upload/sessions', {
+            method: 'POST',
+            body: JSON.stringify({
+                filename: file.name,
+                size: file.size,
+                mime_type: file.type,
+                description: file.description || ''
+            })
+        });
+        token = created.token;
+        chunkSize = created.chunk_size || chunkSize;
+        localStorage.setItem(storageKey, token);
+    }
+    
+    onProgress(offset);
+    let retries = 0;
+    
+    while (true) {
+        const end = Math.min(offset + chunkSize, file.size);
+        let response;
+        
+        try {
+            response = await fetch(`/api/guest-upload/sessions/${token}`, {
+                method: 'PUT',
+                credentials: 'same-origin',
+                headers: {
+                    'Content-Type': 'application/octet-stream',
+                    'Content-Range': `bytes ${offset}-${end - 1}/${file.size}`
+                },
+                body: file.slice(offset, end)
+            });
+        } catch (networkError) {
+            // Verbindung weg - warten und den bestätigten Offset beim Server erfragen
+            if (retries >= UPLOAD_RETRY_DELAYS.length) throw networkError;
+            await sleep(UPLOAD_RETRY_DELAYS[retries++]);
+            try {
+                const status = await fetch(`/api/guest-upload/sessions/${token}`, { credentials: 'same-origin' });
+                if (status.ok) offset = (await status.json()).offset;
+            } catch (statusError) {
+                // Nächster Versuch fragt erneut
+            }
+            continue;
+        }
+        
+        const data = await response.json().catch(() => ({}));
+        
+        if (response.ok) {
+            retries = 0;
+            offset = data.offset;
+            onProgress(offset);
+            if (data.complete) {
+                localStorage.removeItem(storageKey);
+                return data;
+            }
+            continue;
+        }
+        
+        // Offset weicht ab bzw. Abschnitt läuft noch - am Server-Stand fortsetzen
+        if ((response.status === 409 || response.status === 423) && retries < UPLOAD_RETRY_DELAYS.length) {
+            if (response.status === 423) await sleep(UPLOAD_RETRY_DELAYS[retries]);
+            retries++;
+            offset = data.offset ?? offset;
+            continue;
+        }
+        
+        if (response.status === 404 || response.status === 410) {
+            localStorage.removeItem(storageKey);
+        }
+        throw new Error(data.error || `HTTP Error: ${response.status}`);
+    }
+}
+
 /**
  * Lädt die eigenen Uploads des Gastes
  */
@@ -654,7 +751,7 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Initialisiere Upload-System direkt
     if (document.getElementById('uploadArea')) {
-
+        
         initUploads();
         window.uploadsInitialized = true;
     }
@@ -663,9 +760,9 @@ document.addEventListener('DOMContentLoaded', function() {
     const uploadsTab = document.getElementById('uploads-tab');
     if (uploadsTab) {
         uploadsTab.addEventListener('shown.bs.tab', function() {
-
+            
             if (!window.uploadsInitialized) {
-
+                
                 initUploads();
                 window.uploadsInitialized = true;
             }
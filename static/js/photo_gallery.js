@@ -196,9 +196,10 @@ function renderGallery() {
         <div class="${columns}">
             <div class="gallery-item" onclick="openFullscreen(${index})">
                 ${photo.file_type === 'image' ? 
-                    `<img src="/api/gallery-image/${photo.id}" alt="${escapeHtml(photo.original_filename)}" loading="lazy">` :
-                    `<video poster="" preload="metadata">
-                        <source src="/api/gallery-image/${photo.id}" type="${photo.mime_type}">
+                    `<img src="/api/gallery-image/${photo.id}?w=${Math.round(400 * (window.devicePixelRatio || 1))}" alt="${escapeHtml(photo.original_filename)}" loading="lazy">` :
+                    `<video poster="/api/gallery-thumbnail/${photo.id}" preload="none" muted loop playsinline
+                            onmouseenter="this.play()" onmouseleave="this.pause()">
+                        <source src="/api/gallery-preview/${photo.id}">
                         Ihr Browser unterstützt dieses Video-Format nicht.
                     </video>`
                 }
@@ -309,7 +310,7 @@ function openFullscreen(index) {
     // Set media content
     if (photo.file_type === 'image') {
         if (fullscreenImage) {
-            fullscreenImage.src = `/api/gallery-image/${photo.id}`;
+            fullscreenImage.src = `/api/gallery-image/${photo.id}?w=${Math.round(window.innerWidth * (window.devicePixelRatio || 1))}`;
             fullscreenImage.alt = photo.original_filename;
             fullscreenImage.classList.remove('d-none');
         }
@@ -323,6 +324,7 @@ function openFullscreen(index) {
                 source.src = `/api/gallery-image/${photo.id}`;
                 source.type = photo.mime_type;
             }
+            fullscreenVideo.poster = `/api/gallery-thumbnail/${photo.id}`;
             fullscreenVideo.load();
             fullscreenVideo.classList.remove('d-none');
         }
@@ -378,7 +380,7 @@ function downloadFile() {
     if (currentModalIndex >= 0 && currentModalIndex < filteredPhotos.length) {
         const photo = filteredPhotos[currentModalIndex];
         const link = document.createElement('a');
-        link.href = `/api/gallery-image/${photo.id}`;
+        link.href = `/api/gallery-image/${photo.id}?original=1`;
         link.download = photo.original_filename;
         document.body.appendChild(link);
         link.click();
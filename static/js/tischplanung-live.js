@@ -0,0 +1,177 @@
+// Tischplanung Live-Modul
+// Empfängt Sitzplan-Änderungen anderer Sessions per Server-Sent Events und
+// patcht die lokalen Daten (guests, tables), statt die Übersicht neu zu laden
+
+window.TischplanungLive = {
+    source: null,
+    planVersion: null,
+    renderPending: false,
+    reloadPending: false,
+
+    start() {
+        if (!window.EventSource || this.source) return;
+
+        this.source = new EventSource('/api/tischplanung/events');
+
+        this.source.addEventListener('hello', (e) => this.handleHello(e));
+        this.source.addEventListener('resync', (e) => this.handleResync(e));
+        ['assign', 'unassign', 'clear', 'plan', 'table_add', 'table_update', 'table_delete', 'guest'].forEach(type => {
+            this.source.addEventListener(type, (e) => this.handleChange(type, e));
+        });
+
+        this.source.onerror = () => {
+            // EventSource verbindet sich selbst neu und sendet dabei Last-Event-ID
+            console.warn('⚠️ Live-Tischplanung: Verbindung unterbrochen');
+        };
+    },
+
+    stop() {
+        if (this.source) {
+            this.source.close();
+            this.source = null;
+        }
+    },
+
+    handleHello(e) {
+        const message = JSON.parse(e.data);
+        if (this.planVersion === null) {
+            // Erste Verbindung: Stand der Seite an die Serverversion angleichen
+            this.planVersion = message.version;
+            this.scheduleReload();
+        }
+    },
+
+    handleResync(e) {
+        const message = JSON.parse(e.data);
+        this.planVersion = message.version;
+        this.scheduleReload();
+    },
+
+    handleChange(type, e) {
+        const message = JSON.parse(e.data);
+
+        // Bereits bekannte Version (z.B. eigene Änderung nach Reconnect)
+        if (this.planVersion !== null && message.version <= this.planVersion) return;
+
+        // Lücke erkannt - kompletter Abgleich statt Patch
+        if (this.planVersion !== null && message.version !== this.planVersion + 1) {
+            this.planVersion = message.version;
+            this.scheduleReload();
+            return;
+        }
+
+        this.planVersion = message.version;
+        this.applyChange(type, message.daten || {});
+        this.scheduleRender();
+    },
+
+    applyChange(type, data) {
+        switch (type) {
+            case 'assign':
+                this.setGuestTable(data.gast_id, data.tisch_id);
+                break;
+            case 'unassign':
+                this.setGuestTable(data.gast_id, null);
+                break;
+            case 'clear':
+                guests.forEach(guest => { guest.assigned_table = null; });
+                break;
+            case 'table_add':
+            case 'table_update':
+                this.upsertTable(data.tisch);
+                break;
+            case 'table_delete':
+                tables = tables.filter(table => table.id !== data.tisch_id);
+                window.tables = tables;
+                guests.forEach(guest => {
+                    if (guest.assigned_table === data.tisch_id) guest.assigned_table = null;
+                });
+                if (selectedTable === data.tisch_id) selectedTable = null;
+                break;
+            case 'plan':
+                (data.tables || []).forEach(table => this.upsertTable(table));
+                (data.table_updates || []).forEach(update => this.upsertTable(update));
+                if (data.replace_all) {
+                    guests.forEach(guest => { guest.assigned_table = null; });
+                }
+                (data.assignments || []).forEach(([guestId, tableId]) => this.setGuestTable(guestId, tableId));
+                break;
+            case 'guest':
+                // Gästedaten (Name, Personenzahl) geändert - nur die Übersicht liefert sie vollständig
+                this.scheduleReload();
+                break;
+        }
+    },
+
+    setGuestTable(guestId, tableId) {
+        const guest = guests.find(g => g.id === guestId);
+        if (guest) {
+            guest.assigned_table = tableId;
+        }
+    },
+
+    upsertTable(data) {
+        if (!data || data.id === undefined) return;
+
+        const table = tables.find(t => t.id === data.id);
+        if (table) {
+            ['name', 'max_personen', 'x_position', 'y_position', 'farbe', 'beschreibung'].forEach(key => {
+                if (data[key] !== undefined && data[key] !== null) table[key] = data[key];
+            });
+        } else {
+            tables.push({
+                id: data.id,
+                name: data.name,
+                max_personen: data.max_personen || 8,
+                x_position: data.x_position || 100,
+                y_position: data.y_position || 100,
+                farbe: data.farbe || '#007bff',
+                form: 'round',
+                beschreibung: data.beschreibung || ''
+            });
+            window.tables = tables;
+        }
+    },
+
+    // Mehrere Events kurz hintereinander werden zu einem Rendering zusammengefasst
+    scheduleRender() {
+        if (this.renderPending) return;
+        this.renderPending = true;
+
+        requestAnimationFrame(() => {
+            this.renderPending = false;
+            renderSeatingChart();
+            renderGuestList();
+            updateStatistics();
+            if (selectedTable) {
+                showTableInfo(selectedTable);
+            }
+            refreshTableOverviewModal();
+        });
+    },
+
+    scheduleReload() {
+        if (this.reloadPending) return;
+        this.reloadPending = true;
+
+        setTimeout(async () => {
+            try {
+                guests.forEach(guest => { guest.assigned_table = null; });
+                await loadTables();
+                this.scheduleRender();
+            } catch (error) {
+                console.error('❌ Live-Tischplanung: Abgleich fehlgeschlagen', error);
+            } finally {
+                this.reloadPending = false;
+            }
+        }, 250);
+    }
+};
+
+document.addEventListener('DOMContentLoaded', () => {
+    TischplanungLive.start();
+});
+
+window.addEventListener('beforeunload', () => {
+    TischplanungLive.stop();
+});
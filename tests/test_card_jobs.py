@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests für die Karten-Jobs (card_jobs)
+Ausführen mit: python -m pytest tests  (oder python -m unittest discover tests)
+"""
+
+import os
+import sys
+import time
+import shutil
+import socket
+import logging
+import secrets
+import tempfile
+import unittest
+import subprocess
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import card_jobs
+from card_jobs import CardJobManager
+
+
+def beendeter_pid():
+    """PID eines Prozesses, der bereits beendet ist"""
+    prozess = subprocess.Popen([sys.executable, '-c', 'pass'])
+    prozess.wait()
+    return prozess.pid
+
+
+class JobTestCase(unittest.TestCase):
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.verzeichnis = tempfile.mkdtemp(prefix='card-jobs-test-')
+        self.manager = CardJobManager(None, self.verzeichnis, worker_count=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.verzeichnis, ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    def lege_job_an(self, pid, lebenszeichen=None, karten=0):
+        """Job-Verzeichnis wie von start_job, dessen Job-Thread nicht (mehr) arbeitet"""
+        job_id = secrets.token_hex(16)
+        job_dir = os.path.join(card_jobs.jobs_dir(self.verzeichnis), job_id)
+        os.makedirs(job_dir)
+        card_jobs._schreibe_json(os.path.join(job_dir, 'status.json'), {
+            'job_id': job_id, 'status': 'laeuft', 'template': 'elegant', 'gesamt': 5,
+            'fertig': karten, 'fehler': 0, 'wiederverwendet': 0, 'gestartet': '2026-10-19T12:00:00',
+            'beendet': None, 'pid': pid, 'host': socket.gethostname(),
+            'lebenszeichen': time.time() if lebenszeichen is None else lebenszeichen,
+            'karten': [{'datei': f'{nummer}_abc.png', 'name': f'karte_{nummer}.png'} for nummer in range(karten)]
+        })
+        for nummer in range(karten):
+            with open(os.path.join(card_jobs.card_cache_dir(self.verzeichnis), f'{nummer}_abc.png'), 'wb') as f:
+                f.write(b'png')
+        return job_id
+
+
+class TestVerwaisteJobs(JobTestCase):
+
+    def test_laufender_job_bleibt_laufend(self):
+        job_id = self.lege_job_an(os.getpid())
+        self.assertEqual(self.manager.status(job_id)['status'], 'laeuft')
+
+    def test_beendeter_besitzer_wird_fehler(self):
+        job_id = self.lege_job_an(beendeter_pid(), karten=2)
+
+        status = self.manager.status(job_id)
+
+        self.assertEqual(status['status'], 'fehler')
+        self.assertTrue(status['meldung'])
+        self.assertIsNotNone(status['beendet'])
+        # Dauerhaft eingetragen, nicht nur in der Antwort
+        self.assertEqual(self.manager._lese_status(job_id)['status'], 'fehler')
+
+    def test_veraltetes_lebenszeichen_wird_fehler(self):
+        job_id = self.lege_job_an(os.getpid(), lebenszeichen=time.time() - card_jobs.JOB_LEBENSZEICHEN_SEKUNDEN - 1)
+        self.assertEqual(self.manager.status(job_id)['status'], 'fehler')
+
+    def test_abbruch_eines_verwaisten_jobs(self):
+        job_id = self.lege_job_an(beendeter_pid())
+
+        self.assertTrue(self.manager.cancel(job_id))
+
+        self.assertEqual(self.manager._lese_status(job_id)['status'], 'abgebrochen')
+
+    def test_download_eines_verwaisten_jobs_endet(self):
+        job_id = self.lege_job_an(beendeter_pid(), karten=2)
+        karten = list(self.manager.iter_karten(job_id))
+        self.assertEqual([name for name, _ in karten], ['karte_0.png', 'karte_1.png'])
+
+    def test_download_wartet_hoechstens_stream_max_warten(self):
+        job_id = self.lege_job_an(os.getpid(), karten=1)
+
+        start = time.monotonic()
+        with mock.patch.object(card_jobs, 'STREAM_MAX_WARTEN', 0.3), \
+                mock.patch.object(card_jobs, 'STREAM_INTERVALL', 0.05):
+            karten = list(self.manager.iter_karten(job_id))
+
+        self.assertEqual(len(karten), 1)
+        self.assertLess(time.monotonic() - start, 5)
+
+
+class KartenAttrappe:
+    """Generator-Ersatz: Karteninhalt ist der Vorlagenname"""
+
+    def create_guest_card(self, guest, template):
+        return template.encode('utf-8')
+
+    def card_filename(self, guest):
+        return f"karte_{guest['id']}.png"
+
+    def card_fingerprint(self, guest, template):
+        return f"{guest['id']}{template}".encode('utf-8').hex().ljust(32, '0')
+
+
+class TestKartenCache(JobTestCase):
+
+    def rendere(self, guest, template, fingerabdruck):
+        cache_dir = card_jobs.card_cache_dir(self.verzeichnis)
+        datei = f"{card_jobs._cache_praefix(guest, template)}{fingerabdruck}.png"
+        ergebnis = card_jobs._rendere_karte(KartenAttrappe(), cache_dir, template, 0, guest, datei)
+        self.assertEqual(ergebnis['datei'], datei)
+        return datei
+
+    def test_andere_vorlage_loescht_keine_karten(self):
+        cache_dir = card_jobs.card_cache_dir(self.verzeichnis)
+        guest = {'id': 7}
+        elegant = self.rendere(guest, 'elegant', 'a' * 32)
+        andere_vorlage = self.rendere(guest, 'elegant_gold', 'b' * 32)
+        modern = self.rendere(guest, 'modern', 'c' * 32)
+
+        self.assertEqual(sorted(os.listdir(cache_dir)), sorted([elegant, andere_vorlage, modern]))
+        status = card_jobs.pruefe_karten_cache(self.verzeichnis, KartenAttrappe(), [guest], 'elegant')
+        self.assertEqual(status[0]['status'], 'veraltet')
+
+    def test_neuer_stand_ersetzt_nur_dieselbe_vorlage(self):
+        cache_dir = card_jobs.card_cache_dir(self.verzeichnis)
+        guest = {'id': 7}
+        # Karte im Format vor dem Vorlagen-Präfix
+        with open(os.path.join(cache_dir, f"7_{'d' * 32}.png"), 'wb') as f:
+            f.write(b'alt')
+        self.rendere(guest, 'elegant', 'a' * 32)
+        modern = self.rendere(guest, 'modern', 'c' * 32)
+        elegant = self.rendere(guest, 'elegant', 'e' * 32)
+
+        self.assertEqual(sorted(os.listdir(cache_dir)), sorted([elegant, modern]))
+
+    def test_download_ueberspringt_entfernte_karte(self):
+        job_id = self.lege_job_an(beendeter_pid(), karten=2)
+        os.remove(os.path.join(card_jobs.card_cache_dir(self.verzeichnis), '0_abc.png'))
+
+        self.assertEqual(list(self.manager.iter_karten(job_id)), [('karte_1.png', b'png')])
+
+
+if __name__ == '__main__':
+    unittest.main()
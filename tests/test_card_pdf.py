@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests für das Druck-PDF der Einladungskarten (card_pdf)
+Ausführen mit: python -m pytest tests  (oder python -m unittest discover tests)
+"""
+
+import os
+import re
+import sys
+import zlib
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageFont
+
+import card_pdf
+
+SCHRIFT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'fonts',
+                       'DancingScript-Regular.ttf')
+
+
+def erstelle_pdf(elemente, titel='Einladungskarten'):
+    hintergrund = Image.new('RGB', (800, 1200), 'white')
+    return b''.join(card_pdf.stream_karten_pdf(hintergrund, [elemente], titel=titel))
+
+
+def stroeme(pdf):
+    """Alle (entpackten) Streams des PDFs"""
+    ergebnis = []
+    for daten in re.findall(rb'stream\n(.*?)\nendstream', pdf, re.S):
+        try:
+            ergebnis.append(zlib.decompress(daten))
+        except zlib.error:
+            ergebnis.append(daten)
+    return ergebnis
+
+
+class TestNichtLatin1Namen(unittest.TestCase):
+
+    @unittest.skipUnless(os.path.exists(SCHRIFT), 'Dancing Script nicht vorhanden')
+    def test_truetype_name_als_glyphen(self):
+        font = ImageFont.truetype(SCHRIFT, 40)
+        name = 'Łukasz Wójcik'
+        pdf = erstelle_pdf([{'art': 'text', 'x': 50, 'y': 50, 'text': name, 'font': font, 'fill': '#000000'}])
+
+        self.assertIn(b'/Subtype /Type0', pdf)
+        self.assertIn(b'/Encoding /Identity-H', pdf)
+
+        with open(SCHRIFT, 'rb') as datei:
+            cmap = card_pdf._truetype_cmap(datei.read())
+        erwartet = ''.join(f"{cmap[ord(zeichen)]:04X}" for zeichen in name)
+        inhalt = b''.join(stroeme(pdf))
+        self.assertIn(f"<{erwartet}> Tj".encode('ascii'), inhalt)
+        self.assertNotIn(b'?ukasz', inhalt)
+
+        # ToUnicode: Ł (U+0141) und ó (U+00F3) lassen sich zurückgewinnen
+        self.assertIn(f"<{cmap[0x141]:04X}> <0141>".encode('ascii'), inhalt)
+        self.assertIn(f"<{cmap[0xF3]:04X}> <00F3>".encode('ascii'), inhalt)
+
+    def test_ersatzschrift_zeichnet_nicht_kodierbaren_text_als_bild(self):
+        font = ImageFont.load_default(40)
+        pdf = erstelle_pdf([
+            {'art': 'text', 'x': 50, 'y': 50, 'text': 'Łukasz Wójcik', 'font': font, 'fill': '#000000'},
+            {'art': 'text', 'x': 50, 'y': 150, 'text': 'Jürgen', 'font': font, 'fill': '#000000'}
+        ], titel='Karten für Łukasz')
+
+        inhalt = b''.join(stroeme(pdf))
+        self.assertIn(b'(J\\374rgen) Tj', inhalt)
+        self.assertNotIn(b'ukasz', inhalt)
+        # Hintergrund plus Textbild samt Transparenzmaske
+        self.assertEqual(pdf.count(b'/Subtype /Image /Width'), 3)
+        titel = 'Karten für Łukasz'.encode('utf-16-be').hex().upper()
+        self.assertIn(f"/Title <FEFF{titel}>".encode('ascii'), pdf)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests für den E-Mail-Versand über die Outbox (email_outbox) gegen den lokalen SMTP-Testserver
+Ausführen mit: python -m pytest tests  (oder python -m unittest discover tests)
+"""
+
+import os
+import sys
+import json
+import shutil
+import smtplib
+import logging
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import email_outbox
+import smtp_testserver
+from email_manager import EmailManager
+from email_outbox import EmailOutbox, PipeliningSMTP, klassifiziere_fehler
+from smtp_testserver import SMTPTestServer
+from sqlite_datenmanager import SQLiteHochzeitsDatenManager
+
+BENUTZER = 'brautpaar@example.com'
+PASSWORT = 'geheim'
+
+
+class OutboxTestCase(unittest.TestCase):
+    """Temporäres Datenverzeichnis mit Datenbank und auth_config.json je Test"""
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.verzeichnis = tempfile.mkdtemp(prefix='outbox-test-')
+        # email_history.json legt der EmailManager im Arbeitsverzeichnis an
+        self.arbeitsverzeichnis = os.getcwd()
+        os.chdir(self.verzeichnis)
+        self.data_manager = SQLiteHochzeitsDatenManager(self.verzeichnis)
+
+    def tearDown(self):
+        if getattr(self, 'server', None):
+            self.server.stop()
+        os.chdir(self.arbeitsverzeichnis)
+        shutil.rmtree(self.verzeichnis, ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    def starte_outbox(self, passwort=PASSWORT, **server_optionen):
+        self.server = SMTPTestServer(benutzer=BENUTZER, passwort=PASSWORT, **server_optionen).start()
+        config_pfad = os.path.join(self.verzeichnis, 'auth_config.json')
+        with open(config_pfad, 'w', encoding='utf-8') as f:
+            json.dump({'email': {
+                'enabled': True,
+                'smtp_server': '127.0.0.1',
+                'smtp_port': self.server.port,
+                'use_tls': False,
+                'username': BENUTZER,
+                'password': passwort,
+                'from_email': BENUTZER,
+                'rate_limit_per_minute': 0
+            }}, f)
+        return EmailOutbox(self.data_manager, EmailManager(config_pfad), self.verzeichnis)
+
+    def einreihen(self, outbox, empfaenger):
+        return outbox.enqueue([{
+            'to_emails': [adresse],
+            'subject': f'Einladung {nummer}',
+            'body': 'Wir freuen uns auf euch!',
+            'mit_signatur': False
+        } for nummer, adresse in enumerate(empfaenger)], batch_id='test')
+
+    def status(self, ids):
+        return {email['id']: email for email in self.data_manager.get_outbox_emails(email_ids=ids)}
+
+
+class TestVersand(OutboxTestCase):
+
+    def test_serienversand_ueber_eine_verbindung_mit_pipelining(self):
+        outbox = self.starte_outbox()
+        ids = self.einreihen(outbox, [f'gast{nummer}@example.com' for nummer in range(5)])
+
+        # Schreibvorgänge des Servers zählen: mit PIPELINING zwei Round-Trips je Nachricht
+        schreibvorgaenge = []
+        senden = smtp_testserver._SMTPHandler._senden
+
+        def gezaehlt(handler):
+            if handler._antworten:
+                schreibvorgaenge.append(len(handler._antworten))
+            senden(handler)
+
+        with mock.patch.object(smtp_testserver._SMTPHandler, '_senden', gezaehlt), \
+                mock.patch.object(email_outbox, 'PipeliningSMTP', wraps=PipeliningSMTP) as smtp_klasse:
+            ergebnis = outbox.verarbeite_faellige()
+
+        self.assertEqual(ergebnis['gesendet'], 5)
+        self.assertEqual(self.server.verbindungen, 1)
+        self.assertEqual(outbox.status()['smtp_connections'], 1)
+        self.assertEqual(smtp_klasse.call_count, 1)
+        self.assertEqual(len(self.server.nachrichten), 5)
+        self.assertEqual({email['status'] for email in self.status(ids).values()}, {'sent'})
+        # Begrüßung, EHLO, AUTH, dann je Nachricht MAIL/RCPT/DATA gesammelt und der Abschluss
+        self.assertEqual(len(schreibvorgaenge), 3 + 2 * 5)
+        self.assertEqual(schreibvorgaenge[3], 3)
+
+    def test_voruebergehender_fehler_wird_erneut_geplant(self):
+        outbox = self.starte_outbox(fehler_alle=2)
+        ids = self.einreihen(outbox, ['a@example.com', 'b@example.com', 'c@example.com'])
+
+        ergebnis = outbox.verarbeite_faellige()
+
+        self.assertEqual((ergebnis['gesendet'], ergebnis['erneut'], ergebnis['fehlgeschlagen']), (2, 1, 0))
+        zweite = self.status(ids)[ids[1]]
+        self.assertEqual(zweite['status'], 'pending')
+        self.assertEqual(zweite['smtp_code'], 451)
+        self.assertEqual(zweite['versuche'], 1)
+        # Die Verbindung bleibt nach dem 451 nutzbar
+        self.assertEqual(self.server.verbindungen, 1)
+
+    def test_abgelehnter_empfaenger_schlaegt_dauerhaft_fehl(self):
+        outbox = self.starte_outbox(ablehnen=['unbekannt@example.com'])
+        ids = self.einreihen(outbox, ['unbekannt@example.com', 'gast@example.com'])
+
+        ergebnis = outbox.verarbeite_faellige()
+
+        self.assertEqual((ergebnis['gesendet'], ergebnis['fehlgeschlagen']), (1, 1))
+        abgelehnt = self.status(ids)[ids[0]]
+        self.assertEqual(abgelehnt['status'], 'failed')
+        self.assertEqual(abgelehnt['smtp_code'], 550)
+        self.assertEqual(self.status(ids)[ids[1]]['status'], 'sent')
+
+    def test_rate_limit_stellt_ohne_versuch_zurueck(self):
+        outbox = self.starte_outbox(rate_limit=2)
+        ids = self.einreihen(outbox, [f'gast{nummer}@example.com' for nummer in range(4)])
+
+        ergebnis = outbox.verarbeite_faellige()
+
+        self.assertEqual((ergebnis['gesendet'], ergebnis['zurueckgestellt']), (2, 2))
+        for email_id in ids[2:]:
+            email = self.status(ids)[email_id]
+            self.assertEqual(email['status'], 'pending')
+            self.assertEqual(email['versuche'], 0)
+            self.assertIn('451', email['fehler'])
+        self.assertEqual(outbox.pause_grund, 'rate')
+        self.assertEqual(outbox.status()['pause_reason'], 'rate')
+
+        # Während der Pause wird nichts abgeholt
+        self.assertEqual(outbox.verarbeite_faellige()['abgeholt'], 0)
+
+    def test_falsche_zugangsdaten_stellen_alles_zurueck(self):
+        outbox = self.starte_outbox(passwort='falsch')
+        ids = self.einreihen(outbox, ['a@example.com', 'b@example.com'])
+
+        ergebnis = outbox.verarbeite_faellige()
+
+        self.assertEqual((ergebnis['gesendet'], ergebnis['zurueckgestellt']), (0, 2))
+        self.assertEqual({(email['status'], email['versuche']) for email in self.status(ids).values()},
+                         {('pending', 0)})
+        self.assertEqual(outbox.pause_grund, 'anmeldung')
+        self.assertEqual(self.server.nachrichten, [])
+
+
+class TestKlassifizierung(unittest.TestCase):
+
+    def test_smtp_antworten(self):
+        self.assertEqual(klassifiziere_fehler(
+            smtplib.SMTPSenderRefused(451, b'4.7.0 Rate limit exceeded, try again later', 'a@example.com'))[0],
+            'rate')
+        self.assertEqual(klassifiziere_fehler(
+            smtplib.SMTPResponseException(421, b'4.7.0 Too many connections'))[0], 'rate')
+        self.assertEqual(klassifiziere_fehler(
+            smtplib.SMTPDataError(451, b'4.3.0 Temporary local problem'))[0], 'temporaer')
+        self.assertEqual(klassifiziere_fehler(
+            smtplib.SMTPRecipientsRefused({'x@example.com': (550, b'5.1.1 User unknown')})),
+            ('dauerhaft', 550, '5.1.1 User unknown'))
+        self.assertEqual(klassifiziere_fehler(
+            smtplib.SMTPAuthenticationError(535, b'5.7.8 Authentication credentials invalid'))[0], 'anmeldung')
+
+    def test_verbindungsfehler_sind_voruebergehend(self):
+        self.assertEqual(klassifiziere_fehler(smtplib.SMTPServerDisconnected('Verbindung getrennt'))[0],
+                         'temporaer')
+        self.assertEqual(klassifiziere_fehler(ConnectionRefusedError(111, 'Connection refused'))[0], 'temporaer')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests für die Gunicorn-Hooks (gunicorn.conf.py)
+Ausführen mit: python -m pytest tests  (oder python -m unittest discover tests)
+"""
+
+import os
+import sys
+import types
+import runpy
+import logging
+import unittest
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestHintergrunddienste(unittest.TestCase):
+    """Medien-Worker und E-Mail-Outbox starten erst nach dem gevent-Patching"""
+
+    def setUp(self):
+        self.aufrufe = []
+        app_modul = types.ModuleType('app')
+        app_modul.warm_up_worker = lambda: self.aufrufe.append('warm_up_worker')
+        app_modul.start_background_services = lambda: self.aufrufe.append('start_background_services')
+        app_modul.cleanup = lambda: self.aufrufe.append('cleanup')
+        self.echtes_app_modul = sys.modules.get('app')
+        sys.modules['app'] = app_modul
+
+        self.config = runpy.run_path(os.path.join(REPO, 'gunicorn.conf.py'))
+        self.worker = types.SimpleNamespace(pid=4711, log=logging.getLogger('gunicorn.worker'))
+        self.server = types.SimpleNamespace(log=logging.getLogger('gunicorn.arbiter'))
+
+    def tearDown(self):
+        if self.echtes_app_modul is None:
+            sys.modules.pop('app', None)
+        else:
+            sys.modules['app'] = self.echtes_app_modul
+
+    def test_post_fork_startet_keine_hintergrunddienste(self):
+        # post_fork läuft vor init_process und damit vor monkey.patch_all()
+        self.config['post_fork'](self.server, self.worker)
+        self.assertEqual(self.aufrufe, ['warm_up_worker'])
+
+    def test_post_worker_init_startet_hintergrunddienste(self):
+        self.config['post_worker_init'](self.worker)
+        self.assertEqual(self.aufrufe, ['start_background_services'])
+
+    def test_worker_exit_gibt_hintergrunddienste_frei(self):
+        self.config['worker_exit'](self.server, self.worker)
+        self.assertEqual(self.aufrufe, ['cleanup'])
+
+
+if __name__ == '__main__':
+    unittest.main()
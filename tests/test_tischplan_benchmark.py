@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests für den Tischplanung-Benchmark (tischplan_benchmark)
+Ausführen mit: python -m pytest tests  (oder python -m unittest discover tests)
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def dateistand(verzeichnis):
+    """Pfad, Größe und Änderungszeit aller Dateien (ohne Bytecode)"""
+    stand = {}
+    for wurzel, ordner, dateien in os.walk(verzeichnis):
+        ordner[:] = [name for name in ordner if name not in ('__pycache__', '.pytest_cache')]
+        for name in dateien:
+            pfad = os.path.join(wurzel, name)
+            info = os.stat(pfad)
+            stand[os.path.relpath(pfad, verzeichnis)] = (info.st_size, info.st_mtime_ns)
+    return stand
+
+
+class TestBenchmarkDatenverzeichnis(unittest.TestCase):
+
+    def setUp(self):
+        self.verzeichnis = tempfile.mkdtemp(prefix='tischplan-bench-test-')
+        # Kopie der Quellen, damit ein Fehlschlag nie das echte Datenverzeichnis trifft
+        self.quellen = os.path.join(self.verzeichnis, 'quellen')
+        shutil.copytree(REPO, self.quellen, ignore=shutil.ignore_patterns(
+            '.git', '__pycache__', '.pytest_cache', 'tests', 'data', 'app_config.json', 'email_history.json'))
+        self.arbeitsverzeichnis = os.path.join(self.verzeichnis, 'cwd')
+        os.makedirs(self.arbeitsverzeichnis)
+
+    def tearDown(self):
+        shutil.rmtree(self.verzeichnis, ignore_errors=True)
+
+    def test_lauf_veraendert_den_quellbaum_nicht(self):
+        vorher = dateistand(self.quellen)
+        ausgabe = os.path.join(self.arbeitsverzeichnis, 'ergebnis.json')
+        umgebung = dict(os.environ)
+        umgebung.pop('DATA_PATH', None)
+
+        lauf = subprocess.run(
+            [sys.executable, os.path.join(self.quellen, 'tischplan_benchmark.py'),
+             '--guests', '12', '--repeat', '1', '--output', ausgabe],
+            cwd=self.arbeitsverzeichnis, env=umgebung, capture_output=True, text=True, timeout=300
+        )
+
+        self.assertEqual(lauf.returncode, 0, lauf.stderr[-2000:])
+        with open(ausgabe, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['cases'][0]['guests'], 12)
+        self.assertEqual(dateistand(self.quellen), vorher)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests für fortsetzbare Gäste-Uploads (upload_manager)
+Ausführen mit: python -m pytest tests  (oder python -m unittest discover tests)
+"""
+
+import io
+import os
+import sys
+import shutil
+import hashlib
+import logging
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_datenmanager import SQLiteHochzeitsDatenManager
+from upload_manager import UploadSessionManager
+
+INHALT = bytes(range(256)) * 64
+
+
+class TestWiederholteAbschnitte(unittest.TestCase):
+    """Ein wiederholter Request mit veraltetem Session-Stand"""
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.verzeichnis = tempfile.mkdtemp(prefix='upload-test-')
+        self.upload_root = os.path.join(self.verzeichnis, 'uploads')
+        os.makedirs(self.upload_root)
+        self.data_manager = SQLiteHochzeitsDatenManager(self.verzeichnis)
+        self.manager = UploadSessionManager(self.data_manager, lambda: self.upload_root)
+        self.token = self.manager.create(1, 'foto.jpg', len(INHALT), 'image/jpeg')['token']
+
+    def tearDown(self):
+        shutil.rmtree(self.verzeichnis, ignore_errors=True)
+        logging.disable(logging.NOTSET)
+
+    def abschnitt(self, upload_session, start, ende):
+        return self.manager.write_chunk(upload_session, io.BytesIO(INHALT[start:ende + 1]),
+                                        start, ende, len(INHALT))
+
+    def test_wiederholung_schneidet_fortschritt_nicht_ab(self):
+        mitte = len(INHALT) // 2
+        veraltet = self.manager.get(self.token, 1)
+        self.assertTrue(self.abschnitt(dict(veraltet), 0, mitte - 1)['success'])
+
+        ergebnis = self.abschnitt(dict(veraltet), 0, mitte - 1)
+
+        self.assertEqual((ergebnis['status'], ergebnis['offset']), (409, mitte))
+        self.assertEqual(self.manager.get(self.token, 1)['received'], mitte)
+        self.assertEqual(os.path.getsize(veraltet['part_path']), mitte)
+
+    def test_wiederholung_des_letzten_abschnitts(self):
+        veraltet = self.manager.get(self.token, 1)
+        fertig = self.abschnitt(dict(veraltet), 0, len(INHALT) - 1)
+        self.assertTrue(fertig['complete'])
+        self.assertEqual(fertig['content_hash'], hashlib.sha256(INHALT).hexdigest())
+
+        # Session beendet, .part-Datei noch nicht abgelegt
+        self.assertEqual(self.abschnitt(dict(veraltet), 0, len(INHALT) - 1)['status'], 410)
+        self.assertEqual(os.path.getsize(fertig['temp_path']), len(INHALT))
+
+        # .part-Datei bereits in den Blob-Speicher verschoben
+        ziel = os.path.join(self.upload_root, 'abgelegt.jpg')
+        os.replace(fertig['temp_path'], ziel)
+        self.assertEqual(self.abschnitt(dict(veraltet), 0, len(INHALT) - 1)['status'], 410)
+        with open(ziel, 'rb') as f:
+            self.assertEqual(f.read(), INHALT)
+
+
+if __name__ == '__main__':
+    unittest.main()
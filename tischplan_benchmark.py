@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tischplanung-Benchmark für Hochzeitsplaner
+==========================================
+Erzeugt reproduzierbare, synthetische Gästelisten (Kategorien, Seiten,
+Familien-Nachnamen, anzahl_essen, Beziehungsgraph mit einstellbarer Dichte
+und Konfliktquote) in einer temporären SQLite-Datenbank und misst die
+Tischplanungs-Endpunkte auto-assign, optimize-table-sizes und overview.
+
+Gemessen werden Laufzeit, Speicherspitze und Qualität des Sitzplans
+(Bewertung wie bei den Sitzplan-Szenarien). Die Ergebnisse werden als JSON
+geschrieben, damit Regressionen verglichen werden können.
+
+Beispiel:
+    python tischplan_benchmark.py --guests 50 150 400 --density 3 --conflict-ratio 0.1
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from tischplan_szenarien import SitzplanSzenario, bewerte_sitzplan
+
+KATEGORIEN = ['Familie', 'Freunde', 'Kollegen', 'Nachbarn', 'Verein']
+SEITEN = ['Käthe', 'Pascal', 'Beide']
+NACHNAMEN = [
+    'Müller', 'Schmidt', 'Schneider', 'Fischer', 'Weber', 'Meyer', 'Wagner', 'Becker',
+    'Schulz', 'Hoffmann', 'Koch', 'Richter', 'Klein', 'Wolf', 'Schröder', 'Neumann',
+    'Schwarz', 'Braun', 'Zimmermann', 'Hofmann', 'Hartmann', 'Krüger', 'Lange', 'Werner'
+]
+POSITIVE_TYPEN = ['beste_freunde', 'freunde', 'studienfreunde', 'kollegen', 'nachbarn', 'sportverein']
+NEGATIVE_TYPEN = [('spinnen_sich_nicht', -2), ('konflikt', -3), ('ex_partner', -3)]
+
+
+# =============================================================================
+# Synthetische Daten
+# =============================================================================
+
+def generate_gaeste(anzahl, rnd):
+    """
+    Erzeugt Gäste in Haushalten (gleicher Nachname, gleiche Seite und Kategorie)
+
+    Returns:
+        Liste von Gast-Dicts und Liste der Haushalte (Listen von Indizes)
+    """
+    gaeste = []
+    haushalte = []
+    while len(gaeste) < anzahl:
+        groesse = min(rnd.choice([1, 1, 2, 2, 3, 4]), anzahl - len(gaeste))
+        nachname = rnd.choice(NACHNAMEN)
+        seite = rnd.choice(SEITEN)
+        kategorie = rnd.choice(KATEGORIEN)
+        haushalt = []
+        for _ in range(groesse):
+            # Ein Gast-Eintrag kann mehrere Personen umfassen (z.B. Paar mit Kind)
+            personen = rnd.choices([1, 2, 3], weights=[70, 25, 5])[0]
+            essen = 0 if rnd.random() < 0.08 else personen
+            haushalt.append(len(gaeste))
+            gaeste.append({
+                'vorname': f"Gast{len(gaeste) + 1}",
+                'nachname': nachname,
+                'kategorie': kategorie,
+                'seite': seite,
+                'status': 'Zugesagt',
+                'anzahl_personen': personen,
+                'anzahl_essen': essen,
+                'zum_essen': 'Ja' if essen > 0 else 'Nein',
+                'kind': 1 if personen == 3 else 0
+            })
+        haushalte.append(haushalt)
+    return gaeste, haushalte
+
+
+def generate_beziehungen(gast_ids, gaeste, haushalte, dichte, konfliktquote, rnd):
+    """
+    Erzeugt einen Beziehungsgraphen
+
+    Args:
+        dichte: Durchschnittliche Anzahl zusätzlicher Beziehungen pro Gast
+        konfliktquote: Anteil negativer Beziehungen an den zusätzlichen Beziehungen
+
+    Returns:
+        Liste von (gast_id_1, gast_id_2, beziehungstyp, staerke)
+    """
+    kanten = {}
+
+    # Haushalte sind immer eng verbunden
+    for haushalt in haushalte:
+        for i, a in enumerate(haushalt):
+            for b in haushalt[i + 1:]:
+                kanten[(gast_ids[a], gast_ids[b])] = ('familie', 3)
+
+    # Zufällige Beziehungen, bevorzugt innerhalb derselben Kategorie
+    nach_kategorie = {}
+    for index, gast in enumerate(gaeste):
+        nach_kategorie.setdefault(gast['kategorie'], []).append(index)
+
+    ziel = int(len(gaeste) * dichte / 2)
+    versuche = 0
+    hinzugefuegt = 0
+    while hinzugefuegt < ziel and versuche < ziel * 20:
+        versuche += 1
+        a = rnd.randrange(len(gaeste))
+        if rnd.random() < 0.7:
+            b = rnd.choice(nach_kategorie[gaeste[a]['kategorie']])
+        else:
+            b = rnd.randrange(len(gaeste))
+        if a == b:
+            continue
+        schluessel = tuple(sorted((gast_ids[a], gast_ids[b])))
+        if schluessel in kanten:
+            continue
+        if rnd.random() < konfliktquote:
+            kanten[schluessel] = rnd.choice(NEGATIVE_TYPEN)
+        else:
+            kanten[schluessel] = (rnd.choice(POSITIVE_TYPEN), rnd.randint(1, 3))
+        hinzugefuegt += 1
+
+    return [(g1, g2, typ, staerke) for (g1, g2), (typ, staerke) in kanten.items()]
+
+
+def seed_database(db_path, anzahl, dichte, konfliktquote, seed):
+    """Schreibt die synthetischen Gäste und Beziehungen direkt in die Datenbank"""
+    rnd = random.Random(seed)
+    gaeste, haushalte = generate_gaeste(anzahl, rnd)
+
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM tisch_zuordnungen")
+    cursor.execute("DELETE FROM tische")
+    cursor.execute("DELETE FROM gast_beziehungen")
+    cursor.execute("DELETE FROM gaeste")
+
+    gast_ids = []
+    for gast in gaeste:
+        cursor.execute("""
+            INSERT INTO gaeste (vorname, nachname, kategorie, seite, status,
+                                anzahl_personen, anzahl_essen, zum_essen, kind)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (gast['vorname'], gast['nachname'], gast['kategorie'], gast['seite'], gast['status'],
+              gast['anzahl_personen'], gast['anzahl_essen'], gast['zum_essen'], gast['kind']))
+        gast_ids.append(cursor.lastrowid)
+
+    beziehungen = generate_beziehungen(gast_ids, gaeste, haushalte, dichte, konfliktquote, rnd)
+    cursor.executemany("""
+        INSERT INTO gast_beziehungen (gast_id_1, gast_id_2, beziehungstyp, staerke)
+        VALUES (?, ?, ?, ?)
+    """, beziehungen)
+
+    conn.commit()
+    conn.close()
+
+    return {
+        'gaeste': len(gaeste),
+        'personen_essen': sum(g['anzahl_essen'] for g in gaeste),
+        'haushalte': len(haushalte),
+        'beziehungen': len(beziehungen),
+        'konflikte': sum(1 for b in beziehungen if b[3] < 0)
+    }
+
+
+def reset_sitzplan(db_path):
+    """Entfernt Tische und Zuordnungen, damit jede Wiederholung gleich startet"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM tisch_zuordnungen")
+    conn.execute("DELETE FROM tische")
+    conn.commit()
+    conn.close()
+
+
+# =============================================================================
+# Messung
+# =============================================================================
+
+def load_app(data_dir):
+    """
+    Importiert die Flask-App auf der Temp-DB
+    
+    DATA_PATH wird vor dem Import gesetzt: schon die Initialisierung beim
+    Import (Datenbank, Migrationen, app_config.json) darf nur das
+    Temp-Verzeichnis berühren, nie die echten Hochzeitsdaten.
+    """
+    if 'app' in sys.modules:
+        raise RuntimeError("App bereits importiert - Datenverzeichnis lässt sich nicht mehr umlenken")
+    os.environ['DATA_PATH'] = data_dir
+    # Keine Medien-Worker für den Benchmark starten
+    os.environ.setdefault('MEDIA_WORKERS', '0')
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+    if not app_module.data_manager or (os.path.abspath(app_module.data_manager.data_directory)
+                                         != os.path.abspath(data_dir)):
+        raise RuntimeError(f"App nutzt nicht das Temp-Verzeichnis {data_dir}")
+
+    client = app_module.app.test_client()
+    with client.session_transaction() as sess:
+        sess['logged_in'] = True
+        sess['user_role'] = 'admin'
+        sess['username'] = 'benchmark'
+    return app_module, client
+
+
+def call_endpoint(client, method, path, payload=None):
+    if method == 'POST':
+        response = client.post(path, json=payload or {})
+    else:
+        response = client.get(path)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{method} {path} -> {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response.get_json()
+
+
+def measure(funktion, wiederholungen, vorbereitung=None):
+    """
+    Misst eine Funktion: Laufzeiten ohne Tracing, Speicherspitze in einem
+    zusätzlichen Lauf mit tracemalloc (Tracing verfälscht sonst die Zeiten)
+    """
+    zeiten = []
+    ergebnis = None
+    for _ in range(wiederholungen):
+        if vorbereitung:
+            vorbereitung()
+        start = time.perf_counter()
+        ergebnis = funktion()
+        zeiten.append(time.perf_counter() - start)
+
+    if vorbereitung:
+        vorbereitung()
+    tracemalloc.start()
+    ergebnis = funktion()
+    _, spitze = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    zeiten.sort()
+    return ergebnis, {
+        'runs': wiederholungen,
+        'min_ms': round(zeiten[0] * 1000, 2),
+        'median_ms': round(zeiten[len(zeiten) // 2] * 1000, 2),
+        'max_ms': round(zeiten[-1] * 1000, 2),
+        'peak_alloc_kb': round(spitze / 1024, 1)
+    }
+
+
+def bewerte_live_plan(data_manager):
+    """Qualität des aktuellen Sitzplans"""
+    tische = data_manager.get_tische()
+    szenario = SitzplanSzenario.from_zuordnungen(data_manager.get_tisch_zuordnungen())
+    bewertung = bewerte_sitzplan(szenario, data_manager.get_gaeste_list(),
+                                 data_manager.get_gast_beziehungen(), tische)
+
+    kapazitaet = sum(t.get('max_personen') or 0 for t in tische)
+    belegung = sum(data_manager.get_tisch_belegung().values())
+    bewertung['tische'] = len(tische)
+    bewertung['kapazitaet'] = kapazitaet
+    bewertung['auslastung'] = round(belegung / kapazitaet, 3) if kapazitaet else 0
+    return bewertung
+
+
+def run_case(client, data_manager, anzahl, args):
+    daten = seed_database(data_manager.db_path, anzahl, args.density, args.conflict_ratio, args.seed)
+    db_path = data_manager.db_path
+
+    def auto_assign():
+        return call_endpoint(client, 'POST', '/api/tischplanung/auto-assign')
+
+    _, auto_assign_stats = measure(auto_assign, args.repeat, lambda: reset_sitzplan(db_path))
+    qualitaet_auto = bewerte_live_plan(data_manager)
+
+    # optimize-table-sizes arbeitet auf dem Ergebnis der Auto-Zuweisung
+    def optimize():
+        return call_endpoint(client, 'POST', '/api/tischplanung/optimize-table-sizes')
+
+    _, optimize_stats = measure(optimize, args.repeat)
+    qualitaet_optimiert = bewerte_live_plan(data_manager)
+
+    def overview():
+        return call_endpoint(client, 'GET', '/api/tischplanung/overview')
+
+    _, overview_stats = measure(overview, args.repeat)
+
+    return {
+        'guests': anzahl,
+        'dataset': daten,
+        'auto_assign': dict(auto_assign_stats, quality=qualitaet_auto),
+        'optimize_table_sizes': dict(optimize_stats, quality=qualitaet_optimiert),
+        'overview': overview_stats
+    }
+
+
+def max_rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS liefert Bytes, Linux Kilobytes
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark der Tischplanung mit synthetischen Gästelisten')
+    parser.add_argument('--guests', type=int, nargs='+', default=[50, 150, 300],
+                        help='Anzahl der Gast-Einträge je Durchlauf')
+    parser.add_argument('--density', type=float, default=3.0,
+                        help='Zusätzliche Beziehungen pro Gast (Durchschnitt)')
+    parser.add_argument('--conflict-ratio', type=float, default=0.1,
+                        help='Anteil negativer Beziehungen (0..1)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed für den Datengenerator')
+    parser.add_argument('--repeat', type=int, default=3, help='Wiederholungen je Messung')
+    parser.add_argument('--output', default='tischplan_benchmark.json', help='Ergebnisdatei (JSON)')
+    parser.add_argument('--verbose', action='store_true', help='App-Logging nicht unterdrücken')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    print("🪑 Tischplanung-Benchmark")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory(prefix='tischplan_bench_') as data_dir:
+        app_module, client = load_app(data_dir)
+        data_manager = app_module.data_manager
+
+        faelle = []
+        for anzahl in args.guests:
+            fall = run_case(client, data_manager, anzahl, args)
+            faelle.append(fall)
+            print(f"👥 {anzahl:>5} Gäste | auto-assign {fall['auto_assign']['median_ms']:>9} ms "
+                  f"(Score {fall['auto_assign']['quality']['score']}) | "
+                  f"optimize {fall['optimize_table_sizes']['median_ms']:>8} ms | "
+                  f"overview {fall['overview']['median_ms']:>7} ms")
+
+    ergebnis = {
+        'benchmark': 'tischplanung',
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {
+            'guests': args.guests,
+            'density': args.density,
+            'conflict_ratio': args.conflict_ratio,
+            'seed': args.seed,
+            'repeat': args.repeat
+        },
+        'max_rss_kb': max_rss_kb(),
+        'cases': faelle
+    }
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(ergebnis, f, indent=2, ensure_ascii=False)
+    print(f"📂 Ergebnisse gespeichert: {os.path.abspath(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
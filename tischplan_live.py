@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Live-Tischplanung für Hochzeitsplaner
+Verteilt Sitzplan-Änderungen per Server-Sent Events an alle offenen Tischplanungs-Seiten
+"""
+
+import json
+import queue
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event, version, daten=None, event_id=True):
+    """Kodiert ein Server-Sent Event (einmalig, wird an alle Abonnenten verteilt)"""
+    payload = json.dumps({'version': version, 'daten': daten or {}}, separators=(',', ':'))
+    zeilen = []
+    if event_id:
+        zeilen.append(f"id: {version}")
+    zeilen.append(f"event: {event}")
+    zeilen.append(f"data: {payload}")
+    return ("\n".join(zeilen) + "\n\n").encode('utf-8')
+
+
+class _Abonnent:
+    """Eine offene Event-Stream-Verbindung mit begrenzter Warteschlange"""
+
+    def __init__(self, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.ueberlaeufe = 0
+        self.start_version = 0
+
+
+class TischplanEventBroker:
+    """
+    Verteilt protokollierte Sitzplan-Änderungen (tischplan_events) an SSE-Clients
+
+    Pro Prozess fragt genau ein Hintergrund-Thread die Datenbank nach neuen
+    Planversionen ab - so erreichen auch Änderungen aus anderen Gunicorn-Workern
+    alle Clients. Jede Änderung wird nur einmal kodiert und dann in die
+    Warteschlangen der Abonnenten gelegt. Läuft die Warteschlange eines
+    langsamen Clients über, wird sie verworfen und durch ein einzelnes
+    'resync'-Event ersetzt; nach wiederholtem Überlauf wird die Verbindung beendet.
+
+    Der Broker sollte erst im Worker erzeugt werden (nach dem gevent Monkey-Patching),
+    damit Thread, Event und Queue kooperativ arbeiten.
+    """
+
+    def __init__(self, data_manager, poll_interval=0.5, queue_size=256,
+                 max_ueberlaeufe=3, keepalive_interval=15.0):
+        self.data_manager = data_manager
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.max_ueberlaeufe = max_ueberlaeufe
+        self.keepalive_interval = keepalive_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._abonnenten = set()
+        self._thread = None
+        self._version = 0
+
+    def notify(self):
+        """Weckt den Poller nach einer Änderung im eigenen Prozess sofort auf"""
+        if self._abonnenten:
+            self._wakeup.set()
+
+    def subscribe(self):
+        """Registriert einen neuen Client und startet bei Bedarf den Poller"""
+        abonnent = _Abonnent(self.queue_size)
+        with self._lock:
+            if self._thread is None:
+                self._version = self.data_manager.get_tischplan_version()
+                self._thread = threading.Thread(target=self._run, name='tischplan-live', daemon=True)
+                self._thread.start()
+                logger.info(f"📡 Live-Tischplanung gestartet (Version {self._version})")
+            abonnent.start_version = self._version
+            self._abonnenten.add(abonnent)
+        return abonnent
+
+    def unsubscribe(self, abonnent):
+        """Entfernt einen Client; der Poller beendet sich ohne Abonnenten selbst"""
+        with self._lock:
+            self._abonnenten.discard(abonnent)
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+            with self._lock:
+                if not self._abonnenten:
+                    self._thread = None
+                    logger.info("📡 Live-Tischplanung beendet (keine Clients)")
+                    return
+
+            try:
+                self._poll()
+            except Exception as e:
+                logger.error(f"Fehler beim Verteilen der Sitzplan-Änderungen: {e}")
+
+    def _poll(self):
+        events = self.data_manager.get_tischplan_events(self._version)
+        if events is None:
+            # Lücke im Protokoll - alle Clients laden den Plan neu
+            version = self.data_manager.get_tischplan_version()
+            self._version = version
+            self._publish(format_sse('resync', version))
+            return
+
+        for event in events:
+            self._version = event['version']
+            self._publish(format_sse(event['typ'], event['version'], event['daten']))
+
+    def _publish(self, nachricht):
+        with self._lock:
+            abonnenten = list(self._abonnenten)
+
+        for abonnent in abonnenten:
+            try:
+                abonnent.queue.put_nowait(nachricht)
+            except queue.Full:
+                self._handle_ueberlauf(abonnent)
+
+    def _handle_ueberlauf(self, abonnent):
+        abonnent.ueberlaeufe += 1
+        while True:
+            try:
+                abonnent.queue.get_nowait()
+            except queue.Empty:
+                break
+
+        if abonnent.ueberlaeufe > self.max_ueberlaeufe:
+            logger.warning("⚠️ Live-Tischplanung: Client zu langsam, Verbindung wird beendet")
+            with self._lock:
+                self._abonnenten.discard(abonnent)
+            abonnent.queue.put_nowait(None)
+        else:
+            abonnent.queue.put_nowait(format_sse('resync', self._version))
+
+    def stream(self, since_version=None):
+        """
+        Generator für die SSE-Response eines Clients
+
+        Args:
+            since_version: Zuletzt bekannte Planversion des Clients (Last-Event-ID),
+                           fehlende Änderungen werden aus dem Protokoll nachgeliefert
+        """
+        abonnent = self.subscribe()
+        try:
+            yield b"retry: 3000\n\n"
+
+            version = abonnent.start_version
+            if since_version is not None and since_version < version:
+                events = self.data_manager.get_tischplan_events(since_version, limit=version - since_version)
+                if events is None or (events and events[-1]['version'] < version):
+                    yield format_sse('resync', version)
+                else:
+                    for event in events:
+                        yield format_sse(event['typ'], event['version'], event['daten'])
+
+            yield format_sse('hello', version)
+
+            while True:
+                try:
+                    nachricht = abonnent.queue.get(timeout=self.keepalive_interval)
+                except queue.Empty:
+                    yield b": keepalive\n\n"
+                    continue
+                if nachricht is None:
+                    break
+                yield nachricht
+        finally:
+            self.unsubscribe(abonnent)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sitzplan-Szenarien für Hochzeitsplaner
+Kompakte Speicherung alternativer Sitzpläne (Gast -> Tisch) und deren Bewertung
+"""
+
+import sys
+import logging
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Gewichte der Sitzplan-Bewertung (entsprechen der Kompatibilitätsberechnung der Auto-Zuweisung)
+GEWICHT_POSITIVE_BEZIEHUNG = 20
+GEWICHT_NEGATIVE_BEZIEHUNG = 50
+GEWICHT_GLEICHER_NACHNAME = -20
+GEWICHT_UEBERBELEGUNG = -100
+GEWICHT_NICHT_ZUGEORDNET = -30
+
+
+class SitzplanSzenario:
+    """
+    Sitzplan als zwei parallele, nach Gast-ID sortierte Integer-Arrays
+
+    Klone teilen sich die Arrays mit dem Original, bis einer von beiden
+    geändert wird (Copy-on-Write).
+    """
+
+    def __init__(self, gast_ids=None, tisch_ids=None):
+        self._gast_ids = gast_ids if gast_ids is not None else array('i')
+        self._tisch_ids = tisch_ids if tisch_ids is not None else array('i')
+        self._shared = False
+
+    @classmethod
+    def from_zuordnungen(cls, zuordnungen):
+        """Erstellt ein Szenario aus einer Liste von Zuordnungen (get_tisch_zuordnungen)"""
+        paare = sorted((z['gast_id'], z['tisch_id']) for z in zuordnungen)
+        return cls(array('i', (p[0] for p in paare)), array('i', (p[1] for p in paare)))
+
+    @classmethod
+    def from_bytes(cls, gast_bytes, tisch_bytes):
+        """Lädt ein Szenario aus den gespeicherten BLOBs (Little Endian)"""
+        gast_ids = array('i')
+        tisch_ids = array('i')
+        gast_ids.frombytes(gast_bytes or b'')
+        tisch_ids.frombytes(tisch_bytes or b'')
+        if sys.byteorder == 'big':
+            gast_ids.byteswap()
+            tisch_ids.byteswap()
+        return cls(gast_ids, tisch_ids)
+
+    def to_bytes(self):
+        """Gibt die Arrays als Little-Endian-BLOBs zurück"""
+        gast_ids = self._gast_ids
+        tisch_ids = self._tisch_ids
+        if sys.byteorder == 'big':
+            gast_ids = array('i', gast_ids)
+            tisch_ids = array('i', tisch_ids)
+            gast_ids.byteswap()
+            tisch_ids.byteswap()
+        return gast_ids.tobytes(), tisch_ids.tobytes()
+
+    def clone(self):
+        """Günstiger Klon - die Arrays werden erst beim ersten Schreiben kopiert"""
+        klon = SitzplanSzenario(self._gast_ids, self._tisch_ids)
+        klon._shared = True
+        self._shared = True
+        return klon
+
+    def _ensure_own_copy(self):
+        if self._shared:
+            self._gast_ids = array('i', self._gast_ids)
+            self._tisch_ids = array('i', self._tisch_ids)
+            self._shared = False
+
+    def get_tisch(self, gast_id):
+        """Gibt die Tisch-ID eines Gastes zurück (oder None)"""
+        index = bisect_left(self._gast_ids, gast_id)
+        if index < len(self._gast_ids) and self._gast_ids[index] == gast_id:
+            return self._tisch_ids[index]
+        return None
+
+    def assign(self, gast_id, tisch_id):
+        """Setzt (oder verschiebt) einen Gast an einen Tisch"""
+        self._ensure_own_copy()
+        index = bisect_left(self._gast_ids, gast_id)
+        if index < len(self._gast_ids) and self._gast_ids[index] == gast_id:
+            self._tisch_ids[index] = tisch_id
+        else:
+            self._gast_ids.insert(index, gast_id)
+            self._tisch_ids.insert(index, tisch_id)
+
+    def unassign(self, gast_id):
+        """Entfernt einen Gast aus dem Szenario"""
+        index = bisect_left(self._gast_ids, gast_id)
+        if index < len(self._gast_ids) and self._gast_ids[index] == gast_id:
+            self._ensure_own_copy()
+            del self._gast_ids[index]
+            del self._tisch_ids[index]
+            return True
+        return False
+
+    def items(self):
+        """Iteriert über (gast_id, tisch_id)-Paare"""
+        return zip(self._gast_ids, self._tisch_ids)
+
+    def __len__(self):
+        return len(self._gast_ids)
+
+
+def bewerte_sitzplan(szenario, gaeste, beziehungen, tische):
+    """
+    Bewertet einen Sitzplan mit derselben Zielfunktion für alle Szenarien
+
+    Args:
+        szenario: SitzplanSzenario
+        gaeste: Gästeliste (get_gaeste_list), berücksichtigt werden Gäste mit anzahl_essen > 0
+        beziehungen: Beziehungen (get_gast_beziehungen)
+        tische: Aktive Tische (get_tische)
+
+    Returns:
+        Dict mit Gesamt-'score' und den einzelnen Bestandteilen
+    """
+    gaeste_by_id = {g['id']: g for g in gaeste}
+    kapazitaet = {t['id']: t.get('max_personen') or 0 for t in tische}
+
+    tisch_gaeste = defaultdict(list)
+    for gast_id, tisch_id in szenario.items():
+        if gast_id in gaeste_by_id:
+            tisch_gaeste[tisch_id].append(gast_id)
+
+    positive = 0
+    konflikte = 0
+    beziehungs_score = 0
+    for rel in beziehungen:
+        gast1 = rel.get('gast_id_1')
+        gast2 = rel.get('gast_id_2')
+        staerke = rel.get('staerke', 0) or 0
+        if staerke == 0 or gast1 == -1 or gast2 == -1:
+            continue
+        tisch1 = szenario.get_tisch(gast1)
+        if tisch1 is None or tisch1 != szenario.get_tisch(gast2):
+            continue
+        if staerke > 0:
+            positive += 1
+            beziehungs_score += staerke * GEWICHT_POSITIVE_BEZIEHUNG
+        else:
+            if staerke < -1:
+                konflikte += 1
+            beziehungs_score += staerke * GEWICHT_NEGATIVE_BEZIEHUNG
+
+    familien_paare = 0
+    ueberbelegung = 0
+    gemischte_tische = 0
+    unbekannte_tische = 0
+    for tisch_id, gast_ids in tisch_gaeste.items():
+        nachnamen = defaultdict(int)
+        seiten = set()
+        personen = 0
+        for gast_id in gast_ids:
+            gast = gaeste_by_id[gast_id]
+            nachname = (gast.get('nachname') or '').strip()
+            if nachname:
+                nachnamen[nachname] += 1
+            if gast.get('seite'):
+                seiten.add(gast['seite'])
+            personen += gast.get('anzahl_essen') or 1
+        familien_paare += sum(n * (n - 1) // 2 for n in nachnamen.values())
+        if len(seiten - {'Beide'}) > 1:
+            gemischte_tische += 1
+        if tisch_id not in kapazitaet:
+            unbekannte_tische += 1
+        elif personen > kapazitaet[tisch_id]:
+            ueberbelegung += personen - kapazitaet[tisch_id]
+
+    nicht_zugeordnet = sum(
+        1 for g in gaeste
+        if (g.get('anzahl_essen') or 0) > 0 and szenario.get_tisch(g['id']) is None
+    )
+
+    score = (beziehungs_score
+             + familien_paare * GEWICHT_GLEICHER_NACHNAME
+             + ueberbelegung * GEWICHT_UEBERBELEGUNG
+             + nicht_zugeordnet * GEWICHT_NICHT_ZUGEORDNET)
+
+    return {
+        'score': score,
+        'positive_beziehungen': positive,
+        'konflikte': konflikte,
+        'familien_paare': familien_paare,
+        'ueberbelegung': ueberbelegung,
+        'nicht_zugeordnet': nicht_zugeordnet,
+        'gemischte_seiten_tische': gemischte_tische,
+        'unbekannte_tische': unbekannte_tische,
+        'belegte_tische': len(tisch_gaeste)
+    }
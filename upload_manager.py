@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Upload-Manager für Hochzeitsplaner
+Fortsetzbare Gäste-Uploads: Dateien werden blockweise (Content-Range) direkt
+auf die Platte geschrieben, beim Schreiben gehasht und am Ende atomar als
+inhaltsadressierte Datei (blobs/<hh>/<sha256>.<ext>) abgelegt
+"""
+
+import os
+import re
+import hashlib
+import logging
+import secrets
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Größe der Lese-/Schreibblöcke beim Streamen auf die Platte
+STREAM_BLOCKGROESSE = 1024 * 1024
+
+# Empfohlene und maximale Größe eines Upload-Abschnitts (ein PUT-Request)
+CHUNK_GROESSE = 4 * 1024 * 1024
+MAX_CHUNK_GROESSE = 16 * 1024 * 1024
+
+# Nicht fortgesetzte Uploads werden nach dieser Zeit verworfen
+SESSION_ABLAUF_STUNDEN = 24
+
+_CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+
+
+def parse_content_range(header):
+    """
+    Zerlegt einen Content-Range-Header ("bytes start-ende/gesamt")
+
+    Returns:
+        (start, ende, gesamt) oder None
+    """
+    match = _CONTENT_RANGE.match((header or '').strip())
+    if not match:
+        return None
+    start, ende, gesamt = (int(x) for x in match.groups())
+    if start > ende or ende >= gesamt:
+        return None
+    return start, ende, gesamt
+
+
+def partial_dir(upload_root):
+    """Verzeichnis für noch unvollständige Uploads"""
+    pfad = os.path.join(upload_root, '.partial')
+    os.makedirs(pfad, exist_ok=True)
+    return pfad
+
+
+def blob_pfad(upload_root, content_hash, original_filename):
+    """Ablageort einer Datei anhand ihres Inhalts-Hashes"""
+    file_ext = original_filename.rsplit('.', 1)[-1].lower() if '.' in original_filename else 'bin'
+    return os.path.join(upload_root, 'blobs', content_hash[:2], f"{content_hash}.{file_ext}")
+
+
+def speichere_stream(stream, upload_root, max_bytes=None):
+    """
+    Schreibt einen Datei-Stream blockweise in eine temporäre Datei und
+    berechnet dabei den SHA-256
+
+    Returns:
+        (temporärer Pfad, Dateigröße, Hex-Hash) oder None, wenn max_bytes überschritten wurde
+    """
+    sha = hashlib.sha256()
+    groesse = 0
+    temp_pfad = os.path.join(partial_dir(upload_root), f"{secrets.token_hex(12)}.part")
+    try:
+        with open(temp_pfad, 'wb') as f:
+            for block in iter(lambda: stream.read(STREAM_BLOCKGROESSE), b''):
+                groesse += len(block)
+                if max_bytes is not None and groesse > max_bytes:
+                    raise OverflowError
+                sha.update(block)
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        return temp_pfad, groesse, sha.hexdigest()
+    except BaseException as e:
+        if os.path.exists(temp_pfad):
+            os.remove(temp_pfad)
+        if isinstance(e, OverflowError):
+            return None
+        raise
+
+
+def lege_blob_ab(data_manager, temp_pfad, content_hash, upload_root, original_filename):
+    """
+    Übernimmt eine fertig geschriebene Datei in den inhaltsadressierten Speicher
+    
+    Ist derselbe Inhalt bereits vorhanden, wird die temporäre Datei verworfen
+    und die vorhandene Datei weiterverwendet.
+    
+    Returns:
+        Absoluter Pfad der abgelegten Datei
+    """
+    blob = data_manager.get_upload_blob(content_hash)
+    if blob and os.path.isfile(blob['pfad']):
+        os.remove(temp_pfad)
+        logger.info(f"♻️ Datei bereits vorhanden, Duplikat wird nicht gespeichert ({content_hash[:12]})")
+        return blob['pfad']
+    
+    ziel = blob_pfad(upload_root, content_hash, original_filename)
+    os.makedirs(os.path.dirname(ziel), exist_ok=True)
+    os.replace(temp_pfad, ziel)
+    return os.path.realpath(ziel)
+
+
+def _ist_dieselbe_datei(f, pfad):
+    """Prüft, ob unter pfad noch die geöffnete Datei liegt (nicht umbenannt oder gelöscht)"""
+    try:
+        return os.path.samestat(os.fstat(f.fileno()), os.stat(pfad))
+    except FileNotFoundError:
+        return False
+
+
+class UploadSessionManager:
+    """
+    Fortsetzbare Uploads nach einem einfachen Content-Range-Protokoll
+
+    1. Session anlegen (Dateiname, Gesamtgröße) - Größe und Endung werden sofort geprüft
+    2. Abschnitte per PUT mit "Content-Range: bytes start-ende/gesamt" senden;
+       start muss dem bestätigten Fortschritt entsprechen
+    3. Nach dem letzten Abschnitt wird die .part-Datei atomar in das
+       Upload-Verzeichnis umbenannt
+
+    Der Request-Body wird nie komplett in den Speicher geladen. Bricht die
+    Verbindung mitten im Abschnitt ab, bleiben die bereits geschriebenen Bytes
+    erhalten und der Client setzt ab dem gemeldeten Offset fort. Der SHA-256
+    wird pro Prozess fortlaufend mitgeführt; landet ein Abschnitt in einem
+    anderen Worker, wird der bisherige Teil einmal nachgehasht.
+    """
+
+    def __init__(self, data_manager, get_upload_path):
+        self.data_manager = data_manager
+        self.get_upload_path = get_upload_path
+        self._hashes = {}
+        self._hashes_lock = threading.Lock()
+
+    def create(self, gast_id, original_filename, total_size, mime_type, beschreibung=''):
+        """Legt eine neue Upload-Session an"""
+        self.cleanup_abgelaufene()
+
+        token = secrets.token_urlsafe(24)
+        part_path = os.path.join(partial_dir(self.get_upload_path()), f"{token}.part")
+        open(part_path, 'wb').close()
+
+        if not self.data_manager.create_upload_session(token, gast_id, original_filename, mime_type,
+                                                       beschreibung, total_size, part_path):
+            os.remove(part_path)
+            return None
+
+        logger.info(f"📤 Upload-Session für '{original_filename}' ({total_size / 1024 / 1024:.1f} MB) angelegt")
+        return {'token': token, 'offset': 0, 'size': total_size, 'chunk_size': CHUNK_GROESSE}
+
+    def get(self, token, gast_id):
+        """Lädt eine Session des Gastes (oder None)"""
+        upload_session = self.data_manager.get_upload_session(token)
+        if not upload_session or upload_session['gast_id'] != gast_id:
+            return None
+        return upload_session
+
+    def _hash_bis(self, upload_session, f, offset):
+        """SHA-256-Objekt über die ersten `offset` Bytes der .part-Datei"""
+        with self._hashes_lock:
+            eintrag = self._hashes.pop(upload_session['token'], None)
+        if eintrag and eintrag[0] == offset:
+            return eintrag[1]
+
+        sha = hashlib.sha256()
+        f.seek(0)
+        rest = offset
+        while rest > 0:
+            block = f.read(min(STREAM_BLOCKGROESSE, rest))
+            if not block:
+                break
+            sha.update(block)
+            rest -= len(block)
+        return sha
+
+    def write_chunk(self, upload_session, stream, start, ende, gesamt):
+        """
+        Schreibt einen Abschnitt direkt aus dem Request-Stream in die .part-Datei
+
+        Returns:
+            Dict mit 'success', 'offset', bei Fehlern 'error' und 'status';
+            nach dem letzten Abschnitt zusätzlich 'complete', 'temp_path',
+            'file_size' und 'content_hash' (ablegen mit lege_blob_ab)
+        """
+        token = upload_session['token']
+        if gesamt != upload_session['total_size']:
+            return {'success': False, 'status': 400, 'error': 'Gesamtgröße passt nicht zur Upload-Session',
+                    'offset': upload_session['received']}
+        if start != upload_session['received']:
+            return {'success': False, 'status': 409, 'error': 'Abschnitt passt nicht zum Upload-Fortschritt',
+                    'offset': upload_session['received']}
+        erwartet = ende - start + 1
+        if erwartet > MAX_CHUNK_GROESSE:
+            return {'success': False, 'status': 413, 'error': 'Abschnitt zu groß',
+                    'offset': upload_session['received']}
+
+        part_path = upload_session['part_path']
+        try:
+            f = open(part_path, 'r+b')
+        except FileNotFoundError:
+            self.data_manager.delete_upload_session(token)
+            return {'success': False, 'status': 410, 'error': 'Upload-Session abgelaufen', 'offset': 0}
+
+        with f:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    return {'success': False, 'status': 423, 'error': 'Abschnitt wird bereits übertragen',
+                            'offset': upload_session['received']}
+
+            # Stand erst unter dem Lock maßgeblich: ein wiederholter Request darf weder
+            # bestätigten Fortschritt abschneiden noch einen beendeten Upload anfassen
+            aktuell = self.data_manager.get_upload_session(token)
+            if aktuell is None or not _ist_dieselbe_datei(f, part_path):
+                if aktuell is not None:
+                    self.data_manager.delete_upload_session(token)
+                return {'success': False, 'status': 410, 'error': 'Upload-Session bereits beendet', 'offset': 0}
+            if start != aktuell['received']:
+                return {'success': False, 'status': 409, 'error': 'Abschnitt passt nicht zum Upload-Fortschritt',
+                        'offset': aktuell['received']}
+            
+            sha = self._hash_bis(upload_session, f, start)
+            # Reste eines abgebrochenen Abschnitts verwerfen
+            f.seek(start)
+            f.truncate()
+
+            geschrieben = 0
+            fehler = None
+            try:
+                while geschrieben < erwartet:
+                    block = stream.read(min(STREAM_BLOCKGROESSE, erwartet - geschrieben))
+                    if not block:
+                        break
+                    f.write(block)
+                    sha.update(block)
+                    geschrieben += len(block)
+                # Mehr Daten als angekündigt: Abschnitt ablehnen
+                if geschrieben == erwartet and stream.read(1):
+                    f.seek(start)
+                    f.truncate()
+                    return {'success': False, 'status': 413, 'error': 'Abschnitt größer als im Content-Range angegeben',
+                            'offset': start}
+            except Exception as e:
+                # Verbindung abgebrochen - bisher Geschriebenes bleibt erhalten
+                fehler = e
+            f.flush()
+
+            offset = start + geschrieben
+            self.data_manager.update_upload_session_received(token, offset)
+
+            if offset < gesamt:
+                with self._hashes_lock:
+                    self._hashes[token] = (offset, sha)
+                if fehler is not None:
+                    logger.warning(f"⚠️ Upload-Abschnitt abgebrochen bei {offset}/{gesamt} Bytes: {fehler}")
+                return {'success': True, 'offset': offset, 'complete': False}
+
+            os.fsync(f.fileno())
+            # Noch unter dem Lock beenden, damit eine Wiederholung die Session nicht mehr findet
+            return self._abschliessen(upload_session, gesamt, sha.hexdigest())
+
+    def _abschliessen(self, upload_session, gesamt, content_hash):
+        """Prüft die fertige .part-Datei und beendet die Session"""
+        part_path = upload_session['part_path']
+        if os.path.getsize(part_path) != gesamt:
+            return {'success': False, 'status': 500, 'error': 'Dateigröße nach dem Upload stimmt nicht',
+                    'offset': os.path.getsize(part_path)}
+
+        self.data_manager.delete_upload_session(upload_session['token'])
+
+        return {
+            'success': True,
+            'complete': True,
+            'offset': gesamt,
+            'temp_path': part_path,
+            'file_size': gesamt,
+            'content_hash': content_hash
+        }
+
+    def abort(self, upload_session):
+        """Bricht einen Upload ab und entfernt die .part-Datei"""
+        with self._hashes_lock:
+            self._hashes.pop(upload_session['token'], None)
+        if os.path.exists(upload_session['part_path']):
+            os.remove(upload_session['part_path'])
+        return self.data_manager.delete_upload_session(upload_session['token'])
+
+    def cleanup_abgelaufene(self):
+        """Verwirft Uploads, die seit SESSION_ABLAUF_STUNDEN nicht fortgesetzt wurden"""
+        abgelaufen = self.data_manager.get_abgelaufene_upload_sessions(SESSION_ABLAUF_STUNDEN)
+        for upload_session in abgelaufen:
+            self.abort(upload_session)
+        if abgelaufen:
+            logger.info(f"🧹 {len(abgelaufen)} abgelaufene Upload-Sessions entfernt")
+        return len(abgelaufen)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming-ZIP für Hochzeitsplaner
+Erzeugt ZIP-Archive blockweise direkt in die HTTP-Response - ohne temporäre
+Datei und mit konstantem Speicherbedarf, auch für mehrere GB
+"""
+
+import os
+import time
+import zipfile
+
+# Blockgröße beim Lesen der Quelldateien
+ZIP_BLOCKGROESSE = 1024 * 1024
+
+# Bereits komprimierte Formate werden unverändert (STORED) übernommen
+KOMPRIMIERTE_ENDUNGEN = {
+    'jpg', 'jpeg', 'png', 'gif', 'webp', 'avif', 'heic', 'heif',
+    'mp4', 'mov', 'avi', 'mkv', 'webm', 'm4v', '3gp',
+    'mp3', 'm4a', 'aac', 'ogg',
+    'zip', 'gz', 'pdf'
+}
+
+
+class _StreamPuffer:
+    """
+    Nicht durchsuchbares Schreibziel für zipfile
+
+    Ohne seek/tell schreibt zipfile Data-Descriptoren statt die lokalen
+    Header nachträglich zu korrigieren - das Archiv entsteht streng sequentiell.
+    """
+
+    def __init__(self):
+        self._teile = []
+
+    def write(self, daten):
+        self._teile.append(bytes(daten))
+        return len(daten)
+
+    def flush(self):
+        pass
+
+    def abholen(self):
+        daten = b''.join(self._teile)
+        self._teile = []
+        return daten
+
+
+def _kompression(name):
+    endung = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return zipfile.ZIP_STORED if endung in KOMPRIMIERTE_ENDUNGEN else zipfile.ZIP_DEFLATED
+
+
+def eindeutiger_name(name, vergeben):
+    """Hängt bei doppelten Dateinamen im Archiv ' (2)', ' (3)' usw. an"""
+    if name not in vergeben:
+        vergeben.add(name)
+        return name
+
+    basis, punkt, endung = name.rpartition('.')
+    if not punkt:
+        basis, endung = name, ''
+    nummer = 2
+    while True:
+        kandidat = f"{basis} ({nummer}).{endung}" if endung else f"{basis} ({nummer})"
+        if kandidat not in vergeben:
+            vergeben.add(kandidat)
+            return kandidat
+        nummer += 1
+
+
+def stream_zip(eintraege):
+    """
+    Generator, der ein ZIP-Archiv stückweise liefert
+
+    Args:
+        eintraege: Iterable von (Name im Archiv, Quelle); Quelle ist ein
+                   Dateipfad oder bytes. Die Einträge werden erst beim
+                   Streamen abgefragt (z.B. Karten erst dann rendern).
+
+    Yields:
+        bytes-Blöcke des Archivs (ZIP64 wird bei Bedarf automatisch verwendet)
+    """
+    for block in _stream_zip(eintraege):
+        if block:
+            yield block
+
+
+def _stream_zip(eintraege):
+    puffer = _StreamPuffer()
+    vergeben = set()
+
+    with zipfile.ZipFile(puffer, 'w', allowZip64=True) as archiv:
+        for name, quelle in eintraege:
+            name = eindeutiger_name(name, vergeben)
+
+            if isinstance(quelle, (bytes, bytearray)):
+                info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                info.compress_type = _kompression(name)
+                info.file_size = len(quelle)
+                with archiv.open(info, 'w') as ziel:
+                    ziel.write(quelle)
+                yield puffer.abholen()
+                continue
+
+            info = zipfile.ZipInfo.from_file(quelle, arcname=name)
+            info.compress_type = _kompression(name)
+            # Dateigröße ist bekannt - zipfile schaltet damit ZIP64 selbst ein
+            info.file_size = os.path.getsize(quelle)
+            with open(quelle, 'rb') as datei, archiv.open(info, 'w') as ziel:
+                for block in iter(lambda: datei.read(ZIP_BLOCKGROESSE), b''):
+                    ziel.write(block)
+                    yield puffer.abholen()
+            yield puffer.abholen()
+
+    # Zentralverzeichnis
+    yield puffer.abholen()